@@ -24,6 +24,7 @@ from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
 from apps.api_gateway.routers.admin import router as admin_router
+from apps.api_gateway.routers.artifacts import resume_rag_index_jobs
 from apps.api_gateway.routers.artifacts import router as artifacts_router
 from apps.api_gateway.routers.diagnostics import router as diagnostics_router
 from apps.api_gateway.routers.llm import router as llm_router
@@ -82,6 +83,7 @@ async def _app_lifespan(_app: FastAPI):
             and bool(getattr(settings, "whisper_warmup_on_start", False))
         ):
             warmup_stt_provider_async()
+        resume_rag_index_jobs()
         yield
     finally:
         shutdown_stt_provider_runtime()
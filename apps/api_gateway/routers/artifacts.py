@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import csv
+import heapq
 import io
 import json
 import math
@@ -8,14 +9,17 @@ import re
 import threading
 import time
 import uuid
-from collections import Counter
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Generator, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import Any, Literal
 
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import FileResponse, Response
+from fastapi.responses import FileResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 
 from apps.api_gateway.deps import auth_dep
@@ -33,8 +37,10 @@ from interview_analytics_agent.common.metrics import (
     record_rag_index_latency_ms,
     record_rag_llm_latency_ms,
     record_rag_no_hits,
+    record_rag_query_cache,
     record_rag_query_error,
     record_rag_query_latency_ms,
+    record_rag_query_stage_latency_ms,
 )
 from interview_analytics_agent.domain.enums import PipelineStatus
 from interview_analytics_agent.processing.aggregation import (
@@ -46,14 +52,22 @@ from interview_analytics_agent.processing.enhancer import (
     normalize_transcript_deterministic,
 )
 from interview_analytics_agent.rag.embeddings import (
-    cosine_similarity_dense,
     embed_texts_gemini,
-    embed_text_hashing,
+    embed_texts_hashing,
     embed_texts_openai_compat,
     hashing_embedding_model_id,
     is_local_openai_compat_base,
 )
+from interview_analytics_agent.rag.ann_index import RAGIVFIndex
+from interview_analytics_agent.rag.corpus import RAGCorpus
+from interview_analytics_agent.rag.embedding_cache import RAGEmbeddingCacheStore
+from interview_analytics_agent.rag.index_file import read_index_file, read_index_header, write_index_file
+from interview_analytics_agent.rag.job_store import RAGIndexJobStore
+from interview_analytics_agent.rag.keyword_index import RAGKeywordIndex
+from interview_analytics_agent.rag.meta_filter import RAGMetaFilterIndex
+from interview_analytics_agent.rag.vector_store import EMBEDDING_QUANTIZATIONS, RAGVectorStore
 from interview_analytics_agent.processing.structured import build_structured_rows, structured_to_csv
+from interview_analytics_agent.queue.dispatcher import enqueue_enhancer
 from interview_analytics_agent.services.audio_artifact_service import (
     CANONICAL_AUDIO_FILENAME,
     materialize_meeting_audio_mp3,
@@ -186,6 +200,8 @@ class RAGIndexJobRequest(BaseModel):
     meeting_ids: list[str] = Field(default_factory=list)
     transcript_variant: TranscriptVariant = "clean"
     force_rebuild: bool = False
+    # Больше — раньше: воркеры берут встречи из задания с наибольшим приоритетом.
+    priority: int = Field(default=0, ge=-10, le=10)
     max_lines_per_chunk: int = Field(default=6, ge=1, le=50)
     overlap_lines: int = Field(default=1, ge=0, le=20)
     max_chars_per_chunk: int = Field(default=1200, ge=100, le=10000)
@@ -210,11 +226,14 @@ class RAGIndexJobStatusResponse(BaseModel):
     finished_at: str = ""
     transcript_variant: TranscriptVariant = "clean"
     force_rebuild: bool = False
+    priority: int = 0
     chunking: dict[str, int] = Field(default_factory=dict)
     total_meetings: int = 0
     completed_meetings: int = 0
     ok_meetings: int = 0
     failed_meetings: int = 0
+    skipped_meetings: int = 0
+    cancelled_meetings: int = 0
     progress: float = 0.0
     current_meeting_id: str = ""
     reused_active_job: bool = False
@@ -258,6 +277,8 @@ class RAGRetrievalMetrics(BaseModel):
     mrr: float = 0.0
     ndcg_at_k: float = 0.0
     total_relevant_candidates: int = 0
+    # Заполняется только при debug=true: стадия -> мс (index_load, query_embedding, ...).
+    stage_timings_ms: dict[str, float] = Field(default_factory=dict)
 
 
 class RAGQueryRequest(BaseModel):
@@ -270,6 +291,24 @@ class RAGQueryRequest(BaseModel):
     force_reindex: bool = False
     answer_mode: RAGAnswerMode = "none"
     answer_prompt: str | None = None
+    # Структурные фильтры: подстрока без учёта регистра по meeting_meta чанков.
+    vacancy: str | None = Field(default=None, max_length=160)
+    level: str | None = Field(default=None, max_length=80)
+    interviewer: str | None = Field(default=None, max_length=120)
+    candidate: str | None = Field(default=None, max_length=120)
+    # Даты создания встречи (UTC, включительно) — сужают выбор встреч до загрузки индексов.
+    date_from: date | None = None
+    date_to: date | None = None
+    debug: bool = False
+
+    def meta_filters(self) -> dict[str, str]:
+        raw = {
+            "vacancy": self.vacancy,
+            "level": self.level,
+            "interviewer": self.interviewer,
+            "candidate": self.candidate,
+        }
+        return {key: str(value).strip() for key, value in raw.items() if str(value or "").strip()}
 
 
 class RAGQueryResponse(BaseModel):
@@ -299,6 +338,7 @@ class RAGQueryResponse(BaseModel):
     hallucination_rate: float = 0.0
     warnings: list[str] = Field(default_factory=list)
     files: list[RAGResultFileRef] = Field(default_factory=list)
+    cached: bool = False
 
 
 class RAGFileDocumentInput(BaseModel):
@@ -319,6 +359,7 @@ class RAGFilesQueryRequest(BaseModel):
     force_reindex: bool = False
     answer_mode: RAGAnswerMode = "none"
     answer_prompt: str | None = None
+    debug: bool = False
 
 
 class ReportRequest(BaseModel):
@@ -1640,9 +1681,39 @@ _RAG_TOKEN_RE = re.compile(r"[0-9A-Za-zА-Яа-я_+\\-]{2,}", flags=re.UNICODE)
 _RAG_SPEAKER_LINE_RE = re.compile(r"^\\s*([^:\\n]{1,80})\\s*:\\s*(.+?)\\s*$")
 _RAG_EMBEDDING_CACHE: dict[str, list[float]] = {}
 _RAG_EMBEDDING_CACHE_LOCK = threading.RLock()
+_RAG_EMBEDDING_DISK_CACHE_STORES: dict[str, RAGEmbeddingCacheStore] = {}
+_RAG_EMBEDDING_DISK_CACHE_LOCK = threading.Lock()
+# In-memory ключ payload индекса с матрицей эмбеддингов (в JSON не сериализуется).
+_RAG_VECTOR_STORE_KEY = "vector_store"
+# Postings для BM25: в JSON — dict, в памяти после чтения — RAGKeywordIndex.
+_RAG_KEYWORD_INDEX_KEY = "keyword_index"
+# In-memory маска чанков view глобального корпуса (какие документы участвуют в запросе).
+_RAG_CHUNK_MASK_KEY = "chunk_mask"
+# In-memory индекс meeting_meta чанков для фильтров vacancy/level/interviewer/candidate.
+_RAG_META_FILTER_KEY = "meta_filter"
+# Запас верхних границ score (top-k с отсечением) на ошибки округления float.
+_RAG_SCORE_BOUND_EPS = 1e-9
+# Распарсенные индексы: (scope, name) -> {"payload", "index_stat", "transcript_stat", "nbytes"}.
+_RAG_INDEX_CACHE: OrderedDict[tuple[str, str], dict[str, Any]] = OrderedDict()
+_RAG_INDEX_CACHE_LOCK = threading.RLock()
+# Готовые ответы RAG-запросов: ключ запроса -> {"expires_at", "response"} (TTL + LRU).
+_RAG_QUERY_CACHE: OrderedDict[str, dict[str, Any]] = OrderedDict()
+_RAG_QUERY_CACHE_LOCK = threading.Lock()
+# sha транскрипта из заголовков индексов для статусов в списке встреч: путь -> ((mtime_ns, size), sha).
+_RAG_INDEX_SHA_CACHE: OrderedDict[str, tuple[tuple[int, int], str]] = OrderedDict()
+_RAG_INDEX_SHA_CACHE_LOCK = threading.Lock()
+_RAG_INDEX_SHA_CACHE_MAX_ITEMS = 4096
+# Глобальные корпуса (records/_global/rag_corpus/<vector signature>) по пути каталога.
+_RAG_CORPORA: dict[str, RAGCorpus] = {}
+_RAG_CORPORA_LOCK = threading.Lock()
 
 
 def _rag_index_relpath(source: TranscriptVariant) -> str:
+    return f"artifacts/rag/index_{source}.ragidx"
+
+
+def _rag_legacy_index_relpath(source: TranscriptVariant) -> str:
+    # rag_index_v2: JSON-индекс с эмбеддингами в чанках; читается, пока не пересобран.
     return f"artifacts/rag/index_{source}.json"
 
 
@@ -1714,12 +1785,24 @@ def _rag_embedding_batch_size() -> int:
     return max(1, min(raw, 256))
 
 
+def _rag_embedding_max_concurrency() -> int:
+    s = get_settings()
+    raw = int(getattr(s, "rag_embedding_max_concurrency", 4) or 1)
+    return max(1, min(raw, 32))
+
+
 def _rag_embedding_cache_max_items() -> int:
     s = get_settings()
     raw = int(getattr(s, "rag_embedding_cache_max_items", 2048) or 2048)
     return max(0, min(raw, 100_000))
 
 
+def _rag_index_cache_max_bytes() -> int:
+    s = get_settings()
+    raw = int(getattr(s, "rag_index_cache_max_mb", 256) or 0)
+    return max(0, min(raw, 16_384)) * 1024 * 1024
+
+
 def _rag_embedding_disk_cache_enabled() -> bool:
     s = get_settings()
     return bool(getattr(s, "rag_embedding_disk_cache_enabled", True))
@@ -1731,28 +1814,91 @@ def _rag_embedding_disk_cache_dir() -> Path:
     return root / "_global" / "rag_embeddings_cache"
 
 
-def _rag_embedding_disk_cache_path(cache_key: str) -> Path:
-    key = str(cache_key or "").strip().lower()
-    if not key or "/" in key or "\\" in key or ".." in key:
-        raise ValueError("invalid_cache_key")
-    return _rag_embedding_disk_cache_dir() / key[:2] / f"{key}.json"
+def _rag_embedding_disk_cache_path() -> Path:
+    return _rag_embedding_disk_cache_dir().with_name("rag_embeddings_cache.sqlite3")
+
 
+def _rag_embedding_disk_cache_store() -> RAGEmbeddingCacheStore:
+    path = _rag_embedding_disk_cache_path()
+    key = str(path)
+    with _RAG_EMBEDDING_DISK_CACHE_LOCK:
+        store = _RAG_EMBEDDING_DISK_CACHE_STORES.get(key)
+        if store is None:
+            store = RAGEmbeddingCacheStore(path)
+            _RAG_EMBEDDING_DISK_CACHE_STORES[key] = store
+        return store
 
-def _rag_embedding_disk_cache_read(cache_key: str) -> list[float] | None:
-    if not _rag_embedding_disk_cache_enabled():
+
+def _rag_embedding_legacy_disk_cache_path(base_dir: Path, key: str) -> Path | None:
+    value = str(key or "").strip().lower()
+    if not value or "/" in value or "\\" in value or ".." in value:
         return None
+    return base_dir / value[:2] / f"{value}.json"
+
+
+def _rag_embedding_legacy_disk_cache_read_many(cache_keys: list[str]) -> dict[str, list[float]]:
+    # rag_embedding_cache_v1: JSON-файл на вектор. Читаем только если каталог ещё существует.
+    base_dir = _rag_embedding_disk_cache_dir()
+    if not cache_keys or not base_dir.is_dir():
+        return {}
+    out: dict[str, list[float]] = {}
+    for key in cache_keys:
+        path = _rag_embedding_legacy_disk_cache_path(base_dir, key)
+        if path is None:
+            continue
+        try:
+            if not path.exists():
+                continue
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            vec = raw.get("vector") if isinstance(raw, dict) else None
+            if isinstance(vec, list) and vec:
+                out[key] = [float(v or 0.0) for v in vec]
+        except Exception:
+            continue
+    return out
+
+
+def _rag_embedding_legacy_disk_cache_drop(cache_keys: list[str]) -> None:
+    # Перенесённые в SQLite JSON-файлы больше не нужны; опустевшие каталоги — тоже.
+    base_dir = _rag_embedding_disk_cache_dir()
+    parents: set[Path] = set()
+    for key in cache_keys:
+        path = _rag_embedding_legacy_disk_cache_path(base_dir, key)
+        if path is None:
+            continue
+        try:
+            path.unlink(missing_ok=True)
+        except OSError:
+            continue
+        parents.add(path.parent)
+    for directory in sorted(parents) + [base_dir]:
+        try:
+            directory.rmdir()
+        except OSError:
+            # Каталог не пуст: в нём остались ещё не перенесённые векторы.
+            continue
+
+
+def _rag_embedding_disk_cache_read_many(cache_keys: list[str]) -> dict[str, list[float]]:
+    if not _rag_embedding_disk_cache_enabled() or not cache_keys:
+        return {}
     try:
-        path = _rag_embedding_disk_cache_path(cache_key)
-        if not path.exists():
-            return None
-        raw = json.loads(path.read_text(encoding="utf-8"))
-        payload = raw if isinstance(raw, dict) else {}
-        vec = payload.get("vector")
-        if not isinstance(vec, list) or not vec:
-            return None
-        return [float(v or 0.0) for v in vec]
-    except Exception:
-        return None
+        store = _rag_embedding_disk_cache_store()
+        found = store.get_many(cache_keys)
+    except Exception as exc:
+        log.warning("rag_embedding_disk_cache_read_failed", extra={"payload": {"err": str(exc)[:200]}})
+        return {}
+    legacy = _rag_embedding_legacy_disk_cache_read_many([key for key in cache_keys if key not in found])
+    if legacy:
+        # Перекладываем найденное в SQLite: следующий холодный старт обойдётся без JSON-файлов.
+        try:
+            store.put_many(legacy, provider_label="legacy_json")
+        except Exception:
+            pass
+        else:
+            _rag_embedding_legacy_disk_cache_drop(list(legacy))
+        found.update(legacy)
+    return found
 
 
 def _rag_embedding_disk_cache_write_many(
@@ -1763,34 +1909,16 @@ def _rag_embedding_disk_cache_write_many(
     if not _rag_embedding_disk_cache_enabled() or not vectors_by_key:
         return
     provider = str(vector_cfg.get("provider") or "").strip().lower()
-    provider_label = str(vector_cfg.get("provider_label") or provider or "")
-    model = str(vector_cfg.get("model") or "")
     try:
-        base_dir = _rag_embedding_disk_cache_dir()
-        base_dir.mkdir(parents=True, exist_ok=True)
-    except Exception:
-        return
-    for key, vec in vectors_by_key.items():
-        try:
-            path = _rag_embedding_disk_cache_path(key)
-            path.parent.mkdir(parents=True, exist_ok=True)
-            path.write_text(
-                json.dumps(
-                    {
-                        "schema_version": "rag_embedding_cache_v1",
-                        "cached_at": _utc_now_iso(),
-                        "provider": provider,
-                        "provider_label": provider_label,
-                        "model": model,
-                        "vector": [float(v or 0.0) for v in list(vec or [])],
-                    },
-                    ensure_ascii=False,
-                    separators=(",", ":"),
-                ),
-                encoding="utf-8",
-            )
-        except Exception:
-            continue
+        _rag_embedding_disk_cache_store().put_many(
+            vectors_by_key,
+            provider=provider,
+            provider_label=str(vector_cfg.get("provider_label") or provider or ""),
+            model=str(vector_cfg.get("model") or ""),
+            quantization=_rag_embedding_quantization(),
+        )
+    except Exception as exc:
+        log.warning("rag_embedding_disk_cache_write_failed", extra={"payload": {"err": str(exc)[:200]}})
 
 
 def _rag_embedding_cache_key(text: str, *, vector_cfg: dict[str, Any]) -> str:
@@ -1887,6 +2015,32 @@ def _rag_hybrid_weights(*, vector_enabled: bool) -> tuple[float, float]:
     return kw / total, vec / total
 
 
+def _rag_embed_batches(
+    texts: list[str],
+    *,
+    batch_size: int,
+    embed_batch: Callable[[list[str]], list[list[float]]],
+) -> list[list[float]]:
+    batches = [texts[start : start + batch_size] for start in range(0, len(texts), max(1, batch_size))]
+    workers = min(_rag_embedding_max_concurrency(), len(batches))
+    if workers <= 1:
+        results = [embed_batch(batch) for batch in batches]
+    else:
+        # Не больше workers запросов в полёте; порядок батчей сохраняется.
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rag-embed")
+        futures = [pool.submit(embed_batch, batch) for batch in batches]
+        try:
+            results = [future.result() for future in futures]
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+    out: list[list[float]] = []
+    for batch, rows in zip(batches, results):
+        if len(rows) != len(batch):
+            raise RuntimeError(f"rag_embeddings_count_mismatch:expected={len(batch)} got={len(rows)}")
+        out.extend(rows)
+    return out
+
+
 def _rag_embed_texts(texts: list[str] | tuple[str, ...], *, vector_cfg: dict[str, Any]) -> list[list[float]]:
     items = [str(text or "") for text in list(texts or [])]
     if not items:
@@ -1912,14 +2066,8 @@ def _rag_embed_texts(texts: list[str] | tuple[str, ...], *, vector_cfg: dict[str
 
     # Disk-backed cache for warm restarts / repeated indexing between process restarts.
     if missing_keys and _rag_embedding_disk_cache_enabled():
-        disk_hits_by_key: dict[str, list[float]] = {}
-        still_missing: list[str] = []
-        for key in missing_keys:
-            cached_vec = _rag_embedding_disk_cache_read(key)
-            if cached_vec is None:
-                still_missing.append(key)
-                continue
-            disk_hits_by_key[key] = cached_vec
+        disk_hits_by_key = _rag_embedding_disk_cache_read_many(missing_keys)
+        still_missing = [key for key in missing_keys if key not in disk_hits_by_key]
         if disk_hits_by_key:
             cache_limit = _rag_embedding_cache_max_items()
             with _RAG_EMBEDDING_CACHE_LOCK:
@@ -1940,35 +2088,35 @@ def _rag_embed_texts(texts: list[str] | tuple[str, ...], *, vector_cfg: dict[str
         missing_texts = [missing_by_key[key] for key in missing_keys]
         missing_vectors: list[list[float]] = []
         if provider == "openai_compat":
-            batch_size = _rag_embedding_batch_size()
-            for start in range(0, len(missing_texts), batch_size):
-                batch = missing_texts[start : start + batch_size]
-                missing_vectors.extend(
-                    embed_texts_openai_compat(
-                        batch,
-                        api_base=str(vector_cfg.get("api_base") or vector_cfg.get("openai_api_base") or ""),
-                        api_key=str(vector_cfg.get("api_key") or vector_cfg.get("openai_api_key") or ""),
-                        model_id=str(vector_cfg.get("model") or ""),
-                        timeout_s=float(vector_cfg.get("timeout_s") or vector_cfg.get("openai_timeout_s") or 8.0),
-                    )
-                )
+            missing_vectors = _rag_embed_batches(
+                missing_texts,
+                batch_size=_rag_embedding_batch_size(),
+                embed_batch=lambda batch: embed_texts_openai_compat(
+                    batch,
+                    api_base=str(vector_cfg.get("api_base") or vector_cfg.get("openai_api_base") or ""),
+                    api_key=str(vector_cfg.get("api_key") or vector_cfg.get("openai_api_key") or ""),
+                    model_id=str(vector_cfg.get("model") or ""),
+                    timeout_s=float(vector_cfg.get("timeout_s") or vector_cfg.get("openai_timeout_s") or 8.0),
+                ),
+            )
         elif provider == "gemini":
-            missing_vectors = embed_texts_gemini(
+            missing_vectors = _rag_embed_batches(
                 missing_texts,
-                api_base=str(vector_cfg.get("api_base") or ""),
-                api_key=str(vector_cfg.get("api_key") or ""),
-                model_id=str(vector_cfg.get("model") or ""),
-                timeout_s=float(vector_cfg.get("timeout_s") or 8.0),
+                batch_size=min(_rag_embedding_batch_size(), 100),
+                embed_batch=lambda batch: embed_texts_gemini(
+                    batch,
+                    api_base=str(vector_cfg.get("api_base") or ""),
+                    api_key=str(vector_cfg.get("api_key") or ""),
+                    model_id=str(vector_cfg.get("model") or ""),
+                    timeout_s=float(vector_cfg.get("timeout_s") or 8.0),
+                ),
             )
         else:
-            missing_vectors = [
-                embed_text_hashing(
-                    text,
-                    dim=int(vector_cfg.get("dim") or 96),
-                    char_ngrams=bool(vector_cfg.get("char_ngrams", True)),
-                )
-                for text in missing_texts
-            ]
+            missing_vectors = embed_texts_hashing(
+                missing_texts,
+                dim=int(vector_cfg.get("dim") or 96),
+                char_ngrams=bool(vector_cfg.get("char_ngrams", True)),
+            ).tolist()
 
         if len(missing_vectors) != len(missing_keys):
             raise RuntimeError(
@@ -2046,11 +2194,235 @@ def _rag_chunk_embedding(chunk: dict[str, Any], *, vector_cfg: dict[str, Any]) -
         return []
 
 
+def _rag_index_vector_store(index: dict[str, Any], *, vector_cfg: dict[str, Any]) -> RAGVectorStore | None:
+    store = index.get(_RAG_VECTOR_STORE_KEY)
+    if isinstance(store, RAGVectorStore):
+        return store
+    chunks = list(index.get("chunks") or [])
+    if not chunks:
+        return None
+    # Legacy/in-memory индексы без матрицы: собираем её из inline-эмбеддингов чанков.
+    rows = [_rag_chunk_embedding(chunk, vector_cfg=vector_cfg) if isinstance(chunk, dict) else [] for chunk in chunks]
+    if not any(rows):
+        return None
+    return RAGVectorStore.from_rows(rows)
+
+
+def _rag_chunk_meta_text(chunk: dict[str, Any]) -> str:
+    meeting_meta = chunk.get("meeting_meta") if isinstance(chunk.get("meeting_meta"), dict) else {}
+    return " ".join(
+        [
+            str(chunk.get("document_name") or ""),
+            str(meeting_meta.get("display_name") or ""),
+            str(meeting_meta.get("candidate_name") or ""),
+            str(meeting_meta.get("vacancy") or ""),
+            str(meeting_meta.get("level") or ""),
+            str(meeting_meta.get("interviewer") or ""),
+        ]
+    ).lower()
+
+
+def _rag_build_keyword_index(chunks: list[dict[str, Any]]) -> RAGKeywordIndex:
+    return RAGKeywordIndex.build(
+        [_rag_tokenize(str(chunk.get("text") or "")) for chunk in chunks],
+        meta_texts=[_rag_chunk_meta_text(chunk) for chunk in chunks],
+    )
+
+
+def _rag_index_keyword_index(index: dict[str, Any], *, chunks: list[dict[str, Any]]) -> RAGKeywordIndex:
+    current = index.get(_RAG_KEYWORD_INDEX_KEY)
+    if isinstance(current, RAGKeywordIndex) and current.chunk_count == len(chunks):
+        return current
+    # Индексы без сохранённых postings (старые v2 / собранные в памяти) — строим один раз
+    # и держим в payload: postings детерминированно выводятся из текстов чанков.
+    built = _rag_build_keyword_index(chunks)
+    index[_RAG_KEYWORD_INDEX_KEY] = built
+    return built
+
+
+def _rag_index_meta_filter(index: dict[str, Any], *, chunks: list[dict[str, Any]]) -> RAGMetaFilterIndex:
+    current = index.get(_RAG_META_FILTER_KEY)
+    if isinstance(current, RAGMetaFilterIndex) and current.chunk_count == len(chunks):
+        return current
+    built = RAGMetaFilterIndex.build(chunks)
+    index[_RAG_META_FILTER_KEY] = built
+    return built
+
+
+def _rag_index_vectors_ready(index_payload: dict[str, Any], vector_cfg: dict[str, Any]) -> bool:
+    if not bool(vector_cfg.get("enabled", False)):
+        return True
+    chunk_count = len(list(index_payload.get("chunks") or []))
+    if chunk_count == 0:
+        return True
+    store = index_payload.get(_RAG_VECTOR_STORE_KEY)
+    return isinstance(store, RAGVectorStore) and len(store) == chunk_count
+
+
+def _rag_attach_index_structures(payload: dict[str, Any], *, index_path: Path) -> dict[str, Any]:
+    chunks = [chunk for chunk in list(payload.get("chunks") or []) if isinstance(chunk, dict)]
+    keyword_payload = payload.get(_RAG_KEYWORD_INDEX_KEY)
+    if isinstance(keyword_payload, dict):
+        try:
+            payload[_RAG_KEYWORD_INDEX_KEY] = RAGKeywordIndex.from_payload(keyword_payload)
+        except Exception:
+            payload.pop(_RAG_KEYWORD_INDEX_KEY, None)
+    # rag_index_v2: эмбеддинги лежат inline в чанках — переносим их в матрицу один раз.
+    inline = [chunk.get("embedding") for chunk in chunks]
+    if any(isinstance(v, list) and v for v in inline):
+        try:
+            payload[_RAG_VECTOR_STORE_KEY] = RAGVectorStore.from_rows(
+                [v if isinstance(v, list) else [] for v in inline]
+            )
+        except Exception:
+            return payload
+        for chunk in chunks:
+            chunk.pop("embedding", None)
+    return payload
+
+
+def _rag_write_index_payload(
+    path: Path,
+    payload: dict[str, Any],
+    *,
+    legacy_path: Path | None = None,
+    cache_key: tuple[str, str] | None = None,
+) -> None:
+    store = payload.get(_RAG_VECTOR_STORE_KEY)
+    if isinstance(store, RAGVectorStore):
+        _rag_attach_ann_index(store)
+        # В кэш индексов попадает то же квантованное хранилище, что и на диск.
+        payload[_RAG_VECTOR_STORE_KEY] = store.quantize(_rag_embedding_quantization())
+    write_index_file(path, payload)
+    if legacy_path is not None:
+        # Миграция v2 -> v3 при пересборке: старый JSON больше не нужен.
+        legacy_path.unlink(missing_ok=True)
+    if cache_key is not None:
+        _rag_index_cache_put(cache_key, payload, index_stat=_rag_file_stat(path))
+
+
+def _rag_file_stat(path: Path) -> tuple[str, int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return str(path), int(st.st_mtime_ns), int(st.st_size)
+
+
+def _rag_index_file_stat(path: Path, legacy_path: Path) -> tuple[str, int, int] | None:
+    return _rag_file_stat(path) or _rag_file_stat(legacy_path)
+
+
+def _rag_index_payload_nbytes(payload: dict[str, Any]) -> int:
+    chunks = list(payload.get("chunks") or [])
+    total = 4096 + 512 * len(chunks)
+    total += sum(2 * len(str(chunk.get("text") or "")) for chunk in chunks if isinstance(chunk, dict))
+    store = payload.get(_RAG_VECTOR_STORE_KEY)
+    if isinstance(store, RAGVectorStore):
+        total += store.nbytes
+    keyword_index = payload.get(_RAG_KEYWORD_INDEX_KEY)
+    if isinstance(keyword_index, RAGKeywordIndex):
+        total += keyword_index.nbytes
+    return int(total)
+
+
+def _rag_index_cache_get(
+    key: tuple[str, str],
+    *,
+    index_stat: tuple[str, int, int] | None,
+    transcript_stat: tuple[str, int, int] | None = None,
+) -> dict[str, Any] | None:
+    if index_stat is None:
+        return None
+    with _RAG_INDEX_CACHE_LOCK:
+        entry = _RAG_INDEX_CACHE.get(key)
+        if entry is None:
+            return None
+        if entry.get("index_stat") != index_stat:
+            _RAG_INDEX_CACHE.pop(key, None)
+            return None
+        if transcript_stat is not None and entry.get("transcript_stat") != transcript_stat:
+            return None
+        _RAG_INDEX_CACHE.move_to_end(key)
+        return entry["payload"]
+
+
+def _rag_index_cache_put(
+    key: tuple[str, str],
+    payload: dict[str, Any],
+    *,
+    index_stat: tuple[str, int, int] | None,
+    transcript_stat: tuple[str, int, int] | None = None,
+) -> None:
+    budget = _rag_index_cache_max_bytes()
+    if index_stat is None or budget <= 0:
+        return
+    nbytes = _rag_index_payload_nbytes(payload)
+    if nbytes > budget:
+        return
+    with _RAG_INDEX_CACHE_LOCK:
+        _RAG_INDEX_CACHE[key] = {
+            "payload": payload,
+            "index_stat": index_stat,
+            "transcript_stat": transcript_stat,
+            "nbytes": nbytes,
+        }
+        _RAG_INDEX_CACHE.move_to_end(key)
+        used = sum(int(item.get("nbytes") or 0) for item in _RAG_INDEX_CACHE.values())
+        while used > budget and _RAG_INDEX_CACHE:
+            _oldest, evicted = _RAG_INDEX_CACHE.popitem(last=False)
+            used -= int(evicted.get("nbytes") or 0)
+
+
+def _rag_index_cache_mark_transcript(key: tuple[str, str], transcript_stat: tuple[str, int, int] | None) -> None:
+    # Индекс сверен с транскриптом по sha — следующие запросы проверяют только stat файлов.
+    with _RAG_INDEX_CACHE_LOCK:
+        entry = _RAG_INDEX_CACHE.get(key)
+        if entry is not None:
+            entry["transcript_stat"] = transcript_stat
+
+
+def _rag_read_index_path(
+    path: Path,
+    *,
+    legacy_path: Path,
+    invalid_detail: str,
+    cache_key: tuple[str, str],
+) -> dict[str, Any] | None:
+    index_stat = _rag_index_file_stat(path, legacy_path)
+    cached = _rag_index_cache_get(cache_key, index_stat=index_stat)
+    if cached is not None:
+        return cached
+    payload = _rag_read_index_path_uncached(path, legacy_path=legacy_path, invalid_detail=invalid_detail)
+    if payload is not None:
+        _rag_index_cache_put(cache_key, payload, index_stat=index_stat)
+    return payload
+
+
+def _rag_read_index_path_uncached(path: Path, *, legacy_path: Path, invalid_detail: str) -> dict[str, Any] | None:
+    if path.exists():
+        try:
+            return read_index_file(path)
+        except Exception as exc:
+            raise HTTPException(status_code=500, detail=invalid_detail) from exc
+    if not legacy_path.exists():
+        return None
+    try:
+        payload = json.loads(legacy_path.read_text(encoding="utf-8"))
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=invalid_detail) from exc
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=500, detail=invalid_detail)
+    return _rag_attach_index_structures(payload, index_path=legacy_path)
+
+
 def _rag_indexes_have_vectors(indexes: list[dict[str, Any]]) -> bool:
     for idx in indexes:
         vector = idx.get("vector") if isinstance(idx.get("vector"), dict) else None
         if vector and bool(vector.get("enabled", False)):
             return True
+        if isinstance(idx.get(_RAG_VECTOR_STORE_KEY), RAGVectorStore):
+            return True
         for chunk in list(idx.get("chunks") or []):
             if isinstance(chunk, dict) and isinstance(chunk.get("embedding"), list) and chunk.get("embedding"):
                 return True
@@ -2066,15 +2438,14 @@ def _rag_primary_index_vector_config(indexes: list[dict[str, Any]]) -> dict[str,
 
 
 def _rag_read_index(meeting_id: str, source: TranscriptVariant) -> dict[str, Any]:
-    path = records.artifact_path(meeting_id, _rag_index_relpath(source))
-    if not path.exists():
+    payload = _rag_read_index_path(
+        records.artifact_path(meeting_id, _rag_index_relpath(source)),
+        legacy_path=records.artifact_path(meeting_id, _rag_legacy_index_relpath(source)),
+        invalid_detail="rag_index_invalid",
+        cache_key=(meeting_id, source),
+    )
+    if payload is None:
         raise HTTPException(status_code=404, detail="rag_index_not_found")
-    try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail="rag_index_invalid") from exc
-    if not isinstance(payload, dict):
-        raise HTTPException(status_code=500, detail="rag_index_invalid")
     return payload
 
 
@@ -2085,12 +2456,13 @@ def _rag_index_status_for_meeting(meeting_id: str) -> dict[str, str]:
         try:
             transcript_path = records.artifact_path(meeting_id, transcript_filename)
             index_path = records.artifact_path(meeting_id, _rag_index_relpath(source))  # type: ignore[arg-type]
+            legacy_path = records.artifact_path(meeting_id, _rag_legacy_index_relpath(source))  # type: ignore[arg-type]
         except ValueError:
             statuses[source] = "invalid_meeting_id"
             continue
 
         transcript_exists = transcript_path.exists()
-        index_exists = index_path.exists()
+        index_exists = index_path.exists() or legacy_path.exists()
         if not index_exists:
             statuses[source] = "missing"
             continue
@@ -2098,23 +2470,49 @@ def _rag_index_status_for_meeting(meeting_id: str) -> dict[str, str]:
             statuses[source] = "orphaned"
             continue
         try:
-            raw = json.loads(index_path.read_text(encoding="utf-8"))
-            payload = raw if isinstance(raw, dict) else {}
-            index_sha = str(payload.get("transcript_sha256") or "").strip()
+            index_sha = _rag_index_transcript_sha(index_path if index_path.exists() else legacy_path)
             if not index_sha:
                 statuses[source] = "invalid"
                 continue
-            transcript_sha = sha256_hex(transcript_path.read_bytes())
+            fingerprint = records.file_fingerprint(meeting_id, transcript_filename)
+            transcript_sha = str((fingerprint or {}).get("sha256") or "")
             statuses[source] = "indexed" if transcript_sha == index_sha else "outdated"
         except Exception:
             statuses[source] = "invalid"
     return statuses
 
 
+def _rag_index_transcript_sha(path: Path) -> str:
+    """sha транскрипта из заголовка индекса; запоминается по (mtime, size) файла индекса."""
+    st = path.stat()
+    stamp = (int(st.st_mtime_ns), int(st.st_size))
+    key = str(path)
+    with _RAG_INDEX_SHA_CACHE_LOCK:
+        cached = _RAG_INDEX_SHA_CACHE.get(key)
+        if cached is not None and cached[0] == stamp:
+            _RAG_INDEX_SHA_CACHE.move_to_end(key)
+            return cached[1]
+    if path.suffix == ".json":
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        payload = raw if isinstance(raw, dict) else {}
+    else:
+        payload = read_index_header(path)
+    index_sha = str(payload.get("transcript_sha256") or "").strip()
+    with _RAG_INDEX_SHA_CACHE_LOCK:
+        _RAG_INDEX_SHA_CACHE[key] = (stamp, index_sha)
+        _RAG_INDEX_SHA_CACHE.move_to_end(key)
+        while len(_RAG_INDEX_SHA_CACHE) > _RAG_INDEX_SHA_CACHE_MAX_ITEMS:
+            _RAG_INDEX_SHA_CACHE.popitem(last=False)
+    return index_sha
+
+
 def _rag_write_index(meeting_id: str, source: TranscriptVariant, payload: dict[str, Any]) -> None:
-    path = records.artifact_path(meeting_id, _rag_index_relpath(source))
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    _rag_write_index_payload(
+        records.artifact_path(meeting_id, _rag_index_relpath(source)),
+        payload,
+        legacy_path=records.artifact_path(meeting_id, _rag_legacy_index_relpath(source)),
+        cache_key=(meeting_id, source),
+    )
 
 
 def _rag_segment_line_metadata(meeting_id: str) -> list[dict[str, Any]]:
@@ -2272,6 +2670,281 @@ def _rag_index_response_from_payload(
     )
 
 
+def _rag_embed_chunks(
+    chunks: list[dict[str, Any]],
+    *,
+    vector_cfg: dict[str, Any],
+    previous: dict[str, Any] | None = None,
+) -> RAGVectorStore:
+    """
+    Эмбеддинги чанков; строки чанков с тем же текстом берутся из предыдущей версии индекса.
+
+    После LLM-очистки транскрипт обычно меняется в нескольких строках — пересчитываются
+    только чанки с новым текстом.
+    """
+    texts = [str(chunk.get("text") or "") for chunk in chunks]
+    rows: list[Any] = [None] * len(texts)
+    prev_store = previous.get(_RAG_VECTOR_STORE_KEY) if isinstance(previous, dict) else None
+    prev_chunks = list(previous.get("chunks") or []) if isinstance(previous, dict) else []
+    if (
+        isinstance(prev_store, RAGVectorStore)
+        and len(prev_store) == len(prev_chunks)
+        and _rag_index_has_compatible_vector_config(previous or {}, vector_cfg)
+    ):
+        prev_by_sha: dict[str, int] = {}
+        for ordinal, chunk in enumerate(prev_chunks):
+            if isinstance(chunk, dict) and float(prev_store.norms[ordinal]) > 0.0:
+                prev_by_sha.setdefault(sha256_hex(str(chunk.get("text") or "").encode("utf-8")), ordinal)
+        reuse: dict[int, int] = {}
+        for idx, text in enumerate(texts):
+            ordinal = prev_by_sha.get(sha256_hex(text.encode("utf-8")))
+            if ordinal is not None:
+                reuse[idx] = ordinal
+        if reuse:
+            prev_rows = prev_store.dequantize(np.asarray(list(reuse.values()), dtype=np.int64))
+            for idx, row in zip(reuse, prev_rows):
+                rows[idx] = row
+    missing = [idx for idx, row in enumerate(rows) if row is None]
+    if missing:
+        embedded = _rag_embed_texts([texts[idx] for idx in missing], vector_cfg=vector_cfg)
+        for idx, vec in zip(missing, embedded):
+            rows[idx] = vec
+    reused = len(texts) - len(missing)
+    if reused:
+        log.info(
+            "rag_index_embeddings_reused",
+            extra={"payload": {"chunks": len(texts), "reused": reused, "embedded": len(missing)}},
+        )
+    return RAGVectorStore.from_rows(rows)
+
+
+def _rag_ann_enabled() -> bool:
+    s = get_settings()
+    return bool(getattr(s, "rag_ann_enabled", True))
+
+
+def _rag_ann_min_rows() -> int:
+    s = get_settings()
+    raw = int(getattr(s, "rag_ann_min_rows", 20_000) or 20_000)
+    return max(256, min(raw, 10_000_000))
+
+
+def _rag_ann_nprobe() -> int:
+    # Ручка recall/latency: число IVF-кластеров, которые просматриваются на запрос.
+    s = get_settings()
+    raw = int(getattr(s, "rag_ann_nprobe", 8) or 8)
+    return max(1, min(raw, 4096))
+
+
+def _rag_ann_candidates() -> int:
+    s = get_settings()
+    raw = int(getattr(s, "rag_ann_candidates", 200) or 200)
+    return max(10, min(raw, 10_000))
+
+
+def _rag_embedding_quantization() -> str:
+    # float32 — без потерь; float16 — вдвое меньше; int8 (масштаб на строку) — вчетверо.
+    s = get_settings()
+    value = str(getattr(s, "rag_embedding_quantization", "float32") or "float32").strip().lower()
+    return value if value in EMBEDDING_QUANTIZATIONS else "float32"
+
+
+def _rag_attach_ann_index(store: RAGVectorStore | None) -> None:
+    if store is None or store.ann is not None or not _rag_ann_enabled() or len(store) < _rag_ann_min_rows():
+        return
+    store.ann = RAGIVFIndex.build(store.matrix)
+
+
+def _rag_ann_candidate_rows(
+    store: RAGVectorStore,
+    query_embedding: list[float],
+    *,
+    mask: np.ndarray | None,
+) -> np.ndarray | None:
+    """
+    Строки из nprobe ближайших IVF-кластеров или None, если точный перебор дешевле.
+
+    Маленький срез корпуса (mask) считается точно: строк в нём меньше, чем дал бы IVF.
+    """
+    if store.ann is None or not _rag_ann_enabled():
+        return None
+    in_scope = int(mask.sum()) if mask is not None else len(store)
+    if in_scope < _rag_ann_min_rows():
+        return None
+    rows = store.ann.probe(np.asarray(query_embedding, dtype=np.float32), nprobe=_rag_ann_nprobe())
+    if mask is not None:
+        rows = rows[mask[rows]]
+    return np.sort(rows)
+
+
+def _rag_corpus_enabled() -> bool:
+    s = get_settings()
+    return bool(getattr(s, "rag_corpus_enabled", True))
+
+
+def _rag_corpus_max_segments() -> int:
+    s = get_settings()
+    raw = int(getattr(s, "rag_corpus_max_segments", 8) or 8)
+    return max(2, min(raw, 256))
+
+
+def _rag_vector_signature(vector_cfg: dict[str, Any]) -> dict[str, Any]:
+    """Поля конфигурации, от которых зависят значения эмбеддингов (без ключей и таймаутов)."""
+    enabled = bool(vector_cfg.get("enabled", False))
+    provider = str(vector_cfg.get("provider") or "").strip().lower() if enabled else ""
+    remote = provider in {"openai_compat", "gemini"}
+    return {
+        "enabled": enabled,
+        "provider": provider,
+        "model": str(vector_cfg.get("model") or "") if enabled else "",
+        "dim": int(vector_cfg.get("dim") or 0) if enabled and not remote else 0,
+        "char_ngrams": bool(vector_cfg.get("char_ngrams", True)) if enabled and not remote else False,
+        "api_base": str(vector_cfg.get("api_base") or vector_cfg.get("openai_api_base") or "").rstrip("/")
+        if remote
+        else "",
+    }
+
+
+def _rag_corpus_root(vector_cfg: dict[str, Any]) -> Path:
+    s = get_settings()
+    root = Path((getattr(s, "records_dir", None) or "./data/records").strip()).resolve()
+    # Векторы разных моделей в одной матрице несравнимы — у каждой конфигурации свой корпус.
+    signature = _rag_vector_signature(vector_cfg)
+    digest = sha256_hex(json.dumps(signature, sort_keys=True).encode("utf-8"))[:16]
+    return root / "_global" / "rag_corpus" / digest
+
+
+def _rag_corpus(vector_cfg: dict[str, Any]) -> RAGCorpus:
+    root = _rag_corpus_root(vector_cfg)
+    with _RAG_CORPORA_LOCK:
+        corpus = _RAG_CORPORA.get(str(root))
+        if corpus is None:
+            corpus = RAGCorpus(
+                root,
+                max_segments=_rag_corpus_max_segments(),
+                ann_min_rows=_rag_ann_min_rows() if _rag_ann_enabled() else 0,
+                quantization=_rag_embedding_quantization(),
+            )
+            _RAG_CORPORA[str(root)] = corpus
+        return corpus
+
+
+def _rag_corpus_meeting_key(meeting_id: str, source: TranscriptVariant) -> str:
+    return f"meeting:{meeting_id}:{source}"
+
+
+def _rag_corpus_file_key(document_hash: str) -> str:
+    return f"file:{document_hash}"
+
+
+def _rag_corpus_doc_matches(doc: dict[str, Any] | None, expected: dict[str, Any]) -> bool:
+    return isinstance(doc, dict) and all(doc.get(key) == value for key, value in expected.items())
+
+
+def _rag_corpus_sync(
+    key: str,
+    payload: dict[str, Any],
+    *,
+    index_stat: tuple[str, int, int] | None,
+    **meta: Any,
+) -> None:
+    """
+    Кладёт индекс документа в глобальный корпус, если там нет актуальной копии.
+
+    Ошибки корпуса не мешают индексации: запрос тогда читает индекс встречи/файла напрямую.
+    """
+    if not _rag_corpus_enabled() or index_stat is None:
+        return
+    chunks = [chunk for chunk in list(payload.get("chunks") or []) if isinstance(chunk, dict)]
+    vector = dict(payload.get("vector") or {}) if isinstance(payload.get("vector"), dict) else {}
+    expected = {"index_stat": list(index_stat), **meta}
+    try:
+        corpus = _rag_corpus(vector)
+        if _rag_corpus_doc_matches(corpus.doc(key), expected):
+            return
+        _rag_index_keyword_index(payload, chunks=chunks)
+        store = payload.get(_RAG_VECTOR_STORE_KEY)
+        corpus.upsert(
+            key,
+            payload,
+            meta={
+                **expected,
+                "schema_version": str(payload.get("schema_version") or ""),
+                "chunking": payload.get("chunking"),
+                "vector": vector,
+                "has_vectors": isinstance(store, RAGVectorStore) and len(store) == len(chunks),
+                "indexed_at": str(payload.get("indexed_at") or ""),
+                "transcript_chars": int(payload.get("transcript_chars") or 0),
+            },
+        )
+    except Exception as exc:
+        log.warning("rag_corpus_sync_failed", extra={"payload": {"key": key, "err": str(exc)[:200]}})
+
+
+def _rag_corpus_fresh(
+    key: str,
+    *,
+    vector_cfg: dict[str, Any],
+    index_stat: tuple[str, int, int] | None,
+    **expected: Any,
+) -> bool:
+    if not _rag_corpus_enabled() or index_stat is None:
+        return False
+    try:
+        doc = _rag_corpus(vector_cfg).doc(key)
+    except Exception:
+        return False
+    if not _rag_corpus_doc_matches(doc, {"index_stat": list(index_stat), **expected}):
+        return False
+    if not _rag_index_has_compatible_vector_config(doc, vector_cfg):
+        return False
+    has_chunks = int(doc.get("end") or 0) > int(doc.get("start") or 0)
+    return bool(doc.get("has_vectors")) or not has_chunks or not bool(vector_cfg.get("enabled", False))
+
+
+def _rag_corpus_remove(key: str, *, vector_cfg: dict[str, Any]) -> None:
+    if not _rag_corpus_enabled():
+        return
+    try:
+        _rag_corpus(vector_cfg).remove(key)
+    except Exception as exc:
+        log.warning("rag_corpus_remove_failed", extra={"payload": {"key": key, "err": str(exc)[:200]}})
+
+
+def _rag_default_chunking() -> dict[str, int]:
+    return {"max_lines_per_chunk": 6, "overlap_lines": 1, "max_chars_per_chunk": 1200}
+
+
+def _rag_corpus_meeting_fresh(
+    meeting_id: str,
+    source: TranscriptVariant,
+    *,
+    auto_index: bool,
+    vector_cfg: dict[str, Any],
+    chunking: dict[str, int] | None = None,
+) -> bool:
+    try:
+        index_stat = _rag_index_file_stat(
+            records.artifact_path(meeting_id, _rag_index_relpath(source)),
+            records.artifact_path(meeting_id, _rag_legacy_index_relpath(source)),
+        )
+        transcript_stat = _rag_file_stat(records.artifact_path(meeting_id, _transcript_filename(source)))
+    except ValueError:
+        return False
+    key = _rag_corpus_meeting_key(meeting_id, source)
+    if not auto_index:
+        return _rag_corpus_fresh(key, vector_cfg=vector_cfg, index_stat=index_stat)
+    if transcript_stat is None:
+        return False
+    return _rag_corpus_fresh(
+        key,
+        vector_cfg=vector_cfg,
+        index_stat=index_stat,
+        transcript_stat=list(transcript_stat),
+        chunking=chunking or _rag_default_chunking(),
+    )
+
+
 def _ensure_rag_index(
     meeting_id: str,
     *,
@@ -2283,22 +2956,54 @@ def _ensure_rag_index(
 ) -> tuple[dict[str, Any], bool]:
     started = time.perf_counter()
     try:
-        transcript_text = _transcript_for_source(meeting_id=meeting_id, source=source)
-        transcript_sha = sha256_hex(transcript_text.encode("utf-8"))
         vector_cfg = _rag_vector_config()
         chunking = {
             "max_lines_per_chunk": int(max_lines_per_chunk),
             "overlap_lines": int(overlap_lines),
             "max_chars_per_chunk": int(max_chars_per_chunk),
         }
+        cache_key = (meeting_id, source)
+        try:
+            transcript_stat = _rag_file_stat(records.artifact_path(meeting_id, _transcript_filename(source)))
+            index_stat = _rag_index_file_stat(
+                records.artifact_path(meeting_id, _rag_index_relpath(source)),
+                records.artifact_path(meeting_id, _rag_legacy_index_relpath(source)),
+            )
+        except ValueError:
+            transcript_stat = None
+            index_stat = None
+        if not force_rebuild and transcript_stat is not None:
+            # Транскрипт и индекс не менялись с последней сверки sha — без чтения и хэширования.
+            current = _rag_index_cache_get(cache_key, index_stat=index_stat, transcript_stat=transcript_stat)
+            if (
+                current is not None
+                and current.get("chunking") == chunking
+                and _rag_index_has_compatible_vector_config(current, vector_cfg)
+                and _rag_index_vectors_ready(current, vector_cfg)
+            ):
+                return current, True
+        transcript_text = _transcript_for_source(meeting_id=meeting_id, source=source)
+        transcript_sha = sha256_hex(transcript_text.encode("utf-8"))
+        previous: dict[str, Any] | None = None
         if not force_rebuild:
             try:
                 current = _rag_read_index(meeting_id, source)
                 same_sha = str(current.get("transcript_sha256") or "") == transcript_sha
                 same_chunking = isinstance(current.get("chunking"), dict) and current.get("chunking") == chunking
                 same_vector = _rag_index_has_compatible_vector_config(current, vector_cfg)
-                if same_sha and same_chunking and same_vector:
+                vectors_ready = _rag_index_vectors_ready(current, vector_cfg)
+                if same_sha and same_chunking and same_vector and vectors_ready:
+                    _rag_index_cache_mark_transcript(cache_key, transcript_stat)
+                    # Индексы, собранные до появления корпуса, попадают в него при первой сверке.
+                    _rag_corpus_sync(
+                        _rag_corpus_meeting_key(meeting_id, source),
+                        current,
+                        index_stat=index_stat,
+                        transcript_sha256=transcript_sha,
+                        transcript_stat=list(transcript_stat) if transcript_stat else None,
+                    )
                     return current, True
+                previous = current
             except HTTPException as exc:
                 if exc.status_code != 404:
                     raise
@@ -2316,14 +3021,10 @@ def _ensure_rag_index(
             meeting_meta=meeting_meta,
         )
         active_vector_cfg = dict(vector_cfg)
+        vector_store: RAGVectorStore | None = None
         if bool(active_vector_cfg.get("enabled", False)):
             try:
-                chunk_embeddings = _rag_embed_texts(
-                    [str(chunk.get("text") or "") for chunk in chunks],
-                    vector_cfg=active_vector_cfg,
-                )
-                for chunk, emb in zip(chunks, chunk_embeddings):
-                    chunk["embedding"] = emb
+                vector_store = _rag_embed_chunks(chunks, vector_cfg=active_vector_cfg, previous=previous)
             except Exception as exc:
                 if str(active_vector_cfg.get("provider") or "") == "openai_compat":
                     log.warning(
@@ -2341,16 +3042,11 @@ def _ensure_rag_index(
                     active_vector_cfg = _rag_hashing_fallback_vector_config(
                         active_vector_cfg, reason="index_embed_failed"
                     )
-                    chunk_embeddings = _rag_embed_texts(
-                        [str(chunk.get("text") or "") for chunk in chunks],
-                        vector_cfg=active_vector_cfg,
-                    )
-                    for chunk, emb in zip(chunks, chunk_embeddings):
-                        chunk["embedding"] = emb
+                    vector_store = _rag_embed_chunks(chunks, vector_cfg=active_vector_cfg, previous=previous)
                 else:
                     raise
         payload = {
-            "schema_version": "rag_index_v2",
+            "schema_version": "rag_index_v3",
             "meeting_id": meeting_id,
             "transcript_variant": source,
             "transcript_chars": len(transcript_text),
@@ -2362,7 +3058,18 @@ def _ensure_rag_index(
             "vector": active_vector_cfg,
             "chunks": chunks,
         }
+        payload[_RAG_KEYWORD_INDEX_KEY] = _rag_build_keyword_index(chunks)
+        if vector_store is not None:
+            payload[_RAG_VECTOR_STORE_KEY] = vector_store
         _rag_write_index(meeting_id, source, payload)
+        _rag_index_cache_mark_transcript(cache_key, transcript_stat)
+        _rag_corpus_sync(
+            _rag_corpus_meeting_key(meeting_id, source),
+            payload,
+            index_stat=_rag_file_stat(records.artifact_path(meeting_id, _rag_index_relpath(source))),
+            transcript_sha256=transcript_sha,
+            transcript_stat=list(transcript_stat) if transcript_stat else None,
+        )
         return payload, False
     finally:
         record_rag_index_latency_ms(service="api_gateway", elapsed_ms=(time.perf_counter() - started) * 1000.0)
@@ -2372,26 +3079,39 @@ def _rag_file_index_relpath(document_hash: str) -> str:
     key = str(document_hash or "").strip().lower()
     if not key or "/" in key or "\\" in key or ".." in key:
         raise ValueError("invalid_document_hash")
-    return f"artifacts/rag_files/{key[:2]}/{key}.json"
+    return f"artifacts/rag_files/{key[:2]}/{key}.ragidx"
+
+
+def _rag_legacy_file_index_relpath(document_hash: str) -> str:
+    return _rag_file_index_relpath(document_hash).removesuffix(".ragidx") + ".json"
 
 
 def _rag_read_file_index(document_hash: str) -> dict[str, Any]:
-    path = records.artifact_path(LLM_FILES_WORKSPACE_ID, _rag_file_index_relpath(document_hash))
-    if not path.exists():
+    payload = _rag_read_index_path(
+        records.artifact_path(LLM_FILES_WORKSPACE_ID, _rag_file_index_relpath(document_hash)),
+        legacy_path=records.artifact_path(LLM_FILES_WORKSPACE_ID, _rag_legacy_file_index_relpath(document_hash)),
+        invalid_detail="rag_file_index_invalid",
+        cache_key=(LLM_FILES_WORKSPACE_ID, document_hash),
+    )
+    if payload is None:
         raise HTTPException(status_code=404, detail="rag_file_index_not_found")
-    try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
-    except Exception as exc:
-        raise HTTPException(status_code=500, detail="rag_file_index_invalid") from exc
-    if not isinstance(payload, dict):
-        raise HTTPException(status_code=500, detail="rag_file_index_invalid")
     return payload
 
 
+def _rag_file_index_stat(document_hash: str) -> tuple[str, int, int] | None:
+    return _rag_index_file_stat(
+        records.artifact_path(LLM_FILES_WORKSPACE_ID, _rag_file_index_relpath(document_hash)),
+        records.artifact_path(LLM_FILES_WORKSPACE_ID, _rag_legacy_file_index_relpath(document_hash)),
+    )
+
+
 def _rag_write_file_index(document_hash: str, payload: dict[str, Any]) -> None:
-    path = records.artifact_path(LLM_FILES_WORKSPACE_ID, _rag_file_index_relpath(document_hash))
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    _rag_write_index_payload(
+        records.artifact_path(LLM_FILES_WORKSPACE_ID, _rag_file_index_relpath(document_hash)),
+        payload,
+        legacy_path=records.artifact_path(LLM_FILES_WORKSPACE_ID, _rag_legacy_file_index_relpath(document_hash)),
+        cache_key=(LLM_FILES_WORKSPACE_ID, document_hash),
+    )
 
 
 def _rag_safe_document_name(value: str) -> str:
@@ -2465,7 +3185,14 @@ def _ensure_rag_file_index(
                 same_sha = str(current.get("document_sha256") or "") == document_sha
                 same_chunking = isinstance(current.get("chunking"), dict) and current.get("chunking") == chunking
                 same_vector = _rag_index_has_compatible_vector_config(current, vector_cfg)
-                if same_sha and same_chunking and same_vector:
+                vectors_ready = _rag_index_vectors_ready(current, vector_cfg)
+                if same_sha and same_chunking and same_vector and vectors_ready:
+                    _rag_corpus_sync(
+                        _rag_corpus_file_key(document_hash),
+                        current,
+                        index_stat=_rag_file_index_stat(document_hash),
+                        document_sha256=document_sha,
+                    )
                     return current, True
             except HTTPException as exc:
                 if exc.status_code != 404:
@@ -2494,14 +3221,14 @@ def _ensure_rag_file_index(
             chunk["document_name"] = document_name
 
         active_vector_cfg = dict(vector_cfg)
+        vector_store: RAGVectorStore | None = None
         if bool(active_vector_cfg.get("enabled", False)):
             try:
                 chunk_embeddings = _rag_embed_texts(
                     [str(chunk.get("text") or "") for chunk in chunks],
                     vector_cfg=active_vector_cfg,
                 )
-                for chunk, emb in zip(chunks, chunk_embeddings):
-                    chunk["embedding"] = emb
+                vector_store = RAGVectorStore.from_rows(chunk_embeddings)
             except Exception as exc:
                 if str(active_vector_cfg.get("provider") or "") == "openai_compat":
                     log.warning(
@@ -2523,8 +3250,7 @@ def _ensure_rag_file_index(
                         [str(chunk.get("text") or "") for chunk in chunks],
                         vector_cfg=active_vector_cfg,
                     )
-                    for chunk, emb in zip(chunks, chunk_embeddings):
-                        chunk["embedding"] = emb
+                    vector_store = RAGVectorStore.from_rows(chunk_embeddings)
                 else:
                     raise
 
@@ -2541,7 +3267,16 @@ def _ensure_rag_file_index(
             "vector": active_vector_cfg,
             "chunks": chunks,
         }
+        payload[_RAG_KEYWORD_INDEX_KEY] = _rag_build_keyword_index(chunks)
+        if vector_store is not None:
+            payload[_RAG_VECTOR_STORE_KEY] = vector_store
         _rag_write_file_index(document_hash, payload)
+        _rag_corpus_sync(
+            _rag_corpus_file_key(document_hash),
+            payload,
+            index_stat=_rag_file_index_stat(document_hash),
+            document_sha256=document_sha,
+        )
         return payload, False
     finally:
         record_rag_index_latency_ms(service="api_gateway", elapsed_ms=(time.perf_counter() - started) * 1000.0)
@@ -2563,13 +3298,29 @@ def _safe_meeting_ids(values: list[str] | None) -> list[str]:
     return out
 
 
-def _rag_select_meeting_ids(*, explicit_ids: list[str], recent_limit: int) -> list[str]:
+def _rag_select_meeting_ids(
+    *,
+    explicit_ids: list[str],
+    recent_limit: int,
+    date_from: date | None = None,
+    date_to: date | None = None,
+) -> list[str]:
     ids = _safe_meeting_ids(explicit_ids)
-    if ids:
+    dated = date_from is not None or date_to is not None
+    if ids and not dated:
         return ids
+    created_from = datetime.combine(date_from, datetime.min.time()) if date_from is not None else None
+    created_before = datetime.combine(date_to + timedelta(days=1), datetime.min.time()) if date_to is not None else None
     with db_session() as session:
         repo = MeetingRepository(session)
-        meetings = repo.list_recent(limit=max(1, min(int(recent_limit), 200)))
+        if ids:
+            allowed = set(repo.filter_ids_created_between(ids, created_from=created_from, created_before=created_before))
+            return [mid for mid in ids if mid in allowed]
+        meetings = repo.list_recent(
+            limit=max(1, min(int(recent_limit), 200)),
+            created_from=created_from,
+            created_before=created_before,
+        )
     return [str(m.id) for m in meetings if str(getattr(m, "id", "") or "").strip()]
 
 
@@ -2585,7 +3336,10 @@ def _rag_relevance_grade(*, chunk_text: str, query_terms: list[str]) -> int:
         return 0
     token_set = set(tokens)
     matched = sum(1 for t in query_terms if t in token_set)
-    coverage = matched / max(1, len(query_terms))
+    return _rag_relevance_grade_from_coverage(matched / max(1, len(query_terms)))
+
+
+def _rag_relevance_grade_from_coverage(coverage: float) -> int:
     if coverage >= 0.95:
         return 3
     if coverage >= 0.60:
@@ -2600,13 +3354,19 @@ def _rag_compute_retrieval_metrics(
     ranked_rows: list[tuple[float, float, float, dict[str, Any]]],
     query_terms: list[str],
     top_k: int,
+    pool_grades: list[int] | None = None,
 ) -> RAGRetrievalMetrics:
+    """
+    ranked_rows может быть только головой ранжирования (top-k с отсечением); тогда pool_grades —
+    grades всех ранжированных кандидатов (для recall и идеального DCG).
+    """
     if not ranked_rows:
         return RAGRetrievalMetrics()
     grades_all: list[int] = []
     for _score, _kw, _sem, chunk in ranked_rows:
         grades_all.append(_rag_relevance_grade(chunk_text=str(chunk.get("text") or ""), query_terms=query_terms))
-    relevant_total = sum(1 for g in grades_all if g > 0)
+    pool = grades_all if pool_grades is None else list(pool_grades)
+    relevant_total = sum(1 for g in pool if g > 0)
     if relevant_total <= 0:
         return RAGRetrievalMetrics(total_relevant_candidates=0)
 
@@ -2624,7 +3384,7 @@ def _rag_compute_retrieval_metrics(
     dcg = 0.0
     for idx, g in enumerate(top_grades, start=1):
         dcg += (2**g - 1) / math.log2(idx + 1)
-    ideal = sorted(grades_all, reverse=True)[:k]
+    ideal = sorted(pool, reverse=True)[:k]
     idcg = 0.0
     for idx, g in enumerate(ideal, start=1):
         idcg += (2**g - 1) / math.log2(idx + 1)
@@ -2687,7 +3447,7 @@ def _rag_apply_reranker(
 
 def _rag_vector_meta_from_indexes(indexes: list[dict[str, Any]]) -> tuple[str, str, str]:
     # Returns: index_version, vector_provider, embedding_model
-    index_version = "rag_index_v2"
+    index_version = "rag_index_v3"
     vector_provider = "keyword_only"
     embedding_model = "none"
     if not indexes:
@@ -2924,12 +3684,37 @@ def _rag_query_export_file(
         raise HTTPException(status_code=404, detail="rag_query_export_not_found")
     return path, target_name
 
+
+def _rag_stage_done(timings: dict[str, float] | None, stage: str, started: float) -> float:
+    """Добавляет время стадии с started до сейчас; возвращает "сейчас" как начало следующей."""
+    now = time.perf_counter()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + (now - started) * 1000.0
+    return now
+
+
+def _rag_finish_stage_timings(
+    response: RAGQueryResponse,
+    timings: dict[str, float],
+    *,
+    debug: bool,
+) -> RAGQueryResponse:
+    for stage, elapsed_ms in timings.items():
+        record_rag_query_stage_latency_ms(service="api_gateway", stage=stage, elapsed_ms=elapsed_ms)
+    response.retrieval_metrics.stage_timings_ms = (
+        {stage: round(float(elapsed_ms), 3) for stage, elapsed_ms in timings.items()} if debug else {}
+    )
+    return response
+
+
 def _rag_rank_hits(
     *,
     query: str,
     indexes: list[dict[str, Any]],
     transcript_variant: TranscriptVariant,
     top_k: int,
+    meta_filters: dict[str, str] | None = None,
+    timings: dict[str, float] | None = None,
 ) -> tuple[list[RAGHit], int, str, RAGRetrievalMetrics]:
     q_text = str(query or "").strip()
     q_terms_all = _rag_tokenize(q_text)
@@ -2938,12 +3723,20 @@ def _rag_rank_hits(
     q_terms_unique = list(dict.fromkeys(q_terms_all))
     q_term_qtf = Counter(q_terms_all)
 
-    all_chunks: list[dict[str, Any]] = []
+    # chunk_mask (срез глобального корпуса) ограничивает и кандидатов, и статистику BM25;
+    # фильтры метаданных сужают ту же маску, так что отсечённые чанки не скорятся вовсе.
+    index_views: list[tuple[dict[str, Any], list[dict[str, Any]], np.ndarray | None]] = []
+    total_chunks = 0
     for idx in indexes:
-        for chunk in list(idx.get("chunks") or []):
-            if isinstance(chunk, dict):
-                all_chunks.append(chunk)
-    total_chunks = len(all_chunks)
+        idx_chunks = [chunk for chunk in list(idx.get("chunks") or []) if isinstance(chunk, dict)]
+        mask = idx.get(_RAG_CHUNK_MASK_KEY)
+        mask = mask if isinstance(mask, np.ndarray) and mask.shape == (len(idx_chunks),) else None
+        if meta_filters:
+            meta_mask = _rag_index_meta_filter(idx, chunks=idx_chunks).mask(meta_filters)
+            if meta_mask is not None:
+                mask = meta_mask if mask is None else mask & meta_mask
+        index_views.append((idx, idx_chunks, mask))
+        total_chunks += int(mask.sum()) if mask is not None else len(idx_chunks)
     if total_chunks == 0:
         return [], 0, "keyword_only", RAGRetrievalMetrics()
 
@@ -2978,6 +3771,7 @@ def _rag_rank_hits(
     vector_runtime_enabled = bool(vector_cfg.get("enabled", False))
     query_embedding: list[float] = []
     query_vector_provider = ""
+    mark = time.perf_counter()
     if vector_runtime_enabled:
         try:
             query_embedding = _rag_embed_text(q_text, vector_cfg=vector_cfg)
@@ -3007,73 +3801,179 @@ def _rag_rank_hits(
                     vector_runtime_enabled = False
                     query_embedding = []
 
-    # BM25-lite IDF over selected candidate chunks.
-    df: dict[str, int] = {t: 0 for t in q_terms_unique}
-    chunk_term_counters: list[Counter[str]] = []
-    chunk_tokens_all: list[list[str]] = []
-    avg_len = 0.0
-    for chunk in all_chunks:
-        chunk_tokens_list = _rag_tokenize(str(chunk.get("text") or ""))
-        chunk_tokens_all.append(chunk_tokens_list)
-        counter = Counter(chunk_tokens_list)
-        chunk_term_counters.append(counter)
-        avg_len += sum(counter.values())
-        present = set(counter.keys())
-        for t in q_terms_unique:
-            if t in present:
-                df[t] = int(df.get(t, 0)) + 1
-    avg_len = avg_len / max(1, len(all_chunks))
+    mark = _rag_stage_done(timings, "query_embedding", mark)
+
+    # Semantic: один matvec по матрице эмбеддингов каждого индекса вместо поэлементного косинуса.
+    # BM25-lite IDF over selected candidate chunks: статистика берётся из postings каждого индекса.
+    # IVF: semantic-кандидаты — top из nprobe кластеров; точный косинус keyword-кандидатов досчитывается ниже.
+    keyword_views: list[
+        tuple[list[dict[str, Any]], RAGKeywordIndex, np.ndarray, np.ndarray | None, RAGVectorStore | None]
+    ] = []
+    for idx, idx_chunks, mask in index_views:
+        idx_semantic = np.zeros((len(idx_chunks),), dtype=np.float64)
+        ann_store: RAGVectorStore | None = None
+        if query_embedding and bool(vector_cfg.get("enabled", False)):
+            raw_chunks = list(idx.get("chunks") or [])
+            store = _rag_index_vector_store(idx, vector_cfg=vector_cfg)
+            if store is not None and len(store) == len(raw_chunks) == len(idx_chunks):
+                ann_rows = _rag_ann_candidate_rows(store, query_embedding, mask=mask)
+                if ann_rows is not None:
+                    ann_store = store
+                    rows = ann_rows
+                else:
+                    rows = np.flatnonzero(mask) if mask is not None else None
+                scores = np.maximum(store.cosine_scores(query_embedding, rows), 0.0)
+                if rows is None:
+                    idx_semantic[:] = scores
+                else:
+                    idx_semantic[rows] = scores
+                limit = _rag_ann_candidates()
+                if ann_store is not None and len(rows) > limit:
+                    keep = rows[np.argsort(-scores, kind="stable")[:limit]]
+                    trimmed = np.zeros_like(idx_semantic)
+                    trimmed[keep] = idx_semantic[keep]
+                    idx_semantic = trimmed
+            elif store is not None and len(store) == len(raw_chunks):
+                scores = np.maximum(store.cosine_scores(query_embedding), 0.0)
+                dict_mask = np.fromiter(
+                    (isinstance(chunk, dict) for chunk in raw_chunks), dtype=bool, count=len(raw_chunks)
+                )
+                idx_semantic[:] = scores[dict_mask]
+                if mask is not None:
+                    idx_semantic[~mask] = 0.0
+        keyword_views.append(
+            (idx_chunks, _rag_index_keyword_index(idx, chunks=idx_chunks), idx_semantic, mask, ann_store)
+        )
+    mark = _rag_stage_done(timings, "semantic_scoring", mark)
+    df: dict[str, int] = {t: sum(kw.df(t, mask) for _c, kw, _s, mask, _a in keyword_views) for t in q_terms_unique}
+    avg_len = sum(kw.total_tokens_for(mask) for _c, kw, _s, mask, _a in keyword_views) / max(1, total_chunks)
     q_lower = q_text.lower()
+    n_terms = len(q_terms_unique)
+    k1 = 1.2
+    b = 0.75
+    k3 = 8.0  # query term frequency saturation (small, but non-zero effect)
+    idf_by_term = {
+        t: math.log(1.0 + ((total_chunks - max(0, int(df.get(t, 0))) + 0.5) / (max(0, int(df.get(t, 0))) + 0.5)))
+        for t in q_terms_unique
+    }
+    qtf_weight_by_term = {
+        t: ((k3 + 1.0) * max(1, int(q_term_qtf.get(t, 1)))) / (k3 + max(1, int(q_term_qtf.get(t, 1))))
+        for t in q_terms_unique
+    }
 
     candidates: list[dict[str, Any]] = []
-    max_keyword = 0.0
     max_semantic = 0.0
-    for chunk, counter, chunk_tokens_list in zip(all_chunks, chunk_term_counters, chunk_tokens_all):
-        chunk_tokens = sum(counter.values())
-        chunk_text = str(chunk.get("text") or "")
-        chunk_lower = chunk_text.lower()
-        meeting_meta = chunk.get("meeting_meta") if isinstance(chunk.get("meeting_meta"), dict) else {}
-        meta_text = " ".join(
-            [
-                str(chunk.get("document_name") or ""),
-                str(meeting_meta.get("display_name") or ""),
-                str(meeting_meta.get("candidate_name") or ""),
-                str(meeting_meta.get("vacancy") or ""),
-                str(meeting_meta.get("level") or ""),
-                str(meeting_meta.get("interviewer") or ""),
-            ]
-        ).lower()
-
-        keyword_score = 0.0
-        k1 = 1.2
-        b = 0.75
-        k3 = 8.0  # query term frequency saturation (small, but non-zero effect)
+    for idx_chunks, kw_index, idx_semantic, mask, ann_store in keyword_views:
+        tf_by_ord: dict[int, dict[str, int]] = {}
+        for t in q_terms_unique:
+            for ordinal, tf in kw_index.term_postings(t):
+                tf_by_ord.setdefault(ordinal, {})[t] = tf
+        # Подстрочное вхождение термина в текст чанка == вхождение в один из его токенов,
+        # поэтому overlap считается через словарь индекса, без сканирования текстов.
+        overlap_by_ord: dict[int, int] = {}
         for t in q_terms_unique:
-            tf = int(counter.get(t, 0))
-            if tf <= 0:
+            matched: set[int] = set()
+            for term in kw_index.terms_containing(t):
+                matched.update(ordinal for ordinal, _tf in kw_index.term_postings(term))
+            for ordinal in matched:
+                overlap_by_ord[ordinal] = overlap_by_ord.get(ordinal, 0) + 1
+        meta_overlap_by_ord: dict[int, int] = {}
+        for meta_text, ordinals in zip(kw_index.meta_texts, kw_index.meta_groups()):
+            meta_overlap = sum(1 for t in q_terms_unique if t in meta_text)
+            if meta_overlap:
+                for ordinal in ordinals:
+                    meta_overlap_by_ord[ordinal] = meta_overlap
+        candidate_ords = set(overlap_by_ord) | set(meta_overlap_by_ord)
+        if mask is not None:
+            candidate_ords = {ordinal for ordinal in candidate_ords if mask[ordinal]}
+        if ann_store is not None and candidate_ords:
+            lexical = np.fromiter(sorted(candidate_ords), dtype=np.int64, count=len(candidate_ords))
+            idx_semantic[lexical] = np.maximum(ann_store.cosine_scores(query_embedding, lexical), 0.0)
+        candidate_ords.update(int(v) for v in np.flatnonzero(idx_semantic > 0.0))
+
+        for ordinal in sorted(candidate_ords):
+            semantic_score = float(idx_semantic[ordinal])
+            bm25 = 0.0
+            tfs = tf_by_ord.get(ordinal) or {}
+            chunk_tokens = kw_index.chunk_lengths[ordinal]
+            for t in q_terms_unique:
+                tf = int(tfs.get(t, 0))
+                if tf <= 0:
+                    continue
+                denom = tf + k1 * (1 - b + b * (chunk_tokens / max(1.0, avg_len)))
+                base = (tf * (k1 + 1.0)) / max(0.0001, denom)
+                # BM25+ style delta protects longer chunks from being overly penalized.
+                bm25 += idf_by_term[t] * ((base + 0.25) * qtf_weight_by_term[t])
+            overlap = overlap_by_ord.get(ordinal, 0)
+            meta_overlap = meta_overlap_by_ord.get(ordinal, 0)
+            coverage = float(len(tfs) / max(1, n_terms))
+            cheap_boosts = (
+                (min(0.5, overlap * 0.08) if overlap else 0.0)
+                + (min(0.4, meta_overlap * 0.06) if meta_overlap else 0.0)
+                + (min(0.55, coverage * 0.28) if coverage > 0 else 0.0)
+            )
+            # Фраза/порядок/min-span считаются только для выживших кандидатов; здесь — их верхняя граница.
+            # Без overlap/coverage эти бусты невозможны, так что нулевой нижней границы достаточно для отсева.
+            phrase_possible = bool(q_lower and overlap == n_terms)
+            ordered_possible = bool(n_terms >= 2 and (q_terms_unique[0] in tfs or coverage >= 0.999))
+            keyword_lb = bm25 + cheap_boosts
+            if keyword_lb <= 0 and semantic_score <= 0:
                 continue
-            dfi = max(0, int(df.get(t, 0)))
-            idf = math.log(1.0 + ((total_chunks - dfi + 0.5) / (dfi + 0.5)))
-            denom = tf + k1 * (1 - b + b * (chunk_tokens / max(1.0, avg_len)))
-            qtf = max(1, int(q_term_qtf.get(t, 1)))
-            qtf_weight = ((k3 + 1.0) * qtf) / (k3 + qtf)
-            base = (tf * (k1 + 1.0)) / max(0.0001, denom)
-            # BM25+ style delta protects longer chunks from being overly penalized.
-            keyword_score += idf * ((base + 0.25) * qtf_weight)
+            keyword_ub = keyword_lb + _RAG_SCORE_BOUND_EPS
+            keyword_ub += 1.25 if phrase_possible else 0.0
+            # ordered_ratio <= coverage, span_ratio <= 1.
+            keyword_ub += min(0.35, coverage * 0.18) if ordered_possible else 0.0
+            keyword_ub += min(0.45, 0.22) if ordered_possible and coverage >= 0.999 else 0.0
+            max_semantic = max(max_semantic, semantic_score)
+            candidates.append(
+                {
+                    "seq": len(candidates),
+                    "chunk": idx_chunks[ordinal],
+                    "bm25": bm25,
+                    "overlap": overlap,
+                    "meta_overlap": meta_overlap,
+                    "coverage": coverage,
+                    "phrase_possible": phrase_possible,
+                    "ordered_possible": ordered_possible,
+                    "keyword_lb": keyword_lb,
+                    "keyword_ub": keyword_ub,
+                    "keyword_score": None,
+                    "semantic_score": semantic_score,
+                    "phrase_match": False,
+                }
+            )
 
+    if not candidates:
+        retrieval_mode = (
+            "hybrid_ollama_vector"
+            if vector_runtime_enabled and query_vector_provider == "openai_compat" and str(vector_cfg.get("provider_label") or "").startswith("ollama")
+            else "hybrid_openai_vector"
+            if vector_runtime_enabled and query_vector_provider == "openai_compat"
+            else "hybrid_hash_vector"
+            if vector_runtime_enabled
+            else "keyword_only"
+        )
+        return [], total_chunks, retrieval_mode, RAGRetrievalMetrics()
+
+    def _exact_keyword(item: dict[str, Any]) -> float:
+        if item["keyword_score"] is not None:
+            return float(item["keyword_score"])
+        chunk = item["chunk"]
+        keyword_score = float(item["bm25"])
         # simple phrase/subsequence boosts
-        if q_lower and q_lower in chunk_lower:
+        phrase_match = bool(item["phrase_possible"] and q_lower in str(chunk.get("text") or "").lower())
+        if phrase_match:
             keyword_score += 1.25
-        overlap = sum(1 for t in q_terms_unique if t in chunk_lower)
-        if overlap:
-            keyword_score += min(0.5, overlap * 0.08)
-        meta_overlap = sum(1 for t in q_terms_unique if t in meta_text)
-        if meta_overlap:
-            keyword_score += min(0.4, meta_overlap * 0.06)
-        coverage = float(sum(1 for t in q_terms_unique if counter.get(t, 0) > 0) / max(1, len(q_terms_unique)))
+        if item["overlap"]:
+            keyword_score += min(0.5, item["overlap"] * 0.08)
+        if item["meta_overlap"]:
+            keyword_score += min(0.4, item["meta_overlap"] * 0.06)
+        coverage = float(item["coverage"])
         if coverage > 0:
             keyword_score += min(0.55, coverage * 0.28)
-        if len(q_terms_unique) >= 2 and chunk_tokens_list:
+        # ordered_ratio > 0 только если первый термин запроса есть среди токенов чанка.
+        if item["ordered_possible"]:
+            chunk_tokens_list = _rag_tokenize(str(chunk.get("text") or ""))
             ordered_ratio = _rag_ordered_match_ratio(chunk_tokens_list, q_terms_unique)
             if ordered_ratio > 0:
                 keyword_score += min(0.35, ordered_ratio * 0.18)
@@ -3081,69 +3981,104 @@ def _rag_rank_hits(
                 span_ratio = _rag_min_cover_span_ratio(chunk_tokens_list, q_terms_unique)
                 if span_ratio > 0:
                     keyword_score += min(0.45, span_ratio * 0.22)
+        item["keyword_score"] = keyword_score
+        item["phrase_match"] = phrase_match
+        return keyword_score
 
-        semantic_score = 0.0
-        if query_embedding and bool(vector_cfg.get("enabled", False)):
-            chunk_embedding = _rag_chunk_embedding(chunk, vector_cfg=vector_cfg)
-            if chunk_embedding:
-                semantic_score = max(0.0, cosine_similarity_dense(query_embedding, chunk_embedding))
-
-        if keyword_score <= 0 and semantic_score <= 0:
-            continue
-        max_keyword = max(max_keyword, float(keyword_score))
-        max_semantic = max(max_semantic, float(semantic_score))
-        candidates.append(
-            {
-                "chunk": chunk,
-                "keyword_score": float(keyword_score),
-                "semantic_score": float(semantic_score),
-            }
-        )
-
-    if not candidates:
-        retrieval_mode = (
-            "hybrid_ollama_vector"
-            if vector_runtime_enabled and query_vector_provider == "openai_compat" and str(vector_cfg.get("provider_label") or "").startswith("ollama")
-            else "hybrid_openai_vector"
-            if vector_runtime_enabled and query_vector_provider == "openai_compat"
-            else "hybrid_hash_vector"
-            if vector_runtime_enabled
-            else "keyword_only"
-        )
-        return [], total_chunks, retrieval_mode, RAGRetrievalMetrics()
+    # MaxScore: точный максимум keyword-score нужен для нормализации; кандидаты, чья верхняя
+    # граница ниже уже найденного максимума, дальше не досчитываются.
+    max_keyword = 0.0
+    for item in sorted(candidates, key=lambda it: it["keyword_ub"], reverse=True):
+        if item["keyword_ub"] < max_keyword:
+            break
+        max_keyword = max(max_keyword, _exact_keyword(item))
 
     hybrid_vector_enabled = bool(vector_runtime_enabled and max_semantic > 0.0)
     kw_weight, vec_weight = _rag_hybrid_weights(vector_enabled=hybrid_vector_enabled)
 
-    ranked: list[tuple[float, float, float, dict[str, Any]]] = []
-    for item in candidates:
-        chunk = item["chunk"]
-        keyword_score = float(item["keyword_score"])
+    def _semantic_part(item: dict[str, Any]) -> float:
+        semantic_norm = (item["semantic_score"] / max_semantic) if max_semantic > 0 else 0.0
+        return vec_weight * semantic_norm
+
+    def _final_bound(item: dict[str, Any], keyword_score: float, *, phrase: bool) -> float:
+        keyword_norm = (keyword_score / max_keyword) if max_keyword > 0 else 0.0
+        bound = (kw_weight * keyword_norm) + _semantic_part(item)
+        bound += 0.03 if phrase else 0.0
+        return bound + min(0.02, max(0.0, item["semantic_score"]) * 0.02)
+
+    def _final(item: dict[str, Any]) -> float:
+        keyword_score = _exact_keyword(item)
         semantic_score = float(item["semantic_score"])
         keyword_norm = (keyword_score / max_keyword) if max_keyword > 0 else 0.0
         semantic_norm = (semantic_score / max_semantic) if max_semantic > 0 else 0.0
         final_score = (kw_weight * keyword_norm) + (vec_weight * semantic_norm)
         # Small deterministic tie-breakers to preserve exact phrase/query overlap preference.
-        chunk_text = str(chunk.get("text") or "")
-        chunk_lower = chunk_text.lower()
-        if q_lower and q_lower in chunk_lower:
+        if item["phrase_match"]:
             final_score += 0.03
         final_score += min(0.02, max(0.0, semantic_score) * 0.02)
+        return final_score
+
+    # Heap top-k: полностью досчитываются только кандидаты, чья верхняя граница итогового score
+    # не ниже худшего в текущем top (с запасом под голову reranker'а).
+    limit = max(max(1, min(int(top_k), 50)), _rag_reranker_top_n())
+    heap: list[tuple[float, int]] = []
+    final_by_seq: dict[int, float] = {}
+    bounds = [
+        (
+            _final_bound(item, item["keyword_ub"], phrase=item["phrase_possible"]) + _RAG_SCORE_BOUND_EPS,
+            item["seq"],
+        )
+        for item in candidates
+    ]
+    bounds.sort(key=lambda pair: (-pair[0], pair[1]))
+    for bound, seq in bounds:
+        if len(heap) >= limit and bound < heap[0][0]:
+            break
+        final_score = _final(candidates[seq])
+        final_by_seq[seq] = final_score
         if final_score <= 0:
             continue
-        ranked.append((final_score, keyword_score, semantic_score, chunk))
-
-    ranked.sort(key=lambda item: item[0], reverse=True)
+        entry = (final_score, -seq)
+        if len(heap) < limit:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    # Grade релевантности = доля терминов запроса среди токенов чанка, т.е. coverage из postings.
+    pool_grades: list[int] = []
+    for item in candidates:
+        final_score = final_by_seq.get(item["seq"])
+        if final_score is None and _final_bound(item, item["keyword_lb"], phrase=False) <= _RAG_SCORE_BOUND_EPS:
+            final_score = final_by_seq[item["seq"]] = _final(item)
+        if final_score is None or final_score > 0:
+            pool_grades.append(_rag_relevance_grade_from_coverage(float(item["coverage"])))
+    top_seqs = sorted(((-score, -neg_seq) for score, neg_seq in heap))
+    if any(pool_grades) and not any(
+        _rag_relevance_grade_from_coverage(float(candidates[seq]["coverage"])) for _score, seq in top_seqs
+    ):
+        # MRR требует позиции первого релевантного чанка за пределами top — досчитываем всё.
+        for item in candidates:
+            if item["seq"] not in final_by_seq:
+                final_by_seq[item["seq"]] = _final(item)
+        top_seqs = sorted((-score, seq) for seq, score in final_by_seq.items() if score > 0)
+
+    ranked: list[tuple[float, float, float, dict[str, Any]]] = [
+        (-neg_score, float(candidates[seq]["keyword_score"]), float(candidates[seq]["semantic_score"]), candidates[seq]["chunk"])
+        for neg_score, seq in top_seqs
+    ]
+    mark = _rag_stage_done(timings, "keyword_scoring", mark)
     ranked = _rag_apply_reranker(
         ranked_rows=ranked,
         query_text=q_text,
         query_terms=q_terms_unique,
         max_semantic_score=max_semantic,
     )
+    _rag_stage_done(timings, "rerank", mark)
     retrieval_metrics = _rag_compute_retrieval_metrics(
         ranked_rows=ranked,
         query_terms=q_terms_unique,
         top_k=top_k,
+        pool_grades=pool_grades,
     )
     hits: list[RAGHit] = []
     for final_score, keyword_score, semantic_score, chunk in ranked[: max(1, min(top_k, 50))]:
@@ -3187,19 +4122,12 @@ def _rag_rank_hits(
     return hits, total_chunks, retrieval_mode, retrieval_metrics
 
 
-def _rag_answer_from_hits(
+def _rag_answer_prompt(
     *,
     query: str,
     hits: list[RAGHit],
     prompt_override: str | None = None,
-) -> tuple[str, bool, list[str]]:
-    warnings: list[str] = []
-    if not hits:
-        return "", False, ["no_hits"]
-    orch = _build_llm_artifact_orchestrator()
-    if orch is None:
-        return "", False, ["llm_unavailable"]
-
+) -> tuple[str, str]:
     citations_blocks: list[str] = []
     for idx, hit in enumerate(hits, start=1):
         lines_label = ""
@@ -3233,6 +4161,23 @@ def _rag_answer_from_hits(
         f"Доп. инструкция:\n{str(prompt_override or '').strip() or 'Кратко ответь и укажи ключевые цитаты.'}\n\n"
         f"Цитаты:\n\n" + "\n\n".join(citations_blocks)
     )
+    return system, user
+
+
+def _rag_answer_from_hits(
+    *,
+    query: str,
+    hits: list[RAGHit],
+    prompt_override: str | None = None,
+) -> tuple[str, bool, list[str]]:
+    warnings: list[str] = []
+    if not hits:
+        return "", False, ["no_hits"]
+    orch = _build_llm_artifact_orchestrator()
+    if orch is None:
+        return "", False, ["llm_unavailable"]
+
+    system, user = _rag_answer_prompt(query=query, hits=hits, prompt_override=prompt_override)
     try:
         text = orch.complete_text(system=system, user=user).text
         return str(text or "").strip(), True, warnings
@@ -3240,18 +4185,223 @@ def _rag_answer_from_hits(
         return "", False, ["llm_error"]
 
 
+def _rag_answer_stream_from_hits(
+    *,
+    query: str,
+    hits: list[RAGHit],
+    prompt_override: str | None = None,
+) -> Generator[tuple[str, Any], None, tuple[str, bool, list[str]]]:
+    """
+    Как _rag_answer_from_hits, но отдаёт ("token", {"text": ...}) по мере генерации.
+
+    Итог (answer, llm_used, warnings) — значение генератора (yield from); при обрыве
+    провайдера на середине ответ считается неудавшимся, как и в блокирующем варианте.
+    """
+    if not hits:
+        return "", False, ["no_hits"]
+    orch = _build_llm_artifact_orchestrator()
+    if orch is None:
+        return "", False, ["llm_unavailable"]
+
+    system, user = _rag_answer_prompt(query=query, hits=hits, prompt_override=prompt_override)
+    parts: list[str] = []
+    try:
+        for delta in orch.stream_text(system=system, user=user):
+            parts.append(delta)
+            yield "token", {"text": delta}
+    except Exception:
+        return "", False, ["llm_error"]
+    return "".join(parts).strip(), True, []
+
+
+def _rag_query_cache_enabled() -> bool:
+    s = get_settings()
+    return bool(getattr(s, "rag_query_cache_enabled", True))
+
+
+def _rag_query_cache_ttl_s() -> float:
+    s = get_settings()
+    raw = float(getattr(s, "rag_query_cache_ttl_s", 300) or 0)
+    return max(0.0, min(raw, 86_400.0))
+
+
+def _rag_query_cache_max_items() -> int:
+    s = get_settings()
+    raw = int(getattr(s, "rag_query_cache_max_items", 256) or 0)
+    return max(0, min(raw, 10_000))
+
+
+def _rag_query_cache_key(
+    *,
+    kind: str,
+    query: str,
+    ids: list[str],
+    top_k: int,
+    transcript_variant: str,
+    fingerprints: list[str | None],
+    vector_cfg: dict[str, Any],
+    answer_mode: str,
+    answer_prompt: str | None,
+    meta_filters: dict[str, str] | None = None,
+) -> str | None:
+    """
+    Ключ кэша ответа: нормализованный запрос + запрошенные документы + их версии + настройки.
+
+    ids — все запрошенные встречи/файлы; fingerprints проиндексированных —
+    "<id>:<sha источника>:<mtime индекса>:<size индекса>", так что любая переиндексация меняет
+    ключ и старый ответ просто вытесняется по TTL/LRU. None среди fingerprints (индекс
+    не прочитан или не построен) — запрос не кэшируется.
+    """
+    if any(fingerprint is None for fingerprint in fingerprints):
+        return None
+    payload = {
+        "kind": kind,
+        "query": " ".join(str(query or "").lower().split()),
+        "ids": sorted(str(item) for item in ids),
+        "top_k": int(top_k),
+        "transcript_variant": str(transcript_variant),
+        "fingerprints": sorted(fingerprints),
+        "vector": _rag_vector_signature(vector_cfg),
+        "answer_mode": str(answer_mode),
+        "answer_prompt": str(answer_prompt or ""),
+        "meta_filters": {key: " ".join(value.lower().split()) for key, value in (meta_filters or {}).items()},
+    }
+    return sha256_hex(_json_canonical_bytes(payload))
+
+
+def _rag_query_cache_get(key: str | None) -> RAGQueryResponse | None:
+    if key is None or not _rag_query_cache_enabled():
+        return None
+    now = time.monotonic()
+    with _RAG_QUERY_CACHE_LOCK:
+        entry = _RAG_QUERY_CACHE.get(key)
+        if entry is None:
+            return None
+        if float(entry["expires_at"]) <= now:
+            _RAG_QUERY_CACHE.pop(key, None)
+            return None
+        _RAG_QUERY_CACHE.move_to_end(key)
+        response = entry["response"].model_copy(deep=True)
+    response.cached = True
+    return response
+
+
+def _rag_query_cacheable(response: RAGQueryResponse, *, answer_mode: str) -> bool:
+    # Неудавшийся LLM-ответ не кэшируем: повтор запроса должен снова обратиться к LLM.
+    return answer_mode != "llm" or bool(response.llm_used)
+
+
+def _rag_query_cache_bind(
+    response: RAGQueryResponse, *, query: str, meeting_ids: list[str], warnings: list[str]
+) -> RAGQueryResponse:
+    """Поля запроса в закэшированном ответе — от текущего запроса (регистр, порядок встреч)."""
+    response.query = query
+    response.meeting_ids = list(meeting_ids)
+    response.searched_meetings = len(meeting_ids)
+    response.warnings = list(dict.fromkeys([*warnings, *response.warnings]))
+    return response
+
+
+def _rag_query_cache_put(key: str | None, response: RAGQueryResponse) -> None:
+    max_items = _rag_query_cache_max_items()
+    ttl_s = _rag_query_cache_ttl_s()
+    if key is None or not _rag_query_cache_enabled() or max_items <= 0 or ttl_s <= 0:
+        return
+    entry = {"expires_at": time.monotonic() + ttl_s, "response": response.model_copy(deep=True)}
+    with _RAG_QUERY_CACHE_LOCK:
+        _RAG_QUERY_CACHE[key] = entry
+        _RAG_QUERY_CACHE.move_to_end(key)
+        while len(_RAG_QUERY_CACHE) > max_items:
+            _RAG_QUERY_CACHE.popitem(last=False)
+
+
+def _rag_index_fingerprint(name: str, source_sha: str, index_stat: tuple[str, int, int] | None) -> str | None:
+    # Без файла индекса версию не проверить — такой запрос не кэшируется.
+    if index_stat is None or not source_sha:
+        return None
+    _path, mtime_ns, size = index_stat
+    return f"{name}:{source_sha}:{mtime_ns}:{size}"
+
+
 def _rag_query(req: RAGQueryRequest) -> RAGQueryResponse:
+    for event, payload in _rag_query_events(req):
+        if event == "done":
+            return payload
+    raise RuntimeError("rag_query_without_result")
+
+
+def _rag_hits_event(
+    *,
+    request_id: str,
+    retrieval_mode: str,
+    total_chunks: int,
+    hits: list[RAGHit],
+    warnings: list[str],
+) -> tuple[str, dict[str, Any]]:
+    return "hits", {
+        "request_id": request_id,
+        "retrieval_mode": retrieval_mode,
+        "total_chunks_scanned": int(total_chunks),
+        "hits": [hit.model_dump(mode="json") for hit in hits],
+        "warnings": list(warnings),
+    }
+
+
+def _rag_query_events(
+    req: RAGQueryRequest,
+    *,
+    stream_answer: bool = False,
+) -> Generator[tuple[str, Any], None, None]:
+    """
+    Запрос по встречам как поток событий: "hits" сразу после ранжирования,
+    "token" — фрагменты LLM-ответа (только при stream_answer), "done" — итоговый RAGQueryResponse.
+    """
     started = time.perf_counter()
     request_id = f"ragq_{uuid.uuid4().hex[:16]}"
     generated_at = _utc_now_iso()
     warnings: list[str] = []
-    meeting_ids = _rag_select_meeting_ids(explicit_ids=req.meeting_ids, recent_limit=req.recent_limit)
+    timings: dict[str, float] = {}
+    meeting_ids = _rag_select_meeting_ids(
+        explicit_ids=req.meeting_ids,
+        recent_limit=req.recent_limit,
+        date_from=req.date_from,
+        date_to=req.date_to,
+    )
+    meta_filters = req.meta_filters()
     try:
         indexes: list[dict[str, Any]] = []
+        indexed_meetings = 0
+        fingerprints: list[str | None] = []
+        vector_cfg = _rag_vector_config()
         if not meeting_ids:
             warnings.append("no_meetings_selected")
         else:
-            for meeting_id in meeting_ids:
+            pending = list(meeting_ids)
+            if not req.force_reindex:
+                # Актуальные встречи берутся срезом глобального корпуса, без чтения их индексов.
+                fresh = [
+                    meeting_id
+                    for meeting_id in meeting_ids
+                    if _rag_corpus_meeting_fresh(
+                        meeting_id, req.transcript_variant, auto_index=bool(req.auto_index), vector_cfg=vector_cfg
+                    )
+                ]
+                if fresh:
+                    corpus = _rag_corpus(vector_cfg)
+                    keys = {_rag_corpus_meeting_key(mid, req.transcript_variant): mid for mid in fresh}
+                    views, missing = corpus.views(list(keys))
+                    indexes.extend(views)
+                    missing_ids = {keys[key] for key in missing}
+                    indexed_meetings += len(fresh) - len(missing_ids)
+                    pending = [mid for mid in meeting_ids if mid not in set(fresh) or mid in missing_ids]
+                    for key, mid in keys.items():
+                        doc = corpus.doc(key) or {}
+                        if mid not in missing_ids:
+                            stat = tuple(doc.get("index_stat") or ()) or None
+                            fingerprints.append(
+                                _rag_index_fingerprint(mid, str(doc.get("transcript_sha256") or ""), stat)
+                            )
+            for meeting_id in pending:
                 try:
                     if req.auto_index:
                         index, _cached = _ensure_rag_index(
@@ -3262,31 +4412,92 @@ def _rag_query(req: RAGQueryRequest) -> RAGQueryResponse:
                     else:
                         index = _rag_read_index(meeting_id, req.transcript_variant)
                     indexes.append(index)
+                    indexed_meetings += 1
+                    index_stat = _rag_index_file_stat(
+                        records.artifact_path(meeting_id, _rag_index_relpath(req.transcript_variant)),
+                        records.artifact_path(meeting_id, _rag_legacy_index_relpath(req.transcript_variant)),
+                    )
+                    fingerprints.append(
+                        _rag_index_fingerprint(meeting_id, str(index.get("transcript_sha256") or ""), index_stat)
+                    )
                 except Exception:
+                    _rag_corpus_remove(_rag_corpus_meeting_key(meeting_id, req.transcript_variant), vector_cfg=vector_cfg)
+                    fingerprints.append(None)
                     warnings.append(f"index_failed:{meeting_id}")
                     record_rag_query_error(reason="index_failed")
                     continue
 
+        _rag_stage_done(timings, "index_load", started)
+        cache_key = _rag_query_cache_key(
+            kind="meetings",
+            query=req.query,
+            ids=list(meeting_ids),
+            top_k=req.top_k,
+            transcript_variant=req.transcript_variant,
+            fingerprints=fingerprints,
+            vector_cfg=vector_cfg,
+            answer_mode=req.answer_mode,
+            answer_prompt=req.answer_prompt,
+            meta_filters=meta_filters,
+        )
+        if cache_key is not None and not req.force_reindex:
+            cached_response = _rag_query_cache_get(cache_key)
+            record_rag_query_cache(hit=cached_response is not None)
+            if cached_response is not None:
+                _rag_query_cache_bind(
+                    cached_response, query=req.query, meeting_ids=meeting_ids, warnings=warnings
+                )
+                yield _rag_hits_event(
+                    request_id=cached_response.request_id,
+                    retrieval_mode=cached_response.retrieval_mode,
+                    total_chunks=cached_response.total_chunks_scanned,
+                    hits=cached_response.hits,
+                    warnings=cached_response.warnings,
+                )
+                if stream_answer and cached_response.answer:
+                    yield "token", {"text": cached_response.answer}
+                yield "done", _rag_finish_stage_timings(cached_response, timings, debug=req.debug)
+                return
+
         index_version, vector_provider, embedding_model = _rag_vector_meta_from_indexes(indexes)
         hits, total_chunks, retrieval_mode, retrieval_metrics = _rag_rank_hits(
             query=req.query,
             indexes=indexes,
             transcript_variant=req.transcript_variant,
             top_k=req.top_k,
+            meta_filters=meta_filters,
+            timings=timings,
         )
+        if meta_filters and indexes and total_chunks == 0:
+            warnings.append("no_chunks_match_filters")
         if not hits:
             record_rag_no_hits()
+        yield _rag_hits_event(
+            request_id=request_id,
+            retrieval_mode=retrieval_mode,
+            total_chunks=total_chunks,
+            hits=hits,
+            warnings=warnings,
+        )
 
         answer = ""
         llm_used = False
         if req.answer_mode == "llm":
             llm_started = time.perf_counter()
-            answer, llm_used, answer_warnings = _rag_answer_from_hits(
-                query=req.query,
-                hits=hits,
-                prompt_override=req.answer_prompt,
-            )
-            record_rag_llm_latency_ms(service="api_gateway", elapsed_ms=(time.perf_counter() - llm_started) * 1000.0)
+            if stream_answer:
+                answer, llm_used, answer_warnings = yield from _rag_answer_stream_from_hits(
+                    query=req.query,
+                    hits=hits,
+                    prompt_override=req.answer_prompt,
+                )
+            else:
+                answer, llm_used, answer_warnings = _rag_answer_from_hits(
+                    query=req.query,
+                    hits=hits,
+                    prompt_override=req.answer_prompt,
+                )
+            _rag_stage_done(timings, "llm_answer", llm_started)
+            record_rag_llm_latency_ms(service="api_gateway", elapsed_ms=timings["llm_answer"])
             warnings.extend(answer_warnings)
 
         answer_quality, citation_coverage, unsupported_claim_rate, hallucination_rate, quality_warnings = _rag_answer_quality(
@@ -3316,7 +4527,7 @@ def _rag_query(req: RAGQueryRequest) -> RAGQueryResponse:
             vector_provider=vector_provider,
             embedding_model=embedding_model,
             searched_meetings=len(meeting_ids),
-            indexed_meetings=len(indexes),
+            indexed_meetings=indexed_meetings,
             total_chunks_scanned=total_chunks,
             hits=hits,
             retrieval_metrics=retrieval_metrics,
@@ -3330,6 +4541,7 @@ def _rag_query(req: RAGQueryRequest) -> RAGQueryResponse:
             files=[],
         )
 
+        export_started = time.perf_counter()
         try:
             files = _rag_store_query_result_files(
                 request_id=request_id,
@@ -3337,10 +4549,13 @@ def _rag_query(req: RAGQueryRequest) -> RAGQueryResponse:
                 query_resp=response,
             )
             response.files = files
+            if _rag_query_cacheable(response, answer_mode=req.answer_mode):
+                _rag_query_cache_put(cache_key, response)
         except Exception:
             record_rag_export_error(reason="write_failed")
             response.warnings.append("export_write_failed")
-        return response
+        _rag_stage_done(timings, "export_write", export_started)
+        yield "done", _rag_finish_stage_timings(response, timings, debug=req.debug)
     except HTTPException as exc:
         record_rag_query_error(reason=str(exc.detail or "http_error"))
         raise
@@ -3356,31 +4571,99 @@ def _rag_files_query(req: RAGFilesQueryRequest) -> RAGQueryResponse:
     request_id = f"ragf_{uuid.uuid4().hex[:16]}"
     generated_at = _utc_now_iso()
     warnings: list[str] = []
+    timings: dict[str, float] = {}
     try:
         documents = [_rag_normalize_file_document(doc) for doc in list(req.documents or [])]
         indexes: list[dict[str, Any]] = []
+        indexed_documents = 0
+        fingerprints: list[str | None] = []
+        vector_cfg = _rag_vector_config()
         if not documents:
             warnings.append("no_documents_attached")
         else:
-            for document in documents:
+            pending = list(documents)
+            if not req.force_reindex:
+                fresh = {
+                    _rag_corpus_file_key(str(document["document_hash"]))
+                    for document in documents
+                    if _rag_corpus_fresh(
+                        _rag_corpus_file_key(str(document["document_hash"])),
+                        vector_cfg=vector_cfg,
+                        index_stat=_rag_file_index_stat(str(document["document_hash"])),
+                        document_sha256=str(document["document_sha256"]),
+                        chunking=_rag_default_chunking(),
+                    )
+                }
+                if fresh:
+                    views, missing = _rag_corpus(vector_cfg).views(sorted(fresh))
+                    indexes.extend(views)
+                    served = set(fresh) - set(missing)
+                    indexed_documents += len(served)
+                    for document in documents:
+                        document_hash = str(document["document_hash"])
+                        if _rag_corpus_file_key(document_hash) in served:
+                            fingerprints.append(
+                                _rag_index_fingerprint(
+                                    document_hash,
+                                    str(document["document_sha256"]),
+                                    _rag_file_index_stat(document_hash),
+                                )
+                            )
+                    pending = [
+                        document
+                        for document in documents
+                        if _rag_corpus_file_key(str(document["document_hash"])) not in served
+                    ]
+            for document in pending:
                 try:
                     index, _cached = _ensure_rag_file_index(
                         document,
                         force_rebuild=bool(req.force_reindex),
                     )
                     indexes.append(index)
+                    indexed_documents += 1
+                    document_hash = str(document["document_hash"])
+                    fingerprints.append(
+                        _rag_index_fingerprint(
+                            document_hash,
+                            str(index.get("document_sha256") or ""),
+                            _rag_file_index_stat(document_hash),
+                        )
+                    )
                 except Exception:
+                    _rag_corpus_remove(_rag_corpus_file_key(str(document["document_hash"])), vector_cfg=vector_cfg)
+                    fingerprints.append(None)
                     doc_label = str(document.get("document_name") or document.get("document_id") or "").strip()
                     warnings.append(f"index_failed:{doc_label or 'document'}")
                     record_rag_query_error(reason="file_index_failed")
                     continue
 
+        _rag_stage_done(timings, "index_load", started)
+        cache_key = _rag_query_cache_key(
+            kind="files",
+            query=req.query,
+            ids=[str(document["document_hash"]) for document in documents],
+            top_k=req.top_k,
+            transcript_variant="clean",
+            fingerprints=fingerprints,
+            vector_cfg=vector_cfg,
+            answer_mode=req.answer_mode,
+            answer_prompt=req.answer_prompt,
+        )
+        if cache_key is not None and not req.force_reindex:
+            cached_response = _rag_query_cache_get(cache_key)
+            record_rag_query_cache(hit=cached_response is not None)
+            if cached_response is not None:
+                _rag_query_cache_bind(cached_response, query=req.query, meeting_ids=[], warnings=warnings)
+                return _rag_finish_stage_timings(cached_response, timings, debug=req.debug)
+
         index_version, vector_provider, embedding_model = _rag_vector_meta_from_indexes(indexes)
         hits, total_chunks, retrieval_mode, retrieval_metrics = _rag_rank_hits(
             query=req.query,
             indexes=indexes,
             transcript_variant="clean",
             top_k=req.top_k,
+            timings=timings,
         )
         if not hits:
             record_rag_no_hits()
@@ -3394,7 +4677,8 @@ def _rag_files_query(req: RAGFilesQueryRequest) -> RAGQueryResponse:
                 hits=hits,
                 prompt_override=req.answer_prompt,
             )
-            record_rag_llm_latency_ms(service="api_gateway", elapsed_ms=(time.perf_counter() - llm_started) * 1000.0)
+            _rag_stage_done(timings, "llm_answer", llm_started)
+            record_rag_llm_latency_ms(service="api_gateway", elapsed_ms=timings["llm_answer"])
             warnings.extend(answer_warnings)
 
         answer_quality, citation_coverage, unsupported_claim_rate, hallucination_rate, quality_warnings = _rag_answer_quality(
@@ -3426,7 +4710,7 @@ def _rag_files_query(req: RAGFilesQueryRequest) -> RAGQueryResponse:
             searched_meetings=0,
             indexed_meetings=0,
             documents_count=len(documents),
-            indexed_documents=len(indexes),
+            indexed_documents=indexed_documents,
             total_chunks_scanned=total_chunks,
             hits=hits,
             retrieval_metrics=retrieval_metrics,
@@ -3440,6 +4724,7 @@ def _rag_files_query(req: RAGFilesQueryRequest) -> RAGQueryResponse:
             files=[],
         )
 
+        export_started = time.perf_counter()
         try:
             files = _rag_store_query_result_files(
                 request_id=request_id,
@@ -3447,10 +4732,13 @@ def _rag_files_query(req: RAGFilesQueryRequest) -> RAGQueryResponse:
                 query_resp=response,
             )
             response.files = files
+            if _rag_query_cacheable(response, answer_mode=req.answer_mode):
+                _rag_query_cache_put(cache_key, response)
         except Exception:
             record_rag_export_error(reason="write_failed")
             response.warnings.append("export_write_failed")
-        return response
+        _rag_stage_done(timings, "export_write", export_started)
+        return _rag_finish_stage_timings(response, timings, debug=req.debug)
     except HTTPException as exc:
         record_rag_query_error(reason=str(exc.detail or "http_error"))
         raise
@@ -3481,6 +4769,8 @@ class _RAGIndexJob:
     max_lines_per_chunk: int
     overlap_lines: int
     max_chars_per_chunk: int
+    priority: int = 0
+    seq: int = 0
     status: str = "queued"
     created_at: str = ""
     started_at: str = ""
@@ -3489,6 +4779,19 @@ class _RAGIndexJob:
     error: str = ""
     items: list[_RAGIndexJobRow] = field(default_factory=list)
 
+    @property
+    def chunking(self) -> dict[str, int]:
+        return {
+            "max_lines_per_chunk": int(self.max_lines_per_chunk),
+            "overlap_lines": int(self.overlap_lines),
+            "max_chars_per_chunk": int(self.max_chars_per_chunk),
+        }
+
+
+# Встреча в этих статусах больше не будет обработана заданием.
+_RAG_INDEX_JOB_ROW_DONE = {"completed", "skipped", "failed", "cancelled"}
+_RAG_INDEX_JOB_DONE = {"completed", "failed", "cancelled"}
+
 
 def _rag_index_job_error_text(exc: Exception) -> str:
     if isinstance(exc, HTTPException):
@@ -3499,28 +4802,136 @@ def _rag_index_job_error_text(exc: Exception) -> str:
     return str(exc or "error")[:240]
 
 
+def _rag_index_job_workers() -> int:
+    s = get_settings()
+    raw = int(getattr(s, "rag_index_job_workers", 4) or 4)
+    return max(1, min(raw, 32))
+
+
 class RAGIndexJobManager:
-    def __init__(self, *, max_jobs: int = 64) -> None:
+    """
+    Очередь заданий индексации с пулом воркеров.
+
+    Воркер берёт следующую встречу из задания с наибольшим priority (при равенстве — более
+    раннего), так что встречи одного задания индексируются параллельно. Одна и та же встреча
+    (meeting_id, transcript_variant) не индексируется двумя воркерами одновременно.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_jobs: int = 64,
+        workers: int | None = None,
+        store: RAGIndexJobStore | None = None,
+    ) -> None:
         self._lock = threading.RLock()
+        self._wakeup = threading.Condition(self._lock)
         self._jobs: dict[str, _RAGIndexJob] = {}
-        self._active_job_id: str | None = None
+        # Незавершённые задания в порядке выдачи работы: (-priority, seq).
+        self._queue: list[str] = []
+        self._in_flight: set[tuple[str, str]] = set()
         self._latest_job_id: str | None = None
         self._max_jobs = max(4, int(max_jobs))
+        self._workers = workers
+        self._alive_workers = 0
+        self._seq = 0
+        self._store = store
+        if store is not None:
+            with self._lock:
+                self._restore_locked()
+
+    def _persist(self, method: str, *args: Any, **kwargs: Any) -> None:
+        # Сбой записи состояния не должен останавливать индексацию — задание просто не переживёт рестарт.
+        if self._store is None:
+            return
+        try:
+            getattr(self._store, method)(*args, **kwargs)
+        except Exception as exc:
+            log.warning("rag_index_job_persist_failed", extra={"payload": {"op": method, "err": str(exc)[:200]}})
+
+    def _persist_rows(self, job: _RAGIndexJob, ordinals: list[int]) -> None:
+        rows = {
+            ordinal: {
+                "status": job.items[ordinal].status,
+                "chunk_count": job.items[ordinal].chunk_count,
+                "transcript_chars": job.items[ordinal].transcript_chars,
+                "indexed_at": job.items[ordinal].indexed_at,
+                "cached": job.items[ordinal].cached,
+                "error": job.items[ordinal].error,
+            }
+            for ordinal in ordinals
+        }
+        if rows:
+            self._persist("update_items", job.job_id, rows)
+
+    def _restore_locked(self) -> None:
+        """Поднимает задания из store; прерванные рестартом встречи снова ставятся в очередь."""
+        try:
+            saved = self._store.load_jobs() if self._store is not None else []
+        except Exception as exc:
+            log.warning("rag_index_job_restore_failed", extra={"payload": {"err": str(exc)[:200]}})
+            return
+        for data in saved:
+            params = data.get("params") or {}
+            job = _RAGIndexJob(
+                job_id=str(data["job_id"]),
+                meeting_ids=[str(item.get("meeting_id") or "") for item in data.get("items") or []],
+                transcript_variant=str(params.get("transcript_variant") or "clean"),
+                force_rebuild=bool(params.get("force_rebuild", False)),
+                max_lines_per_chunk=int(params.get("max_lines_per_chunk") or 6),
+                overlap_lines=int(params.get("overlap_lines") or 0),
+                max_chars_per_chunk=int(params.get("max_chars_per_chunk") or 1200),
+                priority=int(data.get("priority") or 0),
+                seq=int(data.get("seq") or 0),
+                status=str(data.get("status") or "queued"),
+                created_at=str(data.get("created_at") or ""),
+                started_at=str(data.get("started_at") or ""),
+                finished_at=str(data.get("finished_at") or ""),
+                error=str(data.get("error") or ""),
+                items=[_RAGIndexJobRow(**item) for item in data.get("items") or []],
+            )
+            self._jobs[job.job_id] = job
+            self._seq = max(self._seq, job.seq)
+            self._latest_job_id = job.job_id
+            if job.status in _RAG_INDEX_JOB_DONE and job.status != "cancelled":
+                continue
+            interrupted = [ordinal for ordinal, row in enumerate(job.items) if row.status == "running"]
+            for ordinal in interrupted:
+                job.items[ordinal].status = "cancelled" if job.status == "cancelled" else "queued"
+            self._persist_rows(job, interrupted)
+            if job.status in {"queued", "running"}:
+                self._enqueue_locked(job)
+            self._finish_job_locked(job)
+
+    def resume(self) -> int:
+        """Запускает воркеры для заданий, восстановленных из store; возвращает их число."""
+        with self._wakeup:
+            pending = sum(
+                1
+                for job_id in self._queue
+                if any(row.status == "queued" for row in self._jobs[job_id].items)
+            )
+            if pending:
+                self._spawn_workers_locked()
+                self._wakeup.notify_all()
+            return pending
+
+    def _worker_limit(self) -> int:
+        return max(1, int(self._workers)) if self._workers is not None else _rag_index_job_workers()
 
     def _trim_jobs_locked(self) -> None:
         if len(self._jobs) <= self._max_jobs:
             return
-        removable = [
-            job_id
-            for job_id, job in self._jobs.items()
-            if job_id != self._active_job_id and job.status in {"completed", "failed"}
-        ]
+        removable = [job_id for job_id, job in self._jobs.items() if job.status in _RAG_INDEX_JOB_DONE]
         removable.sort(key=lambda job_id: str(self._jobs[job_id].created_at or ""))
+        dropped: list[str] = []
         while len(self._jobs) > self._max_jobs and removable:
             old_id = removable.pop(0)
             self._jobs.pop(old_id, None)
+            dropped.append(old_id)
             if self._latest_job_id == old_id:
                 self._latest_job_id = None
+        self._persist("delete_jobs", dropped)
 
     def _status_snapshot(self, job: _RAGIndexJob, *, reused_active_job: bool = False) -> RAGIndexJobStatusResponse:
         items = [
@@ -3536,10 +4947,12 @@ class RAGIndexJobManager:
             for row in job.items
         ]
         total = len(items)
-        completed = sum(1 for row in items if row.status in {"completed", "failed"})
-        ok_count = sum(1 for row in items if row.status == "completed")
+        completed = sum(1 for row in items if row.status in _RAG_INDEX_JOB_ROW_DONE)
+        skipped_count = sum(1 for row in items if row.status == "skipped")
+        ok_count = sum(1 for row in items if row.status == "completed") + skipped_count
         failed_count = sum(1 for row in items if row.status == "failed")
-        progress = 1.0 if total == 0 and job.status in {"completed", "failed"} else (completed / max(1, total))
+        cancelled_count = sum(1 for row in items if row.status == "cancelled")
+        progress = 1.0 if total == 0 and job.status in _RAG_INDEX_JOB_DONE else (completed / max(1, total))
         return RAGIndexJobStatusResponse(
             job_id=job.job_id,
             status=str(job.status or "queued"),
@@ -3548,15 +4961,14 @@ class RAGIndexJobManager:
             finished_at=str(job.finished_at or ""),
             transcript_variant=job.transcript_variant,
             force_rebuild=bool(job.force_rebuild),
-            chunking={
-                "max_lines_per_chunk": int(job.max_lines_per_chunk),
-                "overlap_lines": int(job.overlap_lines),
-                "max_chars_per_chunk": int(job.max_chars_per_chunk),
-            },
+            priority=int(job.priority),
+            chunking=job.chunking,
             total_meetings=total,
             completed_meetings=completed,
             ok_meetings=ok_count,
             failed_meetings=failed_count,
+            skipped_meetings=skipped_count,
+            cancelled_meetings=cancelled_count,
             progress=round(float(progress), 6),
             current_meeting_id=str(job.current_meeting_id or ""),
             reused_active_job=bool(reused_active_job),
@@ -3564,76 +4976,138 @@ class RAGIndexJobManager:
             items=items,
         )
 
-    def _run_job(self, job_id: str) -> None:
-        with self._lock:
+    def _enqueue_locked(self, job: _RAGIndexJob) -> None:
+        self._queue.append(job.job_id)
+        self._queue.sort(key=lambda job_id: (-self._jobs[job_id].priority, self._jobs[job_id].seq))
+
+    def _next_task_locked(self) -> tuple[_RAGIndexJob, int] | None:
+        for job_id in self._queue:
             job = self._jobs.get(job_id)
-            if not job:
-                return
-            job.status = "running"
-            job.started_at = _utc_now_iso()
+            if job is None or job.status not in {"queued", "running"}:
+                continue
+            for ordinal, row in enumerate(job.items):
+                if row.status == "queued" and (row.meeting_id, job.transcript_variant) not in self._in_flight:
+                    return job, ordinal
+        return None
 
-        try:
-            for row in list(job.items):
-                with self._lock:
-                    current = self._jobs.get(job_id)
-                    if not current:
+    def _has_queued_rows_locked(self) -> bool:
+        return any(
+            row.status == "queued"
+            for job_id in self._queue
+            for row in (self._jobs[job_id].items if job_id in self._jobs else [])
+        )
+
+    def _finish_job_locked(self, job: _RAGIndexJob) -> None:
+        if any(row.status not in _RAG_INDEX_JOB_ROW_DONE for row in job.items):
+            return
+        if job.status != "cancelled":
+            all_failed = bool(job.items) and all(row.status == "failed" for row in job.items)
+            job.status = "failed" if all_failed else "completed"
+        job.finished_at = job.finished_at or _utc_now_iso()
+        job.current_meeting_id = ""
+        self._persist("update_job", job.job_id, status=job.status, finished_at=job.finished_at, error=job.error)
+        if job.job_id in self._queue:
+            self._queue.remove(job.job_id)
+        self._trim_jobs_locked()
+
+    def _index_row(self, job: _RAGIndexJob, row: _RAGIndexJobRow) -> None:
+        if not job.force_rebuild:
+            # Актуальность — по stat транскрипта/индекса в manifest корпуса, без чтения транскрипта.
+            vector_cfg = _rag_vector_config()
+            if _rag_corpus_meeting_fresh(
+                row.meeting_id,
+                job.transcript_variant,
+                auto_index=True,
+                vector_cfg=vector_cfg,
+                chunking=job.chunking,
+            ):
+                doc = _rag_corpus(vector_cfg).doc(_rag_corpus_meeting_key(row.meeting_id, job.transcript_variant)) or {}
+                row.status = "skipped"
+                row.cached = True
+                row.chunk_count = int(doc.get("end") or 0) - int(doc.get("start") or 0)
+                row.transcript_chars = int(doc.get("transcript_chars") or 0)
+                row.indexed_at = str(doc.get("indexed_at") or "")
+                return
+        payload, cached = _ensure_rag_index(
+            row.meeting_id,
+            source=job.transcript_variant,
+            force_rebuild=bool(job.force_rebuild),
+            max_lines_per_chunk=int(job.max_lines_per_chunk),
+            overlap_lines=int(job.overlap_lines),
+            max_chars_per_chunk=int(job.max_chars_per_chunk),
+        )
+        row.status = "completed"
+        row.cached = bool(cached)
+        row.chunk_count = int(payload.get("chunk_count") or len(list(payload.get("chunks") or [])))
+        row.transcript_chars = int(payload.get("transcript_chars") or 0)
+        row.indexed_at = str(payload.get("indexed_at") or "")
+        row.error = ""
+
+    def _worker(self) -> None:
+        while True:
+            with self._wakeup:
+                task = self._next_task_locked()
+                while task is None:
+                    if not self._has_queued_rows_locked():
+                        # Счётчик уменьшается под тем же локом, чтобы start() не недосчитал воркеров.
+                        self._alive_workers -= 1
                         return
-                    current.current_meeting_id = row.meeting_id
-                    row.status = "running"
-                try:
-                    payload, cached = _ensure_rag_index(
-                        row.meeting_id,
-                        source=job.transcript_variant,
-                        force_rebuild=bool(job.force_rebuild),
-                        max_lines_per_chunk=int(job.max_lines_per_chunk),
-                        overlap_lines=int(job.overlap_lines),
-                        max_chars_per_chunk=int(job.max_chars_per_chunk),
-                    )
-                    row.status = "completed"
-                    row.cached = bool(cached)
-                    row.chunk_count = int(payload.get("chunk_count") or len(list(payload.get("chunks") or [])))
-                    row.transcript_chars = int(payload.get("transcript_chars") or 0)
-                    row.indexed_at = str(payload.get("indexed_at") or "")
-                    row.error = ""
-                except Exception as exc:
-                    row.status = "failed"
-                    row.error = _rag_index_job_error_text(exc)
-                finally:
-                    with self._lock:
-                        current = self._jobs.get(job_id)
-                        if current:
-                            current.items = list(job.items)
-            with self._lock:
-                current = self._jobs.get(job_id)
-                if current:
-                    all_failed = bool(current.items) and all(r.status == "failed" for r in current.items)
-                    current.status = "failed" if all_failed else "completed"
-                    current.finished_at = _utc_now_iso()
-                    current.current_meeting_id = ""
-        except Exception as exc:
-            with self._lock:
-                current = self._jobs.get(job_id)
-                if current:
-                    current.status = "failed"
-                    current.error = _rag_index_job_error_text(exc)
-                    current.finished_at = _utc_now_iso()
-                    current.current_meeting_id = ""
-        finally:
-            with self._lock:
-                if self._active_job_id == job_id:
-                    self._active_job_id = None
-                self._trim_jobs_locked()
+                    # Оставшиеся встречи сейчас индексируют другие воркеры — ждём их.
+                    self._wakeup.wait(timeout=1.0)
+                    task = self._next_task_locked()
+                job, ordinal = task
+                row = job.items[ordinal]
+                key = (row.meeting_id, job.transcript_variant)
+                self._in_flight.add(key)
+                row.status = "running"
+                job.current_meeting_id = row.meeting_id
+                if job.status == "queued":
+                    job.status = "running"
+                    job.started_at = _utc_now_iso()
+                    self._persist("update_job", job.job_id, status=job.status, started_at=job.started_at)
+            try:
+                self._index_row(job, row)
+            except Exception as exc:
+                row.status = "failed"
+                row.error = _rag_index_job_error_text(exc)
+            finally:
+                with self._wakeup:
+                    self._in_flight.discard(key)
+                    self._persist_rows(job, [ordinal])
+                    if job.current_meeting_id == row.meeting_id:
+                        running = [r.meeting_id for r in job.items if r.status == "running"]
+                        job.current_meeting_id = running[0] if running else ""
+                    self._finish_job_locked(job)
+                    self._wakeup.notify_all()
+
+    def _spawn_workers_locked(self) -> None:
+        while self._alive_workers < self._worker_limit():
+            self._alive_workers += 1
+            threading.Thread(target=self._worker, daemon=True).start()
 
     def start(self, req: RAGIndexJobRequest) -> RAGIndexJobStatusResponse:
         meeting_ids = _safe_meeting_ids(req.meeting_ids)
         if not meeting_ids:
             raise ValueError("meeting_ids_required")
-        with self._lock:
-            if self._active_job_id:
-                active = self._jobs.get(self._active_job_id)
-                if active and active.status in {"queued", "running"}:
+        chunking = {
+            "max_lines_per_chunk": int(req.max_lines_per_chunk),
+            "overlap_lines": int(req.overlap_lines),
+            "max_chars_per_chunk": int(req.max_chars_per_chunk),
+        }
+        with self._wakeup:
+            # Повторный запрос того же набора встреч не ставит дубль в очередь.
+            for job_id in self._queue:
+                active = self._jobs.get(job_id)
+                if (
+                    active is not None
+                    and active.status in {"queued", "running"}
+                    and active.meeting_ids == list(meeting_ids)
+                    and active.transcript_variant == req.transcript_variant
+                    and active.force_rebuild == bool(req.force_rebuild)
+                    and active.chunking == chunking
+                ):
                     return self._status_snapshot(active, reused_active_job=True)
-                self._active_job_id = None
+            self._seq += 1
             job_id = f"ragidx-{uuid.uuid4().hex[:10]}"
             job = _RAGIndexJob(
                 job_id=job_id,
@@ -3643,21 +5117,57 @@ class RAGIndexJobManager:
                 max_lines_per_chunk=int(req.max_lines_per_chunk),
                 overlap_lines=int(req.overlap_lines),
                 max_chars_per_chunk=int(req.max_chars_per_chunk),
+                priority=int(req.priority),
+                seq=self._seq,
                 status="queued",
                 created_at=_utc_now_iso(),
                 items=[_RAGIndexJobRow(meeting_id=mid) for mid in meeting_ids],
             )
             self._jobs[job_id] = job
-            self._active_job_id = job_id
+            self._persist(
+                "save_job",
+                {
+                    "job_id": job_id,
+                    "seq": job.seq,
+                    "priority": job.priority,
+                    "status": job.status,
+                    "created_at": job.created_at,
+                    "params": {
+                        "transcript_variant": job.transcript_variant,
+                        "force_rebuild": job.force_rebuild,
+                        **job.chunking,
+                    },
+                },
+                [{"meeting_id": row.meeting_id, "status": row.status} for row in job.items],
+            )
+            self._enqueue_locked(job)
             self._latest_job_id = job_id
             self._trim_jobs_locked()
-            thread = threading.Thread(target=self._run_job, args=(job_id,), daemon=True)
-            thread.start()
+            snapshot = self._status_snapshot(job)
+            self._spawn_workers_locked()
+            self._wakeup.notify_all()
+            return snapshot
+
+    def cancel(self, job_id: str) -> RAGIndexJobStatusResponse | None:
+        """Снимает ещё не начатые встречи; уже идущие дорабатывают, затем задание закрывается."""
+        with self._wakeup:
+            job = self._jobs.get(str(job_id or "").strip())
+            if not job:
+                return None
+            if job.status in {"queued", "running"}:
+                job.status = "cancelled"
+                dropped = [ordinal for ordinal, row in enumerate(job.items) if row.status == "queued"]
+                for ordinal in dropped:
+                    job.items[ordinal].status = "cancelled"
+                self._persist("update_job", job.job_id, status=job.status)
+                self._persist_rows(job, dropped)
+                self._finish_job_locked(job)
+                self._wakeup.notify_all()
             return self._status_snapshot(job)
 
     def get_status(self, job_id: str | None = None) -> RAGIndexJobStatusResponse | None:
         with self._lock:
-            target_id = str(job_id or self._active_job_id or self._latest_job_id or "").strip()
+            target_id = str(job_id or (self._queue[0] if self._queue else "") or self._latest_job_id or "").strip()
             if not target_id:
                 return None
             job = self._jobs.get(target_id)
@@ -3666,11 +5176,42 @@ class RAGIndexJobManager:
             return self._status_snapshot(job)
 
 
-_RAG_INDEX_JOB_MANAGER = RAGIndexJobManager()
+_RAG_INDEX_JOB_MANAGER: RAGIndexJobManager | None = None
+_RAG_INDEX_JOB_MANAGER_LOCK = threading.Lock()
+
+
+def _rag_index_jobs_persist_enabled() -> bool:
+    s = get_settings()
+    return bool(getattr(s, "rag_index_jobs_persist_enabled", True))
+
+
+def _rag_index_job_store_path() -> Path:
+    s = get_settings()
+    root = Path((getattr(s, "records_dir", None) or "./data/records").strip()).resolve()
+    return root / "_global" / "rag_index_jobs.sqlite3"
 
 
 def _rag_index_job_manager() -> RAGIndexJobManager:
-    return _RAG_INDEX_JOB_MANAGER
+    global _RAG_INDEX_JOB_MANAGER
+    with _RAG_INDEX_JOB_MANAGER_LOCK:
+        if _RAG_INDEX_JOB_MANAGER is None:
+            store: RAGIndexJobStore | None = None
+            if _rag_index_jobs_persist_enabled():
+                try:
+                    store = RAGIndexJobStore(_rag_index_job_store_path())
+                except Exception as exc:
+                    log.warning("rag_index_job_store_unavailable", extra={"payload": {"err": str(exc)[:200]}})
+            _RAG_INDEX_JOB_MANAGER = RAGIndexJobManager(store=store)
+        return _RAG_INDEX_JOB_MANAGER
+
+
+def resume_rag_index_jobs() -> int:
+    """Вызывается при старте gateway: продолжает задания индексации, прерванные рестартом."""
+    try:
+        return _rag_index_job_manager().resume()
+    except Exception as exc:
+        log.warning("rag_index_job_resume_failed", extra={"payload": {"err": str(exc)[:200]}})
+        return 0
 
 
 def _load_or_build_report(*, meeting_id: str, source: TranscriptVariant) -> dict[str, Any]:
@@ -4171,6 +5712,14 @@ def finish_meeting(
             # только по запросу текстовых/отчётных артефактов.
             m.status = PipelineStatus.done
         repo.save(m)
+    try:
+        # Live-чанки доочищались инкрементально; финальный полный проход — один раз на Finish.
+        enqueue_enhancer(meeting_id=meeting_id, final=True)
+    except Exception as e:
+        log.warning(
+            "meeting_finish_enhancer_failed",
+            extra={"payload": {"meeting_id": meeting_id, "err": str(e)[:200]}},
+        )
     records.ensure_meeting_metadata(meeting_id)
     audio_path = materialize_meeting_audio_mp3(meeting_id=meeting_id)
     log.info(
@@ -4313,6 +5862,17 @@ def start_rag_index_job(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
 
+@router.post("/rag/index-jobs/{job_id}/cancel", response_model=RAGIndexJobStatusResponse)
+def cancel_rag_index_job(
+    job_id: str,
+    _=Depends(auth_dep),
+) -> RAGIndexJobStatusResponse:
+    resp = _rag_index_job_manager().cancel(job_id)
+    if not resp:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="rag_index_job_not_found")
+    return resp
+
+
 @router.get("/rag/index-jobs", response_model=RAGIndexJobStatusResponse)
 def get_rag_index_job_status_latest(
     job_id: str | None = Query(default=None),
@@ -4343,6 +5903,50 @@ def rag_query(
     return _rag_query(req)
 
 
+def _rag_sse_frame(event: str, payload: Any) -> bytes:
+    data = json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event}\ndata: {data}\n\n".encode("utf-8")
+
+
+def _rag_sse_stream(
+    first: tuple[str, Any],
+    events: Iterator[tuple[str, Any]],
+) -> Iterator[bytes]:
+    event, payload = first
+    try:
+        while True:
+            if isinstance(payload, BaseModel):
+                payload = payload.model_dump(mode="json")
+            yield _rag_sse_frame(event, payload)
+            event, payload = next(events)
+    except StopIteration:
+        return
+    except HTTPException as exc:
+        yield _rag_sse_frame("error", {"detail": str(exc.detail or "http_error")})
+    except Exception:
+        yield _rag_sse_frame("error", {"detail": "rag_query_failed"})
+
+
+@router.post("/rag/query/stream")
+def rag_query_stream(
+    req: RAGQueryRequest,
+    _=Depends(auth_dep),
+) -> StreamingResponse:
+    """
+    SSE-вариант /rag/query: event hits -> token* -> done (полный RAGQueryResponse).
+
+    Поиск выполняется до начала ответа, поэтому ошибки выбора встреч остаются обычными
+    HTTP-кодами; ошибка уже во время генерации приходит событием error.
+    """
+    events = _rag_query_events(req, stream_answer=True)
+    first = next(events)
+    return StreamingResponse(
+        _rag_sse_stream(first, events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/rag/files/query", response_model=RAGQueryResponse)
 def rag_files_query(
     req: RAGFilesQueryRequest,
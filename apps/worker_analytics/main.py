@@ -2,20 +2,20 @@
 Worker Analytics.
 
 Алгоритм (MVP):
-- читаем из Redis Stream q:analytics (consumer group)
+- читаем из Redis Stream q:analytics (consumer group, queue/worker_runtime: несколько встреч параллельно)
 - читаем сегменты встречи
 - собираем raw/enhanced_transcript
 - сохраняем в Meeting.raw_transcript/Meeting.enhanced_transcript
-- ставим задачу delivery
+- ставим задачу delivery только для финальной задачи (после Finish)
+- устаревшие поколения задач встречи пропускаются
 """
 
 from __future__ import annotations
 
 import time
-from contextlib import suppress
 
 from interview_analytics_agent.common.logging import get_project_logger, setup_logging
-from interview_analytics_agent.common.metrics import QUEUE_TASKS_TOTAL, track_stage_latency
+from interview_analytics_agent.common.metrics import track_stage_latency
 from interview_analytics_agent.common.otel import maybe_setup_otel
 from interview_analytics_agent.common.tracing import start_trace_from_payload
 from interview_analytics_agent.domain.enums import PipelineStatus
@@ -23,9 +23,10 @@ from interview_analytics_agent.processing.aggregation import (
     build_enhanced_transcript,
     build_raw_transcript,
 )
-from interview_analytics_agent.queue.dispatcher import Q_ANALYTICS, enqueue_delivery
-from interview_analytics_agent.queue.retry import requeue_with_backoff
-from interview_analytics_agent.queue.streams import ack_task, consumer_name, read_task
+from interview_analytics_agent.queue.coalesce import begin_run, finish_run
+from interview_analytics_agent.queue.dispatcher import Q_ANALYTICS, STAGE_ANALYTICS, enqueue_delivery
+from interview_analytics_agent.queue.retry import start_delayed_promoter
+from interview_analytics_agent.queue.worker_runtime import StageWorkerSpec, run_stage_worker
 from interview_analytics_agent.services.readiness_service import enforce_startup_readiness
 from interview_analytics_agent.storage.db import db_session
 from interview_analytics_agent.storage import records
@@ -36,85 +37,72 @@ from interview_analytics_agent.storage.repositories import (
 
 log = get_project_logger()
 GROUP_ANALYTICS = "g:analytics"
+SPEC = StageWorkerSpec(
+    service="worker-analytics",
+    stage="analytics",
+    stream=Q_ANALYTICS,
+    group=GROUP_ANALYTICS,
+    max_attempts=3,
+    backoff_sec=2,
+    default_concurrency=8,
+)
 
 
-def run_loop() -> None:
-    consumer = consumer_name("worker-analytics")
-    log.info("worker_analytics_started", extra={"payload": {"queue": Q_ANALYTICS}})
+def handle_task(task: dict) -> str | None:
+    meeting_id = task["meeting_id"]
+    final = bool(task.get("final"))
+    run_generation = begin_run(
+        STAGE_ANALYTICS,
+        meeting_id,
+        generation=int(task.get("generation") or 0),
+        final=final,
+    )
+    if run_generation is None:
+        # Более поздний прогон уже обработал данные этой задачи.
+        return "coalesced"
+    with (
+        start_trace_from_payload(task, meeting_id=meeting_id, source="worker.analytics"),
+        track_stage_latency("worker-analytics", "analytics"),
+    ):
+        with db_session() as session:
+            mrepo = MeetingRepository(session)
+            srepo = TranscriptSegmentRepository(session)
+
+            m = mrepo.get(meeting_id)
+
+            segs = srepo.list_by_meeting(meeting_id)
+            raw = build_raw_transcript(segs)
+            enhanced = build_enhanced_transcript(segs)
+
+            records.write_text(meeting_id, "raw.txt", raw)
+            records.write_text(meeting_id, "clean.txt", enhanced)
+
+            if m:
+                m.raw_transcript = raw
+                m.enhanced_transcript = enhanced
+                m.status = PipelineStatus.processing
+                mrepo.save(m)
+
+        if final:
+            # Доставка (и за ней retention) — только по завершённой встрече.
+            enqueue_delivery(meeting_id=meeting_id)
+    finish_run(STAGE_ANALYTICS, meeting_id, generation=run_generation)
+    return None
 
-    while True:
-        msg = read_task(stream=Q_ANALYTICS, group=GROUP_ANALYTICS, consumer=consumer, block_ms=5000)
-        if not msg:
-            continue
 
-        should_ack = False
-        try:
-            task = msg.payload
-            meeting_id = task["meeting_id"]
-            with (
-                start_trace_from_payload(task, meeting_id=meeting_id, source="worker.analytics"),
-                track_stage_latency("worker-analytics", "analytics"),
-            ):
-                with db_session() as session:
-                    mrepo = MeetingRepository(session)
-                    srepo = TranscriptSegmentRepository(session)
-
-                    m = mrepo.get(meeting_id)
-                    ctx = (m.context if m else {}) or {}
-
-                    segs = srepo.list_by_meeting(meeting_id)
-                    raw = build_raw_transcript(segs)
-                    enhanced = build_enhanced_transcript(segs)
-
-                    records.write_text(meeting_id, "raw.txt", raw)
-                    records.write_text(meeting_id, "clean.txt", enhanced)
-
-                    if m:
-                        m.raw_transcript = raw
-                        m.enhanced_transcript = enhanced
-                        m.status = PipelineStatus.processing
-                        mrepo.save(m)
-
-                enqueue_delivery(meeting_id=meeting_id)
-            should_ack = True
-            QUEUE_TASKS_TOTAL.labels(
-                service="worker-analytics", queue=Q_ANALYTICS, result="success"
-            ).inc()
-
-        except Exception as e:
-            log.error(
-                "worker_analytics_error",
-                extra={
-                    "payload": {"err": str(e)[:200], "task": task if "task" in locals() else None}
-                },
-            )
-            QUEUE_TASKS_TOTAL.labels(
-                service="worker-analytics", queue=Q_ANALYTICS, result="error"
-            ).inc()
-            try:
-                task = task if "task" in locals() else {}
-                requeue_with_backoff(
-                    queue_name=Q_ANALYTICS, task_payload=task, max_attempts=3, backoff_sec=2
-                )
-                should_ack = True
-                QUEUE_TASKS_TOTAL.labels(
-                    service="worker-analytics", queue=Q_ANALYTICS, result="retry"
-                ).inc()
-            except Exception:
-                pass
-        finally:
-            if should_ack:
-                with suppress(Exception):
-                    ack_task(stream=Q_ANALYTICS, group=GROUP_ANALYTICS, entry_id=msg.entry_id)
+def run_loop() -> None:
+    run_stage_worker(SPEC, handle_task)
 
 
 def main() -> None:
     setup_logging()
     maybe_setup_otel()
     enforce_startup_readiness(service_name="worker-analytics")
+    start_delayed_promoter()
     while True:
         try:
             run_loop()
+            return
         except Exception as e:
             log.error("worker_analytics_fatal", extra={"payload": {"err": str(e)[:200]}})
             time.sleep(2)
@@ -2,7 +2,7 @@
 Worker Delivery.
 
 Алгоритм (MVP):
-- читаем из Redis Stream q:delivery (consumer group)
+- читаем из Redis Stream q:delivery (consumer group, queue/worker_runtime: несколько встреч параллельно)
 - читает Meeting + report
 - рендерит шаблоны Jinja2
 - отправляет через SMTP (если настроено)
@@ -12,27 +12,35 @@ Worker Delivery.
 from __future__ import annotations
 
 import time
-from contextlib import suppress
 from pathlib import Path
 
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from interview_analytics_agent.common.config import get_settings
 from interview_analytics_agent.common.logging import get_project_logger, setup_logging
-from interview_analytics_agent.common.metrics import QUEUE_TASKS_TOTAL, track_stage_latency
+from interview_analytics_agent.common.metrics import track_stage_latency
 from interview_analytics_agent.common.otel import maybe_setup_otel
 from interview_analytics_agent.common.tracing import start_trace_from_payload
 from interview_analytics_agent.delivery.email.sender import SMTPEmailProvider
 from interview_analytics_agent.domain.enums import PipelineStatus
 from interview_analytics_agent.queue.dispatcher import Q_DELIVERY, enqueue_retention
-from interview_analytics_agent.queue.retry import requeue_with_backoff
-from interview_analytics_agent.queue.streams import ack_task, consumer_name, read_task
+from interview_analytics_agent.queue.retry import start_delayed_promoter
+from interview_analytics_agent.queue.worker_runtime import StageWorkerSpec, run_stage_worker
 from interview_analytics_agent.services.readiness_service import enforce_startup_readiness
 from interview_analytics_agent.storage.db import db_session
 from interview_analytics_agent.storage.repositories import MeetingRepository
 
 log = get_project_logger()
 GROUP_DELIVERY = "g:delivery"
+SPEC = StageWorkerSpec(
+    service="worker-delivery",
+    stage="delivery",
+    stream=Q_DELIVERY,
+    group=GROUP_DELIVERY,
+    max_attempts=3,
+    backoff_sec=2,
+    default_concurrency=8,
+)
 _TRANSCRIPT_ATTACHMENT_MIME = "text/plain"
 
 
@@ -59,132 +67,97 @@ def _jinja() -> Environment:
     )
 
 
-def run_loop() -> None:
+def handle_task(task: dict, *, env: Environment, smtp: SMTPEmailProvider) -> str | None:
     settings = get_settings()
-    consumer = consumer_name("worker-delivery")
-    env = _jinja()
-    smtp = SMTPEmailProvider()
+    meeting_id = task["meeting_id"]
+    with (
+        start_trace_from_payload(task, meeting_id=meeting_id, source="worker.delivery"),
+        track_stage_latency("worker-delivery", "delivery"),
+    ):
+        with db_session() as session:
+            mrepo = MeetingRepository(session)
+            m = mrepo.get(meeting_id)
+
+            report = (m.report if m else None) or {
+                "summary": "",
+                "bullets": [],
+                "risk_flags": [],
+                "recommendation": "",
+            }
+            raw_transcript = (m.raw_transcript if m else None) or ""
+            enhanced_transcript = (m.enhanced_transcript if m else None) or ""
+            recipients = []
+            if m and isinstance(m.context, dict):
+                # Если ты захочешь — потом положим recipients в context при /meetings/start
+                recipients = m.context.get("recipients", []) or []
+
+            html = env.get_template("report.html.j2").render(
+                meeting_id=meeting_id,
+                report=report,
+                has_raw=bool(raw_transcript.strip()),
+                has_enhanced=bool(enhanced_transcript.strip()),
+            )
+            txt = env.get_template("report.txt.j2").render(
+                meeting_id=meeting_id,
+                report=report,
+                has_raw=bool(raw_transcript.strip()),
+                has_enhanced=bool(enhanced_transcript.strip()),
+            )
+            attachments = _build_transcript_attachments(
+                raw_text=raw_transcript, enhanced_text=enhanced_transcript
+            )
 
-    log.info("worker_delivery_started", extra={"payload": {"queue": Q_DELIVERY}})
+            if settings.delivery_provider == "email" and recipients:
+                smtp.send_report(
+                    meeting_id=meeting_id,
+                    recipients=recipients,
+                    subject=f"Отчёт по встрече {meeting_id}",
+                    html_body=html,
+                    text_body=txt,
+                    attachments=attachments,
+                )
+                log.info(
+                    "delivery_done",
+                    extra={"payload": {"meeting_id": meeting_id, "recipients": recipients}},
+                )
+            else:
+                # В MVP, если нет получателей — считаем доставку пропущенной
+                log.warning(
+                    "delivery_skipped",
+                    extra={
+                        "payload": {
+                            "meeting_id": meeting_id,
+                            "provider": settings.delivery_provider,
+                            "recipients": recipients,
+                        },
+                    },
+                )
 
-    while True:
-        msg = read_task(stream=Q_DELIVERY, group=GROUP_DELIVERY, consumer=consumer, block_ms=5000)
-        if not msg:
-            continue
+            if m:
+                m.status = PipelineStatus.done
+                mrepo.save(m)
 
-        should_ack = False
-        try:
-            task = msg.payload
-            meeting_id = task["meeting_id"]
-            with (
-                start_trace_from_payload(task, meeting_id=meeting_id, source="worker.delivery"),
-                track_stage_latency("worker-delivery", "delivery"),
-            ):
-                with db_session() as session:
-                    mrepo = MeetingRepository(session)
-                    m = mrepo.get(meeting_id)
-
-                    report = (m.report if m else None) or {
-                        "summary": "",
-                        "bullets": [],
-                        "risk_flags": [],
-                        "recommendation": "",
-                    }
-                    raw_transcript = (m.raw_transcript if m else None) or ""
-                    enhanced_transcript = (m.enhanced_transcript if m else None) or ""
-                    recipients = []
-                    if m and isinstance(m.context, dict):
-                        # Если ты захочешь — потом положим recipients в context при /meetings/start
-                        recipients = m.context.get("recipients", []) or []
-
-                    html = env.get_template("report.html.j2").render(
-                        meeting_id=meeting_id,
-                        report=report,
-                        has_raw=bool(raw_transcript.strip()),
-                        has_enhanced=bool(enhanced_transcript.strip()),
-                    )
-                    txt = env.get_template("report.txt.j2").render(
-                        meeting_id=meeting_id,
-                        report=report,
-                        has_raw=bool(raw_transcript.strip()),
-                        has_enhanced=bool(enhanced_transcript.strip()),
-                    )
-                    attachments = _build_transcript_attachments(
-                        raw_text=raw_transcript, enhanced_text=enhanced_transcript
-                    )
-
-                    if settings.delivery_provider == "email" and recipients:
-                        smtp.send_report(
-                            meeting_id=meeting_id,
-                            recipients=recipients,
-                            subject=f"Отчёт по встрече {meeting_id}",
-                            html_body=html,
-                            text_body=txt,
-                            attachments=attachments,
-                        )
-                        log.info(
-                            "delivery_done",
-                            extra={"payload": {"meeting_id": meeting_id, "recipients": recipients}},
-                        )
-                    else:
-                        # В MVP, если нет получателей — считаем доставку пропущенной
-                        log.warning(
-                            "delivery_skipped",
-                            extra={
-                                "payload": {
-                                    "meeting_id": meeting_id,
-                                    "provider": settings.delivery_provider,
-                                    "recipients": recipients,
-                                },
-                            },
-                        )
-
-                    if m:
-                        m.status = PipelineStatus.done
-                        mrepo.save(m)
-
-                enqueue_retention(
-                    entity_type="meeting", entity_id=meeting_id, reason="delivered_or_skipped"
-                )
-            should_ack = True
-            QUEUE_TASKS_TOTAL.labels(
-                service="worker-delivery", queue=Q_DELIVERY, result="success"
-            ).inc()
+        enqueue_retention(
+            entity_type="meeting", entity_id=meeting_id, reason="delivered_or_skipped"
+        )
+    return None
 
-        except Exception as e:
-            log.error(
-                "worker_delivery_error",
-                extra={
-                    "payload": {"err": str(e)[:200], "task": task if "task" in locals() else None}
-                },
-            )
-            QUEUE_TASKS_TOTAL.labels(
-                service="worker-delivery", queue=Q_DELIVERY, result="error"
-            ).inc()
-            try:
-                task = task if "task" in locals() else {}
-                requeue_with_backoff(
-                    queue_name=Q_DELIVERY, task_payload=task, max_attempts=3, backoff_sec=2
-                )
-                should_ack = True
-                QUEUE_TASKS_TOTAL.labels(
-                    service="worker-delivery", queue=Q_DELIVERY, result="retry"
-                ).inc()
-            except Exception:
-                pass
-        finally:
-            if should_ack:
-                with suppress(Exception):
-                    ack_task(stream=Q_DELIVERY, group=GROUP_DELIVERY, entry_id=msg.entry_id)
+
+def run_loop() -> None:
+    env = _jinja()
+    smtp = SMTPEmailProvider()
+    run_stage_worker(SPEC, lambda task: handle_task(task, env=env, smtp=smtp))
 
 
 def main() -> None:
     setup_logging()
     maybe_setup_otel()
     enforce_startup_readiness(service_name="worker-delivery")
+    start_delayed_promoter()
     while True:
         try:
             run_loop()
+            return
         except Exception as e:
             log.error("worker_delivery_fatal", extra={"payload": {"err": str(e)[:200]}})
             time.sleep(2)
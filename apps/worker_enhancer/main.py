@@ -2,115 +2,126 @@
 Worker Enhancer.
 
 Алгоритм (MVP):
-- читаем из Redis Stream q:enhancer (consumer group)
-- берём все сегменты встречи
-- прогоняем enhance_text, обновляем enhanced_text
-- ставим задачу analytics
+- читаем из Redis Stream q:enhancer (consumer group, queue/worker_runtime: несколько встреч параллельно)
+- финальная задача ждёт (через q:delayed), пока STT не обработает все чанки встречи
+- берём сегменты после водяной метки и переписанные на месте seq из схлопнутых задач
+  (final=True — все сегменты встречи)
+- прогоняем enhance_text и правила спикеров по окну контекста
+- ставим задачу analytics (устаревшие поколения задач встречи пропускаются)
 """
 
 from __future__ import annotations
 
 import time
-from contextlib import suppress
 
 from interview_analytics_agent.common.logging import get_project_logger, setup_logging
-from interview_analytics_agent.common.config import get_settings
-from interview_analytics_agent.common.metrics import QUEUE_TASKS_TOTAL, track_stage_latency
+from interview_analytics_agent.common.metrics import track_stage_latency
 from interview_analytics_agent.common.otel import maybe_setup_otel
 from interview_analytics_agent.common.tracing import start_trace_from_payload
-from interview_analytics_agent.processing.enhancer import enhance_text
-from interview_analytics_agent.processing.speaker_rules import infer_speakers
-from interview_analytics_agent.queue.dispatcher import Q_ENHANCER, enqueue_analytics
-from interview_analytics_agent.queue.retry import requeue_with_backoff
-from interview_analytics_agent.queue.streams import ack_task, consumer_name, read_task
+from interview_analytics_agent.queue.coalesce import (
+    add_touched,
+    begin_run,
+    finish_run,
+    inflight,
+    pop_touched,
+)
+from interview_analytics_agent.queue.dispatcher import (
+    Q_ENHANCER,
+    STAGE_ENHANCER,
+    STAGE_STT,
+    enqueue_analytics,
+)
+from interview_analytics_agent.queue.retry import schedule_delayed, start_delayed_promoter
+from interview_analytics_agent.queue.worker_runtime import StageWorkerSpec, run_stage_worker
 from interview_analytics_agent.services.readiness_service import enforce_startup_readiness
+from interview_analytics_agent.services.segment_enhancement import enhance_meeting_segments
 from interview_analytics_agent.storage.db import db_session
-from interview_analytics_agent.storage.repositories import TranscriptSegmentRepository
 
 log = get_project_logger()
 GROUP_ENHANCER = "g:enhancer"
+SPEC = StageWorkerSpec(
+    service="worker-enhancer",
+    stage="enhancer",
+    stream=Q_ENHANCER,
+    group=GROUP_ENHANCER,
+    max_attempts=3,
+    backoff_sec=1,
+    default_concurrency=8,
+)
+# Финальный прогон ждёт незавершённые STT-чанки встречи: перепроверка через q:delayed,
+# но не дольше FINAL_WAIT_MAX_SEC (потерянный чанк не должен навсегда задержать отчёт).
+FINAL_RECHECK_SEC = 2.0
+FINAL_WAIT_MAX_SEC = 30 * 60
+
+
+def _defer_final(task: dict) -> bool:
+    """True — финальная задача отложена: STT встречи ещё обрабатывает чанки."""
+    meeting_id = task["meeting_id"]
+    outstanding = inflight(STAGE_STT, meeting_id)
+    if outstanding <= 0:
+        return False
+    waiting_since = float(task.get("final_wait_since") or time.time())
+    if time.time() - waiting_since >= FINAL_WAIT_MAX_SEC:
+        log.warning(
+            "worker_enhancer_final_wait_expired",
+            extra={"payload": {"meeting_id": meeting_id, "stt_inflight": outstanding}},
+        )
+        return False
+    schedule_delayed(
+        queue_name=Q_ENHANCER,
+        task_payload={**task, "final_wait_since": waiting_since},
+        delay_sec=FINAL_RECHECK_SEC,
+    )
+    return True
+
+
+def handle_task(task: dict) -> str | None:
+    meeting_id = task["meeting_id"]
+    final = bool(task.get("final"))
+    if final and _defer_final(task):
+        return "deferred"
+    run_generation = begin_run(
+        STAGE_ENHANCER,
+        meeting_id,
+        generation=int(task.get("generation") or 0),
+        final=final,
+    )
+    if run_generation is None:
+        # Более поздний прогон уже обработал данные этой задачи.
+        return "coalesced"
+    with (
+        start_trace_from_payload(task, meeting_id=meeting_id, source="worker.enhancer"),
+        track_stage_latency("worker-enhancer", "enhancer"),
+    ):
+        touched = pop_touched(STAGE_ENHANCER, meeting_id)
+        if task.get("chunk_seq") is not None:
+            touched.add(int(task["chunk_seq"]))
+        try:
+            with db_session() as session:
+                enhance_meeting_segments(session, meeting_id, full=final, touched_seqs=touched)
+        except Exception:
+            # Ретрай задачи должен снова увидеть переписанные сегменты.
+            add_touched(STAGE_ENHANCER, meeting_id, touched)
+            raise
 
+        enqueue_analytics(meeting_id=meeting_id, final=final)
+    finish_run(STAGE_ENHANCER, meeting_id, generation=run_generation)
+    return None
 
-def run_loop() -> None:
-    consumer = consumer_name("worker-enhancer")
-    log.info("worker_enhancer_started", extra={"payload": {"queue": Q_ENHANCER}})
-
-    while True:
-        msg = read_task(stream=Q_ENHANCER, group=GROUP_ENHANCER, consumer=consumer, block_ms=5000)
-        if not msg:
-            continue
-
-        should_ack = False
-        try:
-            task = msg.payload
-            meeting_id = task["meeting_id"]
-            with (
-                start_trace_from_payload(task, meeting_id=meeting_id, source="worker.enhancer"),
-                track_stage_latency("worker-enhancer", "enhancer"),
-            ):
-                with db_session() as session:
-                    srepo = TranscriptSegmentRepository(session)
-                    segs = srepo.list_by_meeting(meeting_id)
-
-                    settings = get_settings()
-                    decisions = infer_speakers(
-                        [(seg.seq, seg.raw_text or "", seg.enhanced_text or "") for seg in segs],
-                        response_window_sec=settings.speaker_response_window_sec,
-                    )
-                    speaker_map = {
-                        d.seq: d.speaker for d in decisions if d.speaker is not None
-                    }
-
-                    for seg in segs:
-                        enh, _meta = enhance_text(seg.raw_text or "")
-                        enh_changed = enh != (seg.enhanced_text or "")
-                        if enh_changed:
-                            seg.enhanced_text = enh
-                        inferred = speaker_map.get(seg.seq)
-                        speaker_changed = bool(inferred and inferred != (seg.speaker or ""))
-                        if speaker_changed:
-                            seg.speaker = inferred
-
-                enqueue_analytics(meeting_id=meeting_id)
-            should_ack = True
-            QUEUE_TASKS_TOTAL.labels(
-                service="worker-enhancer", queue=Q_ENHANCER, result="success"
-            ).inc()
 
-        except Exception as e:
-            log.error(
-                "worker_enhancer_error",
-                extra={
-                    "payload": {"err": str(e)[:200], "task": task if "task" in locals() else None}
-                },
-            )
-            QUEUE_TASKS_TOTAL.labels(
-                service="worker-enhancer", queue=Q_ENHANCER, result="error"
-            ).inc()
-            try:
-                task = task if "task" in locals() else {}
-                requeue_with_backoff(
-                    queue_name=Q_ENHANCER, task_payload=task, max_attempts=3, backoff_sec=1
-                )
-                should_ack = True
-                QUEUE_TASKS_TOTAL.labels(
-                    service="worker-enhancer", queue=Q_ENHANCER, result="retry"
-                ).inc()
-            except Exception:
-                pass
-        finally:
-            if should_ack:
-                with suppress(Exception):
-                    ack_task(stream=Q_ENHANCER, group=GROUP_ENHANCER, entry_id=msg.entry_id)
+def run_loop() -> None:
+    run_stage_worker(SPEC, handle_task)
 
 
 def main() -> None:
     setup_logging()
     maybe_setup_otel()
     enforce_startup_readiness(service_name="worker-enhancer")
+    start_delayed_promoter()
     while True:
         try:
             run_loop()
+            return
         except Exception as e:
             log.error("worker_enhancer_fatal", extra={"payload": {"err": str(e)[:200]}})
             time.sleep(2)
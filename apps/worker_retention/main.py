@@ -10,95 +10,67 @@ Worker Retention.
 from __future__ import annotations
 
 import time
-from contextlib import suppress
 
 from interview_analytics_agent.common.logging import get_project_logger, setup_logging
-from interview_analytics_agent.common.metrics import QUEUE_TASKS_TOTAL, track_stage_latency
+from interview_analytics_agent.common.metrics import track_stage_latency
 from interview_analytics_agent.common.otel import maybe_setup_otel
 from interview_analytics_agent.common.tracing import start_trace_from_payload
 from interview_analytics_agent.queue.dispatcher import Q_RETENTION
-from interview_analytics_agent.queue.retry import requeue_with_backoff
-from interview_analytics_agent.queue.streams import ack_task, consumer_name, read_task
+from interview_analytics_agent.queue.retry import start_delayed_promoter
+from interview_analytics_agent.queue.worker_runtime import StageWorkerSpec, run_stage_worker
 from interview_analytics_agent.services.readiness_service import enforce_startup_readiness
 from interview_analytics_agent.storage.db import db_session
 from interview_analytics_agent.storage.retention import apply_retention
 
 log = get_project_logger()
 GROUP_RETENTION = "g:retention"
+SPEC = StageWorkerSpec(
+    service="worker-retention",
+    stage="retention",
+    stream=Q_RETENTION,
+    group=GROUP_RETENTION,
+    max_attempts=3,
+    backoff_sec=3,
+    block_ms=10000,
+)
 
 
-def run_loop() -> None:
-    consumer = consumer_name("worker-retention")
-    log.info("worker_retention_started", extra={"payload": {"queue": Q_RETENTION}})
+def handle_task(task: dict) -> str | None:
+    meeting_id = str(task.get("entity_id") or "").strip() or None
+    with (
+        start_trace_from_payload(task, meeting_id=meeting_id, source="worker.retention"),
+        track_stage_latency("worker-retention", "retention"),
+    ):
+        with db_session() as session:
+            apply_retention(session)
 
-    while True:
-        msg = read_task(
-            stream=Q_RETENTION, group=GROUP_RETENTION, consumer=consumer, block_ms=10000
+        log.info(
+            "retention_applied",
+            extra={
+                "payload": {
+                    "task": {
+                        "entity_type": task.get("entity_type"),
+                        "entity_id": task.get("entity_id"),
+                    }
+                }
+            },
         )
-        if not msg:
-            continue
-
-        should_ack = False
-        try:
-            task = msg.payload
-            meeting_id = str(task.get("entity_id") or "").strip() or None
-            with (
-                start_trace_from_payload(task, meeting_id=meeting_id, source="worker.retention"),
-                track_stage_latency("worker-retention", "retention"),
-            ):
-                with db_session() as session:
-                    apply_retention(session)
+    return None
 
-                log.info(
-                    "retention_applied",
-                    extra={
-                        "payload": {
-                            "task": {
-                                "entity_type": task.get("entity_type"),
-                                "entity_id": task.get("entity_id"),
-                            }
-                        }
-                    },
-                )
-            should_ack = True
-            QUEUE_TASKS_TOTAL.labels(
-                service="worker-retention", queue=Q_RETENTION, result="success"
-            ).inc()
 
-        except Exception as e:
-            log.error(
-                "worker_retention_error",
-                extra={
-                    "payload": {"err": str(e)[:200], "task": task if "task" in locals() else None}
-                },
-            )
-            QUEUE_TASKS_TOTAL.labels(
-                service="worker-retention", queue=Q_RETENTION, result="error"
-            ).inc()
-            try:
-                task = task if "task" in locals() else {}
-                requeue_with_backoff(
-                    queue_name=Q_RETENTION, task_payload=task, max_attempts=3, backoff_sec=3
-                )
-                should_ack = True
-                QUEUE_TASKS_TOTAL.labels(
-                    service="worker-retention", queue=Q_RETENTION, result="retry"
-                ).inc()
-            except Exception:
-                pass
-        finally:
-            if should_ack:
-                with suppress(Exception):
-                    ack_task(stream=Q_RETENTION, group=GROUP_RETENTION, entry_id=msg.entry_id)
+def run_loop() -> None:
+    run_stage_worker(SPEC, handle_task)
 
 
 def main() -> None:
     setup_logging()
     maybe_setup_otel()
     enforce_startup_readiness(service_name="worker-retention")
+    start_delayed_promoter()
     while True:
         try:
             run_loop()
+            return
         except Exception as e:
             log.error("worker_retention_fatal", extra={"payload": {"err": str(e)[:200]}})
             time.sleep(2)
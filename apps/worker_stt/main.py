@@ -7,6 +7,7 @@ Worker STT.
 - распознаём (локальный whisper по умолчанию)
 - сохраняем TranscriptSegment (raw_text/enhanced_text=raw на старте)
 - ставим задачу enhancer
+- снимаем чанк со счётчика незавершённых (после успеха или перед DLQ, не при ретрае)
 
 Важно:
 - это MVP: один чанк -> один сегмент (seq)
@@ -15,17 +16,17 @@ Worker STT.
 from __future__ import annotations
 
 import time
-from contextlib import suppress
 
 from interview_analytics_agent.common.config import get_settings
 from interview_analytics_agent.common.logging import get_project_logger, setup_logging
-from interview_analytics_agent.common.metrics import QUEUE_TASKS_TOTAL, track_stage_latency
+from interview_analytics_agent.common.metrics import track_stage_latency
 from interview_analytics_agent.common.otel import maybe_setup_otel
 from interview_analytics_agent.common.tracing import start_trace_from_payload
 from interview_analytics_agent.domain.enums import PipelineStatus
-from interview_analytics_agent.queue.dispatcher import Q_STT, enqueue_enhancer
-from interview_analytics_agent.queue.retry import requeue_with_backoff
-from interview_analytics_agent.queue.streams import ack_task, consumer_name, read_task
+from interview_analytics_agent.queue.coalesce import settle_inflight
+from interview_analytics_agent.queue.dispatcher import Q_STT, STAGE_STT, enqueue_enhancer
+from interview_analytics_agent.queue.retry import start_delayed_promoter
+from interview_analytics_agent.queue.worker_runtime import StageWorkerSpec, run_stage_worker
 from interview_analytics_agent.services.readiness_service import enforce_startup_readiness
 from interview_analytics_agent.storage.blob import get_bytes
 from interview_analytics_agent.storage.db import db_session
@@ -39,6 +40,16 @@ from interview_analytics_agent.stt.mock import MockSTTProvider
 log = get_project_logger()
 
 GROUP_STT = "g:stt"
+# Локальная модель whisper не рассчитана на параллельные вызовы: по умолчанию одна задача за раз.
+SPEC = StageWorkerSpec(
+    service="worker-stt",
+    stage="stt",
+    stream=Q_STT,
+    group=GROUP_STT,
+    max_attempts=3,
+    backoff_sec=1,
+    err_chars=250,
+)
 
 
 def _build_stt_provider():
@@ -70,107 +81,92 @@ def _build_stt_provider():
     )
 
 
-def run_loop() -> None:
-    s = get_settings()
-    stt = _build_stt_provider()
-    consumer = consumer_name("worker-stt")
-
-    log.info("worker_stt_started", extra={"payload": {"queue": Q_STT, "provider": s.stt_provider}})
+def handle_task(task: dict, *, stt) -> str | None:
+    meeting_id = task["meeting_id"]
+    try:
+        _transcribe_chunk(task, stt=stt)
+    except Exception:
+        # Последняя попытка: runtime отправит задачу в DLQ, финализация встречи не должна её ждать.
+        if int(task.get("attempts") or 0) + 1 > SPEC.max_attempts:
+            settle_inflight(STAGE_STT, meeting_id)
+        raise
+    settle_inflight(STAGE_STT, meeting_id)
+    return None
+
+
+def _transcribe_chunk(task: dict, *, stt) -> None:
+    meeting_id = task["meeting_id"]
+    with (
+        start_trace_from_payload(task, meeting_id=meeting_id, source="worker.stt"),
+        track_stage_latency("worker-stt", "stt"),
+    ):
+        chunk_seq = int(task.get("chunk_seq", 0))
+        blob_key = task.get("blob_key") or None
+        source_track = (task.get("source_track") or None) if isinstance(task, dict) else None
+        quality_profile = (
+            str(task.get("quality_profile") or "balanced")
+            if isinstance(task, dict)
+            else "balanced"
+        )
+        capture_levels = (
+            task.get("capture_levels")
+            if isinstance(task, dict) and isinstance(task.get("capture_levels"), dict)
+            else None
+        )
+
+        audio = get_bytes(blob_key)
+
+        # sample_rate из задачи может отсутствовать, для whisper мы всё равно ресемплим в 16k
+        res = stt.transcribe_chunk(
+            audio=audio,
+            sample_rate=16000,
+            source_track=source_track,
+            quality_profile=quality_profile,
+            capture_levels=capture_levels,
+        )
+
+        with db_session() as session:
+            mrepo = MeetingRepository(session)
+            srepo = TranscriptSegmentRepository(session)
+
+            # гарантируем Meeting (иначе FK упадёт) + ставим статус processing
+            m = mrepo.ensure(
+                meeting_id=meeting_id, meeting_context={"source": "auto_worker_stt"}
+            )
+            m.status = PipelineStatus.processing
+            mrepo.save(m)
+            seg = TranscriptSegment(
+                meeting_id=meeting_id,
+                seq=chunk_seq,
+                speaker=res.speaker,
+                start_ms=None,
+                end_ms=None,
+                raw_text=res.text or "",
+                enhanced_text=res.text or "",
+                confidence=res.confidence,
+            )
+            srepo.upsert_by_meeting_seq(seg)
 
-    while True:
-        msg = read_task(stream=Q_STT, group=GROUP_STT, consumer=consumer, block_ms=5000)
-        if not msg:
-            continue
+        enqueue_enhancer(meeting_id=meeting_id, chunk_seq=chunk_seq)
 
-        should_ack = False
-        try:
-            task = msg.payload
-            meeting_id = task["meeting_id"]
-            with (
-                start_trace_from_payload(task, meeting_id=meeting_id, source="worker.stt"),
-                track_stage_latency("worker-stt", "stt"),
-            ):
-                chunk_seq = int(task.get("chunk_seq", 0))
-                blob_key = task.get("blob_key") or None
-                source_track = (task.get("source_track") or None) if isinstance(task, dict) else None
-                quality_profile = (
-                    str(task.get("quality_profile") or "balanced")
-                    if isinstance(task, dict)
-                    else "balanced"
-                )
-                capture_levels = (
-                    task.get("capture_levels")
-                    if isinstance(task, dict) and isinstance(task.get("capture_levels"), dict)
-                    else None
-                )
-
-                audio = get_bytes(blob_key)
-
-                # sample_rate из задачи может отсутствовать, для whisper мы всё равно ресемплим в 16k
-                res = stt.transcribe_chunk(
-                    audio=audio,
-                    sample_rate=16000,
-                    source_track=source_track,
-                    quality_profile=quality_profile,
-                    capture_levels=capture_levels,
-                )
-
-                with db_session() as session:
-                    mrepo = MeetingRepository(session)
-                    srepo = TranscriptSegmentRepository(session)
-
-                    # гарантируем Meeting (иначе FK упадёт) + ставим статус processing
-                    m = mrepo.ensure(
-                        meeting_id=meeting_id, meeting_context={"source": "auto_worker_stt"}
-                    )
-                    m.status = PipelineStatus.processing
-                    mrepo.save(m)
-                    seg = TranscriptSegment(
-                        meeting_id=meeting_id,
-                        seq=chunk_seq,
-                        speaker=res.speaker,
-                        start_ms=None,
-                        end_ms=None,
-                        raw_text=res.text or "",
-                        enhanced_text=res.text or "",
-                        confidence=res.confidence,
-                    )
-                    srepo.upsert_by_meeting_seq(seg)
-
-                enqueue_enhancer(meeting_id=meeting_id)
-            should_ack = True
-            QUEUE_TASKS_TOTAL.labels(service="worker-stt", queue=Q_STT, result="success").inc()
 
-        except Exception as e:
-            log.error(
-                "worker_stt_error",
-                extra={
-                    "payload": {"err": str(e)[:250], "task": task if "task" in locals() else None}
-                },
-            )
-            QUEUE_TASKS_TOTAL.labels(service="worker-stt", queue=Q_STT, result="error").inc()
-            try:
-                task = task if "task" in locals() else {}
-                requeue_with_backoff(
-                    queue_name=Q_STT, task_payload=task, max_attempts=3, backoff_sec=1
-                )
-                should_ack = True
-                QUEUE_TASKS_TOTAL.labels(service="worker-stt", queue=Q_STT, result="retry").inc()
-            except Exception:
-                pass
-        finally:
-            if should_ack:
-                with suppress(Exception):
-                    ack_task(stream=Q_STT, group=GROUP_STT, entry_id=msg.entry_id)
+def run_loop() -> None:
+    s = get_settings()
+    stt = _build_stt_provider()
+    log.info("worker_stt_provider_ready", extra={"payload": {"queue": Q_STT, "provider": s.stt_provider}})
+    run_stage_worker(SPEC, lambda task: handle_task(task, stt=stt))
 
 
 def main() -> None:
     setup_logging()
     maybe_setup_otel()
     enforce_startup_readiness(service_name="worker-stt")
+    # Отложенные ретраи (в т.ч. оставшиеся от прошлого процесса) возвращаются в очередь.
+    start_delayed_promoter()
     while True:
         try:
             run_loop()
+            return
         except Exception as e:
             log.error("worker_stt_fatal", extra={"payload": {"err": str(e)[:250]}})
             time.sleep(2)
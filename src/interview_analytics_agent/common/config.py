@@ -85,6 +85,28 @@ class Settings(BaseSettings):
     )
     redis_url: str = Field(default="redis://127.0.0.1:6379/0", alias="REDIS_URL")
     queue_mode: str = Field(default="redis", alias="QUEUE_MODE")  # redis|inline
+    # Сколько задач воркер забирает одним XREADGROUP и как часто подбирает зависшие (XAUTOCLAIM)
+    queue_read_count: int = Field(default=16, alias="QUEUE_READ_COUNT")
+    queue_autoclaim_interval_sec: float = Field(default=15.0, alias="QUEUE_AUTOCLAIM_INTERVAL_SEC")
+    # Период опроса q:delayed (отложенные ретраи) фоновым promoter'ом
+    queue_delayed_poll_sec: float = Field(default=0.5, alias="QUEUE_DELAYED_POLL_SEC")
+    # Параллельных задач на процесс воркера стадии; не задано — значение по умолчанию стадии
+    # (stt/retention — 1, enhancer/analytics/delivery — 8)
+    worker_stt_concurrency: int | None = Field(default=None, alias="WORKER_STT_CONCURRENCY")
+    worker_enhancer_concurrency: int | None = Field(
+        default=None, alias="WORKER_ENHANCER_CONCURRENCY"
+    )
+    worker_analytics_concurrency: int | None = Field(
+        default=None, alias="WORKER_ANALYTICS_CONCURRENCY"
+    )
+    worker_delivery_concurrency: int | None = Field(
+        default=None, alias="WORKER_DELIVERY_CONCURRENCY"
+    )
+    worker_retention_concurrency: int | None = Field(
+        default=None, alias="WORKER_RETENTION_CONCURRENCY"
+    )
+    # Сколько воркер дорабатывает начатые задачи после SIGTERM/SIGINT (сек)
+    worker_drain_timeout_sec: float = Field(default=30.0, alias="WORKER_DRAIN_TIMEOUT_SEC")
 
     chunks_dir: str = Field(default="./data/chunks", alias="CHUNKS_DIR")
     records_dir: str = Field(default="./data/records", alias="RECORDS_DIR")
@@ -324,6 +346,22 @@ class Settings(BaseSettings):
     rag_reranker_enabled: bool = Field(default=True, alias="RAG_RERANKER_ENABLED")
     rag_reranker_top_n: int = Field(default=20, alias="RAG_RERANKER_TOP_N")
     rag_reranker_alpha: float = Field(default=0.35, alias="RAG_RERANKER_ALPHA")
+    rag_index_cache_max_mb: int = Field(default=256, alias="RAG_INDEX_CACHE_MAX_MB")
+    rag_embedding_max_concurrency: int = Field(default=4, alias="RAG_EMBEDDING_MAX_CONCURRENCY")
+    rag_corpus_enabled: bool = Field(default=True, alias="RAG_CORPUS_ENABLED")
+    rag_corpus_max_segments: int = Field(default=8, alias="RAG_CORPUS_MAX_SEGMENTS")
+    rag_ann_enabled: bool = Field(default=True, alias="RAG_ANN_ENABLED")
+    rag_ann_min_rows: int = Field(default=20_000, alias="RAG_ANN_MIN_ROWS")
+    rag_ann_nprobe: int = Field(default=8, alias="RAG_ANN_NPROBE")
+    rag_ann_candidates: int = Field(default=200, alias="RAG_ANN_CANDIDATES")
+    rag_query_cache_enabled: bool = Field(default=True, alias="RAG_QUERY_CACHE_ENABLED")
+    rag_query_cache_max_items: int = Field(default=256, alias="RAG_QUERY_CACHE_MAX_ITEMS")
+    rag_query_cache_ttl_s: float = Field(default=300.0, alias="RAG_QUERY_CACHE_TTL_S")
+    rag_index_job_workers: int = Field(default=4, alias="RAG_INDEX_JOB_WORKERS")
+    rag_index_jobs_persist_enabled: bool = Field(
+        default=True, alias="RAG_INDEX_JOBS_PERSIST_ENABLED"
+    )
+    rag_embedding_quantization: str = Field(default="float32", alias="RAG_EMBEDDING_QUANTIZATION")
 
     # -------------------------------------------------------------------------
     # Speaker inference
@@ -331,6 +369,8 @@ class Settings(BaseSettings):
     speaker_response_window_sec: int = Field(
         default=8, alias="SPEAKER_RESPONSE_WINDOW_SEC"
     )
+    # Окно сегментов, по которому enhancer прогоняет правила спикеров на очередной чанк.
+    enhancer_context_segments: int = Field(default=32, alias="ENHANCER_CONTEXT_SEGMENTS")
 
     # -------------------------------------------------------------------------
     # OTEL (OpenTelemetry)
@@ -50,6 +50,12 @@ QUEUE_TASKS_TOTAL = Counter(
     ["service", "queue", "result"],
 )
 
+QUEUE_TASKS_IN_FLIGHT = Gauge(
+    "agent_queue_tasks_in_flight",
+    "Задачи очереди, принятые воркером и ещё не завершённые",
+    ["service", "queue"],
+)
+
 QUEUE_DEPTH = Gauge(
     "agent_queue_depth",
     "Текущая глубина stream-очередей",
@@ -178,6 +184,13 @@ RAG_QUERY_LATENCY_MS = Histogram(
     buckets=(10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000),
 )
 
+RAG_QUERY_STAGE_LATENCY_MS = Histogram(
+    "agent_rag_query_stage_latency_ms",
+    "Задержка стадий RAG запроса (мс): index_load, query_embedding, scoring, rerank, llm_answer, export_write",
+    ["service", "stage"],
+    buckets=(1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000),
+)
+
 RAG_LLM_LATENCY_MS = Histogram(
     "agent_rag_llm_latency_ms",
     "Задержка LLM-ответа в RAG (мс)",
@@ -196,6 +209,12 @@ RAG_NO_HITS_TOTAL = Counter(
     "Количество RAG-запросов без найденных цитат",
 )
 
+RAG_QUERY_CACHE_TOTAL = Counter(
+    "agent_rag_query_cache_total",
+    "Обращения к кэшу результатов RAG-запросов",
+    ["result"],
+)
+
 RAG_EXPORT_ERRORS_TOTAL = Counter(
     "agent_rag_export_errors_total",
     "Ошибки экспорта результатов RAG",
@@ -326,6 +345,12 @@ def record_rag_query_latency_ms(*, service: str, elapsed_ms: float) -> None:
     RAG_QUERY_LATENCY_MS.labels(service=service).observe(max(0.0, float(elapsed_ms)))
 
 
+def record_rag_query_stage_latency_ms(*, service: str, stage: str, elapsed_ms: float) -> None:
+    RAG_QUERY_STAGE_LATENCY_MS.labels(service=service, stage=str(stage or "unknown")).observe(
+        max(0.0, float(elapsed_ms))
+    )
+
+
 def record_rag_llm_latency_ms(*, service: str, elapsed_ms: float) -> None:
     RAG_LLM_LATENCY_MS.labels(service=service).observe(max(0.0, float(elapsed_ms)))
 
@@ -338,6 +363,10 @@ def record_rag_no_hits() -> None:
     RAG_NO_HITS_TOTAL.inc()
 
 
+def record_rag_query_cache(*, hit: bool) -> None:
+    RAG_QUERY_CACHE_TOTAL.labels(result="hit" if hit else "miss").inc()
+
+
 def record_rag_export_error(*, reason: str) -> None:
     RAG_EXPORT_ERRORS_TOTAL.labels(reason=str(reason or "unknown")).inc()
 
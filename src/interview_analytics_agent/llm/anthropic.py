@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import json
 import logging
+from collections.abc import Iterator
 from dataclasses import dataclass
 from typing import Optional
 
@@ -78,7 +80,7 @@ class AnthropicProvider:
             return False
         return resp.status_code < 400
 
-    def complete_text(self, *, system: str, user: str) -> str:
+    def _messages_payload(self, *, system: str, user: str) -> dict[str, object]:
         payload: dict[str, object] = {
             "model": self.cfg.model,
             "messages": [{"role": "user", "content": user}],
@@ -88,6 +90,10 @@ class AnthropicProvider:
         }
         if self.cfg.max_tokens is not None:
             payload["max_tokens"] = self.cfg.max_tokens
+        return payload
+
+    def complete_text(self, *, system: str, user: str) -> str:
+        payload = self._messages_payload(system=system, user=user)
         try:
             resp = requests.post(
                 self._messages_url(),
@@ -139,3 +145,53 @@ class AnthropicProvider:
                 "Не удалось извлечь текст из ответа Anthropic",
                 {"err": str(e), "data_head": str(data)[:500]},
             ) from e
+
+    def stream_text(self, *, system: str, user: str) -> Iterator[str]:
+        """Messages API со stream=true: текст приходит в событиях content_block_delta."""
+        payload = self._messages_payload(system=system, user=user)
+        payload["stream"] = True
+        try:
+            resp = requests.post(
+                self._messages_url(),
+                headers=self._headers(),
+                json=payload,
+                timeout=self.cfg.timeout_s,
+                stream=True,
+            )
+        except requests.RequestException as e:
+            log.error("llm_http_error", extra={"provider": "anthropic", "payload": {"err": str(e)}})
+            raise ProviderError(
+                ErrCode.LLM_PROVIDER_ERROR,
+                "Ошибка HTTP при вызове Anthropic",
+                {"err": str(e)},
+            ) from e
+        with resp:
+            if resp.status_code >= 400:
+                raise ProviderError(
+                    ErrCode.LLM_PROVIDER_ERROR,
+                    "Anthropic вернул ошибку",
+                    {"status": resp.status_code, "text_head": resp.text[:500]},
+                )
+            # text/event-stream без charset requests декодирует как ISO-8859-1; SSE — всегда UTF-8.
+            resp.encoding = "utf-8"
+            for raw in resp.iter_lines(decode_unicode=True):
+                line = str(raw or "").strip()
+                if not line.startswith("data:"):
+                    continue
+                try:
+                    event = json.loads(line[len("data:") :].strip())
+                except ValueError:
+                    continue
+                if not isinstance(event, dict):
+                    continue
+                if event.get("type") == "message_stop":
+                    break
+                if event.get("type") == "error":
+                    raise ProviderError(
+                        ErrCode.LLM_PROVIDER_ERROR,
+                        "Anthropic вернул ошибку",
+                        {"text_head": str(event.get("error"))[:500]},
+                    )
+                delta = event.get("delta") if event.get("type") == "content_block_delta" else None
+                if isinstance(delta, dict) and delta.get("type") == "text_delta" and delta.get("text"):
+                    yield str(delta["text"])
@@ -8,6 +8,7 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections.abc import Iterator
 
 
 class LLMProvider(ABC):
@@ -21,3 +22,9 @@ class LLMProvider(ABC):
         Сгенерировать текстовый ответ.
         """
         raise NotImplementedError
+
+    def stream_text(self, *, system: str, user: str) -> Iterator[str]:
+        """
+        Сгенерировать ответ по фрагментам; по умолчанию — одним куском через complete_text.
+        """
+        yield self.complete_text(system=system, user=user)
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import json
 import logging
+from collections.abc import Iterator
 from dataclasses import dataclass
 from typing import Optional
 
@@ -92,8 +94,8 @@ class OpenAICompatProvider:
             return False
         return resp.status_code < 400
 
-    def complete_text(self, *, system: str, user: str) -> str:
-        payload = {
+    def _chat_payload(self, *, system: str, user: str) -> dict[str, object]:
+        payload: dict[str, object] = {
             "model": self.cfg.model,
             "messages": [
                 {"role": "system", "content": system},
@@ -103,6 +105,10 @@ class OpenAICompatProvider:
         }
         if self.cfg.max_tokens is not None:
             payload["max_tokens"] = self.cfg.max_tokens
+        return payload
+
+    def complete_text(self, *, system: str, user: str) -> str:
+        payload = self._chat_payload(system=system, user=user)
 
         try:
             resp = requests.post(
@@ -146,3 +152,50 @@ class OpenAICompatProvider:
                 "Не удалось извлечь текст из ответа LLM",
                 {"err": str(e), "data_head": str(data)[:500]},
             ) from e
+
+    def stream_text(self, *, system: str, user: str) -> Iterator[str]:
+        """Chat completions со stream=true: SSE-строки "data: {...}" до "data: [DONE]"."""
+        payload = self._chat_payload(system=system, user=user)
+        payload["stream"] = True
+        try:
+            resp = requests.post(
+                self._chat_url(),
+                headers=self._headers(),
+                json=payload,
+                timeout=self.cfg.timeout_s,
+                stream=True,
+            )
+        except requests.RequestException as e:
+            log.error(
+                "llm_http_error",
+                extra={"provider": "openai_compat", "payload": {"err": str(e)}},
+            )
+            raise ProviderError(
+                ErrCode.LLM_PROVIDER_ERROR,
+                "Ошибка HTTP при вызове LLM",
+                {"err": str(e)},
+            ) from e
+
+        with resp:
+            if resp.status_code >= 400:
+                raise ProviderError(
+                    ErrCode.LLM_PROVIDER_ERROR,
+                    "LLM вернул ошибку",
+                    {"status": resp.status_code, "text_head": resp.text[:500]},
+                )
+            # text/event-stream без charset requests декодирует как ISO-8859-1; SSE — всегда UTF-8.
+            resp.encoding = "utf-8"
+            for raw in resp.iter_lines(decode_unicode=True):
+                line = str(raw or "").strip()
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    delta = json.loads(data)["choices"][0].get("delta") or {}
+                except (ValueError, KeyError, IndexError, TypeError, AttributeError):
+                    continue
+                text = delta.get("content") if isinstance(delta, dict) else None
+                if text:
+                    yield str(text)
@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import logging
+from collections.abc import Iterator
 from dataclasses import dataclass
 from typing import Any
 
@@ -19,7 +20,8 @@ class LLMOrchestrator:
     """Оркестратор вызовов LLM: единый single-call и валидация JSON.
 
     Важная идея: здесь нет логики провайдера, только orchestration.
-    Провайдер должен иметь метод complete_text(system=..., user=...) -> str.
+    Провайдер должен иметь метод complete_text(system=..., user=...) -> str;
+    stream_text(...) -> Iterator[str] опционален.
     """
 
     def __init__(self, provider: Any) -> None:
@@ -39,6 +41,25 @@ class LLMOrchestrator:
         text = self._single_call(system=system, user=user)
         return LLMTextResult(text=text)
 
+    def stream_text(self, *, system: str, user: str) -> Iterator[str]:
+        """Фрагменты ответа по мере генерации; без stream_text у провайдера — один фрагмент."""
+        stream = getattr(self.provider, "stream_text", None)
+        try:
+            if stream is None:
+                yield self.provider.complete_text(system=system, user=user)
+                return
+            for delta in stream(system=system, user=user):
+                if delta:
+                    yield delta
+        except ProviderError:
+            raise
+        except Exception as err:
+            raise ProviderError(
+                ErrCode.LLM_PROVIDER_ERROR,
+                "LLM не ответил",
+                {"err": str(err)},
+            ) from err
+
     def complete_json(self, *, system: str, user: str) -> dict:
         """Возвращает распарсенный JSON (dict)."""
         res = self.complete_text(system=system, user=user)
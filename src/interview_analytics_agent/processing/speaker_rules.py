@@ -22,6 +22,18 @@ PROXY_RE = re.compile(
 )
 
 
+@dataclass
+class SpeakerState:
+    """
+    Состояние правил между сегментами; передаётся в infer_speakers, чтобы
+    продолжить разбор с окна встречи, не проходя её с начала.
+    """
+
+    host_name: str | None = None
+    pending_name: str | None = None
+    pending_until_seq: int | None = None
+
+
 @dataclass
 class SpeakerDecision:
     seq: int
@@ -34,14 +46,18 @@ def infer_speakers(
     segments: Iterable[tuple[int, str, str]],
     *,
     response_window_sec: int = 8,
+    state: SpeakerState | None = None,
 ) -> list[SpeakerDecision]:
     """
     segments: iterable of (seq, raw_text, enhanced_text)
+
+    state: начальное состояние (например, ведущий, найденный раньше); по окончании
+    в него записывается состояние после последнего сегмента.
     """
     decisions: list[SpeakerDecision] = []
-    host_name: str | None = None
-    pending_name: str | None = None
-    pending_until_seq: int | None = None
+    host_name: str | None = state.host_name if state else None
+    pending_name: str | None = state.pending_name if state else None
+    pending_until_seq: int | None = state.pending_until_seq if state else None
 
     for seq, raw_text, enh_text in segments:
         text = (enh_text or raw_text or "").strip()
@@ -92,4 +108,8 @@ def infer_speakers(
             )
         )
 
+    if state is not None:
+        state.host_name = host_name
+        state.pending_name = pending_name
+        state.pending_until_seq = pending_until_seq
     return decisions
@@ -6,4 +6,6 @@
 - dispatcher (enqueue)
 - idempotency (дедуп)
 - retry (ретраи/DLQ)
+- coalesce (схлопывание задач стадии по встрече)
+- worker_runtime (общий многопоточный цикл воркеров)
 """
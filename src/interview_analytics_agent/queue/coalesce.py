@@ -0,0 +1,188 @@
+"""
+Схлопывание (coalescing) задач стадии по встрече.
+
+Зачем нужно:
+- каждый STT-чанк ставит enhancer, каждый enhancer — analytics: за час встречи
+  это сотни одинаковых пересборок, хотя воркер всё равно читает актуальное состояние БД
+- достаточно, чтобы в очереди была не больше одной задачи стадии на встречу,
+  а устаревшие поколения отбрасывались
+
+Реализация (ключи Redis с TTL):
+- coalesce:<stage>:<meeting_id>:gen     — счётчик поколений (INCR на каждый enqueue)
+- coalesce:<stage>:<meeting_id>:pending — задача уже стоит в очереди (SET NX): новый XADD не нужен
+- coalesce:<stage>:<meeting_id>:done    — поколение, которое покрыл последний успешный прогон
+- coalesce:<stage>:<meeting_id>:touched — seq сегментов из схлопнутых задач (SADD);
+  прогон забирает их разом
+- coalesce:<stage>:<meeting_id>:inflight — задачи стадии в очереди или в работе (INCR/DECR);
+  по нему финальный enhancer ждёт, пока STT дообработает последние чанки
+
+Финальные задачи (final=True) не схлопываются и не отбрасываются.
+При недоступном Redis схлопывание отключается: задача ставится как раньше.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from interview_analytics_agent.common.logging import get_project_logger
+
+from .redis import redis_client
+
+log = get_project_logger()
+
+# Ключи живут дольше самой длинной встречи; после неё они не нужны.
+COALESCE_TTL_SEC = 60 * 60 * 24
+# Флаг pending короче: если задача потерялась, схлопывание не должно блокировать встречу надолго.
+PENDING_TTL_SEC = 10 * 60
+
+
+def _key(stage: str, meeting_id: str, suffix: str) -> str:
+    return f"coalesce:{stage}:{meeting_id}:{suffix}"
+
+
+def _int(value: object) -> int:
+    try:
+        return int(value or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def reserve_generation(stage: str, meeting_id: str, *, final: bool = False) -> tuple[int, bool]:
+    """
+    Новое поколение задачи стадии -> (generation, нужно ли ставить задачу в очередь).
+
+    False — задача этой встречи уже ждёт в очереди и при запуске прочитает свежие данные.
+    """
+    try:
+        r = redis_client()
+        generation = int(r.incr(_key(stage, meeting_id, "gen")))
+        r.expire(_key(stage, meeting_id, "gen"), COALESCE_TTL_SEC)
+        if final:
+            return generation, True
+        queued = r.set(_key(stage, meeting_id, "pending"), str(generation), nx=True, ex=PENDING_TTL_SEC)
+        return generation, bool(queued)
+    except Exception as e:
+        log.warning(
+            "coalesce_reserve_failed",
+            extra={"payload": {"stage": stage, "meeting_id": meeting_id, "err": str(e)[:200]}},
+        )
+        return 0, True
+
+
+def release_pending(stage: str, meeting_id: str) -> None:
+    """Снять pending, если задачу поставить не удалось (иначе следующие enqueue схлопнутся в пустоту)."""
+    try:
+        redis_client().delete(_key(stage, meeting_id, "pending"))
+    except Exception:
+        pass
+
+
+def begin_run(stage: str, meeting_id: str, *, generation: int, final: bool = False) -> int | None:
+    """
+    Вызывается воркером перед обработкой задачи.
+
+    Возвращает поколение, которое покроет прогон (его передают в finish_run),
+    или None, если задача устарела: более поздний прогон уже обработал её данные.
+    Снимает флаг pending, так что данные, пришедшие во время прогона, поставят новую задачу.
+    """
+    try:
+        r = redis_client()
+        if not final and generation > 0:
+            done = _int(r.get(_key(stage, meeting_id, "done")))
+            if generation <= done:
+                return None
+        r.delete(_key(stage, meeting_id, "pending"))
+        return max(generation, _int(r.get(_key(stage, meeting_id, "gen"))))
+    except Exception as e:
+        log.warning(
+            "coalesce_begin_failed",
+            extra={"payload": {"stage": stage, "meeting_id": meeting_id, "err": str(e)[:200]}},
+        )
+        return generation
+
+
+def finish_run(stage: str, meeting_id: str, *, generation: int) -> None:
+    """Отметить поколение обработанным (после успешного прогона)."""
+    if generation <= 0:
+        return
+    try:
+        r = redis_client()
+        key = _key(stage, meeting_id, "done")
+        # Гонка двух воркеров безопасна: в худшем случае пройдёт один лишний прогон.
+        if generation > _int(r.get(key)):
+            r.set(key, str(generation), ex=COALESCE_TTL_SEC)
+    except Exception as e:
+        log.warning(
+            "coalesce_finish_failed",
+            extra={"payload": {"stage": stage, "meeting_id": meeting_id, "err": str(e)[:200]}},
+        )
+
+
+def add_touched(stage: str, meeting_id: str, seqs: Iterable[int]) -> None:
+    """Запомнить seq, которые должен увидеть следующий прогон (задача с ними могла схлопнуться)."""
+    members = sorted({int(seq) for seq in seqs})
+    if not members:
+        return
+    try:
+        r = redis_client()
+        key = _key(stage, meeting_id, "touched")
+        r.sadd(key, *members)
+        r.expire(key, COALESCE_TTL_SEC)
+    except Exception as e:
+        log.warning(
+            "coalesce_touched_failed",
+            extra={"payload": {"stage": stage, "meeting_id": meeting_id, "err": str(e)[:200]}},
+        )
+
+
+def pop_touched(stage: str, meeting_id: str) -> set[int]:
+    """Забрать накопленные seq (SMEMBERS + DEL в одной транзакции)."""
+    try:
+        pipe = redis_client().pipeline()
+        key = _key(stage, meeting_id, "touched")
+        pipe.smembers(key)
+        pipe.delete(key)
+        members, _deleted = pipe.execute()
+    except Exception as e:
+        log.warning(
+            "coalesce_touched_failed",
+            extra={"payload": {"stage": stage, "meeting_id": meeting_id, "err": str(e)[:200]}},
+        )
+        return set()
+    return {_int(member) for member in members or ()}
+
+
+def track_inflight(stage: str, meeting_id: str) -> None:
+    """+1 к задачам стадии встречи, которые ещё не завершены (вызывать до XADD)."""
+    try:
+        r = redis_client()
+        key = _key(stage, meeting_id, "inflight")
+        r.incr(key)
+        r.expire(key, COALESCE_TTL_SEC)
+    except Exception as e:
+        log.warning(
+            "coalesce_inflight_failed",
+            extra={"payload": {"stage": stage, "meeting_id": meeting_id, "err": str(e)[:200]}},
+        )
+
+
+def settle_inflight(stage: str, meeting_id: str) -> None:
+    """-1: задача завершилась успешно или ушла в DLQ (не при ретрае)."""
+    try:
+        r = redis_client()
+        key = _key(stage, meeting_id, "inflight")
+        if int(r.decr(key)) <= 0:
+            r.delete(key)
+    except Exception as e:
+        log.warning(
+            "coalesce_inflight_failed",
+            extra={"payload": {"stage": stage, "meeting_id": meeting_id, "err": str(e)[:200]}},
+        )
+
+
+def inflight(stage: str, meeting_id: str) -> int:
+    """Незавершённые задачи стадии встречи; при недоступном Redis — 0 (не блокировать финализацию)."""
+    try:
+        return max(0, _int(redis_client().get(_key(stage, meeting_id, "inflight"))))
+    except Exception:
+        return 0
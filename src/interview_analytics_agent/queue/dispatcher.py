@@ -5,6 +5,7 @@
 - Единые имена очередей
 - Унифицированная упаковка задач в JSON
 - Удобные функции enqueue_* для всех стадий пайплайна
+- Схлопывание промежуточных задач enhancer/analytics по встрече
 """
 
 from __future__ import annotations
@@ -17,9 +18,19 @@ from interview_analytics_agent.common.config import get_settings
 from interview_analytics_agent.common.ids import new_event_id
 from interview_analytics_agent.common.logging import get_project_logger
 from interview_analytics_agent.common.tracing import inject_trace_context
-from interview_analytics_agent.services.local_pipeline import process_chunk_inline
+from interview_analytics_agent.services.local_pipeline import (
+    finalize_meeting_enhancement,
+    process_chunk_inline,
+)
 from interview_analytics_agent.storage.blob import get_bytes
 
+from .coalesce import (
+    add_touched,
+    release_pending,
+    reserve_generation,
+    settle_inflight,
+    track_inflight,
+)
 from .streams import enqueue
 
 log = get_project_logger()
@@ -33,6 +44,12 @@ Q_ANALYTICS = "q:analytics"
 Q_DELIVERY = "q:delivery"
 Q_RETENTION = "q:retention"
 
+# Стадии со схлопыванием задач по встрече (ключи coalesce:<stage>:...)
+STAGE_ENHANCER = "enhancer"
+STAGE_ANALYTICS = "analytics"
+# Счётчик незавершённых STT-чанков встречи (coalesce:stt:<meeting_id>:inflight)
+STAGE_STT = "stt"
+
 # DLQ
 Q_DLQ = "q:dlq"
 
@@ -84,7 +101,13 @@ def enqueue_stt(
             },
         )
     else:
-        enqueue(Q_STT, payload)
+        # Финальный enhancer ждёт, пока счётчик чанков встречи не дойдёт до нуля.
+        track_inflight(STAGE_STT, meeting_id)
+        try:
+            enqueue(Q_STT, payload)
+        except Exception:
+            settle_inflight(STAGE_STT, meeting_id)
+            raise
         log.info(
             "enqueue_stt",
             extra={
@@ -94,32 +117,105 @@ def enqueue_stt(
     return event_id
 
 
-def enqueue_enhancer(*, meeting_id: str) -> str:
+def _enqueue_coalesced(
+    queue: str,
+    stage: str,
+    payload: dict,
+    *,
+    meeting_id: str,
+    final: bool,
+) -> bool:
+    """
+    XADD задачи стадии с поколением; False — задача встречи уже в очереди (схлопнута).
+    """
+    generation, should_enqueue = reserve_generation(stage, meeting_id, final=final)
+    if not should_enqueue:
+        return False
+    payload["generation"] = generation
+    try:
+        enqueue(queue, payload)
+    except Exception:
+        if not final:
+            release_pending(stage, meeting_id)
+        raise
+    return True
+
+
+def enqueue_enhancer(*, meeting_id: str, final: bool = False, chunk_seq: int | None = None) -> str:
     """
     Поставить задачу улучшения текста.
+
+    final=True — полный проход по всей встрече (после Finish); иначе воркер
+    обрабатывает только сегменты после водяной метки. Не финальные задачи
+    схлопываются по встрече (queue/coalesce.py).
+
+    chunk_seq — сегмент, записанный STT: при повторной записи того же seq id не меняется
+    и водяная метка его не видит, поэтому seq копятся в наборе встречи до прогона воркера.
     """
     event_id = new_event_id("enh")
-    payload = {"schema_version": "v1", "event_id": event_id, "meeting_id": meeting_id}
+    payload = {
+        "schema_version": "v1",
+        "event_id": event_id,
+        "meeting_id": meeting_id,
+        "final": bool(final),
+    }
+    if chunk_seq is not None:
+        payload["chunk_seq"] = int(chunk_seq)
     inject_trace_context(payload, meeting_id=meeting_id, source="queue.enhancer")
-    enqueue(Q_ENHANCER, payload)
+    if final and (get_settings().queue_mode or "").strip().lower() == "inline":
+        finalize_meeting_enhancement(meeting_id=meeting_id)
+        log.info(
+            "enqueue_enhancer_inline",
+            extra={"payload": {"meeting_id": meeting_id, "event_id": event_id, "final": True}},
+        )
+        return event_id
+    if chunk_seq is not None:
+        # До reserve_generation: задача, в которую схлопнется эта, заберёт seq при запуске.
+        add_touched(STAGE_ENHANCER, meeting_id, [chunk_seq])
+    queued = _enqueue_coalesced(
+        Q_ENHANCER, STAGE_ENHANCER, payload, meeting_id=meeting_id, final=final
+    )
     log.info(
-        "enqueue_enhancer",
-        extra={"payload": {"meeting_id": meeting_id, "event_id": event_id}},
+        "enqueue_enhancer" if queued else "enqueue_enhancer_coalesced",
+        extra={
+            "payload": {
+                "meeting_id": meeting_id,
+                "event_id": event_id,
+                "final": bool(final),
+                "generation": payload.get("generation"),
+            }
+        },
     )
     return event_id
 
 
-def enqueue_analytics(*, meeting_id: str) -> str:
+def enqueue_analytics(*, meeting_id: str, final: bool = False) -> str:
     """
     Поставить задачу аналитики/отчёта.
+
+    final=True — встреча завершена: после аналитики воркер ставит delivery.
     """
     event_id = new_event_id("anl")
-    payload = {"schema_version": "v1", "event_id": event_id, "meeting_id": meeting_id}
+    payload = {
+        "schema_version": "v1",
+        "event_id": event_id,
+        "meeting_id": meeting_id,
+        "final": bool(final),
+    }
     inject_trace_context(payload, meeting_id=meeting_id, source="queue.analytics")
-    enqueue(Q_ANALYTICS, payload)
+    queued = _enqueue_coalesced(
+        Q_ANALYTICS, STAGE_ANALYTICS, payload, meeting_id=meeting_id, final=final
+    )
     log.info(
-        "enqueue_analytics",
-        extra={"payload": {"meeting_id": meeting_id, "event_id": event_id}},
+        "enqueue_analytics" if queued else "enqueue_analytics_coalesced",
+        extra={
+            "payload": {
+                "meeting_id": meeting_id,
+                "event_id": event_id,
+                "final": bool(final),
+                "generation": payload.get("generation"),
+            }
+        },
     )
     return event_id
 
@@ -3,23 +3,104 @@ Retry/DLQ утилиты для очередей.
 
 Назначение:
 - аккуратно перекидывать задачи обратно в очередь с ограниченным числом попыток
-- делать простой backoff (sleep) между повторными постановками
+- backoff без sleep в воркере: задача ждёт в ZSET q:delayed (score = время готовности),
+  фоновый promoter перекладывает созревшие задачи обратно в их stream
 - DLQ как отдельный stream <queue>:dlq
-
-Важно:
-- это синхронная реализация (подходит для наших воркеров)
 """
 
 from __future__ import annotations
 
+import json
+import threading
 import time
+import uuid
 from typing import Any
 
+from interview_analytics_agent.common.config import get_settings
 from interview_analytics_agent.common.logging import get_project_logger
+from interview_analytics_agent.queue.redis import redis_client
 from interview_analytics_agent.queue.streams import enqueue, stream_dlq_name
 
 log = get_project_logger()
 
+DELAYED_ZSET = "q:delayed"
+_PROMOTE_BATCH = 100
+
+_promoter_lock = threading.Lock()
+_promoter_thread: threading.Thread | None = None
+
+
+def _promoter_poll_sec() -> float:
+    s = get_settings()
+    raw = float(getattr(s, "queue_delayed_poll_sec", 0.5) or 0.5)
+    return max(0.05, min(raw, 60.0))
+
+
+def schedule_delayed(*, queue_name: str, task_payload: dict[str, Any], delay_sec: float) -> None:
+    """
+    Отложить постановку задачи в queue_name на delay_sec (ZADD в q:delayed).
+    """
+    member = json.dumps(
+        {"id": uuid.uuid4().hex, "queue": queue_name, "payload": task_payload},
+        ensure_ascii=False,
+    )
+    redis_client().zadd(DELAYED_ZSET, {member: time.time() + max(0.0, float(delay_sec))})
+    start_delayed_promoter()
+
+
+def promote_due(*, now: float | None = None, limit: int = _PROMOTE_BATCH) -> int:
+    """
+    Переложить созревшие задачи из q:delayed в их stream; возвращает число перенесённых.
+
+    Задачу забирает тот promoter, чей ZREM её удалил, поэтому несколько процессов
+    с promoter'ом не дублируют задачи.
+    """
+    r = redis_client()
+    due = r.zrangebyscore(DELAYED_ZSET, "-inf", time.time() if now is None else now, start=0, num=limit)
+    promoted = 0
+    for member in due:
+        if not r.zrem(DELAYED_ZSET, member):
+            continue
+        try:
+            item = json.loads(member)
+            queue_name = str(item["queue"])
+            payload = item["payload"]
+        except (ValueError, KeyError, TypeError) as e:
+            log.error("delayed_task_malformed", extra={"payload": {"err": str(e)[:200]}})
+            continue
+        try:
+            enqueue(queue_name, payload)
+        except Exception:
+            # Вернуть задачу в ZSET, чтобы не потерять её при сбое XADD.
+            r.zadd(DELAYED_ZSET, {member: time.time()})
+            raise
+        promoted += 1
+    return promoted
+
+
+def _promoter_loop() -> None:
+    poll_sec = _promoter_poll_sec()
+    while True:
+        try:
+            # Полная пачка — вероятно, созрело больше: следующая без паузы.
+            if promote_due() >= _PROMOTE_BATCH:
+                continue
+        except Exception as e:
+            log.warning("delayed_promoter_error", extra={"payload": {"err": str(e)[:200]}})
+        time.sleep(poll_sec)
+
+
+def start_delayed_promoter() -> None:
+    """Фоновый promoter отложенных задач; один поток на процесс (повторные вызовы — no-op)."""
+    global _promoter_thread
+    with _promoter_lock:
+        if _promoter_thread is not None and _promoter_thread.is_alive():
+            return
+        _promoter_thread = threading.Thread(
+            target=_promoter_loop, name="delayed-promoter", daemon=True
+        )
+        _promoter_thread.start()
+
 
 def requeue_with_backoff(
     *,
@@ -32,7 +113,7 @@ def requeue_with_backoff(
     Повторно поставить задачу в очередь, увеличивая attempts.
 
     Возвращает:
-    - True: задача поставлена обратно в очередь
+    - True: задача поставлена обратно в очередь (при backoff_sec > 0 — через q:delayed)
     - False: задача отправлена в DLQ
     """
     attempts = int(task_payload.get("attempts", 0)) + 1
@@ -55,11 +136,11 @@ def requeue_with_backoff(
         )
         return False
 
-    # Backoff
+    # Backoff: задача ждёт в q:delayed, воркер тем временем берёт следующие.
     if backoff_sec and backoff_sec > 0:
-        time.sleep(backoff_sec)
-
-    enqueue(queue_name, task_payload)
+        schedule_delayed(queue_name=queue_name, task_payload=task_payload, delay_sec=backoff_sec)
+    else:
+        enqueue(queue_name, task_payload)
     log.warning(
         "task_requeued",
         extra={
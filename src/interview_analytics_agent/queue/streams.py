@@ -3,9 +3,9 @@ Redis Streams utilities for task queues.
 
 Features:
 - XADD producer API
-- consumer groups with auto-create
-- ACK support
-- auto-claim for stale pending tasks
+- consumer groups with auto-create (once per process)
+- batched consumer: XREADGROUP COUNT=N, pipelined batch ACK
+- auto-claim for stale pending tasks on a background timer
 """
 
 from __future__ import annotations
@@ -13,13 +13,20 @@ from __future__ import annotations
 import json
 import os
 import socket
+import threading
+from collections import deque
 from dataclasses import dataclass
 from typing import Any
 
 import redis
 
+from interview_analytics_agent.common.config import get_settings
+from interview_analytics_agent.common.logging import get_project_logger
+
 from .redis import redis_client
 
+log = get_project_logger()
+
 _PAYLOAD_FIELD = "payload"
 _GROUP_ERR_PREFIX = "BUSYGROUP"
 
@@ -41,6 +48,22 @@ def stream_dlq_name(stream: str) -> str:
     return f"{stream}:dlq"
 
 
+_ENSURED_GROUPS: set[tuple[str, str]] = set()
+_ENSURED_GROUPS_LOCK = threading.Lock()
+
+
+def read_batch_size() -> int:
+    s = get_settings()
+    raw = int(getattr(s, "queue_read_count", 16) or 16)
+    return max(1, min(raw, 1000))
+
+
+def autoclaim_interval_sec() -> float:
+    s = get_settings()
+    raw = float(getattr(s, "queue_autoclaim_interval_sec", 15.0) or 15.0)
+    return max(1.0, min(raw, 3600.0))
+
+
 def ensure_group(stream: str, group: str) -> None:
     r = redis_client()
     try:
@@ -49,6 +72,21 @@ def ensure_group(stream: str, group: str) -> None:
     except redis.ResponseError as e:
         if _GROUP_ERR_PREFIX not in str(e):
             raise
+    with _ENSURED_GROUPS_LOCK:
+        _ENSURED_GROUPS.add((stream, group))
+
+
+def ensure_group_once(stream: str, group: str) -> None:
+    """XGROUP CREATE один раз на процесс (повторно — только после NOGROUP, см. StreamConsumer)."""
+    with _ENSURED_GROUPS_LOCK:
+        if (stream, group) in _ENSURED_GROUPS:
+            return
+    ensure_group(stream, group)
+
+
+def _forget_group(stream: str, group: str) -> None:
+    with _ENSURED_GROUPS_LOCK:
+        _ENSURED_GROUPS.discard((stream, group))
 
 
 def enqueue(stream: str, payload: dict[str, Any]) -> str:
@@ -64,44 +102,209 @@ def _parse_entry(stream: str, entry_id: str, fields: dict[str, Any]) -> StreamTa
     return StreamTask(stream=stream, entry_id=str(entry_id), payload=payload)
 
 
-def _read_new(stream: str, group: str, consumer: str, block_ms: int) -> StreamTask | None:
-    r = redis_client()
-    rows = r.xreadgroup(
-        groupname=group,
-        consumername=consumer,
-        streams={stream: ">"},
-        count=1,
-        block=block_ms,
-    )
-    if not rows:
-        return None
-    _, entries = rows[0]
-    if not entries:
-        return None
-    entry_id, fields = entries[0]
-    return _parse_entry(stream, str(entry_id), fields)
+class StreamConsumer:
+    """
+    Пакетный консьюмер одного stream/group.
+
+    - read_batch(): сначала задачи, подобранные фоновым autoclaim, затем XREADGROUP;
+      не больше count задач (аргумент read_batch или count консьюмера)
+    - ack(): копит entry_id; flush_acks() отправляет их одним XACK на пачку (в pipeline),
+      автоматически — при заполнении пачки и перед очередным блокирующим чтением
+    - autoclaim зависших pending идёт в фоновом потоке раз в claim_interval_sec,
+      а не на каждом опросе; задачи, выданные этим консьюмером и ещё не подтверждённые, не переподбираются
+    """
+
+    def __init__(
+        self,
+        *,
+        stream: str,
+        group: str,
+        consumer: str,
+        count: int | None = None,
+        block_ms: int = 5000,
+        min_idle_claim_ms: int = 60_000,
+        claim_interval_sec: float | None = None,
+    ) -> None:
+        self.stream = stream
+        self.group = group
+        self.consumer = consumer
+        self.count = max(1, int(count or read_batch_size()))
+        self.block_ms = int(block_ms)
+        self.min_idle_claim_ms = int(min_idle_claim_ms)
+        self.claim_interval_sec = float(claim_interval_sec or autoclaim_interval_sec())
+        self._lock = threading.Lock()
+        self._claimed: deque[StreamTask] = deque()
+        self._delivered: set[str] = set()
+        self._pending_acks: list[str] = []
+        self._stop = threading.Event()
+        self._claimer: threading.Thread | None = None
+
+    def start(self) -> None:
+        ensure_group_once(self.stream, self.group)
+        with self._lock:
+            if self._claimer is not None:
+                return
+            self._claimer = threading.Thread(
+                target=self._claim_loop, name=f"autoclaim:{self.stream}", daemon=True
+            )
+        # Первый проход сразу: после рестарта воркера pending должен подобраться без ожидания таймера.
+        self.claim_stale()
+        self._claimer.start()
+
+    def close(self) -> None:
+        self._stop.set()
+        try:
+            self.flush_acks()
+        except Exception as e:
+            log.warning(
+                "stream_consumer_flush_failed",
+                extra={"payload": {"stream": self.stream, "err": str(e)[:200]}},
+            )
+
+    def _claim_loop(self) -> None:
+        while not self._stop.wait(self.claim_interval_sec):
+            try:
+                self.claim_stale()
+            except Exception as e:
+                log.warning(
+                    "stream_autoclaim_failed",
+                    extra={"payload": {"stream": self.stream, "err": str(e)[:200]}},
+                )
 
+    def claim_stale(self) -> int:
+        """XAUTOCLAIM по всему PEL группы; возвращает число подобранных задач."""
+        r = redis_client()
+        start_id = "0-0"
+        claimed_total = 0
+        while True:
+            next_id, claimed, *_ = r.xautoclaim(
+                name=self.stream,
+                groupname=self.group,
+                consumername=self.consumer,
+                min_idle_time=self.min_idle_claim_ms,
+                start_id=start_id,
+                count=self.count,
+            )
+            with self._lock:
+                known = self._delivered | {task.entry_id for task in self._claimed}
+                fresh = [
+                    (entry_id, fields)
+                    for entry_id, fields in claimed or []
+                    if fields is not None and str(entry_id) not in known
+                ]
+            tasks = self._parse_entries(fresh)
+            with self._lock:
+                self._claimed.extend(tasks)
+            claimed_total += len(tasks)
+            start_id = str(next_id or "0-0")
+            if start_id in {"0-0", "0"}:
+                return claimed_total
 
-def _claim_stale(
+    def _read_new(self, block_ms: int, count: int) -> list[StreamTask]:
+        r = redis_client()
+        try:
+            rows = r.xreadgroup(
+                groupname=self.group,
+                consumername=self.consumer,
+                streams={self.stream: ">"},
+                count=count,
+                block=block_ms,
+            )
+        except redis.ResponseError as e:
+            if "NOGROUP" not in str(e):
+                raise
+            # Stream/группу удалили (FLUSHALL, ручная чистка) — пересоздаём и читаем со следующего опроса.
+            _forget_group(self.stream, self.group)
+            ensure_group_once(self.stream, self.group)
+            return []
+        return self._parse_entries([entry for _stream, entries in rows or [] for entry in entries or []])
+
+    def _parse_entries(self, entries: list[Any]) -> list[StreamTask]:
+        tasks: list[StreamTask] = []
+        for entry_id, fields in entries:
+            try:
+                tasks.append(_parse_entry(self.stream, str(entry_id), fields))
+            except ValueError as e:
+                # Битая запись не должна задерживать остальную пачку и переподбираться вечно.
+                log.error(
+                    "stream_entry_malformed",
+                    extra={"payload": {"stream": self.stream, "entry_id": str(entry_id), "err": str(e)[:200]}},
+                )
+                self.ack(str(entry_id))
+        return tasks
+
+    def read_batch(self, *, block_ms: int | None = None, count: int | None = None) -> list[StreamTask]:
+        if self._claimer is None:
+            self.start()
+        limit = self.count if count is None else max(1, int(count))
+        with self._lock:
+            tasks = [self._claimed.popleft() for _ in range(min(limit, len(self._claimed)))]
+        if not tasks:
+            self.flush_acks()
+            tasks = self._read_new(self.block_ms if block_ms is None else int(block_ms), limit)
+        with self._lock:
+            self._delivered.update(task.entry_id for task in tasks)
+        return tasks
+
+    def ack(self, entry_id: str) -> None:
+        with self._lock:
+            self._delivered.discard(str(entry_id))
+            self._pending_acks.append(str(entry_id))
+            # После close() пачки не копим: задачи, дорабатывающие после drain-таймаута,
+            # подтверждаются сразу, иначе их ACK не уйдёт и задачи выполнятся повторно.
+            full = len(self._pending_acks) >= self.count or self._stop.is_set()
+        if full:
+            self.flush_acks()
+
+    def flush_acks(self) -> int:
+        with self._lock:
+            entry_ids, self._pending_acks = self._pending_acks, []
+        if not entry_ids:
+            return 0
+        pipe = redis_client().pipeline(transaction=False)
+        for offset in range(0, len(entry_ids), 500):
+            pipe.xack(self.stream, self.group, *entry_ids[offset : offset + 500])
+        try:
+            return sum(int(n or 0) for n in pipe.execute())
+        except Exception:
+            # Не потерять подтверждения: следующий flush отправит их снова (XACK идемпотентен).
+            with self._lock:
+                self._pending_acks[:0] = entry_ids
+            raise
+
+    def forget(self, entry_id: str) -> None:
+        """Задача подтверждена в обход ack() (ack_task) — убрать её из выданных."""
+        with self._lock:
+            self._delivered.discard(str(entry_id))
+
+
+_CONSUMERS: dict[tuple[str, str, str], StreamConsumer] = {}
+_CONSUMERS_LOCK = threading.Lock()
+_READ_BUFFERS: dict[tuple[str, str, str], deque[StreamTask]] = {}
+
+
+def get_consumer(
+    *,
     stream: str,
     group: str,
     consumer: str,
-    min_idle_ms: int,
-) -> StreamTask | None:
-    r = redis_client()
-    next_id, claimed, _ = r.xautoclaim(
-        name=stream,
-        groupname=group,
-        consumername=consumer,
-        min_idle_time=min_idle_ms,
-        start_id="0-0",
-        count=1,
-    )
-    _ = next_id
-    if not claimed:
-        return None
-    entry_id, fields = claimed[0]
-    return _parse_entry(stream, str(entry_id), fields)
+    block_ms: int = 5000,
+    min_idle_claim_ms: int = 60_000,
+) -> StreamConsumer:
+    key = (stream, group, consumer)
+    with _CONSUMERS_LOCK:
+        sc = _CONSUMERS.get(key)
+        if sc is None:
+            sc = StreamConsumer(
+                stream=stream,
+                group=group,
+                consumer=consumer,
+                block_ms=block_ms,
+                min_idle_claim_ms=min_idle_claim_ms,
+            )
+            _CONSUMERS[key] = sc
+            _READ_BUFFERS[key] = deque()
+        return sc
 
 
 def read_task(
@@ -112,20 +315,26 @@ def read_task(
     block_ms: int = 5000,
     min_idle_claim_ms: int = 60_000,
 ) -> StreamTask | None:
-    ensure_group(stream, group)
-
-    # Сначала подбираем "зависшие" pending, потом берём новые.
-    stale = _claim_stale(
+    """
+    Совместимая обёртка над StreamConsumer: одна задача за вызов из локально прочитанной пачки.
+    """
+    sc = get_consumer(
         stream=stream,
         group=group,
         consumer=consumer,
-        min_idle_ms=min_idle_claim_ms,
+        block_ms=block_ms,
+        min_idle_claim_ms=min_idle_claim_ms,
     )
-    if stale:
-        return stale
-
-    return _read_new(stream=stream, group=group, consumer=consumer, block_ms=block_ms)
+    buffer = _READ_BUFFERS[(stream, group, consumer)]
+    if not buffer:
+        buffer.extend(sc.read_batch(block_ms=block_ms))
+    return buffer.popleft() if buffer else None
 
 
 def ack_task(*, stream: str, group: str, entry_id: str) -> int:
-    return int(redis_client().xack(stream, group, entry_id))
+    acked = int(redis_client().xack(stream, group, entry_id))
+    with _CONSUMERS_LOCK:
+        consumers = [sc for key, sc in _CONSUMERS.items() if key[:2] == (stream, group)]
+    for sc in consumers:
+        sc.forget(entry_id)
+    return acked
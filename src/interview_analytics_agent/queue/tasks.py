@@ -27,12 +27,16 @@ class STTTask:
 class EnhanceTask:
     schema_version: SchemaV1
     meeting_id: str
+    final: bool = False
+    generation: int = 0
 
 
 @dataclass
 class AnalyticsTask:
     schema_version: SchemaV1
     meeting_id: str
+    final: bool = False
+    generation: int = 0
 
 
 @dataclass
@@ -0,0 +1,238 @@
+"""
+Общий runtime воркеров очередей.
+
+Назначение:
+- несколько задач стадии одновременно в одном процессе (пул потоков, concurrency на стадию)
+- задачи одной встречи выполняются строго по очереди, разные встречи — параллельно
+- единая обработка ошибок: лог, метрики, requeue_with_backoff, ACK пачками
+- graceful drain по SIGTERM/SIGINT: новые задачи не читаются, начатые дорабатываются;
+  неначатые остаются в PEL и подбираются autoclaim'ом другого воркера
+- метрика agent_queue_tasks_in_flight
+
+Concurrency стадии — настройка worker_<stage>_concurrency (1..64), таймаут drain —
+worker_drain_timeout_sec.
+"""
+
+from __future__ import annotations
+
+import signal
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Any
+
+from interview_analytics_agent.common.config import get_settings
+from interview_analytics_agent.common.logging import get_project_logger
+from interview_analytics_agent.common.metrics import QUEUE_TASKS_IN_FLIGHT, QUEUE_TASKS_TOTAL
+
+from .retry import requeue_with_backoff
+from .streams import StreamConsumer, StreamTask, consumer_name, read_batch_size
+
+log = get_project_logger()
+
+# handler(payload) -> метка результата для QUEUE_TASKS_TOTAL (None = "success"); исключение = ретрай.
+TaskHandler = Callable[[dict[str, Any]], str | None]
+
+
+@dataclass(frozen=True)
+class StageWorkerSpec:
+    service: str
+    stage: str
+    stream: str
+    group: str
+    max_attempts: int = 3
+    backoff_sec: int = 1
+    block_ms: int = 5000
+    default_concurrency: int = 1
+    err_chars: int = 200
+
+
+def stage_concurrency(spec: StageWorkerSpec) -> int:
+    s = get_settings()
+    configured = getattr(s, f"worker_{spec.stage}_concurrency", None)
+    raw = int(spec.default_concurrency if configured is None else configured or 1)
+    return max(1, min(raw, 64))
+
+
+def _drain_timeout_sec() -> float:
+    s = get_settings()
+    raw = float(getattr(s, "worker_drain_timeout_sec", 30.0) or 30.0)
+    return max(0.0, min(raw, 3600.0))
+
+
+def ordering_key(task: StreamTask) -> str:
+    """Задачи с одним ключом выполняются последовательно; без встречи — каждая сама по себе."""
+    payload = task.payload if isinstance(task.payload, dict) else {}
+    key = str(payload.get("meeting_id") or payload.get("entity_id") or "").strip()
+    return key or f"entry:{task.entry_id}"
+
+
+class StageWorkerRuntime:
+    def __init__(
+        self,
+        spec: StageWorkerSpec,
+        handler: TaskHandler,
+        *,
+        concurrency: int | None = None,
+        consumer: StreamConsumer | None = None,
+    ) -> None:
+        self.spec = spec
+        self.handler = handler
+        self.concurrency = max(1, int(concurrency or stage_concurrency(spec)))
+        # Прочитано, но не завершено (выполняется + ждёт своей встречи): не больше двух на поток.
+        self.max_in_flight = self.concurrency * 2
+        self.consumer = consumer or StreamConsumer(
+            stream=spec.stream,
+            group=spec.group,
+            consumer=consumer_name(spec.service),
+            count=read_batch_size(),
+            block_ms=spec.block_ms,
+        )
+        self._log_prefix = spec.service.replace("-", "_")
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=spec.service)
+        self._cond = threading.Condition()
+        # ключ встречи -> ожидающие задачи; наличие ключа = по встрече уже выполняется задача.
+        self._by_key: dict[str, deque[StreamTask]] = {}
+        self._in_flight = 0
+        self._stop = threading.Event()
+        self._gauge = QUEUE_TASKS_IN_FLIGHT.labels(service=spec.service, queue=spec.stream)
+
+    @property
+    def in_flight(self) -> int:
+        with self._cond:
+            return self._in_flight
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def install_signal_handlers(self) -> None:
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda _signum, _frame: self.stop())
+
+    def run(self) -> None:
+        """Цикл чтения до stop(); затем drain и выход."""
+        log.info(
+            f"{self._log_prefix}_started",
+            extra={"payload": {"queue": self.spec.stream, "concurrency": self.concurrency}},
+        )
+        while not self._stop.is_set():
+            with self._cond:
+                while self._in_flight >= self.max_in_flight and not self._stop.is_set():
+                    self._cond.wait(0.5)
+                busy = self._in_flight > 0
+                free = self.max_in_flight - self._in_flight
+            if self._stop.is_set():
+                break
+            try:
+                # Не больше свободных мест: лишние задачи ждали бы в памяти, а не в PEL.
+                # Пока задачи в работе, не блокируемся надолго: иначе их ACK ждут конца блокировки.
+                tasks = self.consumer.read_batch(
+                    block_ms=min(self.spec.block_ms, 200) if busy else None,
+                    count=free,
+                )
+            except Exception as e:
+                log.error(f"{self._log_prefix}_fatal", extra={"payload": {"err": str(e)[: self.spec.err_chars]}})
+                self._stop.wait(2)
+                continue
+            for task in tasks:
+                self._submit(task)
+        self._drain()
+
+    def _submit(self, task: StreamTask) -> None:
+        key = ordering_key(task)
+        with self._cond:
+            self._in_flight += 1
+            self._gauge.inc()
+            waiting = self._by_key.get(key)
+            if waiting is not None:
+                waiting.append(task)
+                return
+            self._by_key[key] = deque()
+        self._pool.submit(self._run_key, key, task)
+
+    def _run_key(self, key: str, task: StreamTask) -> None:
+        while task is not None:
+            try:
+                self.process(task)
+            finally:
+                with self._cond:
+                    self._in_flight -= 1
+                    self._gauge.dec()
+                    waiting = self._by_key[key]
+                    if waiting and not self._stop.is_set():
+                        task = waiting.popleft()
+                    else:
+                        # При остановке неначатые задачи встречи не выполняются и не подтверждаются.
+                        self._in_flight -= len(waiting)
+                        self._gauge.dec(len(waiting))
+                        del self._by_key[key]
+                        task = None
+                    self._cond.notify_all()
+
+    def process(self, msg: StreamTask) -> None:
+        """Одна задача: handler, метрики, ретрай/DLQ, ACK (пачкой через consumer)."""
+        spec = self.spec
+        task = msg.payload
+        should_ack = False
+        try:
+            result = self.handler(task) or "success"
+            should_ack = True
+            QUEUE_TASKS_TOTAL.labels(service=spec.service, queue=spec.stream, result=result).inc()
+        except Exception as e:
+            log.error(
+                f"{self._log_prefix}_error",
+                extra={"payload": {"err": str(e)[: spec.err_chars], "task": task}},
+            )
+            QUEUE_TASKS_TOTAL.labels(service=spec.service, queue=spec.stream, result="error").inc()
+            try:
+                requeue_with_backoff(
+                    queue_name=spec.stream,
+                    task_payload=task if isinstance(task, dict) else {},
+                    max_attempts=spec.max_attempts,
+                    backoff_sec=spec.backoff_sec,
+                )
+                should_ack = True
+                QUEUE_TASKS_TOTAL.labels(service=spec.service, queue=spec.stream, result="retry").inc()
+            except Exception:
+                pass
+        finally:
+            if should_ack:
+                with suppress(Exception):
+                    self.consumer.ack(msg.entry_id)
+
+    def _drain(self) -> None:
+        deadline = time.monotonic() + _drain_timeout_sec()
+        with self._cond:
+            log.info(
+                f"{self._log_prefix}_draining",
+                extra={"payload": {"queue": self.spec.stream, "in_flight": self._in_flight}},
+            )
+            while self._in_flight > 0:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    break
+                self._cond.wait(left)
+            remaining = self._in_flight
+        # Задачи, не уложившиеся в таймаут, дорабатывают в фоне: их ACK consumer после close()
+        # отправляет сразу, без пачки.
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.consumer.close()
+        log.info(
+            f"{self._log_prefix}_stopped",
+            extra={"payload": {"queue": self.spec.stream, "in_flight": remaining}},
+        )
+
+
+def run_stage_worker(spec: StageWorkerSpec, handler: TaskHandler) -> None:
+    """Запустить стадию с сигналами SIGTERM/SIGINT; возвращается после drain."""
+    runtime = StageWorkerRuntime(spec, handler)
+    runtime.install_signal_handlers()
+    runtime.run()
@@ -1,7 +1,33 @@
-from .embeddings import cosine_similarity_dense, embed_text_hashing, hashing_embedding_model_id
+from .ann_index import RAGIVFIndex
+from .corpus import RAGCorpus
+from .embedding_cache import RAGEmbeddingCacheStore
+from .embeddings import (
+    cosine_similarity_dense,
+    embed_text_hashing,
+    embed_texts_hashing,
+    hashing_embedding_model_id,
+)
+from .index_file import INDEX_FILE_FORMAT, read_index_file, read_index_header, write_index_file
+from .job_store import RAGIndexJobStore
+from .keyword_index import RAGKeywordIndex
+from .meta_filter import RAGMetaFilterIndex
+from .vector_store import EMBEDDING_QUANTIZATIONS, RAGVectorStore
 
 __all__ = [
+    "EMBEDDING_QUANTIZATIONS",
+    "INDEX_FILE_FORMAT",
+    "RAGCorpus",
+    "RAGEmbeddingCacheStore",
+    "RAGIVFIndex",
+    "RAGIndexJobStore",
+    "RAGKeywordIndex",
+    "RAGMetaFilterIndex",
+    "RAGVectorStore",
     "cosine_similarity_dense",
     "embed_text_hashing",
+    "embed_texts_hashing",
     "hashing_embedding_model_id",
+    "read_index_file",
+    "read_index_header",
+    "write_index_file",
 ]
@@ -0,0 +1,105 @@
+"""
+Приближённый поиск ближайших соседей (IVF) по матрице эмбеддингов RAG.
+
+Назначение:
+- строки матрицы разбиваются на n_lists кластеров сферическим k-means (косинус)
+- на запросе косинус считается только по строкам nprobe ближайших кластеров
+- nprobe — ручка recall/latency: больше списков — выше recall и дольше поиск
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+# k-means учится на подвыборке: дальше качество центроидов почти не растёт, а время — да.
+_TRAIN_ROWS_PER_LIST = 64
+_ASSIGN_BATCH = 8192
+
+
+def _normalized(matrix: np.ndarray) -> np.ndarray:
+    mat = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(mat, axis=1, keepdims=True)
+    return np.divide(mat, norms, out=np.zeros_like(mat), where=norms > 1e-6)
+
+
+def _assign(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    out = np.empty((matrix.shape[0],), dtype=np.int64)
+    for start in range(0, matrix.shape[0], _ASSIGN_BATCH):
+        block = _normalized(matrix[start : start + _ASSIGN_BATCH])
+        out[start : start + block.shape[0]] = np.argmax(block @ centroids.T, axis=1)
+    return out
+
+
+class RAGIVFIndex:
+    """
+    Inverted file: centroids[k, dim], списки строк подряд в rows, границы — offsets[k + 1].
+    """
+
+    def __init__(self, *, centroids: np.ndarray, offsets: np.ndarray, rows: np.ndarray) -> None:
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.rows = np.asarray(rows, dtype=np.int32)
+        if len(self.offsets) != len(self.centroids) + 1:
+            raise ValueError("invalid_ann_index_offsets")
+
+    @classmethod
+    def build(
+        cls,
+        matrix: np.ndarray,
+        *,
+        n_lists: int = 0,
+        iterations: int = 8,
+        seed: int = 0,
+    ) -> RAGIVFIndex:
+        n_rows = int(matrix.shape[0])
+        dim = int(matrix.shape[1]) if matrix.ndim == 2 else 0
+        k = int(n_lists) if n_lists > 0 else int(math.sqrt(max(1, n_rows)))
+        k = max(1, min(k, n_rows))
+        if n_rows == 0 or dim == 0:
+            return cls(
+                centroids=np.zeros((0, dim), dtype=np.float32),
+                offsets=np.zeros((1,), dtype=np.int64),
+                rows=np.zeros((0,), dtype=np.int32),
+            )
+        rng = np.random.default_rng(seed)
+        sample_size = min(n_rows, max(k, k * _TRAIN_ROWS_PER_LIST))
+        sample_ids = np.sort(rng.choice(n_rows, size=sample_size, replace=False))
+        sample = _normalized(matrix[sample_ids])
+        centroids = sample[rng.choice(sample_size, size=k, replace=False)].copy()
+        for _ in range(max(1, int(iterations))):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=k)
+            empty = counts == 0
+            # Пустой кластер получает случайную строку выборки, чтобы списки не вырождались.
+            if empty.any():
+                sums[empty] = sample[rng.choice(sample_size, size=int(empty.sum()))]
+            centroids = _normalized(sums)
+        labels = _assign(matrix, centroids)
+        order = np.argsort(labels, kind="stable")
+        offsets = np.zeros((k + 1,), dtype=np.int64)
+        offsets[1:] = np.cumsum(np.bincount(labels, minlength=k))
+        return cls(centroids=centroids, offsets=offsets, rows=order.astype(np.int32))
+
+    @property
+    def n_lists(self) -> int:
+        return int(self.centroids.shape[0])
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.centroids.nbytes + self.offsets.nbytes + self.rows.nbytes)
+
+    def probe(self, query: np.ndarray, *, nprobe: int) -> np.ndarray:
+        """Строки матрицы из nprobe кластеров, ближайших к запросу (порядок не определён)."""
+        if self.n_lists == 0:
+            return np.zeros((0,), dtype=np.int64)
+        q = np.asarray(query, dtype=np.float32)[: self.centroids.shape[1]]
+        width = q.shape[0]
+        scores = self.centroids[:, :width] @ q
+        take = max(1, min(int(nprobe), self.n_lists))
+        lists = np.argpartition(-scores, take - 1)[:take] if take < self.n_lists else np.arange(self.n_lists)
+        parts = [self.rows[self.offsets[i] : self.offsets[i + 1]] for i in lists.tolist()]
+        return np.concatenate(parts).astype(np.int64) if parts else np.zeros((0,), dtype=np.int64)
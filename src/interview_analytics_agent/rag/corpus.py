@@ -0,0 +1,309 @@
+"""
+Глобальный RAG-корпус по всем проиндексированным встречам и файлам (records/_global/rag_corpus).
+
+Назначение:
+- чанки всех документов лежат в нескольких сегментах формата rag_index_v3 + manifest.json
+- добавление/переиндексация документа пишет новый маленький сегмент, старая копия становится
+  tombstone (manifest указывает на живой сегмент документа)
+- запрос берёт маску чанков выбранных документов внутри сегмента — без чтения индексов встреч
+- сегменты сливаются, когда их слишком много или в сегменте много tombstone-чанков
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .ann_index import RAGIVFIndex
+from .index_file import INDEX_FILE_FORMAT, read_index_file, write_index_file
+from .keyword_index import RAGKeywordIndex
+from .meta_filter import RAGMetaFilterIndex
+from .vector_store import RAGVectorStore
+
+CORPUS_SCHEMA_VERSION = "rag_corpus_v1"
+_MANIFEST_FILENAME = "manifest.json"
+# Сегмент переписывается при слиянии, если в нём больше половины удалённых чанков.
+_MAX_DEAD_RATIO = 0.5
+
+
+def _stat_key(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return int(st.st_mtime_ns), int(st.st_size)
+
+
+def _empty_manifest() -> dict[str, Any]:
+    return {"schema_version": CORPUS_SCHEMA_VERSION, "generation": 0, "segments": {}, "docs": {}}
+
+
+def _stack_vectors(parts: list[tuple[RAGVectorStore | None, int]]) -> RAGVectorStore | None:
+    if not any(isinstance(store, RAGVectorStore) for store, _rows in parts):
+        return None
+    dim = max((store.dim for store, _rows in parts if isinstance(store, RAGVectorStore)), default=0)
+    blocks: list[np.ndarray] = []
+    for store, rows in parts:
+        block = np.zeros((rows, dim), dtype=np.float32)
+        if isinstance(store, RAGVectorStore) and len(store) == rows and store.dim:
+            block[:, : store.dim] = store.matrix
+        blocks.append(block)
+    return RAGVectorStore(np.vstack(blocks) if blocks else np.zeros((0, dim), dtype=np.float32))
+
+
+class RAGCorpus:
+    def __init__(
+        self,
+        root: Path | str,
+        *,
+        max_segments: int = 8,
+        ann_min_rows: int = 0,
+        quantization: str = "float32",
+    ) -> None:
+        self.root = Path(root)
+        self.max_segments = max(2, int(max_segments))
+        # Сегменты от ann_min_rows векторов получают IVF-индекс (0 — не строить).
+        self.ann_min_rows = max(0, int(ann_min_rows))
+        # Формат эмбеддингов в новых сегментах; уже записанные читаются в своём.
+        self.quantization = quantization
+        self._lock = threading.RLock()
+        self._manifest: tuple[tuple[int, int] | None, dict[str, Any]] | None = None
+        self._segments: dict[str, tuple[tuple[int, int] | None, dict[str, Any]]] = {}
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / _MANIFEST_FILENAME
+
+    def manifest(self) -> dict[str, Any]:
+        stat = _stat_key(self.manifest_path)
+        with self._lock:
+            if self._manifest is not None and self._manifest[0] == stat:
+                return self._manifest[1]
+            manifest = _empty_manifest()
+            if stat is not None:
+                try:
+                    raw = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+                    if isinstance(raw, dict) and raw.get("schema_version") == CORPUS_SCHEMA_VERSION:
+                        manifest = raw
+                except Exception:
+                    manifest = _empty_manifest()
+            self._manifest = (stat, manifest)
+            return manifest
+
+    def doc(self, key: str) -> dict[str, Any] | None:
+        value = (self.manifest().get("docs") or {}).get(key)
+        return value if isinstance(value, dict) else None
+
+    def upsert(self, key: str, payload: dict[str, Any], *, meta: dict[str, Any]) -> None:
+        chunks = [chunk for chunk in list(payload.get("chunks") or []) if isinstance(chunk, dict)]
+        keyword_index = payload.get("keyword_index")
+        if not isinstance(keyword_index, RAGKeywordIndex) or keyword_index.chunk_count != len(chunks):
+            raise ValueError("rag_corpus_keyword_index_required")
+        store = payload.get("vector_store")
+        store = store if isinstance(store, RAGVectorStore) and len(store) == len(chunks) else None
+        with self._lock:
+            manifest = json.loads(json.dumps(self.manifest()))
+            seg_id = self._next_segment_id(manifest)
+            self._write_segment(
+                seg_id,
+                docs=[{"key": key, "start": 0, "end": len(chunks)}],
+                chunks=chunks,
+                keyword_index=keyword_index,
+                vector_store=store,
+            )
+            self._drop_doc(manifest, key)
+            manifest["segments"][seg_id] = {"file": f"{seg_id}.ragidx", "chunks": len(chunks), "dead": 0}
+            manifest["docs"][key] = {**meta, "segment": seg_id, "start": 0, "end": len(chunks)}
+            self._compact(manifest)
+            self._commit(manifest)
+
+    def remove(self, key: str) -> bool:
+        with self._lock:
+            manifest = json.loads(json.dumps(self.manifest()))
+            if key not in manifest["docs"]:
+                return False
+            self._drop_doc(manifest, key)
+            self._compact(manifest)
+            self._commit(manifest)
+            return True
+
+    def views(self, keys: list[str]) -> tuple[list[dict[str, Any]], list[str]]:
+        """
+        Один view на сегмент: payload сегмента + chunk_mask выбранных документов.
+
+        Вторым значением — ключи, которых нет в корпусе или чей сегмент не читается.
+        """
+        manifest = self.manifest()
+        docs = manifest.get("docs") or {}
+        by_segment: dict[str, list[tuple[str, dict[str, Any]]]] = {}
+        missing: list[str] = []
+        for key in dict.fromkeys(keys):
+            doc = docs.get(key)
+            if isinstance(doc, dict):
+                by_segment.setdefault(str(doc.get("segment") or ""), []).append((key, doc))
+            else:
+                missing.append(key)
+        out: list[dict[str, Any]] = []
+        for seg_id, seg_docs in by_segment.items():
+            try:
+                payload = self._segment(seg_id, manifest)
+            except (OSError, ValueError):
+                payload = None
+            if payload is None:
+                missing.extend(key for key, _doc in seg_docs)
+                continue
+            n = len(payload.get("chunks") or [])
+            mask = np.zeros((n,), dtype=bool)
+            for _key, doc in seg_docs:
+                mask[int(doc.get("start") or 0) : int(doc.get("end") or 0)] = True
+            first = seg_docs[0][1]
+            view = {key: value for key, value in payload.items() if key not in {"docs", "vector", "schema_version"}}
+            view["schema_version"] = str(first.get("schema_version") or payload.get("schema_version") or "")
+            view["vector"] = dict(first.get("vector") or {}) if isinstance(first.get("vector"), dict) else {}
+            view["chunk_mask"] = mask
+            out.append(view)
+        return out, missing
+
+    def _next_segment_id(self, manifest: dict[str, Any]) -> str:
+        generation = int(manifest.get("generation") or 0) + 1
+        manifest["generation"] = generation
+        return f"seg_{generation:08d}"
+
+    def _drop_doc(self, manifest: dict[str, Any], key: str) -> None:
+        old = manifest["docs"].pop(key, None)
+        if not isinstance(old, dict):
+            return
+        seg = manifest["segments"].get(str(old.get("segment") or ""))
+        if isinstance(seg, dict):
+            seg["dead"] = int(seg.get("dead") or 0) + int(old.get("end") or 0) - int(old.get("start") or 0)
+
+    def _segment(self, seg_id: str, manifest: dict[str, Any]) -> dict[str, Any] | None:
+        spec = (manifest.get("segments") or {}).get(seg_id)
+        if not isinstance(spec, dict):
+            return None
+        path = self.root / str(spec.get("file") or "")
+        stat = _stat_key(path)
+        with self._lock:
+            cached = self._segments.get(seg_id)
+            if cached is not None and cached[0] == stat:
+                return cached[1]
+        if stat is None:
+            return None
+        payload = read_index_file(path)
+        # Фильтр метаданных строится раз на загрузку сегмента и попадает во все его view.
+        payload["meta_filter"] = RAGMetaFilterIndex.build(list(payload.get("chunks") or []))
+        with self._lock:
+            self._segments[seg_id] = (stat, payload)
+        return payload
+
+    def _write_segment(
+        self,
+        seg_id: str,
+        *,
+        docs: list[dict[str, Any]],
+        chunks: list[dict[str, Any]],
+        keyword_index: RAGKeywordIndex,
+        vector_store: RAGVectorStore | None,
+    ) -> None:
+        payload: dict[str, Any] = {
+            "schema_version": INDEX_FILE_FORMAT,
+            "segment_id": seg_id,
+            "docs": docs,
+            "chunk_count": len(chunks),
+            "chunks": chunks,
+            "keyword_index": keyword_index,
+        }
+        if vector_store is not None:
+            if self.ann_min_rows and len(vector_store) >= self.ann_min_rows and vector_store.ann is None:
+                vector_store.ann = RAGIVFIndex.build(vector_store.matrix)
+            payload["vector_store"] = vector_store.quantize(self.quantization)
+        write_index_file(self.root / f"{seg_id}.ragidx", payload)
+
+    def _compact(self, manifest: dict[str, Any]) -> None:
+        segments: dict[str, dict[str, Any]] = manifest["segments"]
+        for seg_id in [sid for sid, seg in segments.items() if int(seg.get("chunks") or 0) <= int(seg.get("dead") or 0)]:
+            segments.pop(seg_id, None)
+        merge = {
+            seg_id
+            for seg_id, seg in segments.items()
+            if int(seg.get("dead") or 0) > _MAX_DEAD_RATIO * max(1, int(seg.get("chunks") or 0))
+        }
+        if len(segments) > self.max_segments:
+            live = {sid: int(seg.get("chunks") or 0) - int(seg.get("dead") or 0) for sid, seg in segments.items()}
+            base = max(live, key=lambda sid: live[sid])
+            # Крупный здоровый сегмент не переписываем — сливаем мелкие (tiered merge).
+            keep_base = base not in merge and live[base] * 2 >= sum(live.values())
+            merge.update(sid for sid in segments if not (keep_base and sid == base))
+        if not merge:
+            return
+        ordered = sorted(merge)
+        docs_by_segment: dict[str, list[tuple[str, dict[str, Any]]]] = {sid: [] for sid in ordered}
+        for key, doc in manifest["docs"].items():
+            sid = str(doc.get("segment") or "")
+            if sid in docs_by_segment:
+                docs_by_segment[sid].append((key, doc))
+        chunks: list[dict[str, Any]] = []
+        kw_parts: list[RAGKeywordIndex] = []
+        vec_parts: list[tuple[RAGVectorStore | None, int]] = []
+        placed: list[tuple[str, int, int]] = []
+        for sid in ordered:
+            items = sorted(docs_by_segment[sid], key=lambda item: int(item[1].get("start") or 0))
+            if not items:
+                continue
+            payload = self._segment(sid, manifest)
+            if payload is None:
+                # Файл сегмента потерян — его документы выпадают из корпуса и переиндексируются по запросу.
+                for key, _doc in items:
+                    manifest["docs"].pop(key, None)
+                continue
+            ordinals: list[int] = []
+            for key, doc in items:
+                start, end = int(doc.get("start") or 0), int(doc.get("end") or 0)
+                placed.append((key, len(chunks) + len(ordinals), len(chunks) + len(ordinals) + (end - start)))
+                ordinals.extend(range(start, end))
+            seg_chunks = list(payload.get("chunks") or [])
+            chunks.extend(seg_chunks[o] for o in ordinals)
+            kw_parts.append(payload["keyword_index"].select(ordinals))
+            store = payload.get("vector_store")
+            if isinstance(store, RAGVectorStore):
+                vec_parts.append((RAGVectorStore(store.dequantize(np.asarray(ordinals, dtype=np.int64))), len(ordinals)))
+            else:
+                vec_parts.append((None, len(ordinals)))
+        for sid in ordered:
+            segments.pop(sid, None)
+        if not placed:
+            return
+        seg_id = self._next_segment_id(manifest)
+        self._write_segment(
+            seg_id,
+            docs=[{"key": key, "start": start, "end": end} for key, start, end in placed],
+            chunks=chunks,
+            keyword_index=RAGKeywordIndex.concat(kw_parts),
+            vector_store=_stack_vectors(vec_parts),
+        )
+        segments[seg_id] = {"file": f"{seg_id}.ragidx", "chunks": len(chunks), "dead": 0}
+        for key, start, end in placed:
+            manifest["docs"][key].update({"segment": seg_id, "start": start, "end": end})
+
+    def _commit(self, manifest: dict[str, Any]) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_name(_MANIFEST_FILENAME + ".tmp")
+        tmp.write_text(json.dumps(manifest, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+        self._manifest = (_stat_key(self.manifest_path), manifest)
+        live_files = {str(seg.get("file") or "") for seg in manifest["segments"].values()}
+        # Сначала отпускаем кэш мёртвых сегментов: на Windows открытое отображение не даёт удалить файл.
+        for seg_id in [sid for sid in self._segments if sid not in manifest["segments"]]:
+            self._segments.pop(seg_id, None)
+        for path in self.root.glob("seg_*.ragidx"):
+            if path.name not in live_files:
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError:
+                    # Файл ещё открыт (запрос в другом потоке/процессе) — удалится при следующем commit.
+                    pass
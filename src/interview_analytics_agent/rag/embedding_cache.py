@@ -0,0 +1,140 @@
+"""
+Дисковый кэш эмбеддингов RAG в одном SQLite-файле.
+
+Назначение:
+- один файл (WAL) вместо JSON-файла на каждый вектор
+- векторы хранятся packed blob: float32, float16 или int8 (+ float32-масштаб в начале blob)
+- чтение и запись пачками: один запрос на вызов _rag_embed_texts
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections.abc import Iterable
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Лимит SQLite на число параметров в запросе (999 в старых сборках).
+_SQL_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rag_embeddings (
+    cache_key TEXT PRIMARY KEY,
+    dim INTEGER NOT NULL,
+    vector BLOB NOT NULL,
+    provider TEXT NOT NULL DEFAULT '',
+    provider_label TEXT NOT NULL DEFAULT '',
+    model TEXT NOT NULL DEFAULT '',
+    cached_at TEXT NOT NULL DEFAULT '',
+    dtype TEXT NOT NULL DEFAULT 'float32'
+) WITHOUT ROWID
+"""
+_SCALE = np.dtype("<f4")
+
+
+def _pack(vector: Iterable[float], dtype: str = "float32") -> bytes:
+    values = np.asarray(list(vector), dtype=np.float32)
+    if dtype == "float16":
+        return values.astype("<f2").tobytes()
+    if dtype == "int8":
+        peak = float(np.max(np.abs(values))) if values.size else 0.0
+        scale = np.float32(peak / 127.0)
+        codes = np.clip(np.rint(values / scale), -127, 127) if scale > 0 else np.zeros_like(values)
+        return np.asarray([scale], dtype=_SCALE).tobytes() + codes.astype(np.int8).tobytes()
+    return values.astype("<f4").tobytes()
+
+
+def _unpack(blob: bytes, dtype: str = "float32") -> list[float]:
+    if dtype == "float16":
+        return np.frombuffer(blob, dtype="<f2").astype(np.float32).tolist()
+    if dtype == "int8":
+        scale = np.frombuffer(blob[: _SCALE.itemsize], dtype=_SCALE)[0]
+        codes = np.frombuffer(blob[_SCALE.itemsize :], dtype=np.int8)
+        return (codes.astype(np.float32) * scale).tolist()
+    return np.frombuffer(blob, dtype="<f4").tolist()
+
+
+class RAGEmbeddingCacheStore:
+    """
+    Key-value кэш: cache_key -> вектор (читается всегда как список float).
+
+    Соединение одно на процесс и файл; доступ сериализуется локом (sqlite3 не потокобезопасен
+    при check_same_thread=False), WAL позволяет другим процессам читать параллельно.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=10.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        columns = {str(row[1]) for row in self._conn.execute("PRAGMA table_info(rag_embeddings)")}
+        if "dtype" not in columns:
+            # Кэш до квантования: все строки — float32.
+            self._conn.execute("ALTER TABLE rag_embeddings ADD COLUMN dtype TEXT NOT NULL DEFAULT 'float32'")
+
+    def get_many(self, keys: Iterable[str]) -> dict[str, list[float]]:
+        wanted = list(dict.fromkeys(str(k) for k in keys if k))
+        out: dict[str, list[float]] = {}
+        if not wanted:
+            return out
+        with self._lock:
+            for start in range(0, len(wanted), _SQL_BATCH):
+                batch = wanted[start : start + _SQL_BATCH]
+                marks = ",".join("?" for _ in batch)
+                rows = self._conn.execute(
+                    f"SELECT cache_key, vector, dtype FROM rag_embeddings WHERE cache_key IN ({marks})",
+                    batch,
+                ).fetchall()
+                for key, blob, dtype in rows:
+                    if blob:
+                        out[str(key)] = _unpack(blob, str(dtype or "float32"))
+        return out
+
+    def put_many(
+        self,
+        vectors_by_key: dict[str, list[float]],
+        *,
+        provider: str = "",
+        provider_label: str = "",
+        model: str = "",
+        quantization: str = "float32",
+    ) -> None:
+        if not vectors_by_key:
+            return
+        dtype = quantization if quantization in {"float16", "int8"} else "float32"
+        cached_at = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+        rows = [
+            (str(key), len(vec), _pack(vec, dtype), provider, provider_label, model, cached_at, dtype)
+            for key, vec in vectors_by_key.items()
+            if key and vec
+        ]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO rag_embeddings"
+                    " (cache_key, dim, vector, provider, provider_label, model, cached_at, dtype)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def count(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM rag_embeddings").fetchone()
+        return int(row[0] if row else 0)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
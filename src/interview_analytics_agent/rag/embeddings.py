@@ -3,11 +3,15 @@ from __future__ import annotations
 import hashlib
 import math
 import re
+from functools import lru_cache
 from urllib.parse import urlparse
 
+import numpy as np
 import requests
 
 _TOKEN_RE = re.compile(r"[0-9A-Za-zА-Яа-я_+\-]{2,}", flags=re.UNICODE)
+# Лимит batchEmbedContents: не больше 100 запросов в одном вызове.
+_GEMINI_BATCH_LIMIT = 100
 
 
 def hashing_embedding_model_id(*, dim: int = 96, char_ngrams: bool = True) -> str:
@@ -67,6 +71,78 @@ def embed_text_hashing(
     return [round(v / norm, 8) for v in vec]
 
 
+@lru_cache(maxsize=262_144)
+def _feature_hash(feature: str) -> tuple[int, float]:
+    # Не зависит от dim: индекс = hash % dim считается уже векторно.
+    digest = _stable_feature_hash(feature)
+    return int.from_bytes(digest[:4], "big"), 1.0 if (digest[4] & 1) == 0 else -1.0
+
+
+@lru_cache(maxsize=65_536)
+def _token_features(token: str, char_ngrams: bool) -> tuple[tuple[int, ...], tuple[float, ...]]:
+    hashes: list[int] = []
+    weights: list[float] = []
+    h, sign = _feature_hash(f"w:{token}")
+    hashes.append(h)
+    weights.append(1.0 * sign)
+    if char_ngrams and len(token) >= 4:
+        for gram in _iter_char_ngrams(token):
+            gh, gsign = _feature_hash(f"g:{gram}")
+            hashes.append(gh)
+            weights.append(0.18 * gsign)
+    return tuple(hashes), tuple(weights)
+
+
+def _round8(values: np.ndarray) -> np.ndarray:
+    """
+    round(v, 8) как в Python, но векторно.
+
+    rint(v * 1e8) расходится с десятичным округлением Python только у значений,
+    чьё произведение почти ровно на границе .5 — их докручиваем через round().
+    """
+    scaled = values * 1e8
+    out = np.rint(scaled) / 1e8
+    frac = scaled - np.floor(scaled)
+    for pos in zip(*np.nonzero(np.abs(frac - 0.5) < 1e-6)):
+        out[pos] = round(float(values[pos]), 8)
+    return out
+
+
+def embed_texts_hashing(
+    texts: list[str] | tuple[str, ...],
+    *,
+    dim: int = 96,
+    char_ngrams: bool = True,
+) -> np.ndarray:
+    """
+    Пакетный hashing_v1: матрица (len(texts), dim) float32.
+
+    Совпадает побитово с float32(embed_text_hashing(text)): признаки складываются
+    np.add.at в том же порядке, норма — последовательной суммой, округление — как round().
+    """
+    dim_safe = max(8, min(int(dim or 96), 2048))
+    items = [str(text or "") for text in list(texts or [])]
+    row_ids: list[int] = []
+    hashes: list[int] = []
+    weights: list[float] = []
+    for row, text in enumerate(items):
+        for token in _tokenize(text):
+            token_hashes, token_weights = _token_features(token, bool(char_ngrams))
+            row_ids.extend([row] * len(token_hashes))
+            hashes.extend(token_hashes)
+            weights.extend(token_weights)
+    matrix = np.zeros((len(items), dim_safe), dtype=np.float64)
+    if hashes:
+        cols = np.asarray(hashes, dtype=np.int64) % dim_safe
+        np.add.at(matrix, (np.asarray(row_ids, dtype=np.int64), cols), np.asarray(weights, dtype=np.float64))
+    # cumsum складывает слева направо — как sum() в embed_text_hashing (np.sum суммирует попарно).
+    norms = np.sqrt(np.cumsum(matrix * matrix, axis=1)[:, -1]) if len(items) else np.zeros((0,))
+    valid = norms > 1e-12
+    normalized = np.zeros_like(matrix)
+    normalized[valid] = _round8(matrix[valid] / norms[valid, None])
+    return normalized.astype(np.float32)
+
+
 def cosine_similarity_dense(a: list[float] | tuple[float, ...], b: list[float] | tuple[float, ...]) -> float:
     if not a or not b:
         return 0.0
@@ -243,6 +319,61 @@ def embed_texts_gemini(
     if not items:
         return []
 
+    headers = {"Content-Type": "application/json"}
+    timeout = max(1.0, float(timeout_s or 8.0))
+    out: list[list[float]] = []
+    for start in range(0, len(items), _GEMINI_BATCH_LIMIT):
+        batch = items[start : start + _GEMINI_BATCH_LIMIT]
+        url = base.rstrip("/") + f"/models/{model}:batchEmbedContents?key={key}"
+        payload = {
+            "requests": [
+                {
+                    "model": f"models/{model}",
+                    "content": {"parts": [{"text": text}]},
+                    "taskType": "RETRIEVAL_DOCUMENT",
+                }
+                for text in batch
+            ]
+        }
+        resp = requests.post(url, headers=headers, json=payload, timeout=timeout)
+        if resp.status_code == 404:
+            # Старые/прокси-эндпоинты без batchEmbedContents — по одному запросу на текст.
+            out.extend(_embed_texts_gemini_single(batch, base=base, model=model, key=key, timeout=timeout))
+            continue
+        if resp.status_code >= 400:
+            raise RuntimeError(f"embeddings_http_{resp.status_code}:{(resp.text or '')[:180]}")
+        try:
+            body = resp.json()
+        except Exception as exc:
+            raise RuntimeError(f"embeddings_invalid_json:{exc}") from exc
+        rows = body.get("embeddings") if isinstance(body, dict) else None
+        if not isinstance(rows, list) or len(rows) != len(batch):
+            got = len(rows) if isinstance(rows, list) else 0
+            raise RuntimeError(f"embeddings_count_mismatch:expected={len(batch)} got={got}")
+        for row in rows:
+            out.append(_gemini_values(row))
+    return out
+
+
+def _gemini_values(embedding: object) -> list[float]:
+    values = embedding.get("values") if isinstance(embedding, dict) else None
+    if not isinstance(values, list) or not values:
+        raise RuntimeError("embeddings_missing_vector")
+    try:
+        dense = [float(v or 0.0) for v in values]
+    except Exception as exc:
+        raise RuntimeError(f"embeddings_invalid_vector:{exc}") from exc
+    return _normalize_dense_embedding(dense)
+
+
+def _embed_texts_gemini_single(
+    items: list[str],
+    *,
+    base: str,
+    model: str,
+    key: str,
+    timeout: float,
+) -> list[list[float]]:
     out: list[list[float]] = []
     url = base.rstrip("/") + f"/models/{model}:embedContent?key={key}"
     headers = {"Content-Type": "application/json"}
@@ -251,20 +382,12 @@ def embed_texts_gemini(
             "content": {"parts": [{"text": text}]},
             "taskType": "RETRIEVAL_DOCUMENT",
         }
-        resp = requests.post(url, headers=headers, json=payload, timeout=max(1.0, float(timeout_s or 8.0)))
+        resp = requests.post(url, headers=headers, json=payload, timeout=timeout)
         if resp.status_code >= 400:
             raise RuntimeError(f"embeddings_http_{resp.status_code}:{(resp.text or '')[:180]}")
         try:
             body = resp.json()
         except Exception as exc:
             raise RuntimeError(f"embeddings_invalid_json:{exc}") from exc
-        embedding = body.get("embedding") if isinstance(body, dict) else None
-        values = embedding.get("values") if isinstance(embedding, dict) else None
-        if not isinstance(values, list) or not values:
-            raise RuntimeError("embeddings_missing_vector")
-        try:
-            dense = [float(v or 0.0) for v in values]
-        except Exception as exc:
-            raise RuntimeError(f"embeddings_invalid_vector:{exc}") from exc
-        out.append(_normalize_dense_embedding(dense))
+        out.append(_gemini_values(body.get("embedding") if isinstance(body, dict) else None))
     return out
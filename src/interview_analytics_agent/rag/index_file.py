@@ -0,0 +1,297 @@
+"""
+Бинарный формат RAG-индекса (rag_index_v3).
+
+Назначение:
+- один файл вместо pretty-printed JSON: заголовок + секции, выровненные по 64 байта
+- метаданные чанков лежат колонками (повторяющиеся значения — словарём), текст — одним utf-8 блоком
+- postings BM25 и эмбеддинги — упакованные массивы; эмбеддинги открываются через np.memmap
+  (float32, float16 или int8 + секция embedding_scales)
+- IVF-индекс (если построен) — три секции ann_* рядом с эмбеддингами
+
+Раскладка файла:
+    MAGIC (8 байт) | uint32 LE длина заголовка | заголовок JSON | паддинг | секции
+Смещения секций в заголовке отсчитываются от начала области данных.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from .ann_index import RAGIVFIndex
+from .keyword_index import RAGKeywordIndex
+from .vector_store import RAGVectorStore
+
+INDEX_FILE_FORMAT = "rag_index_v3"
+INDEX_FILE_MAGIC = b"RAGIDX3\n"
+_ALIGN = 64
+_PREFIX = struct.Struct("<8sI")
+# Ключи payload, которые живут в секциях, а не в meta заголовка.
+_SECTION_KEYS = {"chunks", "keyword_index", "vector_store"}
+# На Windows открытый memmap не даёт ни os.replace поверх файла, ни unlink: индексы из кэша
+# держат отображение, и пересборка индекса падала бы с PermissionError. Там читаем в память.
+_MMAP_DEFAULT = os.name != "nt"
+
+
+def _aligned(value: int) -> int:
+    return (value + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _json_bytes(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _encode_columns(chunks: list[dict[str, Any]]) -> dict[str, Any]:
+    keys: list[str] = []
+    for chunk in chunks:
+        for key in chunk:
+            if key not in keys:
+                keys.append(key)
+    n = len(chunks)
+    columns: dict[str, Any] = {}
+    for key in keys:
+        if key == "text":
+            # Текст — отдельной секцией chunk_text; в keys остаётся ради порядка ключей.
+            continue
+        values = [chunk.get(key) for chunk in chunks]
+        missing = [idx for idx, chunk in enumerate(chunks) if key not in chunk]
+        distinct: list[Any] = []
+        ids: list[int] = []
+        seen: dict[str, int] = {}
+        for value in values:
+            marker = json.dumps(value, ensure_ascii=False, sort_keys=True)
+            vid = seen.get(marker)
+            if vid is None:
+                vid = len(distinct)
+                seen[marker] = vid
+                distinct.append(value)
+            ids.append(vid)
+        if len(distinct) * 2 <= n:
+            column: dict[str, Any] = {"kind": "dict", "values": distinct, "ids": ids}
+        else:
+            column = {"kind": "plain", "values": values}
+        if missing:
+            column["missing"] = missing
+        columns[key] = column
+    return {"keys": keys, "columns": columns}
+
+
+def _decode_columns(payload: dict[str, Any], texts: list[str]) -> list[dict[str, Any]]:
+    n = len(texts)
+    chunks: list[dict[str, Any]] = [{} for _ in range(n)]
+    columns = payload.get("columns") if isinstance(payload.get("columns"), dict) else {}
+    for key in list(payload.get("keys") or []):
+        if key == "text":
+            for idx in range(n):
+                chunks[idx]["text"] = texts[idx]
+            continue
+        column = columns.get(key) if isinstance(columns.get(key), dict) else {}
+        if column.get("kind") == "dict":
+            distinct = list(column.get("values") or [])
+            values = [distinct[int(vid)] for vid in list(column.get("ids") or [])]
+        else:
+            values = list(column.get("values") or [])
+        if len(values) != n:
+            raise ValueError("rag_index_file_invalid")
+        missing = set(int(v) for v in list(column.get("missing") or []))
+        for idx, value in enumerate(values):
+            if idx in missing:
+                continue
+            # Значения из словаря общие между чанками — копируем контейнеры.
+            if isinstance(value, dict):
+                value = dict(value)
+            elif isinstance(value, list):
+                value = list(value)
+            chunks[idx][key] = value
+    return chunks
+
+
+def _text_block(values: list[str]) -> tuple[bytes, np.ndarray]:
+    encoded = [str(v or "").encode("utf-8") for v in values]
+    offsets = np.zeros((len(encoded) + 1,), dtype=np.int64)
+    if encoded:
+        offsets[1:] = np.cumsum([len(item) for item in encoded])
+    return b"".join(encoded), offsets
+
+
+def write_index_file(path: Path | str, payload: dict[str, Any]) -> None:
+    """
+    Сохраняет payload индекса (meta + chunks + keyword_index + vector_store) атомарно.
+    """
+    target = Path(path)
+    chunks = [chunk for chunk in list(payload.get("chunks") or []) if isinstance(chunk, dict)]
+    sections: list[tuple[str, str, tuple[int, ...], bytes]] = []
+
+    def add_array(name: str, array: np.ndarray) -> None:
+        arr = np.ascontiguousarray(array)
+        sections.append((name, arr.dtype.str, tuple(int(v) for v in arr.shape), arr.tobytes()))
+
+    def add_bytes(name: str, kind: str, data: bytes) -> None:
+        sections.append((name, kind, (len(data),), data))
+
+    texts, text_offsets = _text_block([str(chunk.get("text") or "") for chunk in chunks])
+    add_bytes("chunk_columns", "json", _json_bytes(_encode_columns(chunks)))
+    add_bytes("chunk_text", "utf8", texts)
+    add_array("chunk_text_offsets", text_offsets)
+
+    keyword_index = payload.get("keyword_index")
+    if isinstance(keyword_index, RAGKeywordIndex):
+        terms, offsets, pairs = keyword_index.to_arrays()
+        add_bytes("kw_terms", "utf8", "\n".join(terms).encode("utf-8"))
+        add_array("kw_offsets", np.asarray(offsets, dtype=np.int64))
+        add_array("kw_pairs", np.asarray(pairs, dtype=np.int32).reshape(-1, 2))
+        add_array("kw_chunk_lengths", np.asarray(keyword_index.chunk_lengths, dtype=np.int32))
+        add_array("kw_chunk_meta_ids", np.asarray(keyword_index.chunk_meta_ids, dtype=np.int32))
+        add_bytes("kw_meta_texts", "json", _json_bytes(list(keyword_index.meta_texts)))
+
+    store = payload.get("vector_store")
+    if isinstance(store, RAGVectorStore):
+        # float32/float16/int8 — как хранит store; dtype секции определяет чтение.
+        add_array("embeddings", np.asarray(store.data))
+        add_array("embedding_norms", np.asarray(store.norms, dtype=np.float32))
+        if store.scales is not None:
+            add_array("embedding_scales", np.asarray(store.scales, dtype=np.float32))
+        if isinstance(store.ann, RAGIVFIndex):
+            add_array("ann_centroids", store.ann.centroids)
+            add_array("ann_offsets", store.ann.offsets)
+            add_array("ann_rows", store.ann.rows)
+
+    table: dict[str, dict[str, Any]] = {}
+    cursor = 0
+    for name, dtype, shape, data in sections:
+        table[name] = {"offset": cursor, "nbytes": len(data), "dtype": dtype, "shape": list(shape)}
+        cursor = _aligned(cursor + len(data))
+    meta = {key: value for key, value in payload.items() if key not in _SECTION_KEYS}
+    header = _json_bytes(
+        {
+            "format": INDEX_FILE_FORMAT,
+            "chunk_count": len(chunks),
+            "meta": meta,
+            "sections": table,
+        }
+    )
+    data_start = _aligned(_PREFIX.size + len(header))
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    with tmp.open("wb") as fh:
+        fh.write(_PREFIX.pack(INDEX_FILE_MAGIC, len(header)))
+        fh.write(header)
+        for name, _dtype, _shape, data in sections:
+            fh.seek(data_start + int(table[name]["offset"]))
+            fh.write(data)
+        fh.truncate(data_start + cursor)
+    os.replace(tmp, target)
+
+
+def _read_header(fh: Any) -> tuple[dict[str, Any], int]:
+    prefix = fh.read(_PREFIX.size)
+    if len(prefix) != _PREFIX.size:
+        raise ValueError("rag_index_file_invalid")
+    magic, header_len = _PREFIX.unpack(prefix)
+    if magic != INDEX_FILE_MAGIC:
+        raise ValueError("rag_index_file_invalid")
+    header = json.loads(fh.read(header_len).decode("utf-8"))
+    if not isinstance(header, dict) or header.get("format") != INDEX_FILE_FORMAT:
+        raise ValueError("rag_index_file_invalid")
+    return header, _aligned(_PREFIX.size + header_len)
+
+
+def read_index_header(path: Path | str) -> dict[str, Any]:
+    """Только meta индекса (sha транскрипта, chunking, vector) — без чтения секций."""
+    with Path(path).open("rb") as fh:
+        header, _data_start = _read_header(fh)
+    meta = header.get("meta") if isinstance(header.get("meta"), dict) else {}
+    return dict(meta)
+
+
+def read_index_file(path: Path | str, *, mmap: bool | None = None) -> dict[str, Any]:
+    """
+    Восстанавливает payload индекса: meta, chunks, keyword_index, vector_store.
+
+    При mmap=True матрица эмбеддингов не читается целиком — страницы подтягивает ОС.
+    По умолчанию (None) — mmap везде, кроме Windows.
+    """
+    source = Path(path)
+    if mmap is None:
+        mmap = _MMAP_DEFAULT
+    with source.open("rb") as fh:
+        header, data_start = _read_header(fh)
+        table = header.get("sections") if isinstance(header.get("sections"), dict) else {}
+
+        def raw(name: str) -> bytes | None:
+            spec = table.get(name)
+            if not isinstance(spec, dict):
+                return None
+            fh.seek(data_start + int(spec["offset"]))
+            data = fh.read(int(spec["nbytes"]))
+            if len(data) != int(spec["nbytes"]):
+                raise ValueError("rag_index_file_invalid")
+            return data
+
+        def array(name: str) -> np.ndarray | None:
+            data = raw(name)
+            if data is None:
+                return None
+            spec = table[name]
+            return np.frombuffer(data, dtype=np.dtype(str(spec["dtype"]))).reshape(tuple(spec["shape"]))
+
+        text_blob = raw("chunk_text") or b""
+        text_offsets = array("chunk_text_offsets")
+        offsets_list = text_offsets.tolist() if text_offsets is not None else [0]
+        texts = [
+            text_blob[offsets_list[idx] : offsets_list[idx + 1]].decode("utf-8")
+            for idx in range(len(offsets_list) - 1)
+        ]
+        columns = json.loads((raw("chunk_columns") or b"{}").decode("utf-8"))
+        chunks = _decode_columns(columns if isinstance(columns, dict) else {}, texts)
+        if len(chunks) != int(header.get("chunk_count") or 0):
+            raise ValueError("rag_index_file_invalid")
+
+        payload: dict[str, Any] = dict(header.get("meta") or {})
+        payload["chunks"] = chunks
+
+        if "kw_offsets" in table:
+            terms_blob = (raw("kw_terms") or b"").decode("utf-8")
+            meta_texts = json.loads((raw("kw_meta_texts") or b"[]").decode("utf-8"))
+            payload["keyword_index"] = RAGKeywordIndex.from_arrays(
+                terms=terms_blob.split("\n") if terms_blob else [],
+                offsets=array("kw_offsets"),
+                pairs=array("kw_pairs"),
+                chunk_lengths=array("kw_chunk_lengths").tolist(),
+                meta_texts=meta_texts,
+                chunk_meta_ids=array("kw_chunk_meta_ids").tolist(),
+            )
+
+        spec = table.get("embeddings")
+        if isinstance(spec, dict):
+            shape = tuple(int(v) for v in spec["shape"])
+            if mmap and int(spec["nbytes"]) > 0:
+                matrix = np.memmap(
+                    source,
+                    dtype=np.dtype(str(spec["dtype"])),
+                    mode="r",
+                    offset=data_start + int(spec["offset"]),
+                    shape=shape,
+                )
+            else:
+                matrix = array("embeddings")
+            ann = None
+            if "ann_offsets" in table:
+                ann = RAGIVFIndex(
+                    centroids=array("ann_centroids"),
+                    offsets=array("ann_offsets"),
+                    rows=array("ann_rows"),
+                )
+            payload["vector_store"] = RAGVectorStore(
+                matrix,
+                norms=array("embedding_norms"),
+                ann=ann,
+                scales=array("embedding_scales"),
+            )
+    return payload
@@ -0,0 +1,207 @@
+"""
+Хранилище заданий фоновой индексации RAG в SQLite-файле.
+
+Назначение:
+- статус заданий переживает рестарт gateway (UI видит прогресс и после перезапуска)
+- незавершённые задания поднимаются при старте и продолжаются с первой неготовой встречи
+- строка встречи обновляется точечно: на задание в 1000 встреч не переписывается весь JSON
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS rag_index_jobs (
+        job_id TEXT PRIMARY KEY,
+        seq INTEGER NOT NULL,
+        priority INTEGER NOT NULL DEFAULT 0,
+        status TEXT NOT NULL,
+        params TEXT NOT NULL DEFAULT '{}',
+        created_at TEXT NOT NULL DEFAULT '',
+        started_at TEXT NOT NULL DEFAULT '',
+        finished_at TEXT NOT NULL DEFAULT '',
+        error TEXT NOT NULL DEFAULT ''
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS rag_index_job_items (
+        job_id TEXT NOT NULL,
+        ordinal INTEGER NOT NULL,
+        meeting_id TEXT NOT NULL,
+        status TEXT NOT NULL,
+        chunk_count INTEGER NOT NULL DEFAULT 0,
+        transcript_chars INTEGER NOT NULL DEFAULT 0,
+        indexed_at TEXT NOT NULL DEFAULT '',
+        cached INTEGER NOT NULL DEFAULT 0,
+        error TEXT NOT NULL DEFAULT '',
+        PRIMARY KEY (job_id, ordinal)
+    ) WITHOUT ROWID
+    """,
+)
+_JOB_COLUMNS = ("status", "started_at", "finished_at", "error")
+_ITEM_COLUMNS = ("status", "chunk_count", "transcript_chars", "indexed_at", "cached", "error")
+
+
+def _item_value(name: str, value: Any) -> Any:
+    if name == "cached":
+        return int(bool(value))
+    if name in {"chunk_count", "transcript_chars"}:
+        return int(value or 0)
+    return str(value or "")
+
+
+class RAGIndexJobStore:
+    """
+    Задание: строка rag_index_jobs (params — JSON параметров запроса) + строки встреч.
+
+    Соединение и лок — как у RAGEmbeddingCacheStore: одно соединение на процесс, WAL.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=10.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for ddl in _SCHEMA:
+            self._conn.execute(ddl)
+
+    def _write(self, statements: list[tuple[str, Iterable[tuple[Any, ...]]]]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for sql, rows in statements:
+                    self._conn.executemany(sql, list(rows))
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def save_job(self, job: dict[str, Any], items: list[dict[str, Any]]) -> None:
+        job_row = (
+            str(job["job_id"]),
+            int(job.get("seq") or 0),
+            int(job.get("priority") or 0),
+            str(job.get("status") or "queued"),
+            json.dumps(job.get("params") or {}, ensure_ascii=False, sort_keys=True),
+            str(job.get("created_at") or ""),
+            str(job.get("started_at") or ""),
+            str(job.get("finished_at") or ""),
+            str(job.get("error") or ""),
+        )
+        item_rows = [
+            (
+                str(job["job_id"]),
+                ordinal,
+                str(item.get("meeting_id") or ""),
+                str(item.get("status") or "queued"),
+                int(item.get("chunk_count") or 0),
+                int(item.get("transcript_chars") or 0),
+                str(item.get("indexed_at") or ""),
+                int(bool(item.get("cached"))),
+                str(item.get("error") or ""),
+            )
+            for ordinal, item in enumerate(items)
+        ]
+        self._write(
+            [
+                ("DELETE FROM rag_index_job_items WHERE job_id = ?", [(str(job["job_id"]),)]),
+                ("INSERT OR REPLACE INTO rag_index_jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", [job_row]),
+                ("INSERT INTO rag_index_job_items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", item_rows),
+            ]
+        )
+
+    def update_job(self, job_id: str, **fields: Any) -> None:
+        columns = [name for name in _JOB_COLUMNS if name in fields]
+        if not columns:
+            return
+        sets = ", ".join(f"{name} = ?" for name in columns)
+        values = tuple(str(fields[name] or "") for name in columns)
+        self._write([(f"UPDATE rag_index_jobs SET {sets} WHERE job_id = ?", [(*values, str(job_id))])])
+
+    def update_items(self, job_id: str, items: dict[int, dict[str, Any]]) -> None:
+        """items: ordinal -> поля строки (status/chunk_count/...); одной транзакцией."""
+        statements: list[tuple[str, Iterable[tuple[Any, ...]]]] = []
+        for ordinal, item in items.items():
+            columns = [name for name in _ITEM_COLUMNS if name in item]
+            if not columns:
+                continue
+            sets = ", ".join(f"{name} = ?" for name in columns)
+            values = tuple(_item_value(name, item[name]) for name in columns)
+            statements.append(
+                (
+                    f"UPDATE rag_index_job_items SET {sets} WHERE job_id = ? AND ordinal = ?",
+                    [(*values, str(job_id), int(ordinal))],
+                )
+            )
+        if statements:
+            self._write(statements)
+
+    def load_jobs(self) -> list[dict[str, Any]]:
+        """Все задания в порядке seq, у каждого — items в исходном порядке встреч."""
+        with self._lock:
+            job_rows = self._conn.execute(
+                "SELECT job_id, seq, priority, status, params, created_at, started_at, finished_at, error"
+                " FROM rag_index_jobs ORDER BY seq"
+            ).fetchall()
+            item_rows = self._conn.execute(
+                "SELECT job_id, meeting_id, status, chunk_count, transcript_chars, indexed_at, cached, error"
+                " FROM rag_index_job_items ORDER BY job_id, ordinal"
+            ).fetchall()
+        items_by_job: dict[str, list[dict[str, Any]]] = {}
+        for job_id, meeting_id, status, chunk_count, transcript_chars, indexed_at, cached, error in item_rows:
+            items_by_job.setdefault(str(job_id), []).append(
+                {
+                    "meeting_id": str(meeting_id),
+                    "status": str(status),
+                    "chunk_count": int(chunk_count),
+                    "transcript_chars": int(transcript_chars),
+                    "indexed_at": str(indexed_at),
+                    "cached": bool(cached),
+                    "error": str(error),
+                }
+            )
+        out: list[dict[str, Any]] = []
+        for job_id, seq, priority, status, params, created_at, started_at, finished_at, error in job_rows:
+            try:
+                parsed = json.loads(params or "{}")
+            except ValueError:
+                parsed = {}
+            out.append(
+                {
+                    "job_id": str(job_id),
+                    "seq": int(seq),
+                    "priority": int(priority),
+                    "status": str(status),
+                    "params": parsed if isinstance(parsed, dict) else {},
+                    "created_at": str(created_at),
+                    "started_at": str(started_at),
+                    "finished_at": str(finished_at),
+                    "error": str(error),
+                    "items": items_by_job.get(str(job_id), []),
+                }
+            )
+        return out
+
+    def delete_jobs(self, job_ids: Iterable[str]) -> None:
+        rows = [(str(job_id),) for job_id in job_ids]
+        if not rows:
+            return
+        self._write(
+            [
+                ("DELETE FROM rag_index_job_items WHERE job_id = ?", rows),
+                ("DELETE FROM rag_index_jobs WHERE job_id = ?", rows),
+            ]
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,289 @@
+"""
+Инвертированный индекс (postings) для BM25-поиска по чанкам RAG-индекса.
+
+Назначение:
+- один раз при индексации: term -> [(ordinal чанка, tf)], длины чанков, статистика корпуса
+- на запросе трогаем только postings терминов запроса, а не весь корпус
+- группы метаданных (кандидат/вакансия/...) хранятся отдельно: одна строка на группу чанков
+- в бинарном индексе postings лежат упакованными массивами и разворачиваются по терму лениво
+"""
+
+from __future__ import annotations
+
+import bisect
+import re
+from collections import Counter
+from typing import Any
+
+import numpy as np
+
+KEYWORD_INDEX_SCHEMA_VERSION = "rag_postings_v1"
+
+
+class RAGKeywordIndex:
+    def __init__(
+        self,
+        *,
+        postings: dict[str, list[tuple[int, int]]] | None,
+        chunk_lengths: list[int],
+        meta_texts: list[str] | None = None,
+        chunk_meta_ids: list[int] | None = None,
+        packed: tuple[list[str], np.ndarray, np.ndarray] | None = None,
+    ) -> None:
+        self._postings = postings
+        # (отсортированный словарь, offsets[n_terms + 1], pairs[n, 2]) — см. from_arrays.
+        self._packed = packed
+        self._term_ids: dict[str, int] | None = None
+        self.chunk_lengths = [int(v) for v in chunk_lengths]
+        self.meta_texts = list(meta_texts or [])
+        self.chunk_meta_ids = list(chunk_meta_ids or [])
+        self.total_tokens = int(sum(self.chunk_lengths))
+        self._vocab_blob: str | None = None
+        self._vocab_terms: list[str] = []
+        self._vocab_offsets: list[int] = []
+        self._meta_groups: list[list[int]] | None = None
+
+    @classmethod
+    def build(
+        cls,
+        token_lists: list[list[str]],
+        *,
+        meta_texts: list[str] | None = None,
+    ) -> RAGKeywordIndex:
+        postings: dict[str, list[tuple[int, int]]] = {}
+        lengths: list[int] = []
+        for ordinal, tokens in enumerate(token_lists):
+            lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).append((ordinal, int(tf)))
+        groups: list[str] = []
+        group_ids: dict[str, int] = {}
+        chunk_meta_ids: list[int] = []
+        for text in list(meta_texts or []):
+            key = str(text or "")
+            gid = group_ids.get(key)
+            if gid is None:
+                gid = len(groups)
+                group_ids[key] = gid
+                groups.append(key)
+            chunk_meta_ids.append(gid)
+        return cls(
+            postings=postings,
+            chunk_lengths=lengths,
+            meta_texts=groups,
+            chunk_meta_ids=chunk_meta_ids,
+        )
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> RAGKeywordIndex:
+        if str(payload.get("schema_version") or "") != KEYWORD_INDEX_SCHEMA_VERSION:
+            raise ValueError("unsupported_keyword_index_schema")
+        raw_postings = payload.get("postings") if isinstance(payload.get("postings"), dict) else {}
+        postings: dict[str, list[tuple[int, int]]] = {}
+        for term, flat in raw_postings.items():
+            values = [int(v) for v in list(flat or [])]
+            postings[str(term)] = list(zip(values[0::2], values[1::2]))
+        return cls(
+            postings=postings,
+            chunk_lengths=[int(v) for v in list(payload.get("chunk_lengths") or [])],
+            meta_texts=[str(v) for v in list(payload.get("meta_texts") or [])],
+            chunk_meta_ids=[int(v) for v in list(payload.get("chunk_meta_ids") or [])],
+        )
+
+    @classmethod
+    def concat(cls, parts: list[RAGKeywordIndex]) -> RAGKeywordIndex:
+        """Склейка индексов подряд (ordinals сдвигаются), без повторной токенизации."""
+        postings: dict[str, list[tuple[int, int]]] = {}
+        lengths: list[int] = []
+        meta_texts: list[str] = []
+        meta_ids: dict[str, int] = {}
+        chunk_meta_ids: list[int] = []
+        for part in parts:
+            base = len(lengths)
+            for term, rows in part.postings.items():
+                postings.setdefault(term, []).extend((base + ordinal, tf) for ordinal, tf in rows)
+            lengths.extend(part.chunk_lengths)
+            remap: list[int] = []
+            for text in part.meta_texts:
+                gid = meta_ids.get(text)
+                if gid is None:
+                    gid = len(meta_texts)
+                    meta_ids[text] = gid
+                    meta_texts.append(text)
+                remap.append(gid)
+            part_ids = part.chunk_meta_ids if len(part.chunk_meta_ids) == part.chunk_count else [-1] * part.chunk_count
+            chunk_meta_ids.extend(remap[gid] if 0 <= gid < len(remap) else -1 for gid in part_ids)
+        return cls(postings=postings, chunk_lengths=lengths, meta_texts=meta_texts, chunk_meta_ids=chunk_meta_ids)
+
+    def select(self, ordinals: list[int]) -> RAGKeywordIndex:
+        """Подмножество чанков в заданном порядке (ordinals перенумеровываются с 0)."""
+        remap = np.full((self.chunk_count,), -1, dtype=np.int64)
+        if ordinals:
+            remap[np.asarray(ordinals, dtype=np.int64)] = np.arange(len(ordinals), dtype=np.int64)
+        terms, offsets, pairs = self.to_arrays()
+        postings: dict[str, list[tuple[int, int]]] = {}
+        if len(pairs):
+            new_ords = remap[pairs[:, 0]]
+            keep = new_ords >= 0
+            for idx, term in enumerate(terms):
+                lo, hi = int(offsets[idx]), int(offsets[idx + 1])
+                sel = keep[lo:hi]
+                if not sel.any():
+                    continue
+                rows = sorted(zip(new_ords[lo:hi][sel].tolist(), pairs[lo:hi, 1][sel].tolist()))
+                postings[term] = [(int(o), int(tf)) for o, tf in rows]
+        meta_ids = self.chunk_meta_ids if len(self.chunk_meta_ids) == self.chunk_count else [-1] * self.chunk_count
+        used: dict[int, int] = {}
+        meta_texts: list[str] = []
+        chunk_meta_ids: list[int] = []
+        for ordinal in ordinals:
+            gid = meta_ids[ordinal]
+            if 0 <= gid < len(self.meta_texts):
+                if gid not in used:
+                    used[gid] = len(meta_texts)
+                    meta_texts.append(self.meta_texts[gid])
+                chunk_meta_ids.append(used[gid])
+            else:
+                chunk_meta_ids.append(-1)
+        return RAGKeywordIndex(
+            postings=postings,
+            chunk_lengths=[self.chunk_lengths[o] for o in ordinals],
+            meta_texts=meta_texts,
+            chunk_meta_ids=chunk_meta_ids,
+        )
+
+    @classmethod
+    def from_arrays(
+        cls,
+        *,
+        terms: list[str],
+        offsets: np.ndarray,
+        pairs: np.ndarray,
+        chunk_lengths: list[int],
+        meta_texts: list[str] | None = None,
+        chunk_meta_ids: list[int] | None = None,
+    ) -> RAGKeywordIndex:
+        if len(offsets) != len(terms) + 1:
+            raise ValueError("invalid_keyword_index_offsets")
+        return cls(
+            postings=None,
+            chunk_lengths=chunk_lengths,
+            meta_texts=meta_texts,
+            chunk_meta_ids=chunk_meta_ids,
+            packed=(list(terms), np.asarray(offsets, dtype=np.int64), np.asarray(pairs, dtype=np.int32).reshape(-1, 2)),
+        )
+
+    def to_arrays(self) -> tuple[list[str], np.ndarray, np.ndarray]:
+        """Словарь (отсортирован), offsets в pairs и сами пары (ordinal, tf) как int32."""
+        if self._packed is not None:
+            return self._packed
+        terms = sorted(self.postings)
+        offsets = np.zeros((len(terms) + 1,), dtype=np.int64)
+        rows: list[tuple[int, int]] = []
+        for idx, term in enumerate(terms):
+            rows.extend(self.postings[term])
+            offsets[idx + 1] = len(rows)
+        pairs = np.asarray(rows, dtype=np.int32).reshape(-1, 2)
+        return terms, offsets, pairs
+
+    @property
+    def postings(self) -> dict[str, list[tuple[int, int]]]:
+        if self._postings is None:
+            terms, _offsets, _pairs = self._packed or ([], None, None)
+            self._postings = {term: self.term_postings(term) for term in terms}
+        return self._postings
+
+    def to_payload(self) -> dict[str, Any]:
+        return {
+            "schema_version": KEYWORD_INDEX_SCHEMA_VERSION,
+            "chunk_count": self.chunk_count,
+            "total_tokens": self.total_tokens,
+            "chunk_lengths": list(self.chunk_lengths),
+            "meta_texts": list(self.meta_texts),
+            "chunk_meta_ids": list(self.chunk_meta_ids),
+            # Плоские пары [ord, tf, ord, tf, ...] — компактнее вложенных списков.
+            "postings": {
+                term: [v for pair in rows for v in pair] for term, rows in self.postings.items()
+            },
+        }
+
+    @property
+    def chunk_count(self) -> int:
+        return len(self.chunk_lengths)
+
+    @property
+    def nbytes(self) -> int:
+        if self._postings is None and self._packed is not None:
+            terms, offsets, pairs = self._packed
+            return int(sum(len(term) + 64 for term in terms) + offsets.nbytes + pairs.nbytes)
+        # Грубая оценка для бюджетов кэша: ~16 байт на posting + словарь.
+        return sum(len(term) + 16 * len(rows) for term, rows in self.postings.items())
+
+    def _packed_term_id(self, term: str) -> int:
+        if self._term_ids is None:
+            terms = self._packed[0] if self._packed is not None else []
+            self._term_ids = {value: idx for idx, value in enumerate(terms)}
+        return self._term_ids.get(term, -1)
+
+    def df(self, term: str, mask: np.ndarray | None = None) -> int:
+        if mask is not None:
+            # df только по разрешённым чанкам (срез глобального корпуса под выбранные встречи).
+            ordinals = np.fromiter((o for o, _tf in self.term_postings(term)), dtype=np.int64)
+            return int(mask[ordinals].sum()) if ordinals.size else 0
+        if self._postings is None and self._packed is not None:
+            idx = self._packed_term_id(term)
+            if idx < 0:
+                return 0
+            offsets = self._packed[1]
+            return int(offsets[idx + 1] - offsets[idx])
+        return len(self.postings.get(term, ()))
+
+    def total_tokens_for(self, mask: np.ndarray | None = None) -> int:
+        if mask is None:
+            return self.total_tokens
+        return int(np.asarray(self.chunk_lengths, dtype=np.int64)[mask].sum()) if self.chunk_lengths else 0
+
+    def term_postings(self, term: str) -> list[tuple[int, int]]:
+        if self._postings is None and self._packed is not None:
+            idx = self._packed_term_id(term)
+            if idx < 0:
+                return []
+            _terms, offsets, pairs = self._packed
+            return [(int(o), int(tf)) for o, tf in pairs[int(offsets[idx]) : int(offsets[idx + 1])].tolist()]
+        return self.postings.get(term, [])
+
+    def terms_containing(self, fragment: str) -> list[str]:
+        """
+        Термины словаря, содержащие fragment как подстроку.
+
+        Поиск идёт по склеенному словарю (C-уровень), а не циклом по терминам.
+        """
+        needle = str(fragment or "")
+        if not needle or "\n" in needle:
+            return []
+        if self._vocab_blob is None:
+            self._vocab_terms = list(self._packed[0]) if self._packed is not None else sorted(self.postings)
+            offsets: list[int] = []
+            pos = 0
+            for term in self._vocab_terms:
+                offsets.append(pos)
+                pos += len(term) + 1
+            self._vocab_offsets = offsets
+            self._vocab_blob = "\n".join(self._vocab_terms)
+        out: list[str] = []
+        last_idx = -1
+        for match in re.finditer(re.escape(needle), self._vocab_blob):
+            idx = bisect.bisect_right(self._vocab_offsets, match.start()) - 1
+            if idx != last_idx:
+                out.append(self._vocab_terms[idx])
+                last_idx = idx
+        return out
+
+    def meta_groups(self) -> list[list[int]]:
+        if self._meta_groups is None:
+            groups: list[list[int]] = [[] for _ in self.meta_texts]
+            for ordinal, gid in enumerate(self.chunk_meta_ids):
+                if 0 <= gid < len(groups):
+                    groups[gid].append(ordinal)
+            self._meta_groups = groups
+        return self._meta_groups
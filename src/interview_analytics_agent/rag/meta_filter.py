@@ -0,0 +1,77 @@
+"""
+Индекс метаданных чанков RAG для структурных фильтров запроса.
+
+Назначение:
+- по каждому полю meeting_meta (вакансия/уровень/интервьюер/кандидат): значение -> ordinals чанков
+- значений на поле мало (десятки), поэтому фильтр сверяется со словарём значений, а не с чанками
+- результат — bool-маска чанков: чанки вне фильтра отсекаются до BM25/semantic-скоринга
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+# Поле фильтра -> поля meeting_meta, по которым оно сопоставляется.
+META_FILTER_FIELDS: dict[str, tuple[str, ...]] = {
+    "vacancy": ("vacancy",),
+    "level": ("level",),
+    "interviewer": ("interviewer",),
+    "candidate": ("candidate_name", "candidate_id"),
+}
+
+
+def normalize_meta_value(value: Any) -> str:
+    return " ".join(str(value or "").casefold().split())
+
+
+class RAGMetaFilterIndex:
+    def __init__(self, *, chunk_count: int, postings: dict[str, dict[str, np.ndarray]]) -> None:
+        self.chunk_count = int(chunk_count)
+        # meta-поле -> нормализованное значение -> отсортированные ordinals чанков (int32).
+        self.postings = postings
+
+    @classmethod
+    def build(cls, chunks: list[dict[str, Any]]) -> RAGMetaFilterIndex:
+        fields = sorted({name for names in META_FILTER_FIELDS.values() for name in names})
+        rows: dict[str, dict[str, list[int]]] = {name: {} for name in fields}
+        for ordinal, chunk in enumerate(chunks):
+            meta = chunk.get("meeting_meta") if isinstance(chunk, dict) else None
+            if not isinstance(meta, dict):
+                continue
+            for name in fields:
+                value = normalize_meta_value(meta.get(name))
+                if value:
+                    rows[name].setdefault(value, []).append(ordinal)
+        postings = {
+            name: {value: np.asarray(ords, dtype=np.int32) for value, ords in values.items()}
+            for name, values in rows.items()
+        }
+        return cls(chunk_count=len(chunks), postings=postings)
+
+    def values(self, meta_field: str) -> list[str]:
+        return sorted(self.postings.get(meta_field) or {})
+
+    def mask(self, filters: dict[str, str]) -> np.ndarray | None:
+        """
+        Маска чанков, прошедших все фильтры (AND по полям).
+
+        Значение фильтра сопоставляется как подстрока без учёта регистра:
+        "backend" находит вакансию "Senior Backend Developer". Пустые фильтры -> None.
+        """
+        active = {key: normalize_meta_value(value) for key, value in filters.items() if key in META_FILTER_FIELDS}
+        active = {key: value for key, value in active.items() if value}
+        if not active:
+            return None
+        out = np.ones((self.chunk_count,), dtype=bool)
+        for key, needle in active.items():
+            allowed = np.zeros((self.chunk_count,), dtype=bool)
+            for meta_field in META_FILTER_FIELDS[key]:
+                for value, ordinals in (self.postings.get(meta_field) or {}).items():
+                    if needle in value:
+                        allowed[ordinals] = True
+            out &= allowed
+            if not out.any():
+                break
+        return out
@@ -0,0 +1,192 @@
+"""
+Матричное хранилище эмбеддингов RAG-индекса.
+
+Назначение:
+- держать эмбеддинги всех чанков индекса одной contiguous float32-матрицей
+- матрица сохраняется секцией бинарного индекса (rag/index_file.py), читается через np.memmap
+- считать косинусную близость запроса ко всем чанкам одним matvec
+- опционально держать IVF-индекс (ann) для больших матриц
+- опционально хранить матрицу квантованной (float16 или int8 с масштабом на строку)
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+from .ann_index import RAGIVFIndex
+
+# Как в cosine_similarity_dense: вектор считается нулевым при ||v||^2 <= 1e-12.
+_NORM_SQ_EPS = 1e-12
+EMBEDDING_QUANTIZATIONS = ("float32", "float16", "int8")
+# Квантованные строки переводятся в float32 блоками: временный буфер не растёт с корпусом.
+_DEQUANT_BLOCK_ROWS = 16_384
+
+
+def _as_matrix(rows: Any, *, dim: int = 0) -> np.ndarray:
+    if isinstance(rows, np.ndarray) and rows.ndim == 2 and (dim <= 0 or rows.shape[1] == dim):
+        return np.ascontiguousarray(rows, dtype=np.float32)
+    items = list(rows) if rows is not None else []
+    width = int(dim or 0)
+    if width <= 0:
+        width = max((len(row) for row in items if row is not None), default=0)
+    out = np.zeros((len(items), width), dtype=np.float32)
+    for idx, row in enumerate(items):
+        if row is None or len(row) == 0:
+            continue
+        n = min(width, len(row))
+        out[idx, :n] = np.asarray(list(row)[:n], dtype=np.float32)
+    return out
+
+
+class RAGVectorStore:
+    """
+    Эмбеддинги чанков одного индекса: строка i матрицы = чанк с ordinal i.
+
+    Пустые (нулевые) строки допустимы: такие чанки получают semantic score 0.
+    data хранит матрицу как есть (float32/float16/int8); для int8 строка i равна
+    data[i] * scales[i]. Нормы считаются по деквантованным значениям.
+    """
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        *,
+        norms: np.ndarray | None = None,
+        ann: RAGIVFIndex | None = None,
+        scales: np.ndarray | None = None,
+    ) -> None:
+        mat = np.asanyarray(matrix)
+        if mat.ndim != 2:
+            mat = mat.reshape((mat.shape[0] if mat.ndim else 0, -1))
+        if mat.dtype == np.int8:
+            if scales is None or len(scales) != mat.shape[0]:
+                raise ValueError("rag_vector_scales_required")
+            self.scales: np.ndarray | None = np.asarray(scales, dtype=np.float32)
+        else:
+            if mat.dtype not in (np.float32, np.float16):
+                mat = mat.astype(np.float32)
+            self.scales = None
+        self.data = mat
+        if norms is not None and len(norms) == mat.shape[0]:
+            # Нормы сохранены в бинарном индексе — не читаем ради них всю memmap-матрицу.
+            self.norms = np.asarray(norms, dtype=np.float32)
+        else:
+            self.norms = self._row_norms()
+        self.ann = ann
+
+    def _row_norms(self) -> np.ndarray:
+        if self.data.dtype == np.float32:
+            return np.sqrt(np.einsum("ij,ij->i", self.data, self.data, dtype=np.float32))
+        out = np.empty((len(self),), dtype=np.float32)
+        for start in range(0, len(self), _DEQUANT_BLOCK_ROWS):
+            block = self.dequantize(np.arange(start, min(len(self), start + _DEQUANT_BLOCK_ROWS)))
+            out[start : start + len(block)] = np.sqrt(np.einsum("ij,ij->i", block, block, dtype=np.float32))
+        return out
+
+    @classmethod
+    def from_rows(cls, rows: Any, *, dim: int = 0) -> RAGVectorStore:
+        return cls(_as_matrix(rows, dim=dim))
+
+    def __len__(self) -> int:
+        return int(self.data.shape[0])
+
+    @property
+    def dim(self) -> int:
+        return int(self.data.shape[1]) if self.data.ndim == 2 else 0
+
+    @property
+    def quantization(self) -> str:
+        return "int8" if self.data.dtype == np.int8 else "float16" if self.data.dtype == np.float16 else "float32"
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """float32-матрица; для квантованного хранилища — деквантованная копия целиком."""
+        return self.data if self.data.dtype == np.float32 else self.dequantize()
+
+    @property
+    def nbytes(self) -> int:
+        return int(
+            self.data.nbytes
+            + self.norms.nbytes
+            + (self.scales.nbytes if self.scales is not None else 0)
+            + (self.ann.nbytes if self.ann is not None else 0)
+        )
+
+    def dequantize(self, rows: np.ndarray | None = None) -> np.ndarray:
+        """Строки (все или rows, в их порядке) как float32."""
+        block = self.data if rows is None else self.data[rows]
+        if self.data.dtype == np.float32:
+            return block
+        out = block.astype(np.float32)
+        if self.scales is not None:
+            out *= (self.scales if rows is None else self.scales[rows])[:, None]
+        return out
+
+    def quantize(self, kind: str) -> RAGVectorStore:
+        """
+        Копия в формате kind (float32/float16/int8); ann переносится как есть.
+
+        int8 — симметрично по строке: scale = max|v| / 127, код = round(v / scale).
+        """
+        if kind not in EMBEDDING_QUANTIZATIONS:
+            raise ValueError("rag_vector_quantization_invalid")
+        if kind == self.quantization:
+            return self
+        mat = np.ascontiguousarray(self.matrix, dtype=np.float32)
+        if kind == "float32":
+            return RAGVectorStore(mat, ann=self.ann)
+        if kind == "float16":
+            return RAGVectorStore(mat.astype(np.float16), ann=self.ann)
+        peak = np.max(np.abs(mat), axis=1) if mat.size else np.zeros((len(mat),), dtype=np.float32)
+        scales = (peak / np.float32(127.0)).astype(np.float32)
+        safe = np.where(scales > 0, scales, np.float32(1.0))
+        codes = np.clip(np.rint(mat / safe[:, None]), -127, 127).astype(np.int8)
+        return RAGVectorStore(codes, scales=scales, ann=self.ann)
+
+    def row(self, idx: int) -> list[float]:
+        return [float(v) for v in self.dequantize(np.asarray([int(idx)]))[0]]
+
+    def _dots(self, q: np.ndarray, rows: np.ndarray | None) -> np.ndarray:
+        # Квантованные строки: скалярное произведение по кодам, масштаб int8 — одним умножением в конце.
+        n_rows = len(self) if rows is None else len(rows)
+        out = np.empty((n_rows,), dtype=np.float32)
+        for start in range(0, n_rows, _DEQUANT_BLOCK_ROWS):
+            stop = min(n_rows, start + _DEQUANT_BLOCK_ROWS)
+            block = self.data[start:stop] if rows is None else self.data[rows[start:stop]]
+            out[start:stop] = block.astype(np.float32) @ q
+        if self.scales is not None:
+            out *= self.scales if rows is None else self.scales[rows]
+        return out
+
+    def cosine_scores(self, query: Any, rows: np.ndarray | None = None) -> np.ndarray:
+        """
+        Косинус запроса ко всем строкам (как cosine_similarity_dense, но векторно).
+
+        rows — только эти строки (результат в том же порядке); из memmap читаются лишь их страницы.
+        При разной размерности берётся общий префикс — так же, как в поэлементной версии.
+        """
+        n_rows = len(self) if rows is None else len(rows)
+        q = np.asarray(list(query or []), dtype=np.float32)
+        if n_rows == 0 or q.size == 0 or self.dim == 0:
+            return np.zeros((n_rows,), dtype=np.float32)
+        width = min(int(q.size), self.dim)
+        q = q[:width]
+        q_norm_sq = float(np.dot(q, q))
+        if q_norm_sq <= _NORM_SQ_EPS:
+            return np.zeros((n_rows,), dtype=np.float32)
+        if width != self.dim or self.data.dtype == np.float32:
+            mat = self.dequantize(rows)
+            norms = self.norms if rows is None else self.norms[rows]
+            if width != self.dim:
+                mat = mat[:, :width]
+                norms = np.sqrt(np.einsum("ij,ij->i", mat, mat, dtype=np.float32))
+            dots = mat @ q
+        else:
+            norms = self.norms if rows is None else self.norms[rows]
+            dots = self._dots(q, rows)
+        valid = (norms * norms) > _NORM_SQ_EPS
+        out = np.zeros((n_rows,), dtype=np.float32)
+        np.divide(dots, norms * np.float32(q_norm_sq**0.5), out=out, where=valid)
+        return out
@@ -10,6 +10,7 @@ from interview_analytics_agent.common.logging import get_project_logger
 from interview_analytics_agent.domain.enums import PipelineStatus
 from interview_analytics_agent.processing.enhancer import enhance_text
 from interview_analytics_agent.processing.speaker_rules import infer_speakers
+from interview_analytics_agent.services.segment_enhancement import enhance_meeting_segments
 from interview_analytics_agent.storage.blob import get_bytes
 from interview_analytics_agent.storage import records
 from interview_analytics_agent.storage.db import db_session
@@ -390,32 +391,30 @@ def process_chunk_inline(
         srepo.upsert_by_meeting_seq(seg)
         session.flush()
 
-        segs = srepo.list_by_meeting(meeting_id)
-        settings = get_settings()
-        decisions = infer_speakers(
-            [(s.seq, s.raw_text or "", s.enhanced_text or "") for s in segs],
-            response_window_sec=settings.speaker_response_window_sec,
+        # Только новые сегменты + окно контекста; вся встреча — в finalize_meeting_enhancement.
+        enhance_meeting_segments(
+            session,
+            meeting_id,
+            touched_seqs=[chunk_seq],
+            speaker_locked=_speaker_locked_for_track,
         )
-        speaker_map = {d.seq: d.speaker for d in decisions if d.speaker is not None}
-
-        for s in segs:
-            enh, _meta = enhance_text(s.raw_text or "")
-            enh_changed = enh != (s.enhanced_text or "")
-            if enh_changed:
-                s.enhanced_text = enh
-
-            inferred = speaker_map.get(s.seq)
-            speaker_changed = bool(
-                inferred
-                and inferred != (s.speaker or "")
-                and not _speaker_locked_for_track(s.speaker)
-            )
-            if speaker_changed:
-                s.speaker = inferred
 
     return []
 
 
+def finalize_meeting_enhancement(*, meeting_id: str) -> int:
+    """
+    Полный проход enhance_text + правил спикеров по всей встрече (после Stop/Finish).
+    """
+    with db_session() as session:
+        return enhance_meeting_segments(
+            session,
+            meeting_id,
+            full=True,
+            speaker_locked=_speaker_locked_for_track,
+        )
+
+
 def retranscribe_meeting_high_quality(*, meeting_id: str) -> int:
     """
     Перетранскрибация встречи в финальном (более точном) профиле.
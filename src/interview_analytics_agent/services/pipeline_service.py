@@ -34,6 +34,9 @@ def on_stage_finished(*, meeting_id: str, stage: PipelineStage) -> None:
     Реакция на успешное завершение стадии:
     - решаем, какая следующая стадия
     - ставим в соответствующую очередь
+
+    Стадия завершена для всей встречи, поэтому enhancer/analytics ставятся финальными:
+    только финальная аналитика ставит delivery.
     """
     tr = transition(stage, PipelineStatus.done)
 
@@ -43,9 +46,9 @@ def on_stage_finished(*, meeting_id: str, stage: PipelineStage) -> None:
         return
 
     if tr.next_stage == PipelineStage.enhancer:
-        enqueue_enhancer(meeting_id=meeting_id)
+        enqueue_enhancer(meeting_id=meeting_id, final=True)
     elif tr.next_stage == PipelineStage.analytics:
-        enqueue_analytics(meeting_id=meeting_id)
+        enqueue_analytics(meeting_id=meeting_id, final=True)
     elif tr.next_stage == PipelineStage.delivery:
         enqueue_delivery(meeting_id=meeting_id)
     elif tr.next_stage == PipelineStage.retention:
@@ -0,0 +1,103 @@
+"""
+Сервисный слой: доочистка сегментов встречи (enhance_text + правила спикеров).
+
+Назначение:
+- на очередной чанк обрабатываются только сегменты, добавленные после водяной метки
+- правила спикеров прогоняются по скользящему окну последних сегментов, а не по всей встрече
+- водяная метка и найденный ведущий хранятся в meeting.context["enhancer_state"]
+- полный проход по всей встрече — только при финализации (full=True)
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+
+from sqlalchemy.orm import Session
+
+from interview_analytics_agent.common.config import get_settings
+from interview_analytics_agent.processing.enhancer import enhance_text
+from interview_analytics_agent.processing.speaker_rules import SpeakerState, infer_speakers
+from interview_analytics_agent.storage.repositories import MeetingRepository, TranscriptSegmentRepository
+
+ENHANCER_STATE_KEY = "enhancer_state"
+
+
+def _context_segments() -> int:
+    s = get_settings()
+    raw = int(getattr(s, "enhancer_context_segments", 32) or 32)
+    return max(1, min(raw, 1000))
+
+
+def enhance_meeting_segments(
+    session: Session,
+    meeting_id: str,
+    *,
+    full: bool = False,
+    touched_seqs: Iterable[int] = (),
+    speaker_locked: Callable[[str | None], bool] | None = None,
+) -> int:
+    """
+    Обновляет enhanced_text и спикеров; возвращает число сегментов, прошедших enhance_text.
+
+    touched_seqs — сегменты, переписанные на месте (тот же seq, прежний id): водяная метка
+    их не видит, поэтому вызывающий передаёт их явно. speaker_locked(speaker) -> True
+    запрещает менять спикера сегмента (например, заданного дорожкой записи).
+    """
+    mrepo = MeetingRepository(session)
+    srepo = TranscriptSegmentRepository(session)
+    meeting = mrepo.get(meeting_id)
+    context = dict(getattr(meeting, "context", None) or {})
+    saved = context.get(ENHANCER_STATE_KEY) if isinstance(context.get(ENHANCER_STATE_KEY), dict) else {}
+    watermark = int(saved.get("segment_id") or 0)
+    settings = get_settings()
+
+    if full or watermark <= 0:
+        window = srepo.list_by_meeting(meeting_id)
+        pending = list(window)
+        speaker_state = SpeakerState()
+    else:
+        touched = {int(seq) for seq in touched_seqs}
+        added = srepo.list_by_meeting_after_id(meeting_id, after_id=watermark)
+        first_seq = min([seg.seq for seg in added] + list(touched), default=None)
+        if first_seq is None:
+            return 0
+        # Контекст перед первым новым сегментом: незакрытое обращение к участнику
+        # (pending) живёт не дольше response_window_sec сегментов.
+        size = max(_context_segments(), int(settings.speaker_response_window_sec))
+        window = srepo.list_by_meeting_from_seq(
+            meeting_id,
+            from_seq=srepo.window_start_seq(meeting_id, before_seq=first_seq, size=size),
+        )
+        added_ids = {seg.id for seg in added}
+        pending = [seg for seg in window if seg.id in added_ids or seg.seq in touched]
+        speaker_state = SpeakerState(host_name=str(saved.get("host_name") or "") or None)
+
+    for seg in pending:
+        enh, _meta = enhance_text(seg.raw_text or "")
+        if enh != (seg.enhanced_text or ""):
+            seg.enhanced_text = enh
+
+    decisions = infer_speakers(
+        [(seg.seq, seg.raw_text or "", seg.enhanced_text or "") for seg in window],
+        response_window_sec=settings.speaker_response_window_sec,
+        state=speaker_state,
+    )
+    speaker_map = {d.seq: d.speaker for d in decisions if d.speaker is not None}
+    for seg in window:
+        inferred = speaker_map.get(seg.seq)
+        if not inferred or inferred == (seg.speaker or ""):
+            continue
+        if speaker_locked is not None and speaker_locked(seg.speaker):
+            continue
+        seg.speaker = inferred
+
+    if meeting is not None:
+        session.flush()
+        context[ENHANCER_STATE_KEY] = {
+            "segment_id": max([watermark] + [int(seg.id or 0) for seg in window]),
+            "host_name": speaker_state.host_name or "",
+        }
+        # JSON-колонка отслеживается по присваиванию, не по мутации словаря.
+        meeting.context = context
+        mrepo.save(meeting)
+    return len(pending)
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 import threading
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Any
@@ -11,6 +14,15 @@ from interview_analytics_agent.common.config import get_settings
 _COUNTER_LOCK = threading.Lock()
 _META_FILENAME = "meeting_meta.json"
 _COUNTER_FILENAME = "_record_counter.json"
+_FINGERPRINTS_FILENAME = "_fingerprints.json"
+# Транскрипты, для которых ведётся sidecar (size, mtime, sha): статус RAG-индекса
+# сверяет их без повторного хэширования на каждом запросе списка встреч.
+_FINGERPRINTED_FILES = frozenset({"raw.txt", "normalized.txt", "clean.txt"})
+_FINGERPRINT_LOCK = threading.Lock()
+# Грубейшая точность mtime среди поддерживаемых ФС (FAT — 2 с, HFS+ — 1 с, часть сетевых —
+# секунды): файл, изменённый в пределах этого окна после хэширования, мог получить тот же
+# mtime, поэтому такой sidecar не доверяется и файл перехэшируется.
+_MTIME_GRANULARITY_NS = 2_000_000_000
 
 
 def _base_dir() -> Path:
@@ -108,6 +120,8 @@ def write_text(meeting_id: str, filename: str, text: str) -> Path:
     d = ensure_meeting_dir(meeting_id)
     p = d / filename
     p.write_text(text or "", encoding="utf-8")
+    if filename in _FINGERPRINTED_FILES:
+        _store_fingerprint(meeting_id, filename, p)
     return p
 
 
@@ -188,18 +202,103 @@ def artifact_path(meeting_id: str, filename: str) -> Path:
     return meeting_dir(meeting_id) / filename
 
 
-def list_artifacts(meeting_id: str) -> dict[str, bool]:
+def _fingerprints_path(meeting_id: str) -> Path:
+    return meeting_dir(meeting_id) / _FINGERPRINTS_FILENAME
+
+
+def _read_fingerprints(meeting_id: str) -> dict[str, Any]:
+    path = _fingerprints_path(meeting_id)
+    try:
+        raw = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return raw if isinstance(raw, dict) else {}
+
+
+def _stat_fields(st: os.stat_result) -> dict[str, int]:
+    # inode меняет запись через os.replace, ctime — любую запись на месте (её не выставить utime).
     return {
-        "raw": exists(meeting_id, "raw.txt"),
-        "normalized": exists(meeting_id, "normalized.txt"),
-        "clean": exists(meeting_id, "clean.txt"),
-        "audio_mp3": exists(meeting_id, "meeting_audio.mp3"),
-        "report_raw": exists(meeting_id, "report_raw.json"),
-        "report_clean": exists(meeting_id, "report_clean.json"),
-        "report_raw_txt": exists(meeting_id, "report_raw.txt"),
-        "report_clean_txt": exists(meeting_id, "report_clean.txt"),
-        "structured_raw_json": exists(meeting_id, "structured_raw.json"),
-        "structured_raw_csv": exists(meeting_id, "structured_raw.csv"),
-        "structured_clean_json": exists(meeting_id, "structured_clean.json"),
-        "structured_clean_csv": exists(meeting_id, "structured_clean.csv"),
+        "size": int(st.st_size),
+        "mtime_ns": int(st.st_mtime_ns),
+        "ctime_ns": int(st.st_ctime_ns),
+        "ino": int(st.st_ino),
+    }
+
+
+def _store_fingerprint(meeting_id: str, filename: str, path: Path) -> dict[str, Any] | None:
+    try:
+        before = path.stat()
+        data = path.read_bytes()
+        st = path.stat()
+    except OSError:
+        return None
+    entry = {
+        **_stat_fields(st),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "hashed_ns": time.time_ns(),
     }
+    if _stat_fields(before) != _stat_fields(st):
+        # Файл переписали во время чтения — sha может не соответствовать stat, не запоминаем.
+        return entry
+    with _FINGERPRINT_LOCK:
+        payload = _read_fingerprints(meeting_id)
+        payload[filename] = entry
+        target = _fingerprints_path(meeting_id)
+        tmp = target.with_name(target.name + ".tmp")
+        try:
+            tmp.write_text(json.dumps(payload, ensure_ascii=False, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, target)
+        except OSError:
+            pass
+    return entry
+
+
+def file_fingerprint(meeting_id: str, filename: str) -> dict[str, Any] | None:
+    """
+    {"size", "mtime_ns", "ctime_ns", "ino", "sha256", "hashed_ns"} файла встречи;
+    None, если файла нет.
+
+    sha берётся из sidecar, пока size/mtime/ctime/inode совпадают; файл, изменённый в обход
+    write_text, перехэшируется один раз и sidecar обновляется. Если хэш снят в пределах
+    точности mtime от изменения файла, совпадение stat ничего не доказывает — перехэш.
+    """
+    path = meeting_dir(meeting_id) / filename
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    entry = _read_fingerprints(meeting_id).get(filename)
+    if (
+        isinstance(entry, dict)
+        and entry.get("sha256")
+        and all(entry.get(key) == value for key, value in _stat_fields(st).items())
+        and int(entry.get("hashed_ns") or 0) - int(st.st_mtime_ns) > _MTIME_GRANULARITY_NS
+    ):
+        return entry
+    return _store_fingerprint(meeting_id, filename, path)
+
+
+_ARTIFACT_FILES = {
+    "raw": "raw.txt",
+    "normalized": "normalized.txt",
+    "clean": "clean.txt",
+    "audio_mp3": "meeting_audio.mp3",
+    "report_raw": "report_raw.json",
+    "report_clean": "report_clean.json",
+    "report_raw_txt": "report_raw.txt",
+    "report_clean_txt": "report_clean.txt",
+    "structured_raw_json": "structured_raw.json",
+    "structured_raw_csv": "structured_raw.csv",
+    "structured_clean_json": "structured_clean.json",
+    "structured_clean_csv": "structured_clean.csv",
+}
+
+
+def list_artifacts(meeting_id: str) -> dict[str, bool]:
+    # Один листинг каталога вместо stat на каждый артефакт.
+    try:
+        with os.scandir(meeting_dir(meeting_id)) as entries:
+            names = {entry.name for entry in entries if entry.is_file()}
+    except OSError:
+        names = set()
+    return {key: filename in names for key, filename in _ARTIFACT_FILES.items()}
@@ -8,6 +8,8 @@
 
 from __future__ import annotations
 
+from datetime import datetime
+
 from sqlalchemy import desc
 from sqlalchemy.orm import Session
 
@@ -75,14 +77,36 @@ class MeetingRepository:
     def list_active(self) -> list[Meeting]:
         return self.session.query(Meeting).filter(Meeting.finished_at.is_(None)).all()
 
-    def list_recent(self, *, limit: int = 50) -> list[Meeting]:
+    def list_recent(
+        self,
+        *,
+        limit: int = 50,
+        created_from: datetime | None = None,
+        created_before: datetime | None = None,
+    ) -> list[Meeting]:
         limit = max(1, min(limit, 200))
-        return (
-            self.session.query(Meeting)
-            .order_by(desc(Meeting.created_at))
-            .limit(limit)
-            .all()
-        )
+        query = self.session.query(Meeting)
+        if created_from is not None:
+            query = query.filter(Meeting.created_at >= created_from)
+        if created_before is not None:
+            query = query.filter(Meeting.created_at < created_before)
+        return query.order_by(desc(Meeting.created_at)).limit(limit).all()
+
+    def filter_ids_created_between(
+        self,
+        meeting_ids: list[str],
+        *,
+        created_from: datetime | None = None,
+        created_before: datetime | None = None,
+    ) -> list[str]:
+        if not meeting_ids:
+            return []
+        query = self.session.query(Meeting.id).filter(Meeting.id.in_(list(meeting_ids)))
+        if created_from is not None:
+            query = query.filter(Meeting.created_at >= created_from)
+        if created_before is not None:
+            query = query.filter(Meeting.created_at < created_before)
+        return [str(row[0]) for row in query.all()]
 
 
 # =============================================================================
@@ -127,6 +151,34 @@ class TranscriptSegmentRepository:
             .all()
         )
 
+    def list_by_meeting_after_id(self, meeting_id: str, *, after_id: int) -> list[TranscriptSegment]:
+        """Сегменты, добавленные после сегмента after_id (id растёт с каждой вставкой), по seq."""
+        return (
+            self.session.query(TranscriptSegment)
+            .filter(TranscriptSegment.meeting_id == meeting_id, TranscriptSegment.id > int(after_id))
+            .order_by(TranscriptSegment.seq)
+            .all()
+        )
+
+    def list_by_meeting_from_seq(self, meeting_id: str, *, from_seq: int) -> list[TranscriptSegment]:
+        return (
+            self.session.query(TranscriptSegment)
+            .filter(TranscriptSegment.meeting_id == meeting_id, TranscriptSegment.seq >= int(from_seq))
+            .order_by(TranscriptSegment.seq)
+            .all()
+        )
+
+    def window_start_seq(self, meeting_id: str, *, before_seq: int, size: int) -> int:
+        """seq, с которого начинаются size сегментов перед before_seq (или before_seq, если их нет)."""
+        rows = (
+            self.session.query(TranscriptSegment.seq)
+            .filter(TranscriptSegment.meeting_id == meeting_id, TranscriptSegment.seq < int(before_seq))
+            .order_by(TranscriptSegment.seq.desc())
+            .limit(max(0, int(size)))
+            .all()
+        )
+        return min((int(row[0]) for row in rows), default=int(before_seq))
+
 
 class SecurityAuditRepository:
     def __init__(self, session: Session) -> None:
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import io
+import json
+
+from interview_analytics_agent.llm import anthropic
+from interview_analytics_agent.llm.anthropic import AnthropicConfig, AnthropicProvider
+
+
+def _provider() -> AnthropicProvider:
+    provider = AnthropicProvider.__new__(AnthropicProvider)
+    provider.cfg = AnthropicConfig(
+        api_base="https://api.anthropic.com/v1",
+        api_key="anthropic-test",
+        model="claude-3-5-sonnet-latest",
+        timeout_s=15,
+        max_tokens=256,
+        temperature=0.2,
+        top_p=0.95,
+    )
+    return provider
+
+
+def test_anthropic_stream_text_decodes_utf8(monkeypatch) -> None:
+    chunks = ["Кандидат", " уверенно отвечал"]
+    events = [{"type": "message_start"}] + [
+        {"type": "content_block_delta", "delta": {"type": "text_delta", "text": c}} for c in chunks
+    ] + [{"type": "message_stop"}]
+    body = "".join(
+        f"event: {e['type']}\ndata: {json.dumps(e, ensure_ascii=False)}\n\n" for e in events
+    )
+
+    def _post(*args, **kwargs):
+        resp = anthropic.requests.Response()
+        resp.status_code = 200
+        resp.headers["Content-Type"] = "text/event-stream"
+        # Так requests выставляет кодировку для text/* без charset.
+        resp.encoding = "ISO-8859-1"
+        resp.raw = io.BytesIO(body.encode("utf-8"))
+        return resp
+
+    monkeypatch.setattr(anthropic.requests, "post", _post)
+
+    assert list(_provider().stream_text(system="s", user="u")) == chunks
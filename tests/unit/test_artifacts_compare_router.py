@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 from datetime import datetime
+import json
+import threading
 import time
 
 import pytest
@@ -861,16 +863,333 @@ def test_rag_index_builds_chunks_with_citations_and_caches(monkeypatch, tmp_path
         assert "INTERVIEWER" in first["speakers"]
         assert "CANDIDATE" in first["speakers"]
         assert first["meeting_meta"]["candidate_name"] == "Alice"
-        assert payload1["schema_version"] == "rag_index_v2"
+        assert payload1["schema_version"] == "rag_index_v3"
         assert isinstance(payload1.get("vector"), dict)
         assert bool(payload1["vector"].get("enabled")) is True
-        assert isinstance(first.get("embedding"), list)
-        assert len(first["embedding"]) == int(payload1["vector"].get("dim") or 0)
-        assert artifacts_router.records.exists("m1", "artifacts/rag/index_clean.json")
+        assert "embedding" not in first
+        store = payload1["vector_store"]
+        assert store.matrix.shape == (payload1["chunk_count"], int(payload1["vector"].get("dim") or 0))
+        assert store.matrix.dtype.name == "float32"
+        assert artifacts_router.records.exists("m1", "artifacts/rag/index_clean.ragidx")
+        assert not artifacts_router.records.exists("m1", "artifacts/rag/index_clean.json")
+        assert payload2["vector_store"].matrix.tolist() == store.matrix.tolist()
+        assert payload2["chunks"] == payload1["chunks"]
+        keyword_index = payload2["keyword_index"]
+        assert keyword_index.chunk_count == payload1["chunk_count"]
+        assert keyword_index.df("python") >= 1
+        assert keyword_index.chunk_lengths == [chunk["token_count"] for chunk in payload1["chunks"]]
     finally:
         settings.records_dir = records_dir_snapshot
 
 
+def test_rag_read_index_moves_legacy_inline_embeddings_into_vector_store(tmp_path, auth_none_settings) -> None:
+    settings = get_settings()
+    records_dir_snapshot = settings.records_dir
+    try:
+        settings.records_dir = str(tmp_path)
+        path = artifacts_router.records.artifact_path("m_legacy", "artifacts/rag/index_clean.json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(
+                {
+                    "schema_version": "rag_index_v2",
+                    "chunks": [
+                        {"chunk_id": "c0001", "text": "python", "embedding": [0.6, 0.8]},
+                        {"chunk_id": "c0002", "text": "sql", "embedding": [1.0, 0.0]},
+                    ],
+                }
+            ),
+            encoding="utf-8",
+        )
+
+        payload = artifacts_router._rag_read_index("m_legacy", "clean")
+
+        assert payload["vector_store"].matrix.shape == (2, 2)
+        assert all("embedding" not in chunk for chunk in payload["chunks"])
+        scores = payload["vector_store"].cosine_scores([1.0, 0.0]).tolist()
+        assert scores == pytest.approx([0.6, 1.0])
+
+        # Пересборка пишет rag_index_v3 и убирает legacy JSON.
+        artifacts_router._rag_write_index("m_legacy", "clean", payload)
+        assert not path.exists()
+        migrated = artifacts_router._rag_read_index("m_legacy", "clean")
+        assert migrated["chunks"] == payload["chunks"]
+        assert migrated["vector_store"].cosine_scores([1.0, 0.0]).tolist() == pytest.approx([0.6, 1.0])
+    finally:
+        settings.records_dir = records_dir_snapshot
+
+
+def test_rag_ensure_index_serves_unchanged_index_from_memory(monkeypatch, tmp_path, auth_none_settings) -> None:
+    settings = get_settings()
+    records_dir_snapshot = settings.records_dir
+    try:
+        settings.records_dir = str(tmp_path)
+        monkeypatch.setattr(artifacts_router, "_rag_segment_line_metadata", lambda meeting_id: [])
+        monkeypatch.setattr(artifacts_router, "_rag_meeting_meta", lambda meeting_id: {})
+        monkeypatch.setattr(artifacts_router, "_rag_vector_config", lambda: {"enabled": False})
+        artifacts_router.records.write_text("m_cache", "clean.txt", "CANDIDATE: Python и SQL")
+
+        payload1, cached1 = artifacts_router._ensure_rag_index("m_cache", source="clean")
+
+        def _fail_read(**kwargs):
+            raise AssertionError("transcript must not be re-read")
+
+        monkeypatch.setattr(artifacts_router, "_transcript_for_source", _fail_read)
+        monkeypatch.setattr(artifacts_router, "read_index_file", _fail_read)
+        payload2, cached2 = artifacts_router._ensure_rag_index("m_cache", source="clean")
+
+        assert cached1 is False
+        assert cached2 is True
+        assert payload2 is payload1
+
+        monkeypatch.undo()
+        monkeypatch.setattr(artifacts_router, "_rag_segment_line_metadata", lambda meeting_id: [])
+        monkeypatch.setattr(artifacts_router, "_rag_meeting_meta", lambda meeting_id: {})
+        monkeypatch.setattr(artifacts_router, "_rag_vector_config", lambda: {"enabled": False})
+        artifacts_router.records.write_text("m_cache", "clean.txt", "CANDIDATE: Python, SQL и Kafka")
+        payload3, cached3 = artifacts_router._ensure_rag_index("m_cache", source="clean")
+
+        assert cached3 is False
+        assert "Kafka" in payload3["chunks"][0]["text"]
+    finally:
+        settings.records_dir = records_dir_snapshot
+
+
+def test_rag_reindex_reuses_embeddings_of_unchanged_chunks(monkeypatch, tmp_path, auth_none_settings) -> None:
+    settings = get_settings()
+    records_dir_snapshot = settings.records_dir
+    embedded: list[list[str]] = []
+
+    def _fake_embed(texts, *, vector_cfg):
+        embedded.append(list(texts))
+        return [[1.0, float(len(text))] for text in texts]
+
+    try:
+        settings.records_dir = str(tmp_path)
+        monkeypatch.setattr(artifacts_router, "_rag_segment_line_metadata", lambda meeting_id: [])
+        monkeypatch.setattr(artifacts_router, "_rag_meeting_meta", lambda meeting_id: {})
+        monkeypatch.setattr(
+            artifacts_router,
+            "_rag_vector_config",
+            lambda: {"enabled": True, "provider": "hashing_local", "model": "h", "dim": 2, "char_ngrams": True},
+        )
+        monkeypatch.setattr(artifacts_router, "_rag_embed_texts", _fake_embed)
+        opts = {"source": "clean", "max_lines_per_chunk": 1, "overlap_lines": 0}
+        artifacts_router.records.write_text("m_inc", "clean.txt", "A: one\nB: two\nA: three")
+        first, _cached = artifacts_router._ensure_rag_index("m_inc", **opts)
+
+        artifacts_router.records.write_text("m_inc", "clean.txt", "A: one\nB: two, fixed\nA: three")
+        second, cached = artifacts_router._ensure_rag_index("m_inc", **opts)
+
+        assert cached is False
+        assert [chunk["text"] for chunk in second["chunks"]] == ["A: one", "B: two, fixed", "A: three"]
+        assert embedded[1] == ["B: two, fixed"]
+        assert second["vector_store"].matrix.tolist() == [[1.0, 6.0], [1.0, 13.0], [1.0, 8.0]]
+        assert second["keyword_index"].df("fixed") == 1
+        assert first["vector_store"].matrix.tolist()[0] == [1.0, 6.0]
+    finally:
+        settings.records_dir = records_dir_snapshot
+
+
+def test_rag_query_serves_fresh_meetings_from_global_corpus(monkeypatch, tmp_path, auth_none_settings) -> None:
+    settings = get_settings()
+    records_dir_snapshot = settings.records_dir
+    try:
+        settings.records_dir = str(tmp_path)
+        monkeypatch.setattr(artifacts_router, "_rag_segment_line_metadata", lambda meeting_id: [])
+        monkeypatch.setattr(artifacts_router, "_rag_meeting_meta", lambda meeting_id: {})
+        monkeypatch.setattr(artifacts_router, "_rag_vector_config", lambda: {"enabled": False})
+        monkeypatch.setattr(artifacts_router, "_RAG_CORPORA", {})
+        artifacts_router.records.write_text("m_a", "clean.txt", "A: python and sql\nB: kafka")
+        artifacts_router.records.write_text("m_b", "clean.txt", "A: golang only")
+        req = artifacts_router.RAGQueryRequest(
+            query="python sql", transcript_variant="clean", meeting_ids=["m_a", "m_b"], top_k=3, auto_index=True
+        )
+        first = artifacts_router._rag_query(req)
+
+        def _fail(*_args, **_kwargs):
+            raise AssertionError("per-meeting index must not be touched")
+
+        monkeypatch.setattr(artifacts_router, "_ensure_rag_index", _fail)
+        monkeypatch.setattr(artifacts_router, "_rag_read_index", _fail)
+        second = artifacts_router._rag_query(req)
+
+        assert second.indexed_meetings == 2
+        assert second.total_chunks_scanned == first.total_chunks_scanned
+        assert [(h.chunk_id, h.score) for h in second.hits] == [(h.chunk_id, h.score) for h in first.hits]
+        assert second.hits[0].meeting_id == "m_a"
+        assert second.warnings == []
+    finally:
+        settings.records_dir = records_dir_snapshot
+
+
+def test_rag_query_returns_cached_response_until_index_changes(monkeypatch, tmp_path, auth_none_settings) -> None:
+    settings = get_settings()
+    records_dir_snapshot = settings.records_dir
+    try:
+        settings.records_dir = str(tmp_path)
+        monkeypatch.setattr(artifacts_router, "_rag_segment_line_metadata", lambda meeting_id: [])
+        monkeypatch.setattr(artifacts_router, "_rag_meeting_meta", lambda meeting_id: {})
+        monkeypatch.setattr(artifacts_router, "_rag_vector_config", lambda: {"enabled": False})
+        monkeypatch.setattr(artifacts_router, "_RAG_CORPORA", {})
+        monkeypatch.setattr(artifacts_router, "_RAG_QUERY_CACHE", artifacts_router.OrderedDict())
+        artifacts_router.records.write_text("m_q", "clean.txt", "A: python and sql")
+        req = artifacts_router.RAGQueryRequest(query="Python  SQL", meeting_ids=["m_q"], top_k=3)
+        first = artifacts_router._rag_query(req)
+        rank_hits = artifacts_router._rag_rank_hits
+
+        def _no_rank(**_kwargs):
+            raise AssertionError("cached query must not be re-ranked")
+
+        monkeypatch.setattr(artifacts_router, "_rag_rank_hits", _no_rank)
+        second = artifacts_router._rag_query(req.model_copy(update={"query": "python sql"}))
+
+        assert first.cached is False
+        assert second.cached is True
+        assert second.request_id == first.request_id
+        assert [f.filename for f in second.files] == [f.filename for f in first.files]
+        assert [h.chunk_id for h in second.hits] == [h.chunk_id for h in first.hits]
+
+        monkeypatch.setattr(artifacts_router, "_rag_rank_hits", rank_hits)
+        artifacts_router.records.write_text("m_q", "clean.txt", "A: python and sql, changed")
+        third = artifacts_router._rag_query(req)
+        assert third.cached is False
+        assert third.request_id != first.request_id
+    finally:
+        settings.records_dir = records_dir_snapshot
+
+
+def test_rag_query_does_not_cache_failed_llm_answer(monkeypatch, tmp_path, auth_none_settings) -> None:
+    settings = get_settings()
+    records_dir_snapshot = settings.records_dir
+    try:
+        settings.records_dir = str(tmp_path)
+        monkeypatch.setattr(artifacts_router, "_rag_segment_line_metadata", lambda meeting_id: [])
+        monkeypatch.setattr(artifacts_router, "_rag_meeting_meta", lambda meeting_id: {})
+        monkeypatch.setattr(artifacts_router, "_rag_vector_config", lambda: {"enabled": False})
+        monkeypatch.setattr(artifacts_router, "_RAG_CORPORA", {})
+        monkeypatch.setattr(artifacts_router, "_RAG_QUERY_CACHE", artifacts_router.OrderedDict())
+        artifacts_router.records.write_text("m_l", "clean.txt", "A: python and sql")
+        req = artifacts_router.RAGQueryRequest(query="python sql", meeting_ids=["m_l"], top_k=3, answer_mode="llm")
+
+        monkeypatch.setattr(artifacts_router, "_build_llm_artifact_orchestrator", lambda: None)
+        failed = artifacts_router._rag_query(req)
+        assert failed.llm_used is False
+        assert "llm_unavailable" in failed.warnings
+
+        class _Orch:
+            def complete_text(self, *, system: str, user: str):
+                return type("Result", (), {"text": "Python и SQL [1]"})()
+
+        monkeypatch.setattr(artifacts_router, "_build_llm_artifact_orchestrator", lambda: _Orch())
+        retried = artifacts_router._rag_query(req)
+        assert retried.cached is False
+        assert retried.llm_used is True
+        assert retried.answer == "Python и SQL [1]"
+
+        assert artifacts_router._rag_query(req).cached is True
+    finally:
+        settings.records_dir = records_dir_snapshot
+
+
+def test_rag_query_cache_key_covers_requested_meetings(monkeypatch, tmp_path, auth_none_settings) -> None:
+    settings = get_settings()
+    records_dir_snapshot = settings.records_dir
+    try:
+        settings.records_dir = str(tmp_path)
+        monkeypatch.setattr(artifacts_router, "_rag_segment_line_metadata", lambda meeting_id: [])
+        monkeypatch.setattr(artifacts_router, "_rag_meeting_meta", lambda meeting_id: {})
+        monkeypatch.setattr(artifacts_router, "_rag_vector_config", lambda: {"enabled": False})
+        monkeypatch.setattr(artifacts_router, "_RAG_CORPORA", {})
+        monkeypatch.setattr(artifacts_router, "_RAG_QUERY_CACHE", artifacts_router.OrderedDict())
+        artifacts_router.records.write_text("m_a", "clean.txt", "A: python and sql")
+
+        # У m_missing нет транскрипта: индекс не строится, такой ответ не кэшируется.
+        both = artifacts_router._rag_query(
+            artifacts_router.RAGQueryRequest(query="python sql", meeting_ids=["m_a", "m_missing"], top_k=3)
+        )
+        assert "index_failed:m_missing" in both.warnings
+        only_a = artifacts_router._rag_query(
+            artifacts_router.RAGQueryRequest(query="python sql", meeting_ids=["m_a"], top_k=3)
+        )
+        assert only_a.cached is False
+        assert only_a.meeting_ids == ["m_a"]
+        assert only_a.warnings == []
+
+        again = artifacts_router._rag_query(
+            artifacts_router.RAGQueryRequest(query="Python  SQL", meeting_ids=["m_a"], top_k=3)
+        )
+        assert again.cached is True
+        assert again.query == "Python  SQL"
+        assert again.searched_meetings == 1
+    finally:
+        settings.records_dir = records_dir_snapshot
+
+
+def test_rag_query_debug_reports_stage_timings(monkeypatch, tmp_path, auth_none_settings) -> None:
+    settings = get_settings()
+    records_dir_snapshot = settings.records_dir
+    try:
+        settings.records_dir = str(tmp_path)
+        monkeypatch.setattr(artifacts_router, "_rag_segment_line_metadata", lambda meeting_id: [])
+        monkeypatch.setattr(artifacts_router, "_rag_meeting_meta", lambda meeting_id: {})
+        monkeypatch.setattr(artifacts_router, "_RAG_CORPORA", {})
+        monkeypatch.setattr(artifacts_router, "_RAG_QUERY_CACHE", artifacts_router.OrderedDict())
+        observed: list[str] = []
+        monkeypatch.setattr(
+            artifacts_router,
+            "record_rag_query_stage_latency_ms",
+            lambda *, service, stage, elapsed_ms: observed.append(stage),
+        )
+        artifacts_router.records.write_text("m_t", "clean.txt", "A: python and sql")
+        req = artifacts_router.RAGQueryRequest(query="python sql", meeting_ids=["m_t"], top_k=3, debug=True)
+
+        first = artifacts_router._rag_query(req)
+        timings = first.retrieval_metrics.stage_timings_ms
+        assert {"index_load", "query_embedding", "semantic_scoring", "keyword_scoring", "rerank", "export_write"} <= set(timings)
+        assert all(value >= 0 for value in timings.values())
+        assert "rerank" in observed
+
+        cached = artifacts_router._rag_query(req.model_copy(update={"debug": False}))
+        assert cached.cached is True
+        assert cached.retrieval_metrics.stage_timings_ms == {}
+    finally:
+        settings.records_dir = records_dir_snapshot
+
+
+def test_rag_query_cache_expires_and_evicts_least_recently_used(monkeypatch, auth_none_settings) -> None:
+    monkeypatch.setattr(artifacts_router, "_RAG_QUERY_CACHE", artifacts_router.OrderedDict())
+    monkeypatch.setattr(artifacts_router, "_rag_query_cache_max_items", lambda: 2)
+    clock = [100.0]
+    monkeypatch.setattr(artifacts_router.time, "monotonic", lambda: clock[0])
+    response = artifacts_router.RAGQueryResponse(query="q", transcript_variant="clean")
+
+    for key in ("a", "b"):
+        artifacts_router._rag_query_cache_put(key, response)
+    assert artifacts_router._rag_query_cache_get("a") is not None
+    artifacts_router._rag_query_cache_put("c", response)
+
+    assert list(artifacts_router._RAG_QUERY_CACHE) == ["a", "c"]
+    clock[0] += artifacts_router._rag_query_cache_ttl_s() + 1
+    assert artifacts_router._rag_query_cache_get("a") is None
+    assert artifacts_router._rag_query_cache_get(None) is None
+
+
+def test_rag_index_cache_evicts_least_recently_used_by_byte_budget(monkeypatch, auth_none_settings) -> None:
+    monkeypatch.setattr(artifacts_router, "_rag_index_cache_max_bytes", lambda: 30_000)
+    monkeypatch.setattr(artifacts_router, "_RAG_INDEX_CACHE", artifacts_router.OrderedDict())
+    payload = {"chunks": [{"text": "x" * 2000}]}
+
+    for name in ("a", "b", "c"):
+        artifacts_router._rag_index_cache_put(("m", name), dict(payload), index_stat=(name, 1, 1))
+    assert artifacts_router._rag_index_cache_get(("m", "a"), index_stat=("a", 1, 1)) is not None
+    artifacts_router._rag_index_cache_put(("m", "d"), dict(payload), index_stat=("d", 1, 1))
+
+    # ~8.6 KB на запись: помещаются три, вытесняется давно не использованный "b".
+    assert [name for _m, name in artifacts_router._RAG_INDEX_CACHE] == ["c", "a", "d"]
+    assert artifacts_router._rag_index_cache_get(("m", "a"), index_stat=("a", 2, 1)) is None
+
+
 def test_rag_embed_texts_batches_dedupes_and_caches_provider(monkeypatch, auth_none_settings) -> None:
     vector_cfg = {
         "enabled": True,
@@ -906,8 +1225,30 @@ def test_rag_embed_texts_batches_dedupes_and_caches_provider(monkeypatch, auth_n
     assert rows1[0] == rows1[2]
     assert rows2[0] == rows1[3]
     assert rows2[1] == rows1[0]
-    # Unique texts: alpha, beta, gamma. Batch size=2 -> two provider calls total.
-    assert calls == [["alpha", "beta"], ["gamma"]]
+    # Unique texts: alpha, beta, gamma. Batch size=2 -> two provider calls total (may run concurrently).
+    assert sorted(calls) == [["alpha", "beta"], ["gamma"]]
+
+
+def test_rag_embed_batches_limits_in_flight_requests(monkeypatch, auth_none_settings) -> None:
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    def _slow_embed(batch):
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        time.sleep(0.02)
+        with lock:
+            state["active"] -= 1
+        return [[float(len(text))] for text in batch]
+
+    monkeypatch.setattr(artifacts_router, "_rag_embedding_max_concurrency", lambda: 3)
+    texts = [f"t{i:02d}" + "x" * i for i in range(20)]
+
+    rows = artifacts_router._rag_embed_batches(texts, batch_size=2, embed_batch=_slow_embed)
+
+    assert rows == [[float(len(text))] for text in texts]
+    assert 1 < state["peak"] <= 3
 
 
 def test_rag_embed_texts_uses_disk_cache_after_ram_clear(monkeypatch, tmp_path, auth_none_settings) -> None:
@@ -941,8 +1282,8 @@ def test_rag_embed_texts_uses_disk_cache_after_ram_clear(monkeypatch, tmp_path,
 
         rows1 = artifacts_router._rag_embed_texts(["alpha"], vector_cfg=vector_cfg)
         key = artifacts_router._rag_embedding_cache_key("alpha", vector_cfg=vector_cfg)
-        cache_path = artifacts_router._rag_embedding_disk_cache_path(key)
-        assert cache_path.exists()
+        assert artifacts_router._rag_embedding_disk_cache_path().exists()
+        assert artifacts_router._rag_embedding_disk_cache_store().get_many([key]) == {key: [0.25, 0.75]}
 
         with artifacts_router._RAG_EMBEDDING_CACHE_LOCK:
             artifacts_router._RAG_EMBEDDING_CACHE.clear()
@@ -958,6 +1299,34 @@ def test_rag_embed_texts_uses_disk_cache_after_ram_clear(monkeypatch, tmp_path,
         settings.records_dir = records_dir_snapshot
 
 
+def test_rag_embedding_disk_cache_migrates_legacy_json_files(monkeypatch, tmp_path, auth_none_settings) -> None:
+    settings = get_settings()
+    records_dir_snapshot = settings.records_dir
+    monkeypatch.setattr(artifacts_router, "_rag_embedding_disk_cache_enabled", lambda: True)
+    try:
+        settings.records_dir = str(tmp_path)
+        key = "ab" + "0" * 62
+        legacy = artifacts_router._rag_embedding_disk_cache_dir() / "ab" / f"{key}.json"
+        legacy.parent.mkdir(parents=True, exist_ok=True)
+        legacy.write_text(json.dumps({"schema_version": "rag_embedding_cache_v1", "vector": [0.5, 1.5]}), encoding="utf-8")
+
+        other = "ab" + "2" * 62
+        (legacy.parent / f"{other}.json").write_text(
+            json.dumps({"schema_version": "rag_embedding_cache_v1", "vector": [2.0]}), encoding="utf-8"
+        )
+
+        assert artifacts_router._rag_embedding_disk_cache_read_many([key, "cd" + "1" * 62]) == {key: [0.5, 1.5]}
+        # Перенесённый файл удалён, каталог с оставшимся вектором — нет.
+        assert not legacy.exists()
+        assert legacy.parent.is_dir()
+        assert artifacts_router._rag_embedding_disk_cache_read_many([key]) == {key: [0.5, 1.5]}
+
+        assert artifacts_router._rag_embedding_disk_cache_read_many([other]) == {other: [2.0]}
+        assert not artifacts_router._rag_embedding_disk_cache_dir().exists()
+    finally:
+        settings.records_dir = records_dir_snapshot
+
+
 def test_ensure_rag_index_uses_batched_embeddings(monkeypatch, tmp_path, auth_none_settings) -> None:
     settings = get_settings()
     records_dir_snapshot = settings.records_dir
@@ -1009,7 +1378,7 @@ def test_ensure_rag_index_uses_batched_embeddings(monkeypatch, tmp_path, auth_no
         assert payload["chunk_count"] >= 2
         assert len(batch_calls) == 1
         assert len(batch_calls[0]) == payload["chunk_count"]
-        assert all(chunk.get("embedding") == [1.0, 0.0] for chunk in payload["chunks"])
+        assert payload["vector_store"].matrix.tolist() == [[1.0, 0.0]] * payload["chunk_count"]
     finally:
         settings.records_dir = records_dir_snapshot
 
@@ -1083,6 +1452,69 @@ def test_rag_rank_hits_supports_vector_score_without_keyword_overlap(monkeypatch
     assert hits[0].score > 0.0
 
 
+def test_rag_rank_hits_ann_probe_keeps_top_semantic_and_keyword_hits(monkeypatch, auth_none_settings) -> None:
+    monkeypatch.setattr(
+        artifacts_router,
+        "_rag_vector_config",
+        lambda: {"enabled": True, "provider": "hashing_local", "model": "h", "dim": 8, "char_ngrams": True},
+    )
+    monkeypatch.setattr(artifacts_router, "_rag_embed_text", lambda text, **kwargs: [1.0] + [0.0] * 7)
+    monkeypatch.setattr(artifacts_router, "_rag_ann_min_rows", lambda: 256)
+    monkeypatch.setattr(artifacts_router, "_rag_ann_nprobe", lambda: 1)
+    rng = artifacts_router.np.random.default_rng(3)
+    matrix = rng.normal(size=(400, 8)).astype("float32")
+    matrix[17] = [1.0, 0.01, 0, 0, 0, 0, 0, 0]
+    # Чанк с термином запроса лежит «далеко» по вектору — попадает в кандидаты через postings.
+    matrix[250] = [-1.0, 0, 0, 0, 0, 0, 0, 0.5]
+    chunks = [
+        {"meeting_id": "m1", "chunk_id": f"c{i}", "text": "kafka lag" if i == 250 else f"filler {i}"}
+        for i in range(400)
+    ]
+    store = artifacts_router.RAGVectorStore(matrix, ann=artifacts_router.RAGIVFIndex.build(matrix, n_lists=20))
+    index = {"chunks": chunks, "vector": {"enabled": True, "provider": "hashing_local", "model": "h", "dim": 8}}
+
+    def _rank() -> list[str]:
+        hits, total, _mode, _ = artifacts_router._rag_rank_hits(
+            query="kafka", indexes=[dict(index, vector_store=store)], transcript_variant="clean", top_k=3
+        )
+        assert total == 400
+        return [hit.chunk_id for hit in hits]
+
+    with_ann = _rank()
+    monkeypatch.setattr(artifacts_router, "_rag_ann_enabled", lambda: False)
+    exact = _rank()
+
+    assert with_ann[:2] == exact[:2]
+    assert "c250" in with_ann and "c17" in with_ann
+
+
+def test_rag_rank_hits_scores_expensive_boosts_only_for_top_candidates(monkeypatch, auth_none_settings) -> None:
+    monkeypatch.setattr(artifacts_router, "_rag_vector_config", lambda: {"enabled": False})
+    monkeypatch.setattr(artifacts_router, "_rag_reranker_top_n", lambda: 2)
+    calls: list[int] = []
+    ordered_ratio = artifacts_router._rag_ordered_match_ratio
+
+    def _counting_ratio(tokens, terms):
+        calls.append(1)
+        return ordered_ratio(tokens, terms)
+
+    monkeypatch.setattr(artifacts_router, "_rag_ordered_match_ratio", _counting_ratio)
+    chunks = [
+        {"meeting_id": "m1", "chunk_id": f"c{i}", "text": f"python {'sql ' * (i % 3)}" + "filler " * (i % 40)}
+        for i in range(300)
+    ]
+
+    hits, total, _mode, metrics = artifacts_router._rag_rank_hits(
+        query="python sql", indexes=[{"chunks": chunks}], transcript_variant="clean", top_k=3
+    )
+
+    assert total == 300
+    assert [hit.chunk_id for hit in hits] == ["c80", "c200", "c41"]
+    assert len(calls) < 100
+    assert metrics.total_relevant_candidates == 300
+    assert metrics.mrr == 1.0
+
+
 def test_rag_rank_hits_keyword_score_respects_query_term_repetition(monkeypatch, auth_none_settings) -> None:
     monkeypatch.setattr(artifacts_router, "_rag_vector_config", lambda: {"enabled": False})
 
@@ -1225,6 +1657,106 @@ def test_rag_query_ranks_across_selected_meetings(monkeypatch, auth_none_setting
     }
 
 
+def test_rag_query_meta_filters_prune_chunks_before_scoring(monkeypatch, auth_none_settings) -> None:
+    def _index(meeting_id: str, vacancy: str, level: str) -> dict:
+        return {
+            "chunks": [
+                {
+                    "meeting_id": meeting_id,
+                    "chunk_id": "c0001",
+                    "text": "CANDIDATE: python sql in production",
+                    "meeting_meta": {"candidate_name": meeting_id, "vacancy": vacancy, "level": level},
+                }
+            ]
+        }
+
+    index_map = {
+        "m1": _index("m1", "Backend Developer", "Senior"),
+        "m2": _index("m2", "Backend Developer", "Middle"),
+        "m3": _index("m3", "Data Engineer", "Senior"),
+    }
+    selected: dict = {}
+
+    def _select(**kwargs):
+        selected.update(kwargs)
+        return ["m1", "m2", "m3"]
+
+    monkeypatch.setattr(artifacts_router, "_rag_select_meeting_ids", _select)
+    monkeypatch.setattr(artifacts_router, "_ensure_rag_index", lambda meeting_id, **kwargs: (index_map[meeting_id], True))
+    monkeypatch.setattr(artifacts_router, "_rag_vector_config", lambda: {"enabled": False})
+
+    resp = artifacts_router._rag_query(
+        artifacts_router.RAGQueryRequest(
+            query="python sql",
+            top_k=5,
+            vacancy="backend",
+            level="SENIOR",
+            date_from="2026-01-01",
+            date_to="2026-01-31",
+        )
+    )
+
+    assert selected["date_from"].isoformat() == "2026-01-01"
+    assert selected["date_to"].isoformat() == "2026-01-31"
+    assert resp.total_chunks_scanned == 1
+    assert [hit.meeting_id for hit in resp.hits] == ["m1"]
+
+    resp = artifacts_router._rag_query(
+        artifacts_router.RAGQueryRequest(query="python sql", top_k=5, interviewer="nobody")
+    )
+    assert resp.hits == []
+    assert "no_chunks_match_filters" in resp.warnings
+
+
+def test_rag_query_stream_emits_hits_tokens_and_done(monkeypatch, tmp_path, auth_none_settings) -> None:
+    settings = get_settings()
+    records_dir_snapshot = settings.records_dir
+    index = {
+        "chunks": [
+            {
+                "meeting_id": "m1",
+                "chunk_id": "c0001",
+                "text": "CANDIDATE: python sql in production",
+                "line_start": 1,
+                "line_end": 1,
+            }
+        ]
+    }
+
+    class _StreamingOrchestrator:
+        def stream_text(self, *, system: str, user: str):
+            assert "[1]" in user
+            yield "Python "
+            yield "и SQL [1]"
+
+    try:
+        settings.records_dir = str(tmp_path)
+        monkeypatch.setattr(artifacts_router, "_rag_select_meeting_ids", lambda **kwargs: ["m1"])
+        monkeypatch.setattr(artifacts_router, "_ensure_rag_index", lambda meeting_id, **kwargs: (index, True))
+        monkeypatch.setattr(artifacts_router, "_rag_vector_config", lambda: {"enabled": False})
+        monkeypatch.setattr(artifacts_router, "_rag_query_cache_enabled", lambda: False)
+        monkeypatch.setattr(artifacts_router, "_build_llm_artifact_orchestrator", lambda: _StreamingOrchestrator())
+
+        resp = _client().post("/v1/rag/query/stream", json={"query": "python sql", "answer_mode": "llm"})
+
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+        events = []
+        for frame in resp.text.strip().split("\n\n"):
+            name, data = frame.split("\n", 1)
+            events.append((name.removeprefix("event: "), json.loads(data.removeprefix("data: "))))
+        assert [name for name, _ in events] == ["hits", "token", "token", "done"]
+        assert events[0][1]["hits"][0]["chunk_id"] == "c0001"
+        assert "".join(payload["text"] for name, payload in events if name == "token") == "Python и SQL [1]"
+        done = events[-1][1]
+        assert done["answer"] == "Python и SQL [1]"
+        assert done["llm_used"] is True
+        assert done["request_id"] == events[0][1]["request_id"]
+        assert {item["fmt"] for item in done["files"]} == {"txt", "csv", "json"}
+    finally:
+        settings.records_dir = records_dir_snapshot
+
+
 def test_rag_index_endpoint_returns_response(monkeypatch, auth_none_settings) -> None:
     payload = {
         "chunk_count": 3,
@@ -1441,6 +1973,122 @@ def test_rag_index_job_manager_completes_and_reports_progress(monkeypatch, auth_
     assert [item.status for item in latest.items] == ["completed", "completed"]
 
 
+def _wait_rag_index_job(manager, job_id: str, timeout_s: float = 3.0):
+    deadline = time.time() + timeout_s
+    latest = manager.get_status(job_id=job_id)
+    while time.time() < deadline and latest.status not in {"completed", "failed", "cancelled"}:
+        time.sleep(0.01)
+        latest = manager.get_status(job_id=job_id)
+    return latest
+
+
+def test_rag_index_job_manager_indexes_meetings_in_parallel_and_skips_fresh(monkeypatch, auth_none_settings) -> None:
+    manager = artifacts_router.RAGIndexJobManager(max_jobs=8, workers=3)
+    barrier = threading.Barrier(3, timeout=2.0)
+    calls: list[str] = []
+
+    def _fake_ensure_rag_index(meeting_id, **kwargs):
+        calls.append(meeting_id)
+        barrier.wait()
+        return {"chunk_count": 1, "chunks": []}, False
+
+    class _Corpus:
+        def doc(self, key):
+            return {"start": 0, "end": 4, "transcript_chars": 50, "indexed_at": "2026-02-26T12:00:00Z"}
+
+    monkeypatch.setattr(artifacts_router, "_ensure_rag_index", _fake_ensure_rag_index)
+    monkeypatch.setattr(artifacts_router, "_rag_corpus_meeting_fresh", lambda meeting_id, *a, **k: meeting_id == "m0")
+    monkeypatch.setattr(artifacts_router, "_rag_corpus", lambda vector_cfg: _Corpus())
+
+    started = manager.start(artifacts_router.RAGIndexJobRequest(meeting_ids=["m0", "m1", "m2", "m3"]))
+    latest = _wait_rag_index_job(manager, started.job_id)
+
+    assert latest.status == "completed"
+    assert sorted(calls) == ["m1", "m2", "m3"]
+    assert latest.skipped_meetings == 1
+    assert latest.ok_meetings == 4
+    assert latest.items[0].status == "skipped"
+    assert latest.items[0].chunk_count == 4
+    assert latest.progress == 1.0
+
+
+def test_rag_index_job_manager_runs_jobs_by_priority_and_cancels(monkeypatch, auth_none_settings) -> None:
+    manager = artifacts_router.RAGIndexJobManager(max_jobs=8, workers=1)
+    release = threading.Event()
+    calls: list[str] = []
+
+    def _fake_ensure_rag_index(meeting_id, **kwargs):
+        calls.append(meeting_id)
+        if meeting_id == "a1":
+            release.wait(2.0)
+        return {"chunk_count": 1, "chunks": []}, False
+
+    monkeypatch.setattr(artifacts_router, "_ensure_rag_index", _fake_ensure_rag_index)
+    monkeypatch.setattr(artifacts_router, "_rag_corpus_meeting_fresh", lambda *a, **k: False)
+
+    first = manager.start(artifacts_router.RAGIndexJobRequest(meeting_ids=["a1"]))
+    deadline = time.time() + 2.0
+    while not calls and time.time() < deadline:
+        time.sleep(0.005)
+    low = manager.start(artifacts_router.RAGIndexJobRequest(meeting_ids=["l1", "l2"]))
+    high = manager.start(artifacts_router.RAGIndexJobRequest(meeting_ids=["h1"], priority=5))
+    again = manager.start(artifacts_router.RAGIndexJobRequest(meeting_ids=["h1"], priority=5))
+    cancelled = manager.cancel(low.job_id)
+    release.set()
+
+    assert again.reused_active_job is True
+    assert again.job_id == high.job_id
+    assert cancelled.status == "cancelled"
+    assert cancelled.cancelled_meetings == 2
+    assert _wait_rag_index_job(manager, first.job_id).status == "completed"
+    assert _wait_rag_index_job(manager, high.job_id).status == "completed"
+    assert manager.get_status(low.job_id).status == "cancelled"
+    assert calls == ["a1", "h1"]
+    assert manager.cancel("ragidx-missing") is None
+
+
+def test_rag_index_job_manager_resumes_persisted_jobs_after_restart(monkeypatch, tmp_path, auth_none_settings) -> None:
+    path = tmp_path / "jobs.sqlite3"
+    release = threading.Event()
+    calls: list[str] = []
+
+    def _fake_ensure_rag_index(meeting_id, **kwargs):
+        calls.append(meeting_id)
+        if meeting_id == "m2":
+            release.wait(2.0)
+        return {"chunk_count": 2, "chunks": []}, False
+
+    monkeypatch.setattr(artifacts_router, "_ensure_rag_index", _fake_ensure_rag_index)
+    monkeypatch.setattr(artifacts_router, "_rag_corpus_meeting_fresh", lambda *a, **k: False)
+
+    first = artifacts_router.RAGIndexJobManager(workers=1, store=artifacts_router.RAGIndexJobStore(path))
+    started = first.start(
+        artifacts_router.RAGIndexJobRequest(meeting_ids=["m1", "m2", "m3"], transcript_variant="raw", priority=3)
+    )
+    deadline = time.time() + 2.0
+    while calls != ["m1", "m2"] and time.time() < deadline:
+        time.sleep(0.005)
+
+    # "Рестарт": новый менеджер на том же файле, пока старый воркер висит на m2.
+    restarted = artifacts_router.RAGIndexJobManager(workers=1, store=artifacts_router.RAGIndexJobStore(path))
+    restored = restarted.get_status()
+    assert restored.job_id == started.job_id
+    assert restored.priority == 3
+    assert restored.transcript_variant == "raw"
+    assert [item.status for item in restored.items] == ["completed", "queued", "queued"]
+
+    calls.clear()
+    release.set()
+    assert restarted.resume() == 1
+    latest = _wait_rag_index_job(restarted, started.job_id)
+    assert latest.status == "completed"
+    # Старый воркер после release тоже доходит до m3, поэтому порядок вызовов не фиксирован;
+    # m2 после calls.clear() мог взять только новый менеджер.
+    assert "m2" in calls
+    assert "m3" in calls
+    assert restarted.resume() == 0
+
+
 def test_rag_index_jobs_endpoints_start_and_status(monkeypatch, auth_none_settings) -> None:
     class _FakeMgr:
         def start(self, req):
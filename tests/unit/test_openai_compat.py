@@ -62,3 +62,36 @@ def test_openai_compat_is_available_false_on_error(monkeypatch) -> None:
     monkeypatch.setattr(openai_compat.requests, "get", _raise)
     provider = openai_compat.OpenAICompatProvider()
     assert provider.is_available(timeout_s=1.2) is False
+
+
+def _sse_response(lines: list[str]):
+    import io
+
+    resp = openai_compat.requests.Response()
+    resp.status_code = 200
+    resp.headers["Content-Type"] = "text/event-stream"
+    # Так requests выставляет кодировку для text/* без charset.
+    resp.encoding = "ISO-8859-1"
+    resp.raw = io.BytesIO("".join(f"{line}\n\n" for line in lines).encode("utf-8"))
+    return resp
+
+
+def test_openai_compat_stream_text_decodes_utf8(monkeypatch) -> None:
+    import json
+
+    class Settings:
+        openai_api_base = "http://127.0.0.1:11434/v1"
+        openai_api_key = ""
+        llm_model_id = "llama3.1:8b"
+        llm_request_timeout_sec = 15
+
+    chunks = ["Привет", ", кандидат"]
+    lines = [
+        "data: " + json.dumps({"choices": [{"delta": {"content": c}}]}, ensure_ascii=False)
+        for c in chunks
+    ] + ["data: [DONE]"]
+    monkeypatch.setattr(openai_compat, "get_settings", lambda: Settings())
+    monkeypatch.setattr(openai_compat.requests, "post", lambda *args, **kwargs: _sse_response(lines))
+    provider = openai_compat.OpenAICompatProvider()
+
+    assert list(provider.stream_text(system="s", user="u")) == chunks
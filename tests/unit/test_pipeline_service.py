@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from interview_analytics_agent.domain.enums import PipelineStage
+from interview_analytics_agent.services import pipeline_service
+
+
+def test_finished_stage_enqueues_final_next_stage(monkeypatch) -> None:
+    calls: list[tuple[str, dict]] = []
+    monkeypatch.setattr(pipeline_service, "enqueue_enhancer", lambda **kw: calls.append(("enhancer", kw)))
+    monkeypatch.setattr(pipeline_service, "enqueue_analytics", lambda **kw: calls.append(("analytics", kw)))
+
+    pipeline_service.on_stage_finished(meeting_id="m-1", stage=PipelineStage.stt)
+    pipeline_service.on_stage_finished(meeting_id="m-1", stage=PipelineStage.enhancer)
+
+    # Без final аналитика не поставила бы delivery.
+    assert calls == [
+        ("enhancer", {"meeting_id": "m-1", "final": True}),
+        ("analytics", {"meeting_id": "m-1", "final": True}),
+    ]
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from interview_analytics_agent.common.config import get_settings
+from interview_analytics_agent.queue import coalesce, dispatcher
+
+
+class _FakePipeline:
+    def __init__(self, redis: _FakeRedis) -> None:
+        self._redis = redis
+        self._ops: list[tuple[str, str]] = []
+
+    def smembers(self, key: str) -> None:
+        self._ops.append(("smembers", key))
+
+    def delete(self, key: str) -> None:
+        self._ops.append(("delete", key))
+
+    def execute(self) -> list:
+        return [getattr(self._redis, op)(key) for op, key in self._ops]
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self._store: dict[str, str] = {}
+        self._sets: dict[str, set[str]] = {}
+
+    def incr(self, key: str) -> int:
+        value = int(self._store.get(key) or 0) + 1
+        self._store[key] = str(value)
+        return value
+
+    def decr(self, key: str) -> int:
+        value = int(self._store.get(key) or 0) - 1
+        self._store[key] = str(value)
+        return value
+
+    def expire(self, key: str, ttl: int) -> bool:
+        _ = ttl
+        return key in self._store
+
+    def set(self, key: str, value: str, ex: int | None = None, nx: bool | None = None) -> bool | None:
+        _ = ex
+        if nx and key in self._store:
+            return None
+        self._store[key] = value
+        return True
+
+    def get(self, key: str) -> str | None:
+        return self._store.get(key)
+
+    def delete(self, key: str) -> int:
+        found = self._store.pop(key, None) is not None or self._sets.pop(key, None) is not None
+        return 1 if found else 0
+
+    def sadd(self, key: str, *members: int) -> int:
+        bucket = self._sets.setdefault(key, set())
+        before = len(bucket)
+        bucket.update(str(m) for m in members)
+        return len(bucket) - before
+
+    def smembers(self, key: str) -> set[str]:
+        return set(self._sets.get(key, set()))
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        return _FakePipeline(self)
+
+
+def _patch(monkeypatch) -> list[tuple[str, dict]]:
+    fake = _FakeRedis()
+    enqueued: list[tuple[str, dict]] = []
+    monkeypatch.setattr(coalesce, "redis_client", lambda: fake)
+    monkeypatch.setattr(
+        dispatcher, "enqueue", lambda queue, payload: enqueued.append((queue, dict(payload)))
+    )
+    return enqueued
+
+
+def test_enhancer_tasks_coalesce_until_worker_picks_one(monkeypatch) -> None:
+    enqueued = _patch(monkeypatch)
+
+    for _ in range(5):
+        dispatcher.enqueue_enhancer(meeting_id="m-1")
+    dispatcher.enqueue_enhancer(meeting_id="m-2")
+
+    assert [(q, p["meeting_id"], p["generation"]) for q, p in enqueued] == [
+        ("q:enhancer", "m-1", 1),
+        ("q:enhancer", "m-2", 1),
+    ]
+
+    # Воркер берёт задачу поколения 1, но покрывает всё, что было схлопнуто (до 5).
+    run_generation = coalesce.begin_run("enhancer", "m-1", generation=1)
+    assert run_generation == 5
+    dispatcher.enqueue_enhancer(meeting_id="m-1")
+    assert enqueued[-1][1]["generation"] == 6
+    coalesce.finish_run("enhancer", "m-1", generation=run_generation)
+
+    assert coalesce.begin_run("enhancer", "m-1", generation=6) == 6
+
+
+def test_touched_seqs_survive_coalescing(monkeypatch) -> None:
+    enqueued = _patch(monkeypatch)
+
+    for seq in (3, 4, 3):
+        dispatcher.enqueue_enhancer(meeting_id="m-1", chunk_seq=seq)
+
+    assert len(enqueued) == 1
+    assert enqueued[0][1]["chunk_seq"] == 3
+    # Задача поколения 1 забирает seq всех схлопнутых в неё задач.
+    assert coalesce.pop_touched("enhancer", "m-1") == {3, 4}
+    assert coalesce.pop_touched("enhancer", "m-1") == set()
+
+
+def test_stale_generation_is_dropped_but_final_always_runs(monkeypatch) -> None:
+    enqueued = _patch(monkeypatch)
+
+    dispatcher.enqueue_analytics(meeting_id="m-1")
+    dispatcher.enqueue_analytics(meeting_id="m-1", final=True)
+    assert [p["final"] for _q, p in enqueued] == [False, True]
+
+    run_generation = coalesce.begin_run("analytics", "m-1", generation=2, final=True)
+    coalesce.finish_run("analytics", "m-1", generation=run_generation)
+
+    # Промежуточная задача уже покрыта финальным прогоном.
+    assert coalesce.begin_run("analytics", "m-1", generation=1) is None
+    assert coalesce.begin_run("analytics", "m-1", generation=2, final=True) == 2
+
+
+def test_failed_enqueue_releases_pending(monkeypatch) -> None:
+    enqueued = _patch(monkeypatch)
+
+    def _broken(queue, payload):
+        raise RuntimeError("redis down")
+
+    monkeypatch.setattr(dispatcher, "enqueue", _broken)
+    try:
+        dispatcher.enqueue_enhancer(meeting_id="m-1")
+    except RuntimeError:
+        pass
+    monkeypatch.setattr(dispatcher, "enqueue", lambda queue, payload: enqueued.append((queue, payload)))
+
+    dispatcher.enqueue_enhancer(meeting_id="m-1")
+    assert len(enqueued) == 1
+
+
+def test_stt_inflight_counter_tracks_enqueued_chunks(monkeypatch) -> None:
+    enqueued = _patch(monkeypatch)
+    monkeypatch.setattr(get_settings(), "queue_mode", "redis")
+
+    for seq in (1, 2):
+        dispatcher.enqueue_stt(meeting_id="m-1", chunk_seq=seq, blob_key=f"b-{seq}")
+    assert [q for q, _p in enqueued] == ["q:stt", "q:stt"]
+    assert coalesce.inflight("stt", "m-1") == 2
+
+    coalesce.settle_inflight("stt", "m-1")
+    coalesce.settle_inflight("stt", "m-1")
+    assert coalesce.inflight("stt", "m-1") == 0
+    # Лишний DECR (повторная доставка последней попытки) не уводит счётчик в минус.
+    coalesce.settle_inflight("stt", "m-1")
+    assert coalesce.inflight("stt", "m-1") == 0
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import time
+
+from interview_analytics_agent.queue import retry
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.zset: dict[str, float] = {}
+
+    def zadd(self, key: str, mapping: dict[str, float]) -> int:
+        assert key == retry.DELAYED_ZSET
+        self.zset.update(mapping)
+        return len(mapping)
+
+    def zrangebyscore(self, key: str, low, high: float, start: int = 0, num: int | None = None):
+        due = sorted((score, member) for member, score in self.zset.items() if score <= high)
+        return [member for _score, member in due][start : start + (num or len(due))]
+
+    def zrem(self, key: str, member: str) -> int:
+        return 1 if self.zset.pop(member, None) is not None else 0
+
+
+def _patch(monkeypatch) -> tuple[_FakeRedis, list[tuple[str, dict]]]:
+    fake = _FakeRedis()
+    enqueued: list[tuple[str, dict]] = []
+    monkeypatch.setattr(retry, "redis_client", lambda: fake)
+    monkeypatch.setattr(retry, "enqueue", lambda queue, payload: enqueued.append((queue, payload)))
+    monkeypatch.setattr(retry, "start_delayed_promoter", lambda: None)
+    return fake, enqueued
+
+
+def test_requeue_with_backoff_schedules_without_sleeping(monkeypatch) -> None:
+    fake, enqueued = _patch(monkeypatch)
+    monkeypatch.setattr(time, "sleep", lambda _sec: (_ for _ in ()).throw(AssertionError("sleep")))
+
+    assert retry.requeue_with_backoff(
+        queue_name="q:analytics", task_payload={"meeting_id": "m-1"}, backoff_sec=30
+    )
+    assert enqueued == []
+    assert len(fake.zset) == 1
+
+    assert retry.promote_due() == 0
+    assert retry.promote_due(now=time.time() + 31) == 1
+    assert enqueued == [("q:analytics", {"meeting_id": "m-1", "attempts": 1})]
+    assert fake.zset == {}
+
+
+def test_promote_due_keeps_task_when_enqueue_fails(monkeypatch) -> None:
+    fake, _enqueued = _patch(monkeypatch)
+    retry.schedule_delayed(queue_name="q:stt", task_payload={"meeting_id": "m-2"}, delay_sec=0)
+
+    def _broken(queue, payload):
+        raise RuntimeError("redis down")
+
+    monkeypatch.setattr(retry, "enqueue", _broken)
+    try:
+        retry.promote_due()
+    except RuntimeError:
+        pass
+    assert len(fake.zset) == 1
+
+
+def test_exhausted_attempts_go_to_dlq_immediately(monkeypatch) -> None:
+    fake, enqueued = _patch(monkeypatch)
+
+    assert not retry.requeue_with_backoff(
+        queue_name="q:delivery", task_payload={"attempts": 3}, max_attempts=3, backoff_sec=5
+    )
+    assert enqueued == [("q:delivery:dlq", {"attempts": 4})]
+    assert fake.zset == {}
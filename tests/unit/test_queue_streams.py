@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from interview_analytics_agent.queue import streams
+
+
+class _FakePipeline:
+    def __init__(self, redis: _FakeRedis) -> None:
+        self._redis = redis
+        self._ops: list[tuple[str, str, tuple[str, ...]]] = []
+
+    def xack(self, stream: str, group: str, *entry_ids: str) -> None:
+        self._ops.append((stream, group, entry_ids))
+
+    def execute(self) -> list[int]:
+        self._redis.calls.append("pipeline")
+        return [self._redis.xack(stream, group, *ids) for stream, group, ids in self._ops]
+
+
+class _FakeRedis:
+    def __init__(self, entries: list[tuple[str, dict]]) -> None:
+        self.entries = list(entries)
+        self.pending: dict[str, dict] = {}
+        self.calls: list[str] = []
+        self.claimable: list[tuple[str, dict]] = []
+
+    def xgroup_create(self, **kwargs) -> None:
+        self.calls.append("xgroup_create")
+
+    def xreadgroup(self, *, groupname, consumername, streams, count, block):
+        self.calls.append("xreadgroup")
+        batch, self.entries = self.entries[:count], self.entries[count:]
+        for entry_id, fields in batch:
+            self.pending[entry_id] = fields
+        return [("q:test", batch)] if batch else []
+
+    def xautoclaim(self, **kwargs):
+        self.calls.append("xautoclaim")
+        claimed, self.claimable = self.claimable, []
+        return "0-0", claimed, []
+
+    def xack(self, stream: str, group: str, *entry_ids: str) -> int:
+        self.calls.append("xack")
+        return sum(1 for entry_id in entry_ids if self.pending.pop(entry_id, None) is not None)
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        return _FakePipeline(self)
+
+
+def _entry(n: int) -> tuple[str, dict]:
+    return f"{n}-0", {"payload": json.dumps({"meeting_id": f"m-{n}"})}
+
+
+@pytest.fixture
+def fake_redis(monkeypatch) -> _FakeRedis:
+    fake = _FakeRedis([_entry(n) for n in range(1, 6)])
+    monkeypatch.setattr(streams, "redis_client", lambda: fake)
+    monkeypatch.setattr(streams, "_ENSURED_GROUPS", set())
+    monkeypatch.setattr(streams, "_CONSUMERS", {})
+    monkeypatch.setattr(streams, "_READ_BUFFERS", {})
+    return fake
+
+
+def test_consumer_reads_batches_and_acks_in_one_pipeline(fake_redis: _FakeRedis) -> None:
+    consumer = streams.StreamConsumer(
+        stream="q:test", group="g", consumer="c", count=3, claim_interval_sec=3600
+    )
+    try:
+        first = consumer.read_batch(block_ms=0)
+        second = consumer.read_batch(block_ms=0)
+        assert [t.payload["meeting_id"] for t in first + second] == [f"m-{n}" for n in range(1, 6)]
+        assert fake_redis.calls.count("xgroup_create") == 1
+        assert fake_redis.calls.count("xautoclaim") == 1
+
+        for task in first:
+            consumer.ack(task.entry_id)
+        # count=3 подтверждений -> одна пачка XACK
+        assert fake_redis.calls.count("pipeline") == 1
+        for task in second:
+            consumer.ack(task.entry_id)
+        assert consumer.read_batch(block_ms=0) == []
+        assert fake_redis.pending == {}
+    finally:
+        consumer.close()
+
+
+def test_read_batch_count_overrides_consumer_count(fake_redis: _FakeRedis) -> None:
+    consumer = streams.StreamConsumer(
+        stream="q:test", group="g", consumer="c", count=10, claim_interval_sec=3600
+    )
+    try:
+        assert [t.entry_id for t in consumer.read_batch(block_ms=0, count=2)] == ["1-0", "2-0"]
+        fake_redis.claimable = [_entry(7), _entry(8)]
+        consumer.claim_stale()
+        assert [t.entry_id for t in consumer.read_batch(block_ms=0, count=1)] == ["7-0"]
+        assert [t.entry_id for t in consumer.read_batch(block_ms=0)] == ["8-0"]
+    finally:
+        consumer.close()
+
+
+def test_ack_after_close_is_sent_immediately(fake_redis: _FakeRedis) -> None:
+    consumer = streams.StreamConsumer(
+        stream="q:test", group="g", consumer="c", count=10, claim_interval_sec=3600
+    )
+    tasks = consumer.read_batch(block_ms=0)
+    consumer.ack(tasks[0].entry_id)
+    consumer.close()
+    assert fake_redis.calls.count("pipeline") == 1
+
+    # Задача дорабатывала после drain-таймаута: её ACK не должен осесть в закрытом консьюмере.
+    consumer.ack(tasks[1].entry_id)
+    assert fake_redis.calls.count("pipeline") == 2
+    assert tasks[1].entry_id not in fake_redis.pending
+
+
+def test_autoclaim_skips_tasks_already_delivered(fake_redis: _FakeRedis) -> None:
+    consumer = streams.StreamConsumer(
+        stream="q:test", group="g", consumer="c", count=10, claim_interval_sec=3600
+    )
+    try:
+        delivered = consumer.read_batch(block_ms=0)
+        fake_redis.claimable = [_entry(1), _entry(9)]
+        assert consumer.claim_stale() == 1
+        assert [t.entry_id for t in consumer.read_batch(block_ms=0)] == ["9-0"]
+        assert len(delivered) == 5
+    finally:
+        consumer.close()
+
+
+def test_read_task_wrapper_serves_one_task_per_call(fake_redis: _FakeRedis, monkeypatch) -> None:
+    monkeypatch.setattr(streams, "read_batch_size", lambda: 16)
+    monkeypatch.setattr(streams, "autoclaim_interval_sec", lambda: 3600.0)
+
+    got = [
+        streams.read_task(stream="q:test", group="g", consumer="c", block_ms=0) for _ in range(6)
+    ]
+    assert [t.entry_id for t in got[:5]] == [f"{n}-0" for n in range(1, 6)]
+    assert got[5] is None
+    assert fake_redis.calls.count("xgroup_create") == 1
+    assert fake_redis.calls.count("xreadgroup") == 2
+
+    assert streams.ack_task(stream="q:test", group="g", entry_id="1-0") == 1
+    streams.get_consumer(stream="q:test", group="g", consumer="c").close()
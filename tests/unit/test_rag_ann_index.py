@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import numpy as np
+
+from interview_analytics_agent.rag.ann_index import RAGIVFIndex
+from interview_analytics_agent.rag.index_file import read_index_file, write_index_file
+from interview_analytics_agent.rag.vector_store import RAGVectorStore
+
+
+def _clustered(n_clusters: int = 16, per_cluster: int = 64, dim: int = 32) -> np.ndarray:
+    rng = np.random.default_rng(7)
+    centers = rng.normal(size=(n_clusters, dim))
+    rows = [center + 0.05 * rng.normal(size=(per_cluster, dim)) for center in centers]
+    return np.vstack(rows).astype(np.float32)
+
+
+def test_ivf_probe_finds_exact_nearest_neighbours() -> None:
+    matrix = _clustered()
+    store = RAGVectorStore(matrix, ann=RAGIVFIndex.build(matrix, n_lists=16))
+    ann = store.ann
+
+    assert ann.n_lists == 16
+    assert sorted(ann.rows.tolist()) == list(range(len(matrix)))
+    query = (matrix[100] + 0.01).tolist()
+    exact_top = set(np.argsort(-store.cosine_scores(query))[:10].tolist())
+    probed = ann.probe(query, nprobe=2)
+    assert exact_top <= set(probed.tolist())
+    assert len(probed) < len(matrix) // 4
+    assert len(ann.probe(query, nprobe=1000)) == len(matrix)
+
+
+def test_cosine_scores_for_selected_rows_match_full_scan() -> None:
+    matrix = _clustered(n_clusters=2, per_cluster=8, dim=4)
+    store = RAGVectorStore(matrix)
+    rows = np.array([3, 0, 11], dtype=np.int64)
+
+    full = store.cosine_scores([1.0, 0.5, 0.0, -1.0])
+    assert store.cosine_scores([1.0, 0.5, 0.0, -1.0], rows).tolist() == full[rows].tolist()
+
+
+def test_ivf_index_roundtrips_through_index_file(tmp_path) -> None:
+    matrix = _clustered(n_clusters=4, per_cluster=16, dim=8)
+    ann = RAGIVFIndex.build(matrix, n_lists=4)
+    path = tmp_path / "seg.ragidx"
+    chunks = [{"text": f"t{i}"} for i in range(len(matrix))]
+    write_index_file(path, {"chunks": chunks, "vector_store": RAGVectorStore(matrix, ann=ann)})
+
+    restored = read_index_file(path)["vector_store"].ann
+
+    assert restored is not None
+    assert restored.offsets.tolist() == ann.offsets.tolist()
+    assert restored.rows.tolist() == ann.rows.tolist()
+    assert np.allclose(restored.centroids, ann.centroids)
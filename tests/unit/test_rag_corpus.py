@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from interview_analytics_agent.rag.corpus import RAGCorpus
+from interview_analytics_agent.rag.keyword_index import RAGKeywordIndex
+from interview_analytics_agent.rag.vector_store import RAGVectorStore
+
+
+def _payload(doc: str, texts: list[str]) -> dict:
+    chunks = [{"chunk_id": f"{doc}:{i}", "meeting_id": doc, "text": text} for i, text in enumerate(texts)]
+    return {
+        "schema_version": "rag_index_v3",
+        "chunks": chunks,
+        "keyword_index": RAGKeywordIndex.build([text.split() for text in texts], meta_texts=[doc] * len(texts)),
+        "vector_store": RAGVectorStore.from_rows([[float(len(text)), 1.0] for text in texts]),
+    }
+
+
+def _live_texts(corpus: RAGCorpus, keys: list[str]) -> list[str]:
+    views, _missing = corpus.views(keys)
+    out: list[str] = []
+    for view in views:
+        out.extend(chunk["text"] for chunk, keep in zip(view["chunks"], view["chunk_mask"]) if keep)
+    return sorted(out)
+
+
+def test_views_mask_only_selected_documents(tmp_path) -> None:
+    corpus = RAGCorpus(tmp_path)
+    corpus.upsert("meeting:a", _payload("a", ["python sql", "kafka"]), meta={"vector": {"enabled": True}})
+    corpus.upsert("meeting:b", _payload("b", ["golang"]), meta={})
+
+    views, missing = corpus.views(["meeting:a", "meeting:zzz"])
+
+    assert missing == ["meeting:zzz"]
+    assert len(views) == 1
+    view = views[0]
+    assert view["vector"] == {"enabled": True}
+    assert view["chunk_mask"].tolist() == [True, True]
+    assert view["keyword_index"].df("python", view["chunk_mask"]) == 1
+    assert corpus.doc("meeting:b")["end"] == 1
+
+
+def test_upsert_replaces_document_and_drops_dead_segment(tmp_path) -> None:
+    corpus = RAGCorpus(tmp_path)
+    corpus.upsert("meeting:a", _payload("a", ["one", "two", "three"]), meta={})
+    first_segment = corpus.doc("meeting:a")["segment"]
+    corpus.upsert("meeting:a", _payload("a", ["one", "two fixed"]), meta={"transcript_sha256": "x"})
+
+    manifest = corpus.manifest()
+    assert first_segment not in manifest["segments"]
+    assert not (tmp_path / f"{first_segment}.ragidx").exists()
+    assert corpus.doc("meeting:a")["transcript_sha256"] == "x"
+    assert _live_texts(corpus, ["meeting:a"]) == ["one", "two fixed"]
+
+
+def test_dead_segment_still_open_is_deleted_on_next_commit(tmp_path, monkeypatch) -> None:
+    corpus = RAGCorpus(tmp_path)
+    corpus.upsert("meeting:a", _payload("a", ["one"]), meta={})
+    first_segment = corpus.doc("meeting:a")["segment"]
+    _live_texts(corpus, ["meeting:a"])
+    real_unlink = Path.unlink
+
+    def _locked(path: Path, missing_ok: bool = False) -> None:
+        # Как на Windows: файл, открытый другим читателем, удалить нельзя.
+        raise PermissionError(f"in use: {path.name}")
+
+    monkeypatch.setattr(Path, "unlink", _locked)
+    corpus.upsert("meeting:a", _payload("a", ["two"]), meta={})
+    assert (tmp_path / f"{first_segment}.ragidx").exists()
+    assert first_segment not in corpus._segments
+    assert _live_texts(corpus, ["meeting:a"]) == ["two"]
+
+    monkeypatch.setattr(Path, "unlink", real_unlink)
+    corpus.upsert("meeting:b", _payload("b", ["three"]), meta={})
+    assert not (tmp_path / f"{first_segment}.ragidx").exists()
+
+
+def test_compaction_keeps_segment_count_bounded_and_remove_drops_document(tmp_path) -> None:
+    corpus = RAGCorpus(tmp_path, max_segments=3)
+    for idx in range(7):
+        corpus.upsert(f"meeting:{idx}", _payload(str(idx), [f"text {idx}", f"more {idx}"]), meta={})
+
+    assert len(corpus.manifest()["segments"]) <= 3
+    assert len(list(tmp_path.glob("seg_*.ragidx"))) == len(corpus.manifest()["segments"])
+    assert _live_texts(corpus, ["meeting:0", "meeting:6"]) == ["more 0", "more 6", "text 0", "text 6"]
+    views, _missing = corpus.views(["meeting:3"])
+    store = views[0]["vector_store"]
+    mask = views[0]["chunk_mask"]
+    assert store.matrix[mask].tolist() == [[6.0, 1.0], [6.0, 1.0]]
+
+    assert corpus.remove("meeting:3") is True
+    assert corpus.remove("meeting:3") is False
+    assert corpus.views(["meeting:3"]) == ([], ["meeting:3"])
+    # Новый экземпляр видит то же состояние с диска.
+    assert _live_texts(RAGCorpus(tmp_path, max_segments=3), ["meeting:4"]) == ["more 4", "text 4"]
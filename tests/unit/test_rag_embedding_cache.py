@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import sqlite3
+
+import pytest
+
+from interview_analytics_agent.rag.embedding_cache import RAGEmbeddingCacheStore, _pack
+
+
+def test_embedding_cache_store_roundtrips_float32_blobs_in_batches(tmp_path) -> None:
+    store = RAGEmbeddingCacheStore(tmp_path / "cache.sqlite3")
+    vectors = {f"k{i}": [float(i), 0.5] for i in range(1200)}
+
+    store.put_many(vectors, provider="openai_compat", model="nomic-embed-text")
+    found = store.get_many(["k0", "k1199", "missing", "k0"])
+
+    assert found == {"k0": [0.0, 0.5], "k1199": [1199.0, 0.5]}
+    assert len(store.get_many(list(vectors))) == 1200
+    assert store.count() == 1200
+    store.close()
+
+
+def test_embedding_cache_store_persists_between_instances(tmp_path) -> None:
+    path = tmp_path / "cache.sqlite3"
+    first = RAGEmbeddingCacheStore(path)
+    first.put_many({"alpha": [0.1, 0.2, 0.3]})
+    first.close()
+
+    second = RAGEmbeddingCacheStore(path)
+
+    assert second.get_many(["alpha"])["alpha"] == pytest.approx([0.1, 0.2, 0.3], rel=1e-6)
+    second.close()
+
+
+def test_embedding_cache_store_quantizes_new_rows_and_reads_legacy_float32(tmp_path) -> None:
+    path = tmp_path / "cache.sqlite3"
+    conn = sqlite3.connect(str(path))
+    conn.execute(
+        "CREATE TABLE rag_embeddings (cache_key TEXT PRIMARY KEY, dim INTEGER NOT NULL, vector BLOB NOT NULL,"
+        " provider TEXT NOT NULL DEFAULT '', provider_label TEXT NOT NULL DEFAULT '',"
+        " model TEXT NOT NULL DEFAULT '', cached_at TEXT NOT NULL DEFAULT '') WITHOUT ROWID"
+    )
+    conn.execute("INSERT INTO rag_embeddings (cache_key, dim, vector) VALUES ('old', 2, ?)", (_pack([0.5, -1.0]),))
+    conn.commit()
+    conn.close()
+
+    store = RAGEmbeddingCacheStore(path)
+    store.put_many({"half": [0.1, 0.2, 0.3]}, quantization="float16")
+    store.put_many({"q8": [0.1, -0.2, 0.4], "zero": [0.0, 0.0]}, quantization="int8")
+    found = store.get_many(["old", "half", "q8", "zero"])
+
+    assert found["old"] == [0.5, -1.0]
+    assert found["half"] == pytest.approx([0.1, 0.2, 0.3], abs=1e-3)
+    assert found["q8"] == pytest.approx([0.1, -0.2, 0.4], abs=0.4 / 127)
+    assert found["zero"] == [0.0, 0.0]
+    store.close()
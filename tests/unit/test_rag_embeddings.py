@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import pytest
+
+from interview_analytics_agent.rag import embeddings
+
+
+class _Resp:
+    def __init__(self, status_code: int, body: dict) -> None:
+        self.status_code = status_code
+        self._body = body
+        self.text = ""
+
+    def json(self) -> dict:
+        return self._body
+
+
+def test_embed_texts_gemini_uses_batch_endpoint(monkeypatch) -> None:
+    calls: list[tuple[str, int]] = []
+
+    def _fake_post(url, *, headers, json, timeout):
+        calls.append((url.split("?")[0], len(json["requests"])))
+        return _Resp(200, {"embeddings": [{"values": [3.0, 4.0]} for _ in json["requests"]]})
+
+    monkeypatch.setattr(embeddings.requests, "post", _fake_post)
+
+    rows = embeddings.embed_texts_gemini(
+        [f"t{i}" for i in range(150)],
+        api_base="https://example.test/v1beta",
+        api_key="k",
+        model_id="models/text-embedding-004",
+    )
+
+    assert len(rows) == 150
+    assert rows[0] == pytest.approx([0.6, 0.8])
+    assert calls == [
+        ("https://example.test/v1beta/models/text-embedding-004:batchEmbedContents", 100),
+        ("https://example.test/v1beta/models/text-embedding-004:batchEmbedContents", 50),
+    ]
+
+
+def test_embed_texts_gemini_falls_back_to_single_requests_without_batch_endpoint(monkeypatch) -> None:
+    urls: list[str] = []
+
+    def _fake_post(url, *, headers, json, timeout):
+        urls.append(url.split("?")[0].rsplit(":", 1)[-1])
+        if "batchEmbedContents" in url:
+            return _Resp(404, {})
+        return _Resp(200, {"embedding": {"values": [1.0, 0.0]}})
+
+    monkeypatch.setattr(embeddings.requests, "post", _fake_post)
+
+    rows = embeddings.embed_texts_gemini(["a", "b"], api_base="https://example.test", api_key="k", model_id="m")
+
+    assert rows == [[1.0, 0.0], [1.0, 0.0]]
+    assert urls == ["batchEmbedContents", "embedContent", "embedContent"]
+
+
+def test_embed_texts_hashing_matches_single_text_embedder() -> None:
+    np = pytest.importorskip("numpy")
+    texts = ["", "a", "Python и SQL: опыт 5 лет", "kafka kafka kafka streams", "  mixed CASE tokens 42 "]
+    for char_ngrams in (True, False):
+        batch = embeddings.embed_texts_hashing(texts, dim=32, char_ngrams=char_ngrams)
+        assert batch.dtype == np.float32
+        assert batch.shape == (len(texts), 32)
+        for row, text in zip(batch, texts):
+            expected = np.asarray(
+                embeddings.embed_text_hashing(text, dim=32, char_ngrams=char_ngrams), dtype=np.float32
+            )
+            assert row.tobytes() == expected.tobytes()
+
+
+def test_round8_matches_builtin_round_on_half_boundaries() -> None:
+    np = pytest.importorskip("numpy")
+    values = np.array([0.123456785, -0.000000005, 0.5, 1.000000015, 0.0, -0.333333335], dtype=np.float64)
+    assert embeddings._round8(values).tolist() == [round(float(v), 8) for v in values]
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from interview_analytics_agent.rag import index_file
+from interview_analytics_agent.rag.index_file import read_index_file, read_index_header, write_index_file
+from interview_analytics_agent.rag.keyword_index import RAGKeywordIndex
+from interview_analytics_agent.rag.vector_store import RAGVectorStore
+
+
+def _payload() -> dict:
+    meta = {"candidate_name": "Alice", "vacancy": "Backend"}
+    chunks = [
+        {"chunk_id": "c0001", "text": "Python и SQL", "line_start": 1, "meeting_meta": dict(meta)},
+        {"chunk_id": "c0002", "text": "PostgreSQL, Kafka", "line_start": None, "meeting_meta": dict(meta)},
+        {"chunk_id": "c0003", "text": "", "meeting_meta": dict(meta)},
+    ]
+    return {
+        "schema_version": "rag_index_v3",
+        "transcript_sha256": "abc",
+        "chunking": {"max_lines_per_chunk": 6},
+        "chunks": chunks,
+        "keyword_index": RAGKeywordIndex.build(
+            [["python", "sql"], ["postgresql", "kafka"], []],
+            meta_texts=["alice backend"] * 3,
+        ),
+        "vector_store": RAGVectorStore.from_rows([[1.0, 0.0], [0.6, 0.8], []], dim=2),
+    }
+
+
+def test_index_file_roundtrip_restores_chunks_postings_and_memmap_vectors(tmp_path) -> None:
+    path = tmp_path / "index_clean.ragidx"
+    source = _payload()
+    write_index_file(path, source)
+
+    payload = read_index_file(path, mmap=True)
+
+    assert payload["transcript_sha256"] == "abc"
+    assert payload["chunks"] == source["chunks"]
+    assert "line_end" not in payload["chunks"][2]
+    assert "line_start" not in payload["chunks"][2]
+    kw = payload["keyword_index"]
+    assert kw.term_postings("kafka") == [(1, 1)]
+    assert kw.df("python") == 1
+    assert kw.terms_containing("sql") == ["postgresql", "sql"]
+    assert kw.meta_groups() == [[0, 1, 2]]
+    store = payload["vector_store"]
+    assert isinstance(store.matrix, np.memmap)
+    assert store.cosine_scores([1.0, 0.0]).tolist() == pytest.approx([1.0, 0.6, 0.0])
+    assert not (tmp_path / "index_clean.ragidx.tmp").exists()
+
+
+def test_index_file_without_mmap_can_be_replaced_while_cached(tmp_path, monkeypatch) -> None:
+    # Поведение по умолчанию на Windows: файл не отображён, os.replace поверх него проходит.
+    monkeypatch.setattr(index_file, "_MMAP_DEFAULT", False)
+    path = tmp_path / "index_clean.ragidx"
+    write_index_file(path, _payload())
+
+    cached = read_index_file(path)
+    assert not isinstance(cached["vector_store"].matrix, np.memmap)
+
+    write_index_file(path, {**_payload(), "transcript_sha256": "def"})
+    assert read_index_header(path)["transcript_sha256"] == "def"
+    assert cached["vector_store"].cosine_scores([1.0, 0.0]).tolist() == pytest.approx([1.0, 0.6, 0.0])
+
+
+def test_index_file_header_reads_meta_without_sections(tmp_path) -> None:
+    path = tmp_path / "index_clean.ragidx"
+    write_index_file(path, _payload())
+
+    meta = read_index_header(path)
+
+    assert meta["transcript_sha256"] == "abc"
+    assert "chunks" not in meta
+
+
+def test_index_file_rejects_foreign_files(tmp_path) -> None:
+    path = tmp_path / "index_clean.ragidx"
+    path.write_text('{"schema_version": "rag_index_v2"}', encoding="utf-8")
+
+    with pytest.raises(ValueError):
+        read_index_file(path)
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from interview_analytics_agent.rag.job_store import RAGIndexJobStore
+
+
+def test_job_store_roundtrips_jobs_and_row_updates(tmp_path) -> None:
+    path = tmp_path / "jobs.sqlite3"
+    store = RAGIndexJobStore(path)
+    store.save_job(
+        {"job_id": "j2", "seq": 2, "priority": 5, "status": "queued", "params": {"transcript_variant": "raw"}},
+        [{"meeting_id": "m1"}, {"meeting_id": "m2"}],
+    )
+    store.save_job({"job_id": "j1", "seq": 1, "status": "completed"}, [])
+    store.update_job("j2", status="running", started_at="2026-03-01T10:00:00Z")
+    store.update_items("j2", {1: {"status": "completed", "chunk_count": 7, "cached": True}})
+    store.close()
+
+    reopened = RAGIndexJobStore(path)
+    jobs = reopened.load_jobs()
+
+    assert [job["job_id"] for job in jobs] == ["j1", "j2"]
+    job = jobs[1]
+    assert job["priority"] == 5
+    assert job["status"] == "running"
+    assert job["started_at"] == "2026-03-01T10:00:00Z"
+    assert job["params"] == {"transcript_variant": "raw"}
+    assert [(item["meeting_id"], item["status"]) for item in job["items"]] == [("m1", "queued"), ("m2", "completed")]
+    assert job["items"][1]["chunk_count"] == 7
+    assert job["items"][1]["cached"] is True
+
+    reopened.delete_jobs(["j1", "j2"])
+    assert reopened.load_jobs() == []
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import json
+
+from interview_analytics_agent.rag.keyword_index import RAGKeywordIndex
+
+
+def _sample_index() -> RAGKeywordIndex:
+    return RAGKeywordIndex.build(
+        [
+            ["python", "sql", "python"],
+            ["postgresql", "kafka"],
+            [],
+        ],
+        meta_texts=["alice backend", "alice backend", "bob data"],
+    )
+
+
+def test_build_collects_postings_lengths_and_corpus_stats() -> None:
+    idx = _sample_index()
+
+    assert idx.chunk_count == 3
+    assert idx.total_tokens == 5
+    assert idx.term_postings("python") == [(0, 2)]
+    assert idx.df("sql") == 1
+    assert idx.df("missing") == 0
+    assert idx.meta_texts == ["alice backend", "bob data"]
+    assert idx.meta_groups() == [[0, 1], [2]]
+
+
+def test_terms_containing_finds_substring_matches_in_vocabulary() -> None:
+    idx = _sample_index()
+
+    assert idx.terms_containing("sql") == ["postgresql", "sql"]
+    assert idx.terms_containing("af") == ["kafka"]
+    assert idx.terms_containing("zz") == []
+
+
+def test_payload_roundtrip_is_json_serializable() -> None:
+    idx = _sample_index()
+
+    restored = RAGKeywordIndex.from_payload(json.loads(json.dumps(idx.to_payload())))
+
+    assert restored.postings == idx.postings
+    assert restored.chunk_lengths == idx.chunk_lengths
+    assert restored.meta_groups() == idx.meta_groups()
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from interview_analytics_agent.rag.meta_filter import RAGMetaFilterIndex
+
+
+def _chunk(**meta: str) -> dict:
+    return {"text": "x", "meeting_meta": meta}
+
+
+def test_mask_combines_fields_with_and_and_matches_substrings() -> None:
+    index = RAGMetaFilterIndex.build(
+        [
+            _chunk(vacancy="Senior Backend Developer", level="Senior", interviewer="Anna"),
+            _chunk(vacancy="Backend  developer", level="Middle", interviewer="anna"),
+            _chunk(vacancy="Data Engineer", level="Senior", candidate_name="Bob"),
+            {"text": "no meta"},
+        ]
+    )
+
+    assert index.values("vacancy") == ["backend developer", "data engineer", "senior backend developer"]
+    assert index.mask({}) is None
+    assert index.mask({"vacancy": "  "}) is None
+    assert index.mask({"vacancy": "BACKEND"}).tolist() == [True, True, False, False]
+    assert index.mask({"vacancy": "backend", "level": "senior"}).tolist() == [True, False, False, False]
+    assert index.mask({"interviewer": "ANNA", "candidate": "bob"}).tolist() == [False] * 4
+
+
+def test_candidate_filter_matches_name_or_id() -> None:
+    index = RAGMetaFilterIndex.build(
+        [_chunk(candidate_name="Alice Smith", candidate_id="c-1"), _chunk(candidate_name="Bob", candidate_id="c-22")]
+    )
+
+    assert index.mask({"candidate": "alice"}).tolist() == [True, False]
+    assert index.mask({"candidate": "c-22"}).tolist() == [False, True]
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import numpy as np
+
+from interview_analytics_agent.rag.embeddings import cosine_similarity_dense, embed_text_hashing
+from interview_analytics_agent.rag.index_file import read_index_file, write_index_file
+from interview_analytics_agent.rag.vector_store import RAGVectorStore
+
+
+def test_cosine_scores_match_dense_cosine() -> None:
+    texts = ["python sql backend", "kafka streams", "frontend react typescript", ""]
+    rows = [embed_text_hashing(t, dim=32) for t in texts]
+    store = RAGVectorStore.from_rows(rows)
+    query = embed_text_hashing("python backend", dim=32)
+
+    scores = store.cosine_scores(query)
+
+    assert store.matrix.shape == (4, 32)
+    assert store.matrix.dtype == np.float32
+    for idx, row in enumerate(rows):
+        assert abs(float(scores[idx]) - cosine_similarity_dense(query, row)) < 1e-5
+    assert float(scores[3]) == 0.0
+
+
+def test_cosine_scores_use_common_prefix_for_ragged_rows() -> None:
+    store = RAGVectorStore.from_rows([[1.0, 0.0, 5.0], [0.0, 1.0], []])
+
+    scores = store.cosine_scores([1.0, 0.0])
+
+    assert store.dim == 3
+    assert scores.tolist() == [1.0, 0.0, 0.0]
+
+
+def test_quantized_stores_keep_top_k_and_roundtrip_through_index_file(tmp_path) -> None:
+    rng = np.random.default_rng(11)
+    matrix = rng.normal(size=(2000, 256)).astype(np.float32)
+    picked = matrix[rng.choice(len(matrix), size=20, replace=False)]
+    queries = (picked + 0.3 * rng.normal(size=(20, 256))).tolist()
+    exact = RAGVectorStore(matrix)
+
+    for kind, max_bytes_ratio in (("float16", 0.5), ("int8", 0.26)):
+        store = exact.quantize(kind)
+        assert store.quantization == kind
+        assert store.data.nbytes <= max_bytes_ratio * exact.data.nbytes
+        overlap = []
+        for query in queries:
+            want = set(np.argsort(-exact.cosine_scores(query))[:10].tolist())
+            got = set(np.argsort(-store.cosine_scores(query))[:10].tolist())
+            overlap.append(len(want & got) / 10.0)
+        assert float(np.mean(overlap)) >= 0.95
+
+        path = tmp_path / f"{kind}.ragidx"
+        write_index_file(path, {"chunks": [{"text": str(i)} for i in range(len(matrix))], "vector_store": store})
+        restored = read_index_file(path)["vector_store"]
+        rows = np.array([5, 1, 1999])
+        assert restored.quantization == kind
+        assert np.allclose(restored.cosine_scores(queries[0], rows), store.cosine_scores(queries[0], rows))
+        assert np.allclose(restored.dequantize(rows), store.dequantize(rows))
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import hashlib
+import os
+
 from interview_analytics_agent.storage import records
 
 
@@ -29,3 +32,66 @@ def test_meeting_metadata_rename(monkeypatch, tmp_path) -> None:
     assert str(updated["display_name"]) == "Интервью Python"
     loaded = records.read_meeting_metadata("m1")
     assert str(loaded.get("display_name") or "") == "Интервью Python"
+
+
+def test_transcript_fingerprint_sidecar_skips_rehash_until_file_changes(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(records, "get_settings", lambda: _Settings(str(tmp_path)))
+    # Точная ФС: окно «гонки» с mtime не нужно (его проверяет отдельный тест).
+    monkeypatch.setattr(records, "_MTIME_GRANULARITY_NS", -(10**18))
+    path = records.write_text("m1", "clean.txt", "CLEAN text")
+    calls: list[str] = []
+    real_store = records._store_fingerprint
+    monkeypatch.setattr(
+        records,
+        "_store_fingerprint",
+        lambda meeting_id, filename, p: calls.append(filename) or real_store(meeting_id, filename, p),
+    )
+
+    first = records.file_fingerprint("m1", "clean.txt")
+    assert first is not None
+    assert first["sha256"] == hashlib.sha256(b"CLEAN text").hexdigest()
+    assert calls == []
+
+    # Запись в обход write_text: новый size/mtime -> один перехэш, дальше снова из sidecar.
+    path.write_text("CLEAN text, edited", encoding="utf-8")
+    second = records.file_fingerprint("m1", "clean.txt")
+    assert second is not None
+    assert second["sha256"] == hashlib.sha256(b"CLEAN text, edited").hexdigest()
+    assert records.file_fingerprint("m1", "clean.txt") == second
+    assert calls == ["clean.txt"]
+    assert records.file_fingerprint("m1", "raw.txt") is None
+    assert records.list_artifacts("m1")["clean"] is True
+    assert records.list_artifacts("m1")["raw"] is False
+
+
+def test_fingerprint_rehashes_same_tick_rewrite_on_coarse_mtime(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(records, "get_settings", lambda: _Settings(str(tmp_path)))
+    # ФС, где ctime/inode не помогают: остаются только size и mtime.
+    monkeypatch.setattr(
+        records,
+        "_stat_fields",
+        lambda st: {"size": int(st.st_size), "mtime_ns": int(st.st_mtime_ns)},
+    )
+    path = records.write_text("m1", "clean.txt", "AAAA")
+    st = path.stat()
+
+    # Та же длина и тот же mtime (ФС с точностью в секунды), что при записи sidecar.
+    path.write_text("BBBB", encoding="utf-8")
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    fingerprint = records.file_fingerprint("m1", "clean.txt")
+    assert fingerprint is not None
+    assert fingerprint["sha256"] == hashlib.sha256(b"BBBB").hexdigest()
+
+
+def test_fingerprint_trusts_sidecar_once_mtime_is_settled(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(records, "get_settings", lambda: _Settings(str(tmp_path)))
+    path = records.write_text("m1", "clean.txt", "AAAA")
+    old_ns = path.stat().st_mtime_ns - 10 * records._MTIME_GRANULARITY_NS
+    os.utime(path, ns=(old_ns, old_ns))
+    first = records.file_fingerprint("m1", "clean.txt")
+    calls: list[str] = []
+    monkeypatch.setattr(records, "_store_fingerprint", lambda *args: calls.append("rehash"))
+
+    assert records.file_fingerprint("m1", "clean.txt") == first
+    assert calls == []
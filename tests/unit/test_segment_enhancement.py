@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from interview_analytics_agent.domain.enums import ConsentStatus, PipelineStatus
+from interview_analytics_agent.services import segment_enhancement
+from interview_analytics_agent.services.segment_enhancement import (
+    ENHANCER_STATE_KEY,
+    enhance_meeting_segments,
+)
+from interview_analytics_agent.storage.models import Base, Meeting, TranscriptSegment
+
+
+def _session() -> Session:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = Session(engine)
+    session.add(
+        Meeting(id="m-1", status=PipelineStatus.processing, consent=ConsentStatus.unknown, context={})
+    )
+    session.flush()
+    return session
+
+
+def _add(session: Session, seq: int, text: str) -> None:
+    session.add(TranscriptSegment(meeting_id="m-1", seq=seq, raw_text=text, enhanced_text=""))
+    session.flush()
+
+
+def test_incremental_pass_enhances_only_new_segments(monkeypatch) -> None:
+    calls: list[str] = []
+    real_enhance = segment_enhancement.enhance_text
+
+    def _tracking(text: str):
+        calls.append(text)
+        return real_enhance(text)
+
+    monkeypatch.setattr(segment_enhancement, "enhance_text", _tracking)
+    monkeypatch.setattr(
+        segment_enhancement,
+        "get_settings",
+        lambda: SimpleNamespace(enhancer_context_segments=1, speaker_response_window_sec=1),
+    )
+    session = _session()
+    _add(session, 0, "меня зовут Анна")
+    _add(session, 1, "привет всем")
+
+    assert enhance_meeting_segments(session, "m-1") == 2
+    state = session.get(Meeting, "m-1").context[ENHANCER_STATE_KEY]
+    assert state["host_name"] == "Анна"
+    assert state["segment_id"] > 0
+
+    calls.clear()
+    _add(session, 2, "веду встречу дальше")
+    assert enhance_meeting_segments(session, "m-1") == 1
+    assert calls == ["веду встречу дальше"]
+    # Окно — один сегмент перед новым; ведущий (seq=0) берётся из сохранённого состояния.
+    seg = session.query(TranscriptSegment).filter_by(meeting_id="m-1", seq=2).one()
+    assert seg.speaker == "Анна"
+
+    calls.clear()
+    assert enhance_meeting_segments(session, "m-1") == 0
+    assert calls == []
+
+    assert enhance_meeting_segments(session, "m-1", touched_seqs=[1]) == 1
+    assert calls == ["привет всем"]
+
+    calls.clear()
+    assert enhance_meeting_segments(session, "m-1", full=True) == 3
+    assert len(calls) == 3
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import time
+
+from apps.worker_enhancer import main as worker
+
+
+def test_final_task_waits_for_outstanding_stt_chunks(monkeypatch) -> None:
+    scheduled: list[tuple[str, dict, float]] = []
+    monkeypatch.setattr(
+        worker,
+        "schedule_delayed",
+        lambda *, queue_name, task_payload, delay_sec: scheduled.append(
+            (queue_name, task_payload, delay_sec)
+        ),
+    )
+    monkeypatch.setattr(worker, "inflight", lambda stage, meeting_id: 2)
+    monkeypatch.setattr(
+        worker, "begin_run", lambda *a, **kw: (_ for _ in ()).throw(AssertionError("ran early"))
+    )
+
+    assert worker.handle_task({"meeting_id": "m-1", "final": True, "generation": 3}) == "deferred"
+    queue_name, payload, delay_sec = scheduled[0]
+    assert queue_name == worker.Q_ENHANCER
+    assert payload["generation"] == 3 and payload["final"] is True
+    assert delay_sec == worker.FINAL_RECHECK_SEC
+
+    # Повторная проверка сохраняет начало ожидания: оно ограничено FINAL_WAIT_MAX_SEC.
+    assert worker.handle_task(payload) == "deferred"
+    assert scheduled[1][1]["final_wait_since"] == payload["final_wait_since"]
+
+
+def test_final_task_stops_waiting_after_limit(monkeypatch) -> None:
+    monkeypatch.setattr(worker, "inflight", lambda stage, meeting_id: 1)
+    task = {
+        "meeting_id": "m-1",
+        "final": True,
+        "final_wait_since": time.time() - worker.FINAL_WAIT_MAX_SEC - 1,
+    }
+    assert worker._defer_final(task) is False
+
+    monkeypatch.setattr(worker, "inflight", lambda stage, meeting_id: 0)
+    assert worker._defer_final({"meeting_id": "m-1", "final": True}) is False
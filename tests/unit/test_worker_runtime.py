@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from interview_analytics_agent.common.config import get_settings
+from interview_analytics_agent.queue import worker_runtime
+from interview_analytics_agent.queue.streams import StreamTask
+from interview_analytics_agent.queue.worker_runtime import StageWorkerRuntime, StageWorkerSpec
+
+SPEC = StageWorkerSpec(service="worker-test", stage="test", stream="q:test", group="g:test")
+
+
+class _FakeConsumer:
+    def __init__(self, tasks: list[StreamTask]) -> None:
+        self._tasks = list(tasks)
+        self.acked: list[str] = []
+        self.closed = False
+        self._lock = threading.Lock()
+        self.counts: list[int] = []
+
+    def read_batch(self, *, block_ms=None, count=None) -> list[StreamTask]:
+        self.counts.append(count)
+        size = min(16, count or 16)
+        batch, self._tasks = self._tasks[:size], self._tasks[size:]
+        if not batch:
+            time.sleep(0.01)
+        return batch
+
+    def ack(self, entry_id: str) -> None:
+        with self._lock:
+            self.acked.append(entry_id)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def _task(n: int, meeting_id: str) -> StreamTask:
+    return StreamTask(stream="q:test", entry_id=f"{n}-0", payload={"meeting_id": meeting_id, "n": n})
+
+
+def _run_until(runtime: StageWorkerRuntime, done) -> None:
+    thread = threading.Thread(target=runtime.run)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while not done() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    runtime.stop()
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+def test_runtime_runs_meetings_in_parallel_but_each_meeting_in_order() -> None:
+    tasks = [_task(n, f"m-{n % 3}") for n in range(12)]
+    consumer = _FakeConsumer(tasks)
+    lock = threading.Lock()
+    running: dict[str, int] = {}
+    order: dict[str, list[int]] = {}
+    peak = {"total": 0}
+
+    def handler(payload: dict) -> None:
+        meeting_id = payload["meeting_id"]
+        with lock:
+            running[meeting_id] = running.get(meeting_id, 0) + 1
+            assert running[meeting_id] == 1
+            peak["total"] = max(peak["total"], sum(running.values()))
+            order.setdefault(meeting_id, []).append(payload["n"])
+        time.sleep(0.02)
+        with lock:
+            running[meeting_id] -= 1
+
+    runtime = StageWorkerRuntime(SPEC, handler, concurrency=4, consumer=consumer)
+    _run_until(runtime, lambda: len(consumer.acked) == len(tasks))
+
+    assert sorted(consumer.acked) == sorted(t.entry_id for t in tasks)
+    assert order == {f"m-{k}": [n for n in range(12) if n % 3 == k] for k in range(3)}
+    assert peak["total"] > 1
+    assert runtime.in_flight == 0
+    assert consumer.closed
+
+
+def test_runtime_never_reads_more_than_free_slots() -> None:
+    tasks = [_task(n, f"m-{n}") for n in range(20)]
+    consumer = _FakeConsumer(tasks)
+    lock = threading.Lock()
+    peak = {"in_flight": 0}
+
+    def handler(payload: dict) -> None:
+        with lock:
+            peak["in_flight"] = max(peak["in_flight"], runtime.in_flight)
+        time.sleep(0.01)
+
+    runtime = StageWorkerRuntime(SPEC, handler, concurrency=1, consumer=consumer)
+    _run_until(runtime, lambda: len(consumer.acked) == len(tasks))
+
+    assert runtime.max_in_flight == 2
+    assert peak["in_flight"] <= runtime.max_in_flight
+    assert consumer.counts and all(1 <= c <= runtime.max_in_flight for c in consumer.counts)
+
+
+def test_runtime_requeues_failed_task_and_acks_it(monkeypatch) -> None:
+    requeued: list[dict] = []
+    monkeypatch.setattr(
+        worker_runtime,
+        "requeue_with_backoff",
+        lambda **kwargs: requeued.append(kwargs["task_payload"]) or True,
+    )
+    consumer = _FakeConsumer([_task(1, "m-1"), _task(2, "m-2")])
+
+    def handler(payload: dict) -> str | None:
+        if payload["n"] == 1:
+            raise RuntimeError("llm down")
+        return "coalesced"
+
+    runtime = StageWorkerRuntime(SPEC, handler, concurrency=2, consumer=consumer)
+    _run_until(runtime, lambda: len(consumer.acked) == 2)
+
+    assert [p["n"] for p in requeued] == [1]
+    assert sorted(consumer.acked) == ["1-0", "2-0"]
+
+
+def test_stop_drains_running_task_and_leaves_queued_ones_unacked() -> None:
+    started = threading.Event()
+    release = threading.Event()
+    consumer = _FakeConsumer([_task(1, "m-1"), _task(2, "m-1")])
+
+    def handler(payload: dict) -> None:
+        started.set()
+        release.wait(5)
+
+    runtime = StageWorkerRuntime(SPEC, handler, concurrency=2, consumer=consumer)
+    thread = threading.Thread(target=runtime.run)
+    thread.start()
+    assert started.wait(5)
+    runtime.stop()
+    release.set()
+    thread.join(5)
+
+    assert consumer.acked == ["1-0"]
+    assert runtime.in_flight == 0
+
+
+def test_stage_concurrency_falls_back_to_stage_default(monkeypatch) -> None:
+    spec = StageWorkerSpec(
+        service="worker-enhancer", stage="enhancer", stream="q:e", group="g:e", default_concurrency=8
+    )
+    monkeypatch.setattr(get_settings(), "worker_enhancer_concurrency", None)
+    assert worker_runtime.stage_concurrency(spec) == 8
+    monkeypatch.setattr(get_settings(), "worker_enhancer_concurrency", 3)
+    assert worker_runtime.stage_concurrency(spec) == 3
+    monkeypatch.setattr(get_settings(), "worker_enhancer_concurrency", 500)
+    assert worker_runtime.stage_concurrency(spec) == 64
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Офлайн-бенчмарк RAG внутри процесса на синтетическом корпусе.
+
+Что делает:
+- генерирует транскрипты встреч заданного размера (1k–1M чанков) и набор запросов с
+  известным ответом: редкие слова-"иголки" вставлены в одну строку конкретной встречи
+- индексирует встречи тем же путём, что и gateway (_ensure_rag_index + глобальный корпус)
+- гоняет запросы через _rag_query и считает p50/p95/p99, разбивку по стадиям,
+  recall@k/MRR/nDCG (как tools/rag_benchmark.py) и label-free метрики самого gateway
+- пишет JSON-отчёт, чтобы сравнивать коммиты между собой
+- --quantization float16/int8: тот же прогон с квантованными эмбеддингами — recall и размер
+  корпуса сравниваются с отчётом float32
+
+Работает только с hashing-эмбеддингами, без сети и без БД.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from pathlib import Path
+from typing import Any
+
+# Шаг чанкинга по умолчанию: 6 строк с перекрытием 1 -> новый чанк каждые 5 строк.
+_LINES_PER_CHUNK_STEP = 5
+_SPEAKERS = ("INTERVIEWER", "CANDIDATE")
+_COMMON_WORDS = (
+    "мы мне нужно когда было опыт проект команда задача решение сервис данные запрос "
+    "система релиз продакшн тест код ревью база очередь кэш нагрузка latency python sql "
+    "kafka redis postgres docker kubernetes api backend frontend метрики алерты логи "
+    "архитектура миграция индекс шардирование репликация транзакция блокировка профилирование"
+).split()
+_SYLLABLES = ("ка", "ро", "ми", "на", "ле", "то", "су", "ви", "до", "ры", "жа", "пе", "зо", "лу", "ге")
+
+
+def _bootstrap_pythonpath() -> None:
+    repo_root = Path(__file__).resolve().parents[1]
+    for path in (repo_root, repo_root / "src", repo_root / "tools"):
+        text = str(path)
+        if text not in sys.path:
+            sys.path.insert(0, text)
+
+
+def _configure_env(*, records_dir: Path, dim: int, vectors: bool, quantization: str) -> None:
+    # Settings читаются из окружения при первом get_settings(), поэтому — до импорта gateway.
+    os.environ["RECORDS_DIR"] = str(records_dir)
+    os.environ["EMBEDDING_PROVIDER"] = "hashing"
+    os.environ["RAG_EMBEDDING_DIM"] = str(int(dim))
+    os.environ["RAG_VECTOR_ENABLED"] = "true" if vectors else "false"
+    os.environ["RAG_EMBEDDING_QUANTIZATION"] = str(quantization)
+
+
+def _pseudo_word(rng: random.Random, *, syllables: int) -> str:
+    return "".join(rng.choice(_SYLLABLES) for _ in range(syllables))
+
+
+def _synthetic_corpus(
+    *,
+    chunks: int,
+    meetings: int,
+    queries: int,
+    seed: int,
+) -> tuple[dict[str, str], list[dict[str, Any]]]:
+    """Транскрипты {meeting_id: text} и кейсы в формате датасета tools/rag_benchmark.py."""
+    rng = random.Random(seed)
+    vocab = list(_COMMON_WORDS) + sorted({_pseudo_word(rng, syllables=rng.randint(2, 3)) for _ in range(4000)})
+    # Zipf-подобные веса: частые слова повторяются во многих чанках, хвост — редко.
+    weights = [1.0 / (rank + 1) for rank in range(len(vocab))]
+    meetings = max(1, min(int(meetings), int(chunks)))
+    base, extra = divmod(int(chunks), meetings)
+    transcripts: dict[str, list[str]] = {}
+    for idx in range(meetings):
+        n_lines = (base + (1 if idx < extra else 0)) * _LINES_PER_CHUNK_STEP
+        lines = []
+        for line_no in range(n_lines):
+            words = rng.choices(vocab, weights=weights, k=rng.randint(8, 16))
+            lines.append(f"{_SPEAKERS[line_no % 2]}: {' '.join(words)}")
+        transcripts[f"bench_{idx:06d}"] = lines
+    cases: list[dict[str, Any]] = []
+    used: set[str] = set(vocab)
+    meeting_ids = list(transcripts)
+    for case_no in range(int(queries)):
+        needles: list[str] = []
+        while len(needles) < 3:
+            word = _pseudo_word(rng, syllables=5)
+            if word not in used:
+                used.add(word)
+                needles.append(word)
+        meeting_id = rng.choice(meeting_ids)
+        lines = transcripts[meeting_id]
+        if not lines:
+            continue
+        line_no = rng.randrange(len(lines))
+        if line_no % _LINES_PER_CHUNK_STEP == 0:
+            # Строка на стыке чанков попала бы в два чанка: ответ должен быть ровно один.
+            line_no = min(line_no + 1, len(lines) - 1)
+        filler = " ".join(rng.choices(vocab, weights=weights, k=6))
+        lines[line_no] = f"CANDIDATE: {' '.join(needles)} {filler}"
+        hint = rng.choice(_COMMON_WORDS)
+        cases.append(
+            {
+                "id": f"case_{case_no:04d}",
+                "query": f"{needles[0]} {hint} {needles[2]} {needles[1]}",
+                "meeting_ids": [meeting_id],
+                "expected_chunk_ids": [],
+                "expected_text_contains": [" ".join(needles)],
+            }
+        )
+    return {mid: "\n".join(lines) for mid, lines in transcripts.items()}, cases
+
+
+def _percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo)
+
+
+def _latency_summary(values_ms: list[float]) -> dict[str, float]:
+    return {
+        "count": len(values_ms),
+        "p50_ms": round(_percentile(values_ms, 0.50), 3),
+        "p95_ms": round(_percentile(values_ms, 0.95), 3),
+        "p99_ms": round(_percentile(values_ms, 0.99), 3),
+        "max_ms": round(max(values_ms), 3) if values_ms else 0.0,
+        "mean_ms": round(sum(values_ms) / len(values_ms), 3) if values_ms else 0.0,
+    }
+
+
+def _rss_peak_mb() -> float:
+    # ru_maxrss: килобайты на Linux, байты на macOS.
+    peak = float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    return round(peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0, 2)
+
+
+def _dir_size_mb(path: Path) -> float:
+    total = 0
+    for item in path.rglob("*"):
+        with suppress(OSError):
+            if item.is_file():
+                total += item.stat().st_size
+    return round(total / (1024.0 * 1024.0), 2)
+
+
+def _git_commit() -> str:
+    with suppress(Exception):
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parents[1],
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+        return out.stdout.strip()
+    return ""
+
+
+def run(args: argparse.Namespace) -> int:
+    owns_dir = not args.records_dir
+    records_dir = Path(args.records_dir or tempfile.mkdtemp(prefix="rag_bench_")).resolve()
+    _configure_env(
+        records_dir=records_dir,
+        dim=int(args.dim),
+        vectors=not args.keyword_only,
+        quantization=str(args.quantization),
+    )
+    _bootstrap_pythonpath()
+
+    from apps.api_gateway.routers import artifacts  # noqa: E402
+    from interview_analytics_agent.storage import records  # noqa: E402
+    from rag_benchmark import _evaluate_case  # noqa: E402
+
+    # Без БД: метаданные встреч и сегментов не нужны синтетическому корпусу.
+    artifacts._rag_segment_line_metadata = lambda meeting_id: []
+    artifacts._rag_meeting_meta = lambda meeting_id: {"display_name": meeting_id}
+    # Каждый запрос должен реально ранжироваться, а не отдаваться из кэша ответов.
+    artifacts._rag_query_cache_enabled = lambda: False
+
+    try:
+        gen_started = time.perf_counter()
+        meetings = int(args.meetings) or max(1, int(args.chunks) // 100)
+        transcripts, cases = _synthetic_corpus(
+            chunks=int(args.chunks),
+            meetings=meetings,
+            queries=int(args.queries),
+            seed=int(args.seed),
+        )
+        for meeting_id, text in transcripts.items():
+            records.write_text(meeting_id, "clean.txt", text)
+        gen_ms = (time.perf_counter() - gen_started) * 1000.0
+
+        build_started = time.perf_counter()
+
+        def _build(meeting_id: str) -> int:
+            payload, _cached = artifacts._ensure_rag_index(meeting_id, source="clean")
+            return len(list(payload.get("chunks") or []))
+
+        with ThreadPoolExecutor(max_workers=max(1, int(args.build_workers))) as pool:
+            built_chunks = sum(pool.map(_build, list(transcripts)))
+        build_s = time.perf_counter() - build_started
+        rss_after_build = _rss_peak_mb()
+
+        scope = list(transcripts) if args.scope == "all" else None
+        latencies: list[float] = []
+        stage_totals: dict[str, float] = {}
+        gateway_metrics = {"recall_at_k": 0.0, "mrr": 0.0, "ndcg_at_k": 0.0}
+        results: list[dict[str, Any]] = []
+        cold_ms = 0.0
+        for repeat in range(max(1, int(args.repeat))):
+            for case in cases:
+                req = artifacts.RAGQueryRequest(
+                    query=case["query"],
+                    meeting_ids=scope or case["meeting_ids"],
+                    top_k=int(args.top_k),
+                    debug=True,
+                )
+                started = time.perf_counter()
+                resp = artifacts._rag_query(req)
+                elapsed_ms = (time.perf_counter() - started) * 1000.0
+                if not cold_ms:
+                    # Первый запрос читает сегменты корпуса с диска — в перцентили не идёт.
+                    cold_ms = elapsed_ms
+                else:
+                    latencies.append(elapsed_ms)
+                for stage, value in resp.retrieval_metrics.stage_timings_ms.items():
+                    stage_totals[stage] = stage_totals.get(stage, 0.0) + float(value)
+                if repeat == 0:
+                    for key in gateway_metrics:
+                        gateway_metrics[key] += float(getattr(resp.retrieval_metrics, key))
+                    results.append(
+                        _evaluate_case({"hits": [hit.model_dump() for hit in resp.hits]}, case, int(args.top_k))
+                    )
+
+        denom = float(len(results) or 1)
+        report = {
+            "schema_version": "rag_offline_benchmark_v1",
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "git_commit": _git_commit(),
+            "config": {
+                "chunks_requested": int(args.chunks),
+                "meetings": len(transcripts),
+                "queries": len(cases),
+                "repeat": int(args.repeat),
+                "top_k": int(args.top_k),
+                "scope": args.scope,
+                "embedding_dim": int(args.dim),
+                "vectors": not args.keyword_only,
+                "quantization": str(args.quantization),
+                "build_workers": int(args.build_workers),
+                "seed": int(args.seed),
+            },
+            "build": {
+                "corpus_generate_ms": round(gen_ms, 2),
+                "chunks_indexed": built_chunks,
+                "elapsed_s": round(build_s, 3),
+                "chunks_per_s": round(built_chunks / max(build_s, 1e-9), 1),
+                "meetings_per_s": round(len(transcripts) / max(build_s, 1e-9), 2),
+            },
+            "query": {
+                "cold_first_query_ms": round(cold_ms, 3),
+                **_latency_summary(latencies),
+                "stage_mean_ms": {
+                    stage: round(total / max(1, len(latencies)), 3) for stage, total in sorted(stage_totals.items())
+                },
+            },
+            "quality": {
+                "recall_at_k_avg": round(sum(float(row["recall_at_k"]) for row in results) / denom, 6),
+                "mrr_avg": round(sum(float(row["mrr"]) for row in results) / denom, 6),
+                "ndcg_at_k_avg": round(sum(float(row["ndcg_at_k"]) for row in results) / denom, 6),
+                "gateway_recall_at_k_avg": round(gateway_metrics["recall_at_k"] / denom, 6),
+                "gateway_mrr_avg": round(gateway_metrics["mrr"] / denom, 6),
+                "gateway_ndcg_at_k_avg": round(gateway_metrics["ndcg_at_k"] / denom, 6),
+            },
+            "memory": {
+                "rss_peak_after_build_mb": rss_after_build,
+                "rss_peak_mb": _rss_peak_mb(),
+                "records_dir_mb": _dir_size_mb(records_dir),
+                "rag_corpus_mb": _dir_size_mb(records_dir / "_global" / "rag_corpus"),
+            },
+            "cases": results if args.include_cases else [],
+        }
+    finally:
+        if owns_dir and not args.keep:
+            shutil.rmtree(records_dir, ignore_errors=True)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.output:
+        out_path = Path(args.output)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(text + "\n", encoding="utf-8")
+    return 0
+
+
+def _parser() -> argparse.ArgumentParser:
+    p = argparse.ArgumentParser(description="In-process RAG benchmark on a synthetic corpus (hashing, offline)")
+    p.add_argument("--chunks", type=int, default=10_000, help="Target corpus size in chunks (1k..1M)")
+    p.add_argument("--meetings", type=int, default=0, help="Number of meetings (default: chunks / 100)")
+    p.add_argument("--queries", type=int, default=50)
+    p.add_argument("--repeat", type=int, default=1, help="Passes over the query set for latency percentiles")
+    p.add_argument("--top-k", type=int, default=8)
+    p.add_argument(
+        "--scope",
+        choices=["all", "case"],
+        default="all",
+        help="Query all meetings (archive-wide search) or only the meeting holding the answer",
+    )
+    p.add_argument("--dim", type=int, default=96, help="Hashing embedding dimension")
+    p.add_argument("--keyword-only", action="store_true", default=False, help="Disable vectors")
+    p.add_argument(
+        "--quantization",
+        choices=["float32", "float16", "int8"],
+        default="float32",
+        help="Embedding storage format in indexes and the embedding cache",
+    )
+    p.add_argument("--build-workers", type=int, default=1)
+    p.add_argument("--seed", type=int, default=13)
+    p.add_argument("--records-dir", default="", help="Work dir (default: temporary, removed afterwards)")
+    p.add_argument("--keep", action="store_true", default=False, help="Keep the temporary work dir")
+    p.add_argument("--include-cases", action="store_true", default=False, help="Per-case metrics in the report")
+    p.add_argument("--output", default="", help="Optional output JSON path")
+    return p
+
+
+if __name__ == "__main__":
+    raise SystemExit(run(_parser().parse_args()))